@@ -7,6 +7,24 @@ from azure.storage.blob import BlobServiceClient, BlobSasPermissions, generate_b
 from datetime import datetime, timedelta, UTC
 import xml.etree.ElementTree as ET
 
+# Stored documents may be gzip-compressed (Content-Encoding: gzip)
+try:
+    from PortmanXMLConverter.src.serialization import decompress_xml
+except ImportError:
+    import gzip
+
+    def decompress_xml(data):
+        """Decompress gzip-compressed blob content; plain content is returned as is."""
+        return gzip.decompress(data) if data[:2] == b"\x1f\x8b" else data
+
+# Notification fields written as blob metadata when the document is stored
+try:
+    from PortmanXMLConverter.src.blob_metadata import info_from_metadata
+except ImportError:
+    def info_from_metadata(metadata):
+        """Without the converter package, the fields are always parsed from the XML."""
+        return None
+
 # Import the shared blob utility function
 try:
     from PortmanTrigger.blob_utils import generate_blob_storage_link
@@ -77,9 +95,6 @@ def blob_trigger(blob: func.InputStream):
     channel = os.environ.get("SLACK_CHANNEL")
     username = "Portman Bot"
     try:
-        # Read the blob content
-        blob_content = blob.read().decode('utf-8')
-
         # Determine XML type based on blob name
         if blob_basename.startswith("NOA_"):
             xml_type = "NOA"
@@ -87,9 +102,19 @@ def blob_trigger(blob: func.InputStream):
             xml_type = "VID"
         else:
             xml_type = "ATA"
-        
-        # Parse the XML to extract information
-        port_call_id, time_value, remarks, _, passengers_count, crew_count = extract_info_from_xml(blob_content, xml_type)
+
+        # The converter writes the notification fields as blob metadata; documents
+        # stored without them are read and parsed
+        blob_content = None
+        info = info_from_metadata(getattr(blob, "metadata", None))
+        if info is not None:
+            port_call_id, time_value, remarks, passengers_count, crew_count = info
+        else:
+            # Read the blob content, compressed or plain
+            blob_content = decompress_xml(blob.read()).decode('utf-8')
+
+            # Parse the XML to extract information
+            port_call_id, time_value, remarks, _, passengers_count, crew_count = extract_info_from_xml(blob_content, xml_type)
 
         # Generate a URL with SAS token to access the blob directly
         blob_url = generate_blob_storage_link(blob.name)
@@ -0,0 +1,45 @@
+"""
+Test module for the XML generation benchmark suite.
+"""
+
+from PortmanXMLConverter.benchmarks.suite import STAGES, compare_results, run_suite, synthetic_port_calls
+from PortmanXMLConverter.src.converter import convert_port_call
+
+
+def test_corpus_is_deterministic_and_valid():
+    port_calls = synthetic_port_calls(40, seed=7)
+
+    assert port_calls == synthetic_port_calls(40, seed=7)
+    assert port_calls != synthetic_port_calls(40, seed=8)
+    assert len({port_call["portCallId"] for port_call in port_calls}) == 40
+    for port_call in port_calls:
+        results = convert_port_call(port_call, ["ATA", "NOA", "VID"])
+        assert all(success for success, _ in results.values()), results
+
+
+def test_run_suite_in_process():
+    results = run_suite(["VID"], STAGES, count=10, isolate=False)
+
+    assert results["corpus"] == {"count": 10, "seed": 1}
+    assert set(results["results"]["VID"]) == set(STAGES)
+    for metrics in results["results"]["VID"].values():
+        assert metrics["documents"] == 10
+        assert metrics["failures"] == 0
+        assert metrics["docs_per_second"] > 0
+        assert 0 < metrics["p50_ms"] <= metrics["p99_ms"]
+        assert metrics["peak_rss_kb"] is None
+
+
+def test_compare_results_flags_regressions_beyond_tolerance():
+    def results(docs_per_second, p99_ms):
+        return {"results": {"NOA": {"convert": {"docs_per_second": docs_per_second, "p50_ms": 0.4,
+                                                "p99_ms": p99_ms, "peak_rss_kb": None}}}}
+
+    rows = compare_results(results(850.0, 1.05), results(1000.0, 1.0), tolerance=10)
+
+    assert [(row["metric"], row["change_percent"], row["regression"]) for row in rows] == [
+        ("docs_per_second", -15.0, True),
+        ("p50_ms", 0.0, False),
+        ("p99_ms", 5.0, False),
+    ]
+    assert compare_results(results(1000.0, 1.0), {"results": {}}) == []
@@ -0,0 +1,103 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from azure.core.exceptions import ResourceExistsError
+from PortmanTrigger import blob_utils
+
+CONNECTION_STRING = ("DefaultEndpointsProtocol=https;AccountName=portman;AccountKey=a2V5;"
+                     "EndpointSuffix=core.windows.net")
+
+
+class TestBlobClients(unittest.TestCase):
+    def setUp(self):
+        blob_utils.reset_blob_clients()
+        patcher = patch('PortmanTrigger.blob_utils.BlobServiceClient')
+        self.mock_service_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(blob_utils.reset_blob_clients)
+        self.mock_service = self.mock_service_class.from_connection_string.return_value
+        self.mock_service.account_name = "portman"
+        self.mock_container = self.mock_service.get_container_client.return_value
+
+    def test_clients_are_created_and_checked_once(self):
+        """The service client is shared and the container is checked on first use only."""
+        self.mock_container.exists.return_value = True
+
+        for _ in range(3):
+            container_client = blob_utils.get_container_client("xml", CONNECTION_STRING)
+            blob_utils.generate_blob_storage_link("xml/ATA_1.xml", CONNECTION_STRING)
+
+        self.assertIs(container_client, self.mock_container)
+        self.mock_service_class.from_connection_string.assert_called_once_with(CONNECTION_STRING)
+        self.mock_container.exists.assert_called_once()
+        self.mock_container.create_container.assert_not_called()
+
+    def test_missing_container_is_created(self):
+        self.mock_container.exists.return_value = False
+        self.mock_container.create_container.side_effect = ResourceExistsError("created by another worker")
+
+        self.assertIs(blob_utils.get_container_client("xml", CONNECTION_STRING), self.mock_container)
+        self.mock_container.create_container.assert_called_once()
+
+    def test_reset_checks_container_again(self):
+        self.mock_container.exists.return_value = True
+        blob_utils.get_container_client("xml", CONNECTION_STRING)
+
+        blob_utils.reset_blob_clients("xml")
+        blob_utils.get_container_client("xml", CONNECTION_STRING)
+
+        self.assertEqual(self.mock_container.exists.call_count, 2)
+        self.mock_service_class.from_connection_string.assert_called_once()
+
+    def test_link_contains_sas_token(self):
+        url = blob_utils.generate_blob_storage_link("xml/NOA_1.xml", CONNECTION_STRING)
+
+        self.assertTrue(url.startswith("https://portman.blob.core.windows.net/xml/NOA_1.xml?"))
+        self.assertIn("sig=", url)
+
+
+class TestShortLivedLinks(unittest.TestCase):
+    def setUp(self):
+        blob_utils.reset_blob_clients()
+        blob_utils._cached_blob_url.cache_clear()
+        patcher = patch('PortmanTrigger.blob_utils.BlobServiceClient')
+        patcher.start().from_connection_string.return_value.account_name = "portman"
+        self.addCleanup(patcher.stop)
+        self.addCleanup(blob_utils.reset_blob_clients)
+        config_patcher = patch.dict(blob_utils.BLOB_LINK_CONFIG, {"sas_ttl_minutes": 15, "sas_bucket_minutes": 5})
+        config_patcher.start()
+        self.addCleanup(config_patcher.stop)
+
+    @patch('PortmanTrigger.blob_utils.generate_blob_sas', return_value="se=x&sig=y")
+    def test_links_within_a_bucket_share_one_signature(self, mock_sign):
+        """Requests in the same 5-minute bucket reuse the signature, which expires 15 minutes after the bucket."""
+        start = 1710324000  # 2024-03-13 10:00:00 UTC, a bucket boundary
+        url, expiry = blob_utils.generate_short_lived_link("xml/NOA_1.xml", CONNECTION_STRING, now=start + 10)
+        again, _ = blob_utils.generate_short_lived_link("xml/NOA_1.xml", CONNECTION_STRING, now=start + 299)
+
+        self.assertEqual(url, "https://portman.blob.core.windows.net/xml/NOA_1.xml?se=x&sig=y")
+        self.assertEqual(again, url)
+        self.assertEqual(expiry.timestamp(), start + 300 + 900)
+        self.assertEqual(mock_sign.call_count, 1)
+        self.assertEqual(mock_sign.call_args[1]["expiry"], expiry)
+
+        _, next_expiry = blob_utils.generate_short_lived_link("xml/NOA_1.xml", CONNECTION_STRING, now=start + 300)
+        blob_utils.generate_short_lived_link("xml/VID_1.xml", CONNECTION_STRING, now=start + 10)
+        self.assertEqual(next_expiry.timestamp(), start + 600 + 900)
+        self.assertEqual(mock_sign.call_count, 3)
+
+    def test_no_link_without_connection_string(self):
+        with patch.dict('os.environ', {}, clear=True):
+            self.assertEqual(blob_utils.generate_short_lived_link("xml/NOA_1.xml"), ("", None))
+
+    def test_blob_path_from_stored_values(self):
+        self.assertEqual(blob_utils.blob_path_from_url(
+            "https://portman.blob.core.windows.net/xml/NOA_1.xml?se=2024&sig=y"), "xml/NOA_1.xml")
+        self.assertEqual(blob_utils.blob_path_from_url("xml/NOA_1.xml"), "xml/NOA_1.xml")
+        self.assertEqual(blob_utils.blob_path_from_response({"blobPath": "xml/VID_1.xml"}), "xml/VID_1.xml")
+        self.assertEqual(blob_utils.blob_path_from_response(
+            {"sasUrl": "https://portman.blob.core.windows.net/xml/ATA_1.xml?sig=y"}), "xml/ATA_1.xml")
+        self.assertIsNone(blob_utils.blob_path_from_response({"status": "success"}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Test module for concurrent uploads of generated documents.
+"""
+
+import threading
+
+import pytest
+
+from PortmanXMLConverter.src.bulk_upload import BulkUploader, is_throttling_error
+
+
+class StorageError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FakeStorage:
+    """Upload function recording uploads and the number of uploads in flight."""
+
+    def __init__(self, failures=None):
+        self.blobs = {}
+        self.failures = dict(failures or {})
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._release = threading.Event()
+
+    def __call__(self, name, data):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            self._release.wait(0.01)
+            with self._lock:
+                statuses = self.failures.get(name)
+                if statuses:
+                    raise StorageError(statuses.pop(0))
+                self.blobs[name] = data
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def test_is_throttling_error():
+    assert is_throttling_error(StorageError(429))
+    assert is_throttling_error(StorageError(503))
+    assert not is_throttling_error(StorageError(404))
+    assert not is_throttling_error(ValueError("boom"))
+
+
+def test_uploads_are_concurrent_and_bounded():
+    storage = FakeStorage()
+
+    with BulkUploader(storage, concurrency=4, progress=lambda *counts: None) as uploader:
+        for i in range(40):
+            uploader.submit(f"VID_{i}.xml", f"<Envelope>{i}</Envelope>")
+
+    assert len(storage.blobs) == 40
+    assert 1 < storage.max_in_flight <= 4
+    assert (uploader.done, uploader.failed) == (40, 0)
+
+
+def test_throttled_uploads_are_retried_with_backoff():
+    storage = FakeStorage({"NOA_1.xml": [429, 503], "NOA_2.xml": [429] * 5})
+    delays = []
+
+    uploader = BulkUploader(storage, concurrency=2, max_attempts=3, base_delay=1.0, max_delay=30.0,
+                            sleep=delays.append, random_source=lambda: 0.0, progress=lambda *counts: None)
+    uploader.submit("NOA_1.xml", "<Envelope/>")
+    uploader.submit("NOA_2.xml", "<Envelope/>")
+    results = uploader.close()
+
+    assert [(result.name, result.success, result.attempts) for result in results] == [
+        ("NOA_1.xml", True, 3), ("NOA_2.xml", False, 3)]
+    assert "HTTP 429" in results[1].error
+    assert sorted(delays) == [0.5, 0.5, 1.0, 1.0]
+    assert (uploader.retries, uploader.failed) == (4, 1)
+
+
+def test_other_errors_are_not_retried():
+    storage = FakeStorage({"ATA_1.xml": [403]})
+
+    uploader = BulkUploader(storage, max_attempts=5, sleep=pytest.fail, progress=lambda *counts: None)
+    uploader.submit("ATA_1.xml", "<Envelope/>")
+    (result,) = uploader.close()
+
+    assert (result.success, result.attempts) == (False, 1)
+
+
+def test_progress_reports():
+    reports = []
+
+    uploader = BulkUploader(FakeStorage({"VID_4.xml": [400]}), concurrency=1, progress_every=2,
+                            progress=lambda *counts: reports.append(counts))
+    for i in range(5):
+        uploader.submit(f"VID_{i}.xml", "<Envelope/>")
+    uploader.close()
+
+    assert [counts[0] for counts in reports] == [2, 4, 5]
+    assert reports[-1] == (5, 5, 1)
+    with pytest.raises(RuntimeError):
+        uploader.submit("VID_5.xml", "<Envelope/>")
@@ -0,0 +1,115 @@
+"""
+Test module for the declarative Digitraffic adapter.
+"""
+
+import pytest
+
+from PortmanXMLConverter.src.digitraffic_adapter import (
+    adapt_digitraffic_to_portman, adapt_digitraffic_batch, adapt_digitraffic_multi, compile_mapping, _field
+)
+from PortmanTests.test_xml_templates import SAMPLE_PORT_CALL
+
+
+def test_adapt_port_call():
+    portman_data = adapt_digitraffic_to_portman(SAMPLE_PORT_CALL, "NOA")
+
+    assert portman_data["document_id"] == "MSGID-3190880"
+    assert portman_data["declaration_id"] == "DECL-PT-3190880"
+    assert portman_data["call_id"] == "3190880"
+    assert portman_data["remarks"] == "Viking Grace (IMO: 9606900) -> FITKU/Matkustajasatama/viking1"
+    assert portman_data["eta"] == "2024-03-13T10:00:00Z"
+    assert portman_data["etd"] == "2024-03-13T20:00:00Z"
+    assert portman_data["arrival_datetime"] == "2024-03-13T10:05:00.000Z"
+    assert portman_data["location"] == "FITKU"
+    assert portman_data["imoLloyds"] == 9606900
+    assert portman_data["passengersOnArrival"] == 235
+    assert portman_data["declarant"]["id"] == "FI9606900"
+    assert portman_data["declarant"]["name"] == "Viking Line Abp / Helsinki"
+
+
+def test_arrival_remarks_and_unknown_locations():
+    port_call = dict(SAMPLE_PORT_CALL, imoLloyds=0, portAreaName="Ei tiedossa", berthName="")
+
+    portman_data = adapt_digitraffic_to_portman(port_call, "ATA")
+
+    assert portman_data["remarks"] == "Viking Grace port arrival -> FITKU"
+    assert "imoLloyds" not in portman_data
+    assert portman_data["declarant"]["id"] == "FI123456789012"
+
+
+@pytest.mark.parametrize("formality_type, present, absent", [
+    ("ATA", [], ["radioCallSign", "passengersOnArrival", "crewOnArrival"]),
+    ("NOA", ["passengersOnArrival", "crewOnArrival"], ["radioCallSign"]),
+    ("VID", ["radioCallSign"], ["passengersOnArrival", "crewOnArrival"]),
+    (None, ["radioCallSign", "passengersOnArrival", "crewOnArrival"], []),
+])
+def test_formality_applicability(formality_type, present, absent):
+    portman_data = adapt_digitraffic_to_portman(SAMPLE_PORT_CALL, formality_type)
+
+    assert all(key in portman_data for key in present)
+    assert not any(key in portman_data for key in absent)
+
+
+def test_missing_and_null_values():
+    portman_data = adapt_digitraffic_to_portman(
+        {"portCallId": 1, "portAreaName": None, "crewOnArrival": "x", "eta": "2024-03-13T10:00:00Z"}, "NOA")
+
+    assert portman_data["vesselName"] == "unknown"
+    assert portman_data["portAreaName"] == ""
+    assert portman_data["remarks"] == "unknown -> "
+    assert portman_data["arrival_datetime"] == "2024-03-13T10:00:00Z"
+    assert "crewOnArrival" not in portman_data
+    assert portman_data["declarant"]["name"] == "Unknown Agent"
+
+
+def test_unparseable_datetime_is_kept():
+    assert adapt_digitraffic_to_portman(dict(SAMPLE_PORT_CALL, eta="soon"), "NOA")["eta"] == "soon"
+
+
+def test_batch_matches_single_adaptation():
+    port_calls = [SAMPLE_PORT_CALL, dict(SAMPLE_PORT_CALL, portCallId=2, vesselName="Other"), "not a port call"]
+
+    batch = adapt_digitraffic_batch(port_calls, "VID")
+
+    assert len(batch) == 3
+    for port_call, portman_data in zip(port_calls[:2], batch):
+        expected = adapt_digitraffic_to_portman(port_call, "VID")
+        expected["timestamp"] = portman_data["timestamp"]
+        assert portman_data == expected
+    # Port call data that cannot be adapted gets the minimal fallback structure
+    assert batch[2]["location"] == "UNKNW"
+
+
+@pytest.mark.parametrize("port_call", [
+    SAMPLE_PORT_CALL,
+    dict(SAMPLE_PORT_CALL, imoLloyds=0, radioCallSign=None, passengersOnArrival="x"),
+    {"portCallId": 1},
+])
+def test_multi_matches_single_adaptation(port_call):
+    formality_types = ["VID", "NOA", "ATA"]
+
+    multi = adapt_digitraffic_multi(port_call, formality_types)
+
+    assert list(multi) == formality_types
+    for formality_type in formality_types:
+        expected = adapt_digitraffic_to_portman(port_call, formality_type)
+        expected["timestamp"] = multi[formality_type]["timestamp"]
+        assert multi[formality_type] == expected
+
+
+def test_declarant_is_not_shared():
+    first, second = adapt_digitraffic_batch([SAMPLE_PORT_CALL, SAMPLE_PORT_CALL], "ATA")
+    first["declarant"]["address"]["city"] = "Turku"
+
+    assert second["declarant"]["address"]["city"] == "Port City"
+
+
+def test_compile_custom_mapping():
+    adapt = compile_mapping([
+        _field("name", "vesselName", str.upper, default="?"),
+        _field("vid_only", "radioCallSign", formalities=("VID",)),
+        _field("label", derive=lambda out, data, xml_type, now: f"{xml_type}:{out['name']}@{now}"),
+    ], "NOA")
+
+    assert adapt({"vesselName": "viking", "radioCallSign": "OJPV"}, "T") == {"name": "VIKING", "label": "NOA:VIKING@T"}
+    assert adapt({}, "T") == {"name": "?", "label": "NOA:?@T"}
@@ -0,0 +1,176 @@
+"""
+Test module for the Portman data validators generated from the EMSWe XSD schemas.
+"""
+
+import copy
+
+import pytest
+
+from PortmanXMLConverter.src.converter import EMSWeConverter, convert_port_call
+from PortmanXMLConverter.src.digitraffic_adapter import adapt_digitraffic_to_portman
+from PortmanXMLConverter.src.generated_validators import validate_portman_data
+from PortmanXMLConverter.src.transformer import XMLTransformer
+from PortmanXMLConverter.src.validator import XMLValidator
+from PortmanXMLConverter.src.validator_codegen import DATA_FIELDS, GENERATED_MODULE_PATH, generate_module, main
+from PortmanTests.test_xml_templates import SAMPLE_PORT_CALL
+
+SPARSE_PORT_CALL = {"portCallId": 42, "vesselName": "Sparse", "portToVisit": "FIHEL"}
+
+_DELETE = object()
+
+# Values tried for every field: types, codes, whitespace and lengths around the schema limits
+CORPUS_VALUES = [
+    _DELETE, None, 0, 7, "", " ", "A", "0", "1", "true", "2", " 1 ", "FI", "fi", "XX", "  FI  ", "AG", "CPE", "ZZZ",
+    "1501", "99999", "FITKU", " FITKU ", "FI TKU", "A" * 7, "A" * 8, " " + "A" * 7 + " ", "A" * 17, "A" * 18,
+    "A" * 22, "A" * 23, "A" * 35, "A" * 36, "A" * 70, "A" * 71, " " + "A" * 70 + " ", "A  " * 30, "A\n" * 36,
+    "A" * 256, "A" * 257, "A" * 512, "A" * 513,
+]
+CONTAINER_VALUES = [_DELETE, None, {}, "A"]
+
+
+def _portman_data(port_call, formality_type):
+    portman_data = adapt_digitraffic_to_portman(port_call, formality_type)
+    portman_data["timestamp"] = "2024-03-13T09:00:00Z"
+    return portman_data
+
+
+def _set(portman_data, key, value):
+    for part in key[:-1]:
+        portman_data = portman_data.setdefault(part, {})
+    if value is _DELETE:
+        portman_data.pop(key[-1], None)
+    else:
+        portman_data[key[-1]] = value
+
+
+def _xsd_valid(portman_data, formality_type):
+    xml_root = XMLTransformer().portman_to_emswe(portman_data, formality_type)
+    return xml_root is not None and XMLValidator(formality_type).validate(xml_root)[0]
+
+
+def test_generated_module_is_up_to_date():
+    """The committed module matches the generator output for the current schemas."""
+    with open(GENERATED_MODULE_PATH, encoding="utf-8") as f:
+        assert f.read() == generate_module()
+    assert main(["--check"]) == 0
+
+
+def test_check_reports_stale_module(tmp_path, capsys):
+    stale = tmp_path / "generated_validators.py"
+    stale.write_text("# stale\n", encoding="utf-8")
+
+    assert main(["--check", "--output-file", str(stale)]) == 1
+    assert "out of date" in capsys.readouterr().out
+
+
+def _corpus_mismatches(base, formality_type):
+    """Corpus variations of `base` on which the generated validator and the XSD disagree."""
+    keys = sorted({field.key for field in DATA_FIELDS if formality_type in field.formality_types})
+    mismatches = []
+    for key in keys:
+        for value in CORPUS_VALUES:
+            portman_data = copy.deepcopy(base)
+            _set(portman_data, key, value)
+
+            errors = validate_portman_data(portman_data, formality_type)
+            if bool(errors) == _xsd_valid(portman_data, formality_type):
+                mismatches.append((key, value, errors))
+
+    # Enclosing dicts of nested fields, e.g. declarant.contact, absent or of another type
+    containers = sorted({key[:depth] for key in keys for depth in range(1, len(key))})
+    for key in containers:
+        for value in CONTAINER_VALUES:
+            portman_data = copy.deepcopy(base)
+            _set(portman_data, key, value)
+
+            errors = validate_portman_data(portman_data, formality_type)
+            if bool(errors) == _xsd_valid(portman_data, formality_type):
+                mismatches.append((key, value, errors))
+    return mismatches
+
+
+@pytest.mark.parametrize("port_call", [SAMPLE_PORT_CALL, SPARSE_PORT_CALL], ids=["sample", "sparse"])
+@pytest.mark.parametrize("formality_type", ["ATA", "NOA", "VID"])
+def test_verdicts_match_xsd_validation(formality_type, port_call):
+    """Over the corpus, the generated validator rejects exactly the data whose document fails the XSD."""
+    base = _portman_data(port_call, formality_type)
+    assert validate_portman_data(base, formality_type) == []
+    assert _xsd_valid(base, formality_type)
+
+    assert _corpus_mismatches(base, formality_type) == []
+
+
+def test_verdicts_match_xsd_validation_without_vessel():
+    """Without imoLloyds and vesselName the NOA leaves out UsedLogisticsTransportMeans and its values."""
+    base = _portman_data(SAMPLE_PORT_CALL, "NOA")
+    del base["imoLloyds"], base["vesselName"]
+    base["vesselTypeCode"] = "ZZZ"  # not in the code list, but never rendered
+    assert validate_portman_data(base, "NOA") == []
+    assert _xsd_valid(base, "NOA")
+
+    assert _corpus_mismatches(base, "NOA") == []
+
+
+def test_error_messages():
+    portman_data = _portman_data(SAMPLE_PORT_CALL, "NOA")
+    portman_data["declarant"]["id"] = "X" * 18
+    portman_data["declarant"]["address"]["country"] = " fi "
+    del portman_data["declarant"]["address"]["city"]
+    portman_data["mode_code"] = " 1 "  # whitespace is collapsed in token values
+
+    assert validate_portman_data(portman_data, "NOA") == [
+        "declarant.id: value has length 18, maximum is 17",
+        "declarant.address.city: required value is missing",
+        "declarant.address.country: value 'fi' is not in the code list",
+    ]
+
+
+def test_defaults_and_elements_missing_from_schema():
+    noa = _portman_data(SAMPLE_PORT_CALL, "NOA")
+    noa["call_id"] = "C" * 14  # the default voyage ID VYG-<call ID> exceeds 17 characters
+    vid = _portman_data(SAMPLE_PORT_CALL, "VID")
+    vid["vesselTypeCode"] = 1501
+
+    assert validate_portman_data(noa, "NOA") == [
+        "call_id (default of voyage_id): value has length 18, maximum is 17"]
+    assert validate_portman_data(vid, "VID") == [
+        "vesselTypeCode: element vid:SpecifiedLogisticsTransportMovement/ram:UsedLogisticsTransportMeans/ram:TypeCode"
+        " is not allowed by the VID schema"]
+    assert validate_portman_data(noa, "UNKNOWN") == []
+
+
+@pytest.mark.parametrize("formality_type", ["ATA", "NOA", "VID"])
+def test_absent_optional_containers(formality_type):
+    """Without declarant contact or address the data is valid and converts."""
+    portman_data = _portman_data(SAMPLE_PORT_CALL, formality_type)
+    del portman_data["declarant"]["contact"]
+    del portman_data["declarant"]["address"]
+
+    assert validate_portman_data(portman_data, formality_type) == []
+    assert EMSWeConverter(formality_type).convert_to_emswe(portman_data)[0]
+
+    portman_data["declarant"]["contact"] = None
+    assert validate_portman_data(portman_data, formality_type) == ["declarant.contact: value must be a dict"]
+
+
+def test_converter_rejects_invalid_data_before_building_xml(monkeypatch):
+    converter = EMSWeConverter("ATA")
+    monkeypatch.setattr(converter.transformer, "portman_to_emswe",
+                        lambda *args: pytest.fail("XML built for invalid data"))
+    portman_data = _portman_data(SAMPLE_PORT_CALL, "ATA")
+    portman_data["anchorage_indicator"] = "true"
+
+    success, message = converter.convert_to_emswe(portman_data)
+
+    assert not success
+    assert message == "anchorage_indicator: value 'true' does not match '1 | 0'"
+
+
+def test_convert_port_call_rejects_invalid_types_only():
+    port_call = dict(SAMPLE_PORT_CALL, berthName="B" * 71)  # used by NOA only
+
+    results = convert_port_call(port_call, ["VID", "NOA", "ATA"])
+
+    assert list(results) == ["VID", "NOA", "ATA"]
+    assert results["VID"][0] and results["ATA"][0]
+    assert results["NOA"] == (False, "berthName: value has length 71, maximum is 70")
@@ -0,0 +1,148 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from PortmanTrigger.idempotency import IdempotencyKeys, make_idempotency_key, complete_idempotency_key
+from PortmanTrigger.portman import process_query, save_results_to_db, generate_noa
+
+class FakeKeyTable:
+    """Cursor keeping the xml_idempotency_keys rows in a dictionary (keys never expire)."""
+
+    def __init__(self):
+        self.rows = {}
+        self.result = None
+
+    def execute(self, query, params):
+        if "INSERT INTO xml_idempotency_keys" in query:
+            key, port_call_id, formality = params[:3]
+            claimed = key not in self.rows
+            if claimed:
+                self.rows[key] = {"portCallId": port_call_id, "formality": formality, "status": "pending"}
+            self.result = (key,) if claimed else None
+        elif "UPDATE xml_idempotency_keys" in query:
+            self.rows[params[2]]["status"] = "done"
+        elif "idempotency_key <>" in query:
+            port_call_id, formality, key = params
+            for other in [k for k, row in self.rows.items()
+                          if row["portCallId"] == port_call_id and row["formality"] == formality
+                          and k != key and row["status"] == "done"]:
+                del self.rows[other]
+        elif "DELETE FROM xml_idempotency_keys" in query:
+            if self.rows.get(params[0], {}).get("status") == "pending":
+                del self.rows[params[0]]
+
+    def fetchone(self):
+        return self.result
+
+    def close(self):
+        pass
+
+class TestIdempotencyKeys(unittest.TestCase):
+    def setUp(self):
+        """Set up a mock database connection."""
+        self.mock_conn = MagicMock()
+        self.mock_cursor = MagicMock()
+        self.mock_conn.cursor.return_value = self.mock_cursor
+        self.keys = IdempotencyKeys(lambda db_name: self.mock_conn)
+
+    def test_make_idempotency_key(self):
+        self.assertEqual(make_idempotency_key("3190880", "NOA", "2024-03-13T10:00:00.000Z"),
+                         "3190880:NOA:2024-03-13T10:00:00.000Z")
+        self.assertEqual(make_idempotency_key(3190880, "VID"), "3190880:VID:")
+
+    def test_claim_new_event(self):
+        """A new event is claimed on an autocommit connection."""
+        self.mock_cursor.fetchone.return_value = ("3190880:NOA:2024-03-13T10:00:00.000Z",)
+
+        key = self.keys.claim(3190880, "NOA", "2024-03-13T10:00:00.000Z")
+
+        self.assertEqual(key, "3190880:NOA:2024-03-13T10:00:00.000Z")
+        self.assertTrue(self.mock_conn.autocommit)
+        self.assertIn("ON CONFLICT", self.mock_cursor.execute.call_args[0][0])
+        self.assertEqual(self.keys.duplicates, 0)
+
+    def test_claim_duplicate_event(self):
+        """An event with an unexpired key is dropped."""
+        self.mock_cursor.fetchone.return_value = None
+
+        self.assertIsNone(self.keys.claim(3190880, "ATA", "2024-03-13T10:05:00.000Z"))
+        self.assertEqual(self.keys.duplicates, 1)
+
+    def test_claim_without_database(self):
+        """Generation is not blocked when the database is unavailable."""
+        keys = IdempotencyKeys(lambda db_name: None)
+        self.assertEqual(keys.claim(3190880, "VID"), "3190880:VID:")
+
+        self.mock_cursor.execute.side_effect = Exception("connection lost")
+        self.assertEqual(self.keys.claim(3190880, "VID"), "3190880:VID:")
+        self.mock_conn.close.assert_called()
+
+    def test_disabled_keys_do_not_connect(self):
+        """Disabled keys (SQLite) return every key unclaimed without a database."""
+        get_connection = MagicMock()
+        keys = IdempotencyKeys(get_connection, enabled=False)
+
+        self.assertEqual(keys.claim(3190880, "VID"), "3190880:VID:")
+        keys.release("3190880:VID:")
+        self.assertEqual(keys.purge_expired(), 0)
+        get_connection.assert_not_called()
+
+    def test_release_and_complete(self):
+        self.keys.release("3190880:VID:")
+        self.assertIn("DELETE", self.mock_cursor.execute.call_args[0][0])
+        self.assertEqual(self.mock_cursor.execute.call_args[0][1], ("3190880:VID:",))
+
+        cursor = MagicMock()
+        complete_idempotency_key(cursor, "3190880:VID:", "https://example/VID.xml")
+        (update, update_params), (delete, delete_params) = [call[0] for call in cursor.execute.call_args_list]
+        self.assertIn("status = 'done'", update)
+        self.assertEqual(update_params[0], "https://example/VID.xml")
+        self.assertIn("DELETE", delete)
+        self.assertEqual(delete_params, (3190880, "VID", "3190880:VID:"))
+
+    @patch('PortmanTrigger.portman.createNoaXml')
+    def test_reverted_eta_is_generated_again(self, mock_create_noa):
+        """An ETA changing A -> B -> A generates three NOAs; a repeated ETA is still a duplicate."""
+        table = FakeKeyTable()
+        conn = MagicMock()
+        conn.cursor.return_value = table
+        keys = IdempotencyKeys(lambda db_name: conn)
+
+        def create_noa(noa_data, idempotency_key, retry_queue):
+            complete_idempotency_key(table, idempotency_key, f"emswe-xml-messages/NOA_{noa_data['eta']}.xml")
+            return True
+        mock_create_noa.side_effect = create_noa
+
+        statuses = [generate_noa({"portCallId": 3190880, "eta": eta}, keys)
+                    for eta in ("2024-03-13T10:00:00.000Z", "2024-03-13T11:00:00.000Z",
+                                "2024-03-13T10:00:00.000Z", "2024-03-13T10:00:00.000Z")]
+
+        self.assertEqual(statuses, ["generated", "generated", "generated", "duplicate"])
+        self.assertEqual(list(table.rows), ["3190880:NOA:2024-03-13T10:00:00.000Z"])
+
+    @patch('PortmanTrigger.portman.createNoaXml')
+    @patch('PortmanTrigger.portman.IdempotencyKeys.claim')
+    @patch('pg8000.connect')
+    def test_save_results_skips_duplicate_noa(self, mock_connect, mock_claim, mock_create_noa):
+        """An ETA change whose idempotency key is taken does not call the converter."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_connect.return_value = mock_conn
+
+        old_eta = MagicMock()
+        old_eta.strftime.return_value = "2024-03-13T09:00:00.000Z"
+        mock_cursor.fetchall.return_value = [(3190880, None, old_eta)]
+        mock_claim.return_value = None
+
+        results = process_query({"portCalls": [{
+            "portCallId": 3190880,
+            "imoLloyds": 9606900,
+            "vesselName": "Viking Grace",
+            "portAreaDetails": [{"eta": "2024-03-13T10:00:00.000+00:00", "portAreaName": "Matkustajasatama"}]
+        }]})
+        save_results_to_db(results)
+
+        mock_claim.assert_called_once_with(3190880, "NOA", "2024-03-13T10:00:00.000Z")
+        mock_create_noa.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Test module for the structured log events.
+"""
+
+import logging
+
+import pytest
+
+from PortmanXMLConverter.src.log_events import (
+    EventSampler, Lazy, LazyJSON, log_event, parse_sample_rates, set_event_sampler
+)
+
+LOGGER_NAME = "PortmanTests.log_events"
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def default_sampler():
+    set_event_sampler(EventSampler())
+    yield
+    set_event_sampler(None)
+
+
+def test_disabled_level_renders_nothing(caplog):
+    calls = []
+    payload = Lazy(lambda: calls.append(1) or "rendered")
+    caplog.set_level(logging.INFO, logger=LOGGER_NAME)
+
+    assert not log_event(logging.getLogger(LOGGER_NAME), logging.DEBUG, "test.payload", payload=payload)
+    assert calls == [] and caplog.records == []
+
+    assert log_event(logging.getLogger(LOGGER_NAME), logging.INFO, "test.payload", payload=payload)
+    assert caplog.records[0].getMessage() == "test.payload payload=rendered"
+    assert calls == [1]
+
+
+def test_event_fields(caplog):
+    caplog.set_level(logging.DEBUG, logger=LOGGER_NAME)
+
+    log_event(logging.getLogger(LOGGER_NAME), logging.INFO, "converter.request", formality_type="NOA",
+              vessel="Viking Grace", remarks="", payload=LazyJSON({"portCallId": 1, "vesselName": "Viking Grace"}))
+
+    record = caplog.records[0]
+    assert record.getMessage() == ('converter.request formality_type=NOA vessel="Viking Grace" remarks=""'
+                                   ' payload={"portCallId": 1, "vesselName": "Viking Grace"}')
+    assert record.event == "converter.request"
+    assert record.event_fields["formality_type"] == "NOA"
+
+
+def test_payload_truncation():
+    assert str(LazyJSON("x" * 20, max_chars=10)) == '"xxxxxxxxx...<12 more chars>'
+    assert str(LazyJSON("x" * 20, max_chars=0)) == '"' + "x" * 20 + '"'
+
+
+def test_sample_rates():
+    assert parse_sample_rates("converter.payload=0.25, *=0.5,bad, worse=x,high=3") == {
+        "converter.payload": 0.25, "*": 0.5, "high": 1.0}
+
+    draws = iter([0.1, 0.3, 0.4, 0.6])
+    sampler = EventSampler({"converter.payload": 0.25, "*": 0.5}, random_source=lambda: next(draws))
+
+    assert sampler.admit("converter.payload") == 0
+    assert sampler.admit("converter.payload") is None
+    assert sampler.admit("other") == 0
+    assert sampler.admit("other") is None
+
+
+def test_rate_limit_reports_suppressed_records(caplog):
+    clock = _Clock()
+    set_event_sampler(EventSampler(rate_limit_per_minute=2, clock=clock))
+    caplog.set_level(logging.INFO, logger=LOGGER_NAME)
+    log = logging.getLogger(LOGGER_NAME)
+
+    emitted = [log_event(log, logging.INFO, "noisy") for _ in range(5)]
+    assert emitted == [True, True, False, False, False]
+    assert log_event(log, logging.INFO, "quiet")
+
+    clock.now = 60.0
+    assert log_event(log, logging.INFO, "noisy")
+    assert [record.getMessage() for record in caplog.records] == ["noisy", "noisy", "quiet", "noisy suppressed=3"]
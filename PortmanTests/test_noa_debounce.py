@@ -0,0 +1,116 @@
+import json
+import sqlite3
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+from PortmanTrigger.noa_debounce import NoaDebouncer
+from PortmanTrigger.portman import process_query, save_results_to_db
+
+NOW = datetime(2024, 3, 13, 6, 0)
+
+class TestNoaDebouncer(unittest.TestCase):
+    def setUp(self):
+        self.cursor = MagicMock()
+        self.cursor.fetchone.return_value = (0,)
+        self.noa_data = {"portCallId": 3190880, "eta": "2024-03-13T10:00:00.000Z"}
+
+    def test_disabled_by_default_window(self):
+        """Without a window every ETA change is generated immediately."""
+        debouncer = NoaDebouncer(self.cursor, window_minutes=0, now=NOW)
+
+        self.assertFalse(debouncer.hold(3190880, "2024-03-13T10:00:00.000Z", self.noa_data))
+        self.assertEqual(debouncer.due(), [])
+        self.cursor.execute.assert_not_called()
+
+    def test_hold_eta_change(self):
+        debouncer = NoaDebouncer(self.cursor, window_minutes=30, imminent_minutes=120, now=NOW)
+
+        self.assertTrue(debouncer.hold(3190880, "2024-03-13T10:00:00.000Z", self.noa_data))
+
+        query, params = self.cursor.execute.call_args[0]
+        self.assertIn("INSERT INTO pending_noas", query)
+        self.assertEqual(params[1], datetime(2024, 3, 13, 10, 0))
+        self.assertEqual(json.loads(params[2]), self.noa_data)
+        self.assertEqual(debouncer.held, 1)
+        self.assertEqual(debouncer.suppressed, 0)
+
+    def test_replaced_eta_is_counted_as_suppressed(self):
+        debouncer = NoaDebouncer(self.cursor, window_minutes=30, imminent_minutes=120, now=NOW)
+        self.cursor.fetchone.return_value = (2,)
+
+        debouncer.hold(3190880, "2024-03-13T10:05:00.000Z", self.noa_data)
+
+        self.assertEqual(debouncer.suppressed, 1)
+
+    def test_imminent_arrival_is_not_held(self):
+        """An ETA within the imminent threshold replaces any held value and is generated now."""
+        debouncer = NoaDebouncer(self.cursor, window_minutes=30, imminent_minutes=120, now=NOW)
+        self.cursor.fetchone.return_value = (0,)
+
+        self.assertFalse(debouncer.hold(3190880, "2024-03-13T07:30:00.000+00:00", self.noa_data))
+        self.assertIn("DELETE FROM pending_noas", self.cursor.execute.call_args[0][0])
+        self.assertEqual(debouncer.suppressed, 1)
+
+    def test_due(self):
+        debouncer = NoaDebouncer(self.cursor, window_minutes=30, imminent_minutes=120, now=NOW)
+        self.cursor.fetchall.return_value = [(3190880, json.dumps(self.noa_data))]
+
+        self.assertEqual(debouncer.due(), [(3190880, self.noa_data)])
+        self.assertEqual(self.cursor.execute.call_args[0][1],
+                         (NOW - timedelta(minutes=30), NOW + timedelta(minutes=120)))
+
+    @patch('PortmanTrigger.portman.createNoaXml')
+    @patch('PortmanTrigger.noa_debounce.NOA_DEBOUNCE_CONFIG', {"window_minutes": 30, "imminent_minutes": 0})
+    @patch('pg8000.connect')
+    def test_save_results_holds_eta_change(self, mock_connect, mock_create_noa):
+        """With a debounce window an ETA change does not call the converter right away."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_connect.return_value = mock_conn
+
+        old_eta = MagicMock()
+        old_eta.strftime.return_value = "2099-03-13T09:00:00.000Z"
+        mock_cursor.fetchall.side_effect = [[(3190880, None, old_eta)], []]
+        mock_cursor.fetchone.return_value = (0,)
+
+        results = process_query({"portCalls": [{
+            "portCallId": 3190880,
+            "imoLloyds": 9606900,
+            "vesselName": "Viking Grace",
+            "portAreaDetails": [{"eta": "2099-03-13T10:00:00.000+00:00", "portAreaName": "Matkustajasatama"}]
+        }]})
+        save_results_to_db(results)
+
+        mock_create_noa.assert_not_called()
+        executed = [call[0][0] for call in mock_cursor.execute.call_args_list]
+        self.assertTrue(any("INSERT INTO pending_noas" in query for query in executed))
+
+    @patch('PortmanTrigger.portman.createNoaXml')
+    @patch('PortmanTrigger.noa_debounce.NOA_DEBOUNCE_CONFIG', {"window_minutes": 30, "imminent_minutes": 0})
+    @patch('pg8000.connect')
+    def test_save_results_on_sqlite_does_not_debounce(self, mock_connect, mock_create_noa):
+        """The pending_noas SQL is PostgreSQL-only, so on SQLite an ETA change is generated right away."""
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE voyages (portCallId INTEGER PRIMARY KEY, imoLloyds INTEGER, mmsi INTEGER, "
+                     "vesselTypeCode TEXT, vesselName TEXT, prevPort TEXT, portToVisit TEXT, nextPort TEXT, "
+                     "agentName TEXT, shippingCompany TEXT, eta TIMESTAMP, ata TIMESTAMP, portAreaCode TEXT, "
+                     "portAreaName TEXT, berthCode TEXT, berthName TEXT, etd TIMESTAMP, atd TIMESTAMP, "
+                     "passengersOnArrival INTEGER, passengersOnDeparture INTEGER, crewOnArrival INTEGER, "
+                     "crewOnDeparture INTEGER, modified TIMESTAMP)")
+        conn.execute("INSERT INTO voyages (portCallId, eta) VALUES (3190880, '2099-03-13T09:00:00.000Z')")
+
+        results = process_query({"portCalls": [{
+            "portCallId": 3190880,
+            "imoLloyds": 9606900,
+            "vesselName": "Viking Grace",
+            "portAreaDetails": [{"eta": "2099-03-13T10:00:00.000+00:00", "portAreaName": "Matkustajasatama"}]
+        }]})
+        save_results_to_db(results, conn)
+
+        mock_create_noa.assert_called_once()
+        mock_connect.assert_not_called()
+        self.assertEqual(conn.execute("SELECT eta FROM voyages").fetchone()[0], "2099-03-13T10:00:00.000+00:00")
+
+if __name__ == '__main__':
+    unittest.main()
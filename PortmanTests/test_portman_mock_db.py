@@ -4,7 +4,8 @@ from PortmanTrigger.portman import (
     process_query,
     save_results_to_db,
     fetch_data_from_api,
-    get_db_connection
+    get_db_connection,
+    createVidXml
 )
 
 class TestPortmanMockDb(unittest.TestCase):
@@ -98,6 +99,27 @@ class TestPortmanMockDb(unittest.TestCase):
         # Expect two commits due to the NOA XML generation feature
         self.assertEqual(mock_conn.commit.call_count, 2)
 
+    @patch('requests.post')
+    @patch('pg8000.connect')
+    def test_xml_blob_path_is_stored(self, mock_connect, mock_post):
+        """The blob path of the document is stored, also from the sasUrl of older converters."""
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.rowcount = 1
+        vid_data = {"portCallId": 3190880, "imoLloyds": 9606900, "vesselName": "Viking Grace",
+                    "eta": "2024-03-13T10:00:00.000Z", "portAreaName": "Matkustajasatama"}
+
+        for response_data in ({"blobPath": "emswe-xml-messages/VID_3190880.xml"},
+                              {"sasUrl": "https://portman.blob.core.windows.net/emswe-xml-messages/VID_3190880.xml"
+                                         "?se=2024-03-20&sig=x"}):
+            mock_post.return_value = MagicMock(status_code=200)
+            mock_post.return_value.json.return_value = response_data
+
+            self.assertEqual(createVidXml(dict(vid_data)), "emswe-xml-messages/VID_3190880.xml")
+            query, params = mock_cursor.execute.call_args_list[0][0]
+            self.assertIn("vid_xml_url", query)
+            self.assertEqual(params, ("emswe-xml-messages/VID_3190880.xml", "3190880"))
+            mock_cursor.execute.reset_mock()
+
     def test_get_db_connection(self):
         """Test database connection."""
         # using mock db
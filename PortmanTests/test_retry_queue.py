@@ -0,0 +1,130 @@
+import json
+import unittest
+import requests
+from unittest.mock import patch, MagicMock
+from PortmanTrigger.retry_queue import RetryQueue, RetryEntry, backoff_delay, is_retryable_status
+from PortmanTrigger.portman import createNoaXml, drain_retry_queue
+
+NOA_DATA = {
+    "portCallId": 3190880,
+    "imoLloyds": 9606900,
+    "vesselName": "Viking Grace",
+    "eta": "2024-03-13T10:00:00.000Z",
+    "portAreaName": "Matkustajasatama"
+}
+
+class TestRetryQueue(unittest.TestCase):
+    def setUp(self):
+        """Set up a mock database connection."""
+        self.mock_conn = MagicMock()
+        self.mock_cursor = MagicMock()
+        self.mock_conn.cursor.return_value = self.mock_cursor
+        self.queue = RetryQueue(lambda db_name: self.mock_conn, max_attempts=3)
+
+    def test_backoff_delay(self):
+        """The delay doubles per attempt, is capped and keeps at least half of it after jitter."""
+        self.assertEqual(backoff_delay(1, 60, 3600, random_func=lambda: 0.0), 30)
+        self.assertEqual(backoff_delay(1, 60, 3600, random_func=lambda: 1.0), 60)
+        self.assertEqual(backoff_delay(4, 60, 3600, random_func=lambda: 1.0), 480)
+        self.assertEqual(backoff_delay(20, 60, 3600, random_func=lambda: 1.0), 3600)
+        self.assertEqual(backoff_delay(20, 60, 3600, random_func=lambda: 0.0), 1800)
+
+    def test_is_retryable_status(self):
+        for status in (408, 429, 500, 502, 503):
+            self.assertTrue(is_retryable_status(status))
+        for status in (400, 401, 404):
+            self.assertFalse(is_retryable_status(status))
+
+    def test_record_retryable_failure(self):
+        self.mock_cursor.fetchone.return_value = (7, 1)
+
+        self.queue.record_failure(3190880, "NOA", NOA_DATA, "3190880:NOA:2024-03-13T10:00:00.000Z", "HTTP 503")
+
+        insert_query, insert_params = self.mock_cursor.execute.call_args_list[0][0]
+        self.assertIn("ON CONFLICT (portCallId, formality)", insert_query)
+        self.assertEqual(json.loads(insert_params[3]), NOA_DATA)
+        update_query, update_params = self.mock_cursor.execute.call_args_list[1][0]
+        self.assertIn("next_attempt", update_query)
+        self.assertEqual(update_params[1], 7)
+        self.assertTrue(self.mock_conn.autocommit)
+        self.assertEqual((self.queue.queued, self.queue.dead_lettered), (1, 0))
+
+    def test_dead_letter_after_max_attempts(self):
+        self.mock_cursor.fetchone.return_value = (7, 3)
+
+        self.queue.record_failure(3190880, "NOA", NOA_DATA, None, "HTTP 503")
+
+        self.assertIn("status = 'dead'", self.mock_cursor.execute.call_args[0][0])
+        self.assertEqual((self.queue.queued, self.queue.dead_lettered), (0, 1))
+
+    def test_dead_letter_non_retryable_failure(self):
+        self.mock_cursor.fetchone.return_value = (7, 1)
+
+        self.queue.record_failure(3190880, "VID", NOA_DATA, None, "HTTP 400", retryable=False)
+
+        self.assertIn("status = 'dead'", self.mock_cursor.execute.call_args[0][0])
+        self.assertEqual(self.queue.dead_lettered, 1)
+
+    def test_due(self):
+        self.mock_cursor.fetchall.return_value = [(7, 3190880, "NOA", "3190880:NOA:x", json.dumps(NOA_DATA), 2)]
+
+        entries = self.queue.due(limit=5)
+
+        self.assertEqual(entries, [RetryEntry(7, 3190880, "NOA", "3190880:NOA:x", NOA_DATA, 2)])
+        self.assertEqual(self.mock_cursor.execute.call_args[0][1], (5,))
+
+    def test_queue_unavailable(self):
+        """A failing queue does not break XML generation."""
+        self.mock_cursor.execute.side_effect = Exception("connection lost")
+
+        self.queue.record_failure(3190880, "NOA", NOA_DATA)
+        self.assertEqual(self.queue.due(), [])
+        self.mock_conn.close.assert_called()
+
+    def test_disabled_queue_does_not_connect(self):
+        """A disabled queue (SQLite) records nothing and has nothing due."""
+        get_connection = MagicMock()
+        retry_queue = RetryQueue(get_connection, enabled=False)
+
+        retry_queue.record_failure(3190880, "NOA", NOA_DATA)
+        self.assertEqual(retry_queue.due(), [])
+        self.assertEqual(retry_queue.queued, 0)
+        get_connection.assert_not_called()
+
+    @patch('PortmanTrigger.portman.RetryQueue.record_failure')
+    @patch('requests.post')
+    def test_converter_failure_is_queued(self, mock_post, mock_record_failure):
+        mock_post.return_value = MagicMock(status_code=503)
+        retry_queue = RetryQueue(lambda db_name: None)
+
+        self.assertIsNone(createNoaXml(dict(NOA_DATA), "3190880:NOA:2024-03-13T10:00:00.000Z", retry_queue))
+
+        self.assertIn("timeout", mock_post.call_args[1])
+        args, kwargs = mock_record_failure.call_args
+        self.assertEqual(args[:2], ("3190880", "NOA"))
+        self.assertEqual(args[3], "3190880:NOA:2024-03-13T10:00:00.000Z")
+        self.assertTrue(kwargs["retryable"])
+
+        mock_post.side_effect = requests.Timeout("read timed out")
+        createNoaXml(dict(NOA_DATA), None, retry_queue)
+        self.assertIn("read timed out", mock_record_failure.call_args[0][4])
+
+    @patch('PortmanTrigger.portman.createNoaXml')
+    @patch('PortmanTrigger.portman.IdempotencyKeys.claim')
+    @patch('PortmanTrigger.portman.RetryQueue.due')
+    @patch('pg8000.connect')
+    def test_drain_retry_queue(self, mock_connect, mock_due, mock_claim, mock_create_noa):
+        """Due events are generated again with a newly claimed idempotency key."""
+        mock_connect.return_value = MagicMock()
+        mock_due.side_effect = [[RetryEntry(7, 3190880, "NOA", "3190880:NOA:2024-03-13T10:00:00.000Z", NOA_DATA, 1)]]
+        mock_claim.return_value = "3190880:NOA:2024-03-13T10:00:00.000Z"
+        mock_create_noa.return_value = "https://example/NOA.xml"
+
+        drain_retry_queue()
+
+        mock_claim.assert_called_once_with(3190880, "NOA", "2024-03-13T10:00:00.000Z")
+        self.assertEqual(mock_create_noa.call_args[0][:2], (NOA_DATA, "3190880:NOA:2024-03-13T10:00:00.000Z"))
+        self.assertEqual(mock_due.call_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
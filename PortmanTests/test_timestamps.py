@@ -0,0 +1,63 @@
+"""
+Test module for the shared timestamp normalization.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from PortmanXMLConverter.src import timestamps
+from PortmanXMLConverter.src.timestamps import (
+    parse_timestamp, to_xml_datetime, to_minute_key, to_display, to_naive_utc
+)
+
+
+@pytest.mark.parametrize("value", [
+    "2024-03-13T10:00:00.000+00:00",
+    "2024-03-13T10:00:00+00:00",
+    "2024-03-13T10:00:00.000Z",
+    "2024-03-13T10:00:00Z",
+    "2024-03-13T10:00:00.000",
+    "2024-03-13T10:00:00",
+    "2024-03-13T12:00:00.000+02:00",
+    "2024-03-13T05:00:00.000-05:00",
+    "2024-03-13T10:00:00.0Z",
+    datetime(2024, 3, 13, 10, 0),
+    datetime(2024, 3, 13, 10, 0, tzinfo=timezone.utc),
+])
+def test_digitraffic_variants(value):
+    assert parse_timestamp(value) == datetime(2024, 3, 13, 10, 0, tzinfo=timezone.utc)
+    assert to_xml_datetime(value) == "2024-03-13T10:00:00Z"
+
+
+def test_output_formats():
+    value = "2024-03-13T10:05:42.123+00:00"
+
+    assert to_minute_key(value) == "2024-03-13T10:05:00.000Z"
+    assert to_display(value) == "2024-03-13 10:05"
+    assert to_naive_utc(value) == datetime(2024, 3, 13, 10, 5, 42, 123000)
+
+
+def test_empty_values():
+    assert parse_timestamp(None) is None
+    assert to_xml_datetime("") is None
+    assert to_minute_key(None) is None
+    assert to_display(None) == "N/A"
+    assert to_naive_utc(None) is None
+
+
+def test_invalid_value():
+    with pytest.raises(ValueError):
+        to_xml_datetime("not a timestamp")
+
+
+def test_repeated_values_are_memoized():
+    timestamps.clear_cache()
+
+    for _ in range(3):
+        to_minute_key("2024-03-13T10:00:00.000+00:00")
+        to_xml_datetime("2024-03-13T10:00:00.000+00:00")
+
+    info = timestamps._parse_string.cache_info()
+    assert info.misses == 1
+    assert timestamps._format_string.cache_info().misses == 2
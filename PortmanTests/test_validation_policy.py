@@ -0,0 +1,121 @@
+"""
+Test module for the tiered validation policy.
+"""
+
+import pytest
+from PortmanXMLConverter.src.transformer import XMLTransformer
+from PortmanXMLConverter.src.validator import XMLValidator
+from PortmanXMLConverter.src.validation_policy import StructuralValidator, ValidationPolicy
+from PortmanXMLConverter.src.digitraffic_adapter import adapt_digitraffic_to_portman
+from PortmanTests.test_xml_templates import SAMPLE_PORT_CALL
+
+
+def _document(formality_type, **overrides):
+    portman_data = adapt_digitraffic_to_portman(SAMPLE_PORT_CALL, formality_type)
+    portman_data.update(overrides)
+    return XMLTransformer().portman_to_emswe(portman_data, formality_type)
+
+
+class CountingValidator:
+    """XSD validator stand-in that records how often it is called."""
+
+    def __init__(self, formality_type):
+        self.validator = XMLValidator(formality_type)
+        self.calls = 0
+
+    def validate(self, xml_root):
+        self.calls += 1
+        return self.validator.validate(xml_root)
+
+
+@pytest.mark.parametrize("formality_type", ["ATA", "NOA", "VID"])
+def test_structural_rules_accept_valid_documents(formality_type):
+    """Documents that pass the XSD must pass the structural rules."""
+    xml_root = _document(formality_type)
+
+    assert XMLValidator(formality_type).validate(xml_root) == (True, [])
+    assert StructuralValidator(formality_type).validate(xml_root) == (True, [])
+
+
+@pytest.mark.parametrize("formality_type, overrides, path", [
+    ("ATA", {"declaration_id": "D" * 23}, "mai:MAI/mai:ExchangedDeclaration/ram:ID"),
+    ("NOA", {"voyage_id": "V" * 18}, "noa:SpecifiedLogisticsTransportMovement/ram:ID"),
+    ("NOA", {"portToVisit": "FITKUX"}, "ram:OccurrenceLogisticsLocation/ram:ID"),
+    ("NOA", {"dangerous_goods_indicator": "yes"}, "ram:DangerousGoodsIndicator"),
+    ("VID", {"radioCallSign": "OJPV12345"}, "ram:CallSignID"),
+])
+def test_structural_rules_catch_facet_violations(formality_type, overrides, path):
+    """Length, code and format violations are caught by the structural rules and by the XSD."""
+    xml_root = _document(formality_type, **overrides)
+
+    is_valid, errors = StructuralValidator(formality_type).validate(xml_root)
+
+    assert not is_valid
+    assert any(path in error for error in errors)
+    assert not XMLValidator(formality_type).validate(xml_root)[0]
+
+
+def test_structural_rules_skip_checked_mai():
+    xml_root = _document("ATA", declaration_id="D" * 23)
+    validator = StructuralValidator("ATA")
+
+    assert not validator.validate(xml_root)[0]
+    assert validator.validate(xml_root, mai_checked=True) == (True, [])
+
+
+def test_policy_skips_xsd_when_structural_rules_fail():
+    """A structural failure is reported without running the XSD."""
+    policy = ValidationPolicy("always")
+    validator = CountingValidator("ATA")
+
+    is_valid, _ = policy.validate(_document("ATA", declaration_id="D" * 23), "ATA", validator)
+
+    assert not is_valid
+    assert validator.calls == 0
+    assert policy.stats()["ATA"]["structural_failed"] == 1
+
+
+def test_policy_never_mode_validates_first_document_only():
+    """The first document after startup is always XSD-validated."""
+    policy = ValidationPolicy("never")
+    validator = CountingValidator("VID")
+
+    for _ in range(3):
+        assert policy.validate(_document("VID"), "VID", validator) == (True, [])
+
+    assert validator.calls == 1
+    assert policy.stats()["VID"] == {
+        "documents": 3, "structural_failed": 0, "xsd_validated": 1, "xsd_skipped": 2, "xsd_failed": 0,
+    }
+
+
+def test_policy_sampled_mode():
+    """Sampled mode runs the XSD when the random draw falls under the percentage."""
+    draws = iter([0.05, 0.5, 0.09])
+    policy = ValidationPolicy("sampled", xsd_sample_percent=10, random_func=lambda: next(draws))
+    validator = CountingValidator("NOA")
+
+    for _ in range(4):
+        policy.validate(_document("NOA"), "NOA", validator)
+
+    # First document always, then 0.05 and 0.09 are sampled, 0.5 is not
+    assert validator.calls == 3
+    assert policy.stats()["NOA"]["xsd_skipped"] == 1
+
+
+def test_policy_counts_xsd_only_failures():
+    """Errors the structural rules do not cover are counted as XSD failures."""
+    policy = ValidationPolicy("always")
+    validator = CountingValidator("VID")
+
+    # TypeCode is not allowed in the VID transport means
+    is_valid, errors = policy.validate(_document("VID", vesselTypeCode="20"), "VID", validator)
+
+    assert not is_valid
+    assert errors
+    assert policy.stats()["VID"]["xsd_failed"] == 1
+
+
+def test_invalid_xsd_mode():
+    with pytest.raises(ValueError):
+        ValidationPolicy("sometimes")
@@ -0,0 +1,74 @@
+"""
+Test module for batch archive output.
+"""
+
+import tarfile
+import zipfile
+import pytest
+from PortmanXMLConverter.src.archive import XMLArchiveWriter, XMLArchiveReader, archive_format
+
+DOCUMENTS = [
+    ("portcall_1.xml", b"<?xml version='1.0' encoding='UTF-8'?>\n<Envelope>1</Envelope>\n", 3190880, "NOA"),
+    ("portcall_2.xml", "<?xml version='1.0' encoding='UTF-8'?>\n<Envelope>" + "x" * 700 + "</Envelope>\n", 3190881, "NOA"),
+    ("portcall_3.xml", b"<Envelope/>", 3190882, "NOA"),
+]
+
+
+@pytest.mark.parametrize("suffix", [".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz"])
+def test_archive_round_trip(tmp_path, suffix):
+    """Documents written to an archive can be read back individually."""
+    archive_path = str(tmp_path / f"batch{suffix}")
+
+    with XMLArchiveWriter(archive_path) as writer:
+        for name, content, port_call_id, formality_type in DOCUMENTS:
+            writer.add(name, content, port_call_id, formality_type)
+
+    with XMLArchiveReader(archive_path) as reader:
+        assert [entry["name"] for entry in reader.documents] == [document[0] for document in DOCUMENTS]
+        for name, content, port_call_id, formality_type in DOCUMENTS:
+            expected = content.encode("utf-8") if isinstance(content, str) else content
+            assert reader.read(name) == expected
+            assert [entry["name"] for entry in reader.find(port_call_id, formality_type)] == [name]
+
+        output_file = reader.extract("portcall_3.xml", str(tmp_path / "extracted" / "noa.xml"))
+
+    assert open(output_file, "rb").read() == b"<Envelope/>"
+
+
+def test_tar_offsets_point_at_member_data(tmp_path):
+    """Manifest offsets of an uncompressed tar address the member data directly."""
+    archive_path = str(tmp_path / "batch.tar")
+    with XMLArchiveWriter(archive_path) as writer:
+        entries = [writer.add(*document) for document in DOCUMENTS]
+
+    with tarfile.open(archive_path) as tar:
+        assert [tar.getmember(entry["name"]).offset_data for entry in entries] == \
+            [entry["offset"] for entry in entries]
+
+
+def test_zip_compression_option(tmp_path):
+    archive_path = str(tmp_path / "batch.zip")
+    with XMLArchiveWriter(archive_path, compress=False) as writer:
+        writer.add(*DOCUMENTS[1])
+
+    with zipfile.ZipFile(archive_path) as archive:
+        assert archive.getinfo("portcall_2.xml").compress_type == zipfile.ZIP_STORED
+
+
+def test_corrupted_document_is_detected(tmp_path):
+    archive_path = str(tmp_path / "batch.tar")
+    with XMLArchiveWriter(archive_path) as writer:
+        entry = writer.add(*DOCUMENTS[0])
+
+    with open(archive_path, "r+b") as f:
+        f.seek(entry["offset"])
+        f.write(b"#")
+
+    with XMLArchiveReader(archive_path) as reader:
+        with pytest.raises(ValueError):
+            reader.read(entry["name"])
+
+
+def test_unsupported_archive_type():
+    with pytest.raises(ValueError):
+        archive_format("batch.rar")
@@ -0,0 +1,95 @@
+"""
+Test module for the notification metadata of stored XML documents.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from lxml import etree
+
+from PortmanNotificator import slack_notificator
+from PortmanXMLConverter import xml_converter
+from PortmanXMLConverter.src.blob_metadata import (
+    MAX_METADATA_BYTES, info_from_metadata, notification_info, notification_metadata
+)
+from PortmanTests.test_xml_dedup import _generate, blob_container  # noqa: F401 (fixture)
+from PortmanTests.test_xml_templates import SAMPLE_PORT_CALL
+
+
+def _root(xml_content):
+    return etree.fromstring(xml_content.encode("utf-8") if isinstance(xml_content, str) else xml_content)
+
+
+@pytest.mark.parametrize("formality_type", ["ATA", "NOA", "VID"])
+def test_fields_match_the_notifier(formality_type):
+    """The metadata holds exactly what the notifier would parse from the document."""
+    xml_string = _generate(formality_type)
+    port_call_id, time_value, remarks, _, passengers_count, crew_count = slack_notificator.extract_info_from_xml(
+        xml_string, formality_type)
+
+    assert notification_info(_root(xml_string), formality_type) == (
+        port_call_id, time_value, remarks, passengers_count, crew_count)
+    assert "Unknown" not in (port_call_id, time_value)
+
+
+def test_metadata_is_ascii_and_round_trips():
+    xml_string = _generate("VID", vesselName="Mälardrottningen")
+    metadata = notification_metadata(_root(xml_string), "VID")
+
+    assert metadata["formality"] == "VID"
+    assert all(value.isascii() and "\n" not in value for value in metadata.values())
+    assert info_from_metadata({name.upper(): value for name, value in metadata.items()}) == notification_info(
+        _root(xml_string), "VID")
+    assert "Vessel: Mälardrottningen\n" in info_from_metadata(metadata)[2]
+
+
+def test_missing_or_oversized_metadata():
+    assert info_from_metadata(None) is None
+    assert info_from_metadata({"portcallid": "1"}) is None
+    assert notification_metadata(None, "ATA") == {}
+
+    long_remarks = "x" * MAX_METADATA_BYTES
+    xml_string = _generate("ATA").replace("<ram:Remarks>", f"<ram:Remarks>{long_remarks}", 1)
+    assert long_remarks in xml_string
+    assert notification_metadata(_root(xml_string), "ATA") == {}
+
+
+def _notify(monkeypatch, blob):
+    send = MagicMock()
+    monkeypatch.setenv("SLACK_WEBHOOK_ENABLED", "true")
+    monkeypatch.setenv("SLACK_WEBHOOK_URL", "https://hooks.example.com/x")
+    monkeypatch.setattr(slack_notificator, "send_slack_notification", send)
+    monkeypatch.setattr(slack_notificator, "send_slack_error", MagicMock(side_effect=AssertionError))
+    monkeypatch.setattr(slack_notificator, "generate_blob_storage_link", lambda name: None)
+    slack_notificator.blob_trigger(blob)
+    return send.call_args[0]
+
+
+def test_notifier_reads_stored_metadata_without_parsing(blob_container, monkeypatch):
+    path = xml_converter.convert_from_portcall_data(dict(SAMPLE_PORT_CALL), "NOA")
+    name = path.split("/", 1)[1]
+    blob = MagicMock()
+    blob.name = path
+    blob.metadata = blob_container.metadata[name]
+    blob.read.side_effect = AssertionError("blob content read")
+    monkeypatch.setattr(slack_notificator, "extract_info_from_xml", MagicMock(side_effect=AssertionError))
+
+    args = _notify(monkeypatch, blob)
+
+    expected = notification_info(_root(blob_container.blobs[name]), "NOA")
+    assert (args[2], args[3], args[4], args[9], args[10]) == expected
+    assert args[5] is None
+    assert (expected[3], expected[4]) == (str(SAMPLE_PORT_CALL["passengersOnArrival"]),
+                                          str(SAMPLE_PORT_CALL["crewOnArrival"]))
+
+
+def test_notifier_parses_documents_without_metadata(monkeypatch):
+    blob = MagicMock()
+    blob.name = "emswe-xml-messages/ATA_3190880_20240313090000.xml"
+    blob.metadata = {}
+    blob.read.return_value = _generate("ATA").encode("utf-8")
+
+    args = _notify(monkeypatch, blob)
+
+    assert args[2] == "3190880"
+    assert args[5].startswith("<?xml")
@@ -0,0 +1,142 @@
+"""
+Test module for bulk processing of EMSWe XML files.
+"""
+
+from lxml import etree
+
+from PortmanXMLConverter.src.bulk import (
+    expand_inputs, convert_file, validate_file, process_files, map_in_processes, summarize_validation
+)
+from PortmanXMLConverter.src.converter_config import NAMESPACES
+from PortmanXMLConverter.src.parser import detect_formality_type
+from PortmanTests.test_xml_parser import _document
+
+
+# Set by _init_offset in each worker process
+_offset = None
+
+
+def _init_offset(offset):
+    global _offset
+    _offset = offset
+
+
+def _add_offset(item):
+    return item + _offset
+
+
+def _write(path, xml_root):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(etree.tostring(xml_root, xml_declaration=True, encoding="UTF-8"))
+    return str(path)
+
+
+def test_detect_formality_type():
+    xml_root = _document("VID")
+    assert detect_formality_type(xml_root) == "VID"
+
+    # Without a TypeCode the formality element names the type
+    type_code = xml_root.find(".//mai:ExchangedDocument/ram:TypeCode", namespaces=NAMESPACES)
+    type_code.getparent().remove(type_code)
+    assert detect_formality_type(xml_root) == "VID"
+
+    assert detect_formality_type(etree.fromstring("<Envelope/>")) is None
+
+
+def test_expand_inputs(tmp_path):
+    first = _write(tmp_path / "a" / "1.xml", _document("ATA"))
+    second = _write(tmp_path / "a" / "nested" / "2.xml", _document("NOA"))
+    (tmp_path / "a" / "notes.txt").write_text("not xml")
+
+    assert expand_inputs([str(tmp_path / "a")]) == [first, second]
+    assert expand_inputs([str(tmp_path / "a" / "*.xml"), first]) == [first]
+    assert expand_inputs([str(tmp_path / "missing.xml")]) == [str(tmp_path / "missing.xml")]
+    assert expand_inputs([str(tmp_path / "none" / "*.xml")]) == []
+
+
+def test_convert_file_detects_formality(tmp_path):
+    for formality_type in ("ATA", "NOA", "VID"):
+        result = convert_file(_write(tmp_path / f"{formality_type}.xml", _document(formality_type)))
+
+        assert result["success"], result["errors"]
+        assert result["formality_type"] == formality_type
+        assert result["data"]["document_id"] == "MSGID-3190880"
+        assert result["errors"] == []
+
+
+def test_convert_file_errors(tmp_path):
+    invalid = _document("NOA")
+    invalid.find(".//mai:MAI", namespaces=NAMESPACES).append(etree.Element("Unexpected"))
+    broken = tmp_path / "broken.xml"
+    broken.write_text("<Envelope>")
+
+    invalid_result = convert_file(_write(tmp_path / "invalid.xml", invalid))
+    broken_result = convert_file(str(broken))
+    missing_result = convert_file(str(tmp_path / "missing.xml"))
+
+    assert not invalid_result["success"]
+    assert invalid_result["formality_type"] == "NOA"
+    assert invalid_result["data"] is None
+    assert invalid_result["errors"][0].startswith("Line ")
+    assert broken_result["errors"][0].startswith("Error parsing XML file")
+    assert missing_result["errors"][0].startswith("Error parsing XML file")
+
+
+def test_validate_file(tmp_path):
+    invalid = _document("ATA")
+    invalid.find(".//mai:MAI", namespaces=NAMESPACES).append(etree.Element("Unexpected"))
+
+    valid_result = validate_file(_write(tmp_path / "valid.xml", _document("VID")))
+    invalid_result = validate_file(_write(tmp_path / "invalid.xml", invalid))
+    unknown_result = validate_file(_write(tmp_path / "unknown.xml", etree.fromstring("<Envelope><XYZ/></Envelope>")))
+
+    assert valid_result["status"] == "valid"
+    assert valid_result["formality_type"] == "VID"
+    assert valid_result["errors"] == []
+    assert valid_result["seconds"] >= 0
+    assert invalid_result["status"] == "invalid"
+    assert "Unexpected" in invalid_result["errors"][0]
+    assert unknown_result["status"] == "error"
+    assert unknown_result["formality_type"] == "XYZ"
+    assert "XYZ" in unknown_result["errors"][0]
+
+
+def test_summarize_validation():
+    results = [
+        {"formality_type": "ATA", "status": "valid", "errors": [], "seconds": 0.25},
+        {"formality_type": "ATA", "status": "invalid", "seconds": 0.25,
+         "errors": ["Line 3, Column 0: Element 'X': This element is not expected."]},
+        {"formality_type": "NOA", "status": "invalid", "seconds": 0.5,
+         "errors": ["Line 9, Column 4: Element 'X': This element is not expected.", "Line 9, Column 4: Other."]},
+        {"formality_type": None, "status": "error", "errors": ["Error parsing XML file: boom"], "seconds": 0.0},
+    ]
+
+    summary = summarize_validation(results, top_errors=2)
+
+    assert summary["files"] == 4
+    assert (summary["valid"], summary["invalid"], summary["error"]) == (1, 2, 1)
+    assert summary["seconds"] == 1.0
+    assert summary["formality_types"]["ATA"] == {"files": 2, "valid": 1, "invalid": 1, "error": 0}
+    assert summary["formality_types"]["unknown"]["error"] == 1
+    assert summary["errors"] == [
+        {"message": "Element 'X': This element is not expected.", "count": 2},
+        {"message": "Error parsing XML file: boom", "count": 1},
+    ]
+
+
+def test_process_files_keeps_order(tmp_path):
+    paths = [_write(tmp_path / f"{i:02}.xml", _document(("ATA", "NOA", "VID")[i % 3])) for i in range(9)]
+
+    results = list(process_files(convert_file, paths, workers=3))
+
+    assert [result["file"] for result in results] == paths
+    assert [result["formality_type"] for result in results] == ["ATA", "NOA", "VID"] * 3
+    assert all(result["success"] for result in results)
+
+
+def test_map_in_processes_runs_initializer():
+    """Every worker, and the current process without workers, is initialized before its items."""
+    assert list(map_in_processes(_add_offset, list(range(20)), workers=3,
+                                 initializer=_init_offset, initargs=(100,))) == list(range(100, 120))
+    assert list(map_in_processes(_add_offset, [1, 2], workers=1,
+                                 initializer=_init_offset, initargs=(10,))) == [11, 12]
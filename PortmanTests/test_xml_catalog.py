@@ -0,0 +1,71 @@
+"""
+Test module for the catalog of generated XML documents.
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+from PortmanXMLConverter import xml_converter
+from PortmanXMLConverter.src.catalog import (
+    DatabaseDocumentCatalog, DocumentCatalog, document_name, make_entry
+)
+from PortmanXMLConverter.src.content_hash import semantic_hash
+from PortmanTests.test_xml_dedup import blob_container  # noqa: F401 (fixture)
+from PortmanTests.test_xml_templates import SAMPLE_PORT_CALL
+
+CREATED = datetime(2024, 3, 13, 10, 5, 7, tzinfo=timezone.utc)
+
+
+def test_document_name_is_prefixed_with_date_and_port():
+    assert document_name("NOA", 3190880, "fitku", CREATED) == "2024/03/13/FITKU/NOA_3190880_20240313100507.xml"
+    assert document_name("ATA", 1, None, CREATED) == "2024/03/13/unknown/ATA_1_20240313100507.xml"
+    assert document_name("ATA", 1, "../..", CREATED).startswith("2024/03/13/unknown/")
+
+
+def test_stored_documents_are_recorded(blob_container):
+    path = xml_converter.convert_from_portcall_data(dict(SAMPLE_PORT_CALL), "NOA")
+    # An unchanged document is reused, not recorded again
+    xml_converter.convert_from_portcall_data(dict(SAMPLE_PORT_CALL), "NOA")
+
+    entry, = xml_converter.get_document_catalog().find(imo=9606900)
+    name = path.split("/", 1)[1]
+    assert path.startswith("emswe-xml-messages/") and "/FITKU/NOA_3190880_" in path
+    assert entry.document_path == path
+    assert (entry.formality, entry.port_call_id, entry.port) == ("NOA", "3190880", "FITKU")
+    assert entry.size == len(blob_container.blobs[name])
+    assert entry.content_hash == semantic_hash(blob_container.blobs[name])
+
+
+def test_find_filters_newest_first():
+    catalog = DocumentCatalog()
+    catalog.add_many([
+        make_entry("xml/a.xml", "NOA", 1, 9606900, "FITKU", created=CREATED),
+        make_entry("xml/b.xml", "ATA", 1, "9606900", "FITKU", created=CREATED + timedelta(hours=1)),
+        make_entry("xml/c.xml", "NOA", 2, 9000000, "FIHEL", created=CREATED + timedelta(hours=2)),
+    ])
+    catalog.add(make_entry("xml/a.xml", "VID", 3))
+
+    assert [e.document_path for e in catalog.find(imo=9606900)] == ["xml/b.xml", "xml/a.xml"]
+    assert [e.document_path for e in catalog.find(port_call_id=1, formality="NOA")] == ["xml/a.xml"]
+    assert [e.document_path for e in catalog.find(port="fihel")] == ["xml/c.xml"]
+    assert [e.document_path for e in catalog.find(since=CREATED + timedelta(minutes=30),
+                                                  until=CREATED + timedelta(hours=2))] == ["xml/b.xml"]
+    assert len(catalog.find(limit=2)) == 2
+
+
+def test_database_catalog_queries_indexed_columns():
+    connection = MagicMock()
+    cursor = connection.cursor.return_value
+    cursor.fetchall.return_value = [("xml/a.xml", "NOA", "1", 9606900, "FITKU", "abc", 10, CREATED)]
+    catalog = DatabaseDocumentCatalog(lambda: connection)
+
+    catalog.add(make_entry("xml/a.xml", "NOA", 1, 9606900, "FITKU", "abc", 10, CREATED))
+    query, rows = cursor.executemany.call_args[0]
+    assert "ON CONFLICT (document_path) DO NOTHING" in query
+    assert rows == [("xml/a.xml", "NOA", "1", 9606900, "FITKU", "abc", 10, CREATED)]
+
+    entries = catalog.find(imo=9606900, port="fitku", since=CREATED, limit=5)
+    query, params = cursor.execute.call_args[0]
+    assert "WHERE imo = %s AND port = %s AND created >= %s ORDER BY created DESC LIMIT %s" in query
+    assert params == (9606900, "FITKU", CREATED, 5)
+    assert entries[0].document_path == "xml/a.xml"
@@ -151,3 +151,37 @@ if __name__ == "__main__":
     test_convert_to_emswe()
     test_round_trip_conversion()
     print("All converter tests passed!")
+
+
+def test_convert_port_call_to_several_formalities():
+    """Single-pass conversion produces the same documents as separate conversions."""
+    import re
+    from PortmanXMLConverter.src.converter import convert_port_call
+    from PortmanXMLConverter.src.digitraffic_adapter import adapt_digitraffic_to_portman
+    from PortmanXMLConverter.src.validation_policy import ValidationPolicy
+    from PortmanTests.test_xml_templates import SAMPLE_PORT_CALL
+
+    policy = ValidationPolicy("always")
+    results = convert_port_call(SAMPLE_PORT_CALL, ["VID", "NOA", "ATA"], validation_policy=policy)
+
+    assert list(results) == ["VID", "NOA", "ATA"]
+    # Generation timestamps differ between the runs
+    without_timestamps = lambda xml: re.sub(r"<udt:DateTimeString>[^<]*", "", xml)
+    for formality_type, (success, xml_string) in results.items():
+        expected = EMSWeConverter(formality_type).convert_to_emswe(
+            adapt_digitraffic_to_portman(SAMPLE_PORT_CALL, formality_type))[1]
+        assert success
+        assert without_timestamps(xml_string) == without_timestamps(expected)
+    assert {formality_type: counters["xsd_validated"] for formality_type, counters in policy.stats().items()} == \
+        {"VID": 1, "NOA": 1, "ATA": 1}
+
+
+def test_convert_port_call_reports_invalid_documents():
+    from PortmanXMLConverter.src.converter import convert_port_call
+    from PortmanTests.test_xml_templates import SAMPLE_PORT_CALL
+
+    results = convert_port_call(dict(SAMPLE_PORT_CALL, portToVisit="FITKUX"), ["NOA", "ATA"])
+
+    assert not results["NOA"][0]
+    assert results["NOA"][1] == "portToVisit: value 'FITKUX' has length 6, expected 5"
+    assert results["ATA"][0]
@@ -0,0 +1,167 @@
+"""
+Test module for the EMSWe XML converter command-line interface.
+"""
+
+import sys
+import json
+import pytest
+from PortmanXMLConverter import xml_converter
+from PortmanTests.test_xml_dedup import blob_container  # noqa: F401 (fixture)
+from PortmanTests.test_xml_templates import SAMPLE_PORT_CALL
+
+
+def _run_cli(monkeypatch, *argv):
+    monkeypatch.setattr(sys, "argv", ["xml_converter.py", *argv])
+    args = xml_converter.parse_arguments()
+    return {
+        "validate": xml_converter.validate_xml,
+        "from-emswe": xml_converter.convert_from_emswe,
+        "to-emswe": xml_converter.convert_to_emswe,
+        "from-digitraffic": xml_converter.convert_from_digitraffic,
+        "extract-archive": xml_converter.extract_archive,
+    }[args.command](args)
+
+
+@pytest.fixture
+def batch_file(tmp_path):
+    port_calls = [dict(SAMPLE_PORT_CALL, portCallId=SAMPLE_PORT_CALL["portCallId"] + i) for i in range(12)]
+    path = tmp_path / "portcalls.json"
+    path.write_text(json.dumps({"portCalls": port_calls}))
+    return path
+
+
+@pytest.mark.parametrize("workers", ["1", "3"])
+def test_batch_from_digitraffic(monkeypatch, capsys, tmp_path, batch_file, workers):
+    """Batch conversion writes one numbered file per port call, also with a process pool."""
+    output_dir = tmp_path / f"out_{workers}"
+
+    exit_code = _run_cli(monkeypatch, "from-digitraffic", "--json-file", str(batch_file),
+                         "--output-file", str(output_dir / "noa.xml"), "--formality-type", "NOA",
+                         "--batch", "--workers", workers)
+
+    output = capsys.readouterr().out
+    assert exit_code == 0
+    assert "12 of 12 port calls converted successfully" in output
+    assert f"with {workers} worker(s)" in output
+    assert "Validation (NOA): documents=12" in output
+    assert sorted(p.name for p in output_dir.iterdir()) == sorted(f"noa_{i}.xml" for i in range(1, 13))
+    assert b"VYG-3190891" in (output_dir / "noa_12.xml").read_bytes()
+
+
+def test_batch_from_digitraffic_to_archive(monkeypatch, capsys, tmp_path, batch_file):
+    """Archive mode writes all documents into one archive that extract-archive can read."""
+    archive_path = tmp_path / "archives" / "noa.tar.gz"
+
+    exit_code = _run_cli(monkeypatch, "from-digitraffic", "--json-file", str(batch_file),
+                         "--formality-type", "NOA", "--batch", "--workers", "2", "--archive", str(archive_path))
+
+    assert exit_code == 0
+    assert "12 of 12 port calls converted successfully" in capsys.readouterr().out
+    assert list(archive_path.parent.iterdir()) == [archive_path]
+
+    output_file = tmp_path / "noa_5.xml"
+    exit_code = _run_cli(monkeypatch, "extract-archive", "--archive", str(archive_path),
+                         "--port-call-id", "3190884", "--output-file", str(output_file))
+
+    assert exit_code == 0
+    assert "Extracted portcall_5.xml" in capsys.readouterr().out
+    assert b"VYG-3190884" in output_file.read_bytes()
+
+
+def test_batch_from_digitraffic_upload(monkeypatch, capsys, tmp_path, batch_file, blob_container):
+    """Upload mode stores every document as a blob and writes no local files."""
+    monkeypatch.chdir(tmp_path)
+
+    exit_code = _run_cli(monkeypatch, "from-digitraffic", "--json-file", str(batch_file),
+                         "--formality-type", "VID", "--batch", "--workers", "2", "--upload",
+                         "--upload-concurrency", "4")
+
+    output = capsys.readouterr().out
+    assert exit_code == 0
+    assert "12 of 12 documents uploaded" in output
+    assert blob_container.uploads == 12
+    assert sorted(name.split("_")[1] for name in blob_container.blobs) == [str(3190880 + i) for i in range(12)]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["portcalls.json"]
+
+    entries = xml_converter.get_document_catalog().find(port="FITKU")
+    assert sorted(entry.document_path for entry in entries) == sorted(
+        f"{blob_container.name}/{name}" for name in blob_container.blobs)
+    assert all(entry.imo == 9606900 and entry.size > 0 for entry in entries)
+    assert all(metadata["formality"] == "VID" for metadata in blob_container.metadata.values())
+
+
+def test_bulk_from_emswe(monkeypatch, capsys, tmp_path):
+    """Bulk from-emswe writes one JSON Lines object per document in file order."""
+    from PortmanTests.test_xml_bulk import _write
+    from PortmanTests.test_xml_parser import _document
+
+    for i, formality_type in enumerate(["ATA", "NOA", "VID", "NOA"]):
+        _write(tmp_path / "archive" / f"{i}.xml", _document(formality_type))
+    (tmp_path / "archive" / "4.xml").write_text("<Envelope>")
+    output_file = tmp_path / "portman.jsonl"
+
+    exit_code = _run_cli(monkeypatch, "from-emswe", "--input", str(tmp_path / "archive"),
+                         "--workers", "2", "--output-file", str(output_file))
+
+    assert exit_code == 0
+    assert "4 of 5 documents converted successfully" in capsys.readouterr().out
+    results = [json.loads(line) for line in output_file.read_text().splitlines()]
+    assert [result["file"].rsplit("/", 1)[-1] for result in results] == [f"{i}.xml" for i in range(5)]
+    assert [result["formality_type"] for result in results] == ["ATA", "NOA", "VID", "NOA", None]
+    assert results[1]["data"]["call_id"] == "3190880"
+    assert not results[4]["success"] and results[4]["errors"]
+
+
+def test_bulk_from_emswe_to_stdout(monkeypatch, capsys, tmp_path):
+    from PortmanTests.test_xml_bulk import _write
+    from PortmanTests.test_xml_parser import _document
+
+    _write(tmp_path / "ata.xml", _document("ATA"))
+
+    exit_code = _run_cli(monkeypatch, "from-emswe", "--input", str(tmp_path / "*.xml"))
+
+    captured = capsys.readouterr()
+    assert exit_code == 0
+    assert json.loads(captured.out)["formality_type"] == "ATA"
+    assert "1 of 1 documents converted successfully" in captured.err
+
+
+def test_bulk_validate_report(monkeypatch, capsys, tmp_path):
+    """Bulk validate writes a JSON report with per-file results and aggregate statistics."""
+    from lxml import etree
+    from PortmanXMLConverter.src.converter_config import NAMESPACES
+    from PortmanTests.test_xml_bulk import _write
+    from PortmanTests.test_xml_parser import _document
+
+    invalid = _document("NOA")
+    invalid.find(".//mai:MAI", namespaces=NAMESPACES).append(etree.Element("Unexpected"))
+    for i, formality_type in enumerate(["ATA", "NOA", "VID"]):
+        _write(tmp_path / "archive" / f"{i}.xml", _document(formality_type))
+    _write(tmp_path / "archive" / "3.xml", invalid)
+    report_file = tmp_path / "reports" / "validation.json"
+
+    exit_code = _run_cli(monkeypatch, "validate", "--input", str(tmp_path / "archive"),
+                         "--workers", "2", "--report", str(report_file))
+
+    assert exit_code == 1
+    assert "3 of 4 files valid (1 invalid, 0 not validated)" in capsys.readouterr().out
+    report = json.loads(report_file.read_text())
+    assert report["workers"] == 2
+    assert [entry["status"] for entry in report["files"]] == ["valid", "valid", "valid", "invalid"]
+    assert report["files"][3]["errors"][0].startswith("Line ")
+    assert report["summary"]["formality_types"]["NOA"] == {"files": 2, "valid": 1, "invalid": 1, "error": 0}
+    assert report["summary"]["errors"][0]["count"] == 1
+
+
+def test_bulk_validate_all_valid_to_stdout(monkeypatch, capsys, tmp_path):
+    from PortmanTests.test_xml_bulk import _write
+    from PortmanTests.test_xml_parser import _document
+
+    _write(tmp_path / "ata.xml", _document("ATA"))
+
+    exit_code = _run_cli(monkeypatch, "validate", "--input", str(tmp_path / "*.xml"))
+
+    captured = capsys.readouterr()
+    assert exit_code == 0
+    assert json.loads(captured.out)["summary"]["valid"] == 1
+    assert "1 of 1 files valid" in captured.err
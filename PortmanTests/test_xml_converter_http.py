@@ -0,0 +1,128 @@
+"""
+Test module for the XML converter HTTP route.
+"""
+
+import json
+
+import azure.functions as func
+import pytest
+from lxml import etree
+
+from PortmanXMLConverter import xml_converter
+from PortmanXMLConverter.src.catalog import DocumentCatalog
+from PortmanTests.test_xml_dedup import FakeBlobClient, blob_container  # noqa: F401 (fixture)
+from PortmanTests.test_xml_templates import SAMPLE_PORT_CALL
+
+
+def _call(**body):
+    request = func.HttpRequest(method="POST", url="/api/emswe-xml-converter", body=json.dumps(body).encode("utf-8"))
+    return xml_converter.xml_converter(request)
+
+
+@pytest.fixture
+def blob_storage(blob_container, monkeypatch):
+    monkeypatch.setattr(xml_converter, "generate_short_lived_link",
+                        lambda blob_path, connection_string=None: (
+                            f"https://example.blob.core.windows.net/{blob_path}?sig=x", None))
+    return blob_container
+
+
+def test_store_returns_blob_path(blob_storage):
+    response = _call(portcall_data=SAMPLE_PORT_CALL, formality_type="NOA")
+
+    (name, _), = blob_storage.blobs.items()
+    body = json.loads(response.get_body())
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+    assert body["blobPath"] == f"emswe-xml-messages/{name}"
+    assert "sasUrl" not in body
+    assert blob_storage.uploads == 1
+
+
+def _fail_upload(*args, **kwargs):
+    raise ConnectionError("storage unavailable")
+
+
+@pytest.mark.parametrize("return_xml", [False, True])
+def test_storage_failure_returns_503(blob_storage, monkeypatch, return_xml):
+    """A document that cannot be stored is not reported as stored, so the caller retries."""
+    monkeypatch.setattr(FakeBlobClient, "upload_blob", _fail_upload)
+
+    response = _call(portcall_data=SAMPLE_PORT_CALL, formality_type="NOA", return_xml=return_xml)
+
+    assert response.status_code == 503
+    assert json.loads(response.get_body())["status"] == "error"
+    assert not blob_storage.blobs
+
+
+def test_store_with_local_backend(monkeypatch, tmp_path):
+    monkeypatch.setattr(xml_converter, "DOCUMENT_STORAGE_CONFIG", {"backend": "local", "local_dir": str(tmp_path)})
+    monkeypatch.setattr(xml_converter, "_document_storage", None)
+    monkeypatch.setitem(xml_converter.XML_CONVERTER_CONFIG, "deduplicate", False)
+    monkeypatch.setattr(xml_converter, "_document_catalog", DocumentCatalog())
+
+    body = json.loads(_call(portcall_data=SAMPLE_PORT_CALL, formality_type="NOA").get_body())
+
+    container_name, name = body["blobPath"].split("/", 1)
+    assert name.split("/")[-1].startswith("NOA_3190880_")
+    assert etree.parse(str(tmp_path / container_name / name)).getroot().tag == "Envelope"
+
+
+def test_return_xml_without_storing(blob_storage):
+    response = _call(portcall_data=SAMPLE_PORT_CALL, formality_type="VID",
+                     return_xml=True, store=False)
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/xml"
+    assert response.charset == "utf-8"
+    assert "X-Sas-Url" not in response.headers
+    assert response.headers["Content-Disposition"].startswith('inline; filename="VID_3190880_')
+    assert etree.fromstring(response.get_body()).tag == "Envelope"
+    assert blob_storage.uploads == 0
+
+
+def test_return_xml_and_store(blob_storage):
+    response = _call(portcall_data=SAMPLE_PORT_CALL, formality_type="ATA",
+                     return_xml=True)
+
+    (name, data), = blob_storage.blobs.items()
+    assert response.status_code == 200
+    assert response.mimetype == "application/xml"
+    assert response.headers["X-Blob-Path"] == f"emswe-xml-messages/{name}"
+    assert response.headers["X-Sas-Url"].endswith(f"{name}?sig=x")
+    assert response.get_body() == data
+
+
+@pytest.mark.parametrize("options", [
+    {"return_xml": False, "store": False},
+    {"return_xml": "yes"},
+])
+def test_invalid_options(blob_storage, options):
+    response = _call(portcall_data=SAMPLE_PORT_CALL, **options)
+
+    assert response.status_code == 400
+    assert blob_storage.uploads == 0
+
+
+def test_return_xml_generation_failure(blob_storage, monkeypatch):
+    monkeypatch.setattr(xml_converter, "generate_xml_from_portcall_data", lambda data, xml_type: None)
+
+    response = _call(portcall_data=SAMPLE_PORT_CALL, formality_type="NOA",
+                     return_xml=True)
+
+    assert response.status_code == 422
+    assert json.loads(response.get_body())["status"] == "error"
+
+
+def test_return_xml_with_memory_backend_has_no_sas_url(monkeypatch):
+    monkeypatch.setattr(xml_converter, "DOCUMENT_STORAGE_CONFIG", {"backend": "memory", "local_dir": ""})
+    monkeypatch.setattr(xml_converter, "_document_storage", None)
+    monkeypatch.setitem(xml_converter.XML_CONVERTER_CONFIG, "deduplicate", False)
+    monkeypatch.setattr(xml_converter, "_document_catalog", DocumentCatalog())
+
+    response = _call(portcall_data=SAMPLE_PORT_CALL, formality_type="ATA", return_xml=True)
+
+    storage = xml_converter.get_document_storage()
+    assert response.status_code == 200
+    assert "X-Sas-Url" not in response.headers
+    assert storage.get(storage.name_from_path(response.headers["X-Blob-Path"])) == response.get_body()
@@ -0,0 +1,163 @@
+"""
+Test module for content-addressed deduplication of generated XML documents.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from azure.core.exceptions import ResourceNotFoundError
+from lxml import etree
+from PortmanXMLConverter import xml_converter
+from PortmanXMLConverter.src.converter import EMSWeConverter
+from PortmanXMLConverter.src.catalog import DocumentCatalog
+from PortmanXMLConverter.src.content_hash import ContentHashStore, defaulted_timestamp_paths, semantic_hash
+from PortmanXMLConverter.src.converter_config import NAMESPACES
+from PortmanXMLConverter.src.digitraffic_adapter import adapt_digitraffic_to_portman
+from PortmanTests.test_xml_templates import SAMPLE_PORT_CALL
+
+
+def _generate(formality_type, **overrides):
+    portman_data = adapt_digitraffic_to_portman(dict(SAMPLE_PORT_CALL, **overrides), formality_type)
+    success, xml_string = EMSWeConverter(formality_type).convert_to_emswe(portman_data)
+    assert success
+    return xml_string
+
+
+class FakeBlobClient:
+    def __init__(self, container, name):
+        self.container = container
+        self.name = name
+        self.url = f"https://example.blob.core.windows.net/{container.name}/{name}"
+
+    def exists(self):
+        return self.name in self.container.blobs
+
+    def download_blob(self):
+        if self.name not in self.container.blobs:
+            raise ResourceNotFoundError(self.name)
+        return SimpleNamespace(readall=lambda: self.container.blobs[self.name])
+
+    def get_blob_properties(self):
+        if self.name not in self.container.blobs:
+            raise ResourceNotFoundError(self.name)
+        return SimpleNamespace(metadata=self.container.metadata.get(self.name))
+
+    def upload_blob(self, data, overwrite=False, content_type=None, content_settings=None, metadata=None):
+        self.container.blobs[self.name] = data
+        self.container.content_settings[self.name] = content_settings
+        self.container.metadata[self.name] = metadata
+        self.container.uploads += 1
+
+
+class FakeContainerClient:
+    def __init__(self, name):
+        self.name = name
+        self.blobs = {}
+        self.content_settings = {}
+        self.metadata = {}
+        self.uploads = 0
+
+    def exists(self):
+        return True
+
+    def get_blob_client(self, name):
+        return FakeBlobClient(self, name)
+
+    def list_blobs(self, name_starts_with=None):
+        return [SimpleNamespace(name=name) for name in self.blobs if name.startswith(name_starts_with or "")]
+
+
+@pytest.fixture
+def blob_container(monkeypatch):
+    container = FakeContainerClient("emswe-xml-messages")
+
+    monkeypatch.setattr(xml_converter, "get_container_client", lambda name, connection_string=None: container)
+    monkeypatch.setattr(xml_converter, "AZURE_STORAGE_CONFIG",
+                        {"connection_string": "UseDevelopmentStorage=true", "container_name": container.name})
+    monkeypatch.setattr(xml_converter, "generate_short_lived_link",
+                        lambda blob_path, connection_string=None: ("", None))
+    monkeypatch.setattr(xml_converter, "_content_hash_store", ContentHashStore())
+    monkeypatch.setattr(xml_converter, "_document_catalog", DocumentCatalog())
+    # The storage is created again with the patched clients and config
+    monkeypatch.setattr(xml_converter, "DOCUMENT_STORAGE_CONFIG", {"backend": "azure", "local_dir": ""})
+    monkeypatch.setattr(xml_converter, "_document_storage", None)
+    return container
+
+
+def _store(port_call, formality_type):
+    """Convert and store a port call through the blob storage path."""
+    return xml_converter.convert_from_portcall_data(port_call, formality_type)
+
+
+@pytest.mark.parametrize("formality_type", ["ATA", "NOA", "VID"])
+def test_semantic_hash_ignores_ids_and_timestamps(formality_type):
+    first = _generate(formality_type)
+    second = first.replace("MSGID-3190880", "MSGID-1").replace("DECL-PT-3190880", "DECL-PT-1")
+
+    assert first != second
+    assert semantic_hash(first) == semantic_hash(second)
+    assert semantic_hash(first) != semantic_hash(_generate(formality_type, eta="2024-03-13T11:00:00.000+00:00",
+                                                           ata="2024-03-13T11:05:00.000Z"))
+
+
+@pytest.mark.parametrize("formality_type, missing", [
+    ("ATA", ("ata", "eta")),
+    ("NOA", ("eta", "etd")),
+    ("VID", ("eta",)),
+])
+def test_semantic_hash_ignores_defaulted_timestamps(formality_type, missing):
+    """Date/times filled with the generation time for missing port call fields are not content."""
+    port_call = {key: value for key, value in SAMPLE_PORT_CALL.items() if key not in missing}
+    xml_string = _generate(formality_type, **{key: None for key in missing})
+    paths = defaulted_timestamp_paths(port_call, formality_type)
+    assert paths
+
+    # The same document generated an hour later
+    xml_root = etree.fromstring(xml_string.encode("utf-8"))
+    for path in paths:
+        for element in etree.XPath(path + "//qdt:DateTimeString", namespaces=NAMESPACES)(xml_root):
+            element.text = "2099-01-01T00:00:00Z"
+    later = etree.tostring(xml_root)
+
+    assert semantic_hash(xml_string) != semantic_hash(later)
+    assert semantic_hash(xml_string, paths) == semantic_hash(later, paths)
+    assert defaulted_timestamp_paths(SAMPLE_PORT_CALL, formality_type) == ()
+
+
+def test_semantic_hash_ignores_formatting():
+    xml_string = _generate("NOA")
+    compact = xml_string.replace("\n", "").replace("  ", "")
+
+    assert semantic_hash(xml_string) == semantic_hash(compact)
+
+
+def test_unchanged_document_is_not_uploaded_again(blob_container):
+    first_path = _store(dict(SAMPLE_PORT_CALL), "NOA")
+    second_path = _store(dict(SAMPLE_PORT_CALL), "NOA")
+
+    assert blob_container.uploads == 1
+    assert first_path == second_path
+
+    _store(dict(SAMPLE_PORT_CALL, eta="2024-03-13T11:00:00.000+00:00"), "NOA")
+
+    assert blob_container.uploads == 2
+
+
+def test_deleted_blob_is_uploaded_again(blob_container):
+    _store(dict(SAMPLE_PORT_CALL), "VID")
+    blob_container.blobs.clear()
+
+    blob_path = _store(dict(SAMPLE_PORT_CALL), "VID")
+
+    assert blob_container.uploads == 2
+    assert blob_path == f"emswe-xml-messages/{next(iter(blob_container.blobs))}"
+
+
+def test_deduplication_can_be_disabled(blob_container, monkeypatch):
+    monkeypatch.setitem(xml_converter.XML_CONVERTER_CONFIG, "deduplicate", False)
+
+    _store(dict(SAMPLE_PORT_CALL), "ATA")
+    _store(dict(SAMPLE_PORT_CALL), "ATA")
+
+    assert blob_container.uploads == 2
+
@@ -0,0 +1,141 @@
+import json
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch, MagicMock
+import azure.functions as func
+from PortmanTrigger import xml_link
+from PortmanXMLConverter.src.catalog import DocumentCatalog, make_entry
+from PortmanXMLConverter.src.storage import AzureBlobStorage, LocalFileStorage
+
+LINK = "https://portman.blob.core.windows.net/emswe-xml-messages/NOA_3190880.xml?sig=y"
+
+
+def _request(**params):
+    return func.HttpRequest(method="GET", url="/api/emswe-xml-link", body=b"", params=params)
+
+
+class TestXmlLink(unittest.TestCase):
+    def setUp(self):
+        mock_link = MagicMock()
+        storage = AzureBlobStorage("emswe-xml-messages", MagicMock(), sign_link=mock_link)
+        patcher = patch('PortmanTrigger.xml_link.get_document_storage', return_value=storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_link = mock_link
+
+    def test_redirects_to_short_lived_link(self):
+        self.mock_link.return_value = (LINK, MagicMock())
+
+        response = xml_link.xml_link(_request(path="emswe-xml-messages/NOA_3190880.xml"))
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.headers["Location"], LINK)
+        self.mock_link.assert_called_once_with("emswe-xml-messages/NOA_3190880.xml")
+
+    @patch('PortmanTrigger.xml_link.get_db_connection')
+    def test_latest_document_of_port_call_as_json(self, mock_connect):
+        """Stored 7-day SAS URLs of older documents are resolved to their blob path."""
+        expiry = MagicMock()
+        expiry.isoformat.return_value = "2024-03-13T10:20:00+00:00"
+        self.mock_link.return_value = (LINK, expiry)
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = (LINK.replace("sig=y", "se=2024-03-20&sig=old"),)
+
+        response = xml_link.xml_link(_request(portCallId="3190880", formality="noa", redirect="false"))
+
+        body = json.loads(response.get_body())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body["blobPath"], "emswe-xml-messages/NOA_3190880.xml")
+        self.assertEqual(body["url"], LINK)
+        self.assertEqual(body["expires"], "2024-03-13T10:20:00+00:00")
+        self.assertIn("noa_xml_url", mock_cursor.execute.call_args[0][0])
+        self.assertEqual(mock_cursor.execute.call_args[0][1], (3190880,))
+
+    @patch('PortmanTrigger.xml_link.get_db_connection')
+    def test_unknown_or_local_document(self, mock_connect):
+        mock_cursor = mock_connect.return_value.cursor.return_value
+
+        mock_cursor.fetchone.return_value = None
+        self.assertEqual(xml_link.xml_link(_request(portCallId="1", formality="VID")).status_code, 404)
+
+        mock_cursor.fetchone.return_value = ("output/VID_1.xml",)
+        self.assertEqual(xml_link.xml_link(_request(portCallId="1", formality="VID")).status_code, 404)
+        self.mock_link.assert_not_called()
+
+    def test_rejects_paths_outside_the_container(self):
+        for path in ["other-container/NOA_1.xml", "emswe-xml-messages/", "emswe-xml-messages/../secret.xml",
+                     "emswe-xml-messages/a//b.xml"]:
+            self.assertEqual(xml_link.xml_link(_request(path=path)).status_code, 400, path)
+        for params in [{}, {"portCallId": "1"}, {"portCallId": "1;drop", "formality": "ATA"},
+                       {"portCallId": "1", "formality": "XYZ"}]:
+            self.assertEqual(xml_link.xml_link(_request(**params)).status_code, 400, params)
+        self.mock_link.assert_not_called()
+
+    def test_signing_failure(self):
+        self.mock_link.return_value = ("", None)
+
+        response = xml_link.xml_link(_request(path="emswe-xml-messages/NOA_3190880.xml"))
+
+        self.assertEqual(response.status_code, 503)
+
+    def test_local_document_link(self):
+        with tempfile.TemporaryDirectory() as root:
+            storage = LocalFileStorage("emswe-xml-messages", root)
+            storage.put("NOA_3190880.xml", "<Envelope/>")
+            with patch('PortmanTrigger.xml_link.get_document_storage', return_value=storage):
+                response = xml_link.xml_link(_request(path="emswe-xml-messages/NOA_3190880.xml", redirect="false"))
+
+        body = json.loads(response.get_body())
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(body["url"].startswith("file://"))
+        self.assertIsNone(body["expires"])
+
+
+class TestXmlDocuments(unittest.TestCase):
+    def setUp(self):
+        self.catalog = DocumentCatalog()
+        created = datetime(2024, 3, 13, 10, 0, tzinfo=timezone.utc)
+        self.catalog.add_many([
+            make_entry("emswe-xml-messages/2024/03/13/FITKU/NOA_3190880_20240313100000.xml", "NOA", 3190880,
+                       9606900, "FITKU", "abc", 1200, created),
+            make_entry("emswe-xml-messages/2024/03/13/FIHEL/VID_3190881_20240313110000.xml", "VID", 3190881,
+                       9606900, "FIHEL", "def", 900, created + timedelta(hours=1)),
+        ])
+        patcher = patch('PortmanTrigger.xml_link.get_document_catalog', return_value=self.catalog)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _documents(self, **params):
+        return xml_link.xml_documents(func.HttpRequest(method="GET", url="/api/emswe-xml-documents", body=b"",
+                                                       params=params))
+
+    def test_documents_of_a_vessel_newest_first(self):
+        response = self._documents(imo="9606900")
+
+        documents = json.loads(response.get_body())["documents"]
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([d["portCallId"] for d in documents], ["3190881", "3190880"])
+        self.assertEqual(documents[1], {
+            "blobPath": "emswe-xml-messages/2024/03/13/FITKU/NOA_3190880_20240313100000.xml",
+            "formality": "NOA", "portCallId": "3190880", "imo": 9606900, "port": "FITKU",
+            "contentHash": "abc", "size": 1200, "created": "2024-03-13T10:00:00+00:00"
+        })
+
+    def test_filters(self):
+        def port_call_ids(**params):
+            return [d["portCallId"] for d in json.loads(self._documents(**params).get_body())["documents"]]
+
+        self.assertEqual(port_call_ids(port="fitku"), ["3190880"])
+        self.assertEqual(port_call_ids(imo="9606900", formality="vid"), ["3190881"])
+        self.assertEqual(port_call_ids(since="2024-03-13T10:30:00Z"), ["3190881"])
+        self.assertEqual(port_call_ids(imo="9606900", limit="1"), ["3190881"])
+
+    def test_invalid_queries(self):
+        for params in [{}, {"formality": "NOA"}, {"imo": "96069OO"}, {"port": "FITKU", "limit": "-1"},
+                       {"since": "yesterday"}, {"since": "2024-03-13T10:00:00"}, {"port": "FITKU", "formality": "X"}]:
+            self.assertEqual(self._documents(**params).status_code, 400, params)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Test module for extracting data from EMSWe XML documents.
+"""
+
+import pytest
+from lxml import etree
+
+from PortmanXMLConverter.src.converter_config import NAMESPACES
+from PortmanXMLConverter.src.parser import XMLParser
+from PortmanXMLConverter.src.transformer import XMLTransformer
+from PortmanXMLConverter.src.digitraffic_adapter import adapt_digitraffic_to_portman
+from PortmanTests.test_xml_templates import SAMPLE_PORT_CALL
+
+
+def _document(formality_type, **overrides):
+    portman_data = adapt_digitraffic_to_portman(dict(SAMPLE_PORT_CALL, **overrides), formality_type)
+    portman_data["timestamp"] = "2024-03-13T09:00:00Z"
+    return XMLTransformer().portman_to_emswe(portman_data, formality_type)
+
+
+def test_extract_ata_document():
+    data = XMLParser().extract_data(_document("ATA"))
+
+    assert data["document_type"] == "ATA"
+    assert data["mai_data"]["document_id"] == "MSGID-3190880"
+    assert data["mai_data"]["declaration_id"] == "DECL-PT-3190880"
+    assert data["mai_data"]["timestamp"] == "2024-03-13T09:00:00Z"
+    assert data["mai_data"]["call_id"] == "3190880"
+    assert data["mai_data"]["declarant"]["id"] == "FI9606900"
+    assert data["mai_data"]["declarant"]["contact"]["phone"] == "+358-00-0000000"
+    assert data["mai_data"]["declarant"]["address"]["city"] == "Port City"
+    assert data["formality_data"] == {
+        "remarks": "Viking Grace (IMO: 9606900) port arrival -> FITKU/Matkustajasatama/viking1",
+        "arrival_datetime": "2024-03-13T10:05:00Z",
+        "location": "FITKU",
+        "call_datetime": "2024-03-13T10:05:00Z",
+        "anchorage_indicator": "0",
+    }
+
+
+@pytest.mark.parametrize("formality_type", ["ATA", "NOA", "VID"])
+def test_mai_data_matches_element_find(formality_type):
+    """The precompiled expressions select the same elements as Element.find."""
+    xml_root = _document(formality_type)
+    mai = xml_root.find(".//mai:MAI", namespaces=NAMESPACES)
+
+    mai_data = XMLParser().extract_data(xml_root)["mai_data"]
+
+    for key, path in (("document_id", ".//ram:ID"), ("type_code", ".//ram:TypeCode"),
+                      ("timestamp", ".//udt:DateTimeString"),
+                      ("declaration_id", ".//mai:ExchangedDeclaration/ram:ID")):
+        assert mai_data[key] == mai.find(path, namespaces=NAMESPACES).text
+    declarant = mai.find(".//ram:DeclarantTradeParty", namespaces=NAMESPACES)
+    assert mai_data["declarant"]["name"] == declarant.find(".//ram:Name", namespaces=NAMESPACES).text
+
+
+def test_missing_elements():
+    xml_root = _document("ATA")
+    declarant = xml_root.find(".//ram:DeclarantTradeParty", namespaces=NAMESPACES)
+    declarant.remove(declarant.find("ram:DefinedTradeContact", namespaces=NAMESPACES))
+    call_event = xml_root.find(".//ata:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent",
+                               namespaces=NAMESPACES)
+    call_event.getparent().remove(call_event)
+
+    data = XMLParser().extract_data(xml_root)
+
+    assert "contact" not in data["mai_data"]["declarant"]
+    assert "address" in data["mai_data"]["declarant"]
+    assert "call_datetime" not in data["formality_data"]
+    assert "anchorage_indicator" not in data["formality_data"]
+    assert data["formality_data"]["location"] == "FITKU"
+
+
+def test_unknown_document_type():
+    xml_root = etree.fromstring("<Envelope><Other/></Envelope>")
+
+    data = XMLParser().extract_data(xml_root)
+
+    assert data["document_type"] == "Other"
+    assert data["mai_data"] == {}
+    assert data["formality_data"] == {}
@@ -0,0 +1,108 @@
+"""
+Test module for compact serialization and gzip storage of generated XML documents.
+"""
+
+import gzip
+from unittest.mock import MagicMock
+
+import pytest
+
+from PortmanXMLConverter import xml_converter
+from PortmanXMLConverter.src.bulk import convert_file
+from PortmanXMLConverter.src.content_hash import semantic_hash
+from PortmanXMLConverter.src.converter import EMSWeConverter
+from PortmanXMLConverter.src.digitraffic_adapter import adapt_digitraffic_to_portman
+from PortmanXMLConverter.src.parser import XMLParser
+from PortmanXMLConverter.src.serialization import encode_xml, decompress_xml, is_gzip
+from PortmanXMLConverter.src.validator import XMLValidator
+from PortmanNotificator import slack_notificator
+from PortmanTests.test_xml_dedup import blob_container, _store  # noqa: F401 (fixture)
+from PortmanTests.test_xml_templates import SAMPLE_PORT_CALL
+
+
+def _convert(formality_type, pretty_print):
+    portman_data = adapt_digitraffic_to_portman(SAMPLE_PORT_CALL, formality_type)
+    portman_data["timestamp"] = "2024-03-13T09:00:00Z"
+    success, xml_string = EMSWeConverter(formality_type, pretty_print=pretty_print).convert_to_emswe(portman_data)
+    assert success
+    return xml_string
+
+
+@pytest.mark.parametrize("formality_type", ["ATA", "NOA", "VID"])
+def test_compact_serialization(formality_type):
+    pretty = _convert(formality_type, True)
+    compact = _convert(formality_type, False)
+
+    assert compact.count("\n") <= 1
+    assert len(compact) < len(pretty)
+    assert semantic_hash(compact) == semantic_hash(pretty)
+    assert XMLValidator(formality_type).validate(compact.encode("utf-8"))[0]
+
+
+def test_compact_output_file(tmp_path):
+    portman_data = adapt_digitraffic_to_portman(SAMPLE_PORT_CALL, "NOA")
+
+    success, path = EMSWeConverter("NOA", pretty_print=False).convert_to_emswe(portman_data, str(tmp_path / "noa.xml"))
+
+    assert success
+    assert open(path, "rb").read().count(b"\n") <= 1
+
+
+def test_encode_and_decompress():
+    xml_string = _convert("NOA", False)
+
+    plain, plain_encoding = encode_xml(xml_string)
+    compressed, encoding = encode_xml(xml_string, compress=True)
+
+    assert plain_encoding is None and plain == xml_string.encode("utf-8")
+    assert encoding == "gzip" and is_gzip(compressed)
+    assert compressed == encode_xml(xml_string, compress=True)[0]
+    assert decompress_xml(compressed) == decompress_xml(plain) == plain
+    assert XMLParser().parse_string(compressed) is not None
+
+
+def test_from_emswe_reads_compressed_files(tmp_path):
+    compressed, _ = encode_xml(_convert("VID", True), compress=True)
+    path = tmp_path / "VID_3190880.xml"
+    path.write_bytes(compressed)
+
+    result = convert_file(str(path))
+
+    assert result["success"], result["errors"]
+    assert result["formality_type"] == "VID"
+    assert EMSWeConverter("VID").convert_from_emswe(str(path))[0]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_blob_storage_encoding(blob_container, monkeypatch, compress):
+    monkeypatch.setitem(xml_converter.XML_CONVERTER_CONFIG, "gzip", compress)
+    monkeypatch.setitem(xml_converter.XML_CONVERTER_CONFIG, "pretty_print", False)
+
+    _store(dict(SAMPLE_PORT_CALL), "NOA")
+
+    (name, data), = blob_container.blobs.items()
+    settings = blob_container.content_settings[name]
+    assert settings.content_type == "application/xml"
+    assert settings.content_encoding == ("gzip" if compress else None)
+    assert is_gzip(data) == compress
+    assert decompress_xml(data).count(b"\n") <= 1
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_slack_notifier_reads_both_encodings(monkeypatch, compress):
+    data, _ = encode_xml(_convert("NOA", True), compress=compress)
+    blob = MagicMock()
+    blob.name = "emswe-xml-messages/NOA_3190880_20240313090000.xml"
+    blob.read.return_value = data
+    send = MagicMock()
+    monkeypatch.setenv("SLACK_WEBHOOK_ENABLED", "true")
+    monkeypatch.setenv("SLACK_WEBHOOK_URL", "https://hooks.example.com/x")
+    monkeypatch.setattr(slack_notificator, "send_slack_notification", send)
+    monkeypatch.setattr(slack_notificator, "send_slack_error", MagicMock(side_effect=AssertionError))
+    monkeypatch.setattr(slack_notificator, "generate_blob_storage_link", lambda name: None)
+
+    slack_notificator.blob_trigger(blob)
+
+    args = send.call_args[0]
+    assert args[2] == "3190880"
+    assert args[5].startswith("<?xml")
@@ -0,0 +1,90 @@
+"""
+Test module for the document storage backends.
+"""
+
+import pytest
+
+from PortmanXMLConverter.src.serialization import is_gzip
+from PortmanXMLConverter.src.storage import AzureBlobStorage, LocalFileStorage, MemoryStorage
+from PortmanTests.test_xml_dedup import FakeContainerClient
+
+CONTAINER = "emswe-xml-messages"
+XML = '<?xml version="1.0" encoding="UTF-8"?>\n<Envelope/>\n'
+
+
+@pytest.fixture(params=["azure", "local", "memory"])
+def storage_factory(request, tmp_path):
+    def create(compress=False):
+        if request.param == "azure":
+            container = FakeContainerClient(CONTAINER)
+            return AzureBlobStorage(CONTAINER, lambda: container, compress=compress)
+        if request.param == "local":
+            return LocalFileStorage(CONTAINER, str(tmp_path), compress=compress)
+        return MemoryStorage(CONTAINER, compress=compress)
+    return create
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_put_get_list(storage_factory, compress):
+    storage = storage_factory(compress)
+
+    assert storage.put("NOA_1.xml", XML) == f"{CONTAINER}/NOA_1.xml"
+    storage.put("2024/03/13/ATA_2.xml", XML.encode("utf-8"))
+
+    assert storage.get("NOA_1.xml") == XML.encode("utf-8")
+    assert storage.get("2024/03/13/ATA_2.xml") == XML.encode("utf-8")
+    assert storage.exists("NOA_1.xml") and not storage.exists("VID_1.xml")
+    assert storage.list() == ["2024/03/13/ATA_2.xml", "NOA_1.xml"]
+    assert storage.list("NOA_") == ["NOA_1.xml"]
+    with pytest.raises(KeyError):
+        storage.get("VID_1.xml")
+
+
+def test_metadata(storage_factory):
+    storage = storage_factory()
+
+    storage.put("2024/NOA_1.xml", XML, {"portcallid": "1", "remarks": "On%20time"})
+    storage.put("ATA_2.xml", XML)
+
+    assert storage.get_metadata("2024/NOA_1.xml") == {"portcallid": "1", "remarks": "On%20time"}
+    assert storage.get_metadata("ATA_2.xml") == {}
+    assert storage.list() == ["2024/NOA_1.xml", "ATA_2.xml"]
+    with pytest.raises(KeyError):
+        storage.get_metadata("VID_3.xml")
+
+
+def test_invalid_names_are_rejected(storage_factory):
+    storage = storage_factory()
+
+    for name in ["", "../secret.xml", "/etc/passwd", "a//b.xml", "a\\b.xml"]:
+        with pytest.raises(ValueError):
+            storage.put(name, XML)
+    assert storage.list() == []
+
+
+def test_document_paths():
+    storage = MemoryStorage(CONTAINER)
+
+    assert storage.name_from_path(f"{CONTAINER}/2024/NOA_1.xml") == "2024/NOA_1.xml"
+    for path in ["other/NOA_1.xml", f"{CONTAINER}/", f"{CONTAINER}/../secret.xml", "output/NOA_1.xml", None]:
+        assert storage.name_from_path(path) is None
+    assert storage.url("NOA_1.xml") == ("", None)
+
+
+def test_local_files_are_stored_encoded(tmp_path):
+    storage = LocalFileStorage(CONTAINER, str(tmp_path), compress=True)
+
+    storage.put("NOA_1.xml", XML)
+
+    assert is_gzip((tmp_path / CONTAINER / "NOA_1.xml").read_bytes())
+    assert storage.url("NOA_1.xml")[0] == (tmp_path / CONTAINER / "NOA_1.xml").as_uri()
+    assert storage.url("VID_1.xml") == ("", None)
+
+
+def test_azure_links_are_signed_for_document_paths():
+    signed = []
+    storage = AzureBlobStorage(CONTAINER, lambda: FakeContainerClient(CONTAINER),
+                               sign_link=lambda path: (signed.append(path) or "https://link", None))
+
+    assert storage.url("NOA_1.xml") == ("https://link", None)
+    assert signed == [f"{CONTAINER}/NOA_1.xml"]
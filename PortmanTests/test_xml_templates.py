@@ -0,0 +1,91 @@
+"""
+Test module for the template-based EMSWe envelope builder.
+"""
+
+import copy
+import pytest
+from lxml import etree
+from PortmanXMLConverter.src.transformer import XMLTransformer
+from PortmanXMLConverter.src.digitraffic_adapter import adapt_digitraffic_to_portman
+
+SAMPLE_PORT_CALL = {
+    "portCallId": 3190880,
+    "imoLloyds": 9606900,
+    "mmsi": 257800000,
+    "vesselName": "Viking Grace",
+    "radioCallSign": "OJPV",
+    "portToVisit": "FITKU",
+    "portAreaCode": "PASSE",
+    "portAreaName": "Matkustajasatama",
+    "berthCode": "v1",
+    "berthName": "viking1",
+    "eta": "2024-03-13T10:00:00.000+00:00",
+    "ata": "2024-03-13T10:05:00.000Z",
+    "etd": "2024-03-13T20:00:00.000+00:00",
+    "passengersOnArrival": 235,
+    "crewOnArrival": 40,
+    "agentName": "Viking Line Abp / Helsinki",
+    "shippingCompany": "Viking Line Abp",
+}
+
+
+def _variants(formality_type):
+    """Portman data variants covering the optional elements of each formality."""
+    base = adapt_digitraffic_to_portman(SAMPLE_PORT_CALL, formality_type)
+    base["timestamp"] = "2024-03-13T09:00:00Z"
+
+    no_declarant_details = copy.deepcopy(base)
+    del no_declarant_details["declarant"]["contact"]["phone"]
+    del no_declarant_details["declarant"]["address"]
+
+    no_optional = copy.deepcopy(base)
+    for key in ("declarant", "call_id", "remarks", "location", "anchorage_indicator", "imoLloyds",
+                "mmsi", "radioCallSign", "berthCode", "berthName", "passengersOnArrival", "crewOnArrival"):
+        no_optional.pop(key, None)
+
+    invalid_values = copy.deepcopy(base)
+    invalid_values.update({"imoLloyds": "0", "mmsi": "12345", "radioCallSign": "  ",
+                           "passengersOnArrival": "x", "crewOnArrival": 0, "vesselTypeCode": 20,
+                           "remarks": None})
+
+    return [base, no_declarant_details, no_optional, invalid_values]
+
+
+@pytest.mark.parametrize("formality_type", ["ATA", "NOA", "VID"])
+def test_template_output_matches_element_builder(formality_type):
+    """Template output must be byte-identical to the element-by-element builder."""
+    template_transformer = XMLTransformer()
+    element_transformer = XMLTransformer(use_templates=False)
+
+    for portman_data in _variants(formality_type):
+        expected = element_transformer.portman_to_emswe(copy.deepcopy(portman_data), formality_type)
+        actual = template_transformer.portman_to_emswe(copy.deepcopy(portman_data), formality_type)
+
+        assert expected is not None
+        assert etree.tostring(actual, pretty_print=True, xml_declaration=True, encoding="UTF-8") == \
+            etree.tostring(expected, pretty_print=True, xml_declaration=True, encoding="UTF-8")
+
+
+def test_template_documents_are_independent():
+    """Rendering must not modify the shared skeleton."""
+    transformer = XMLTransformer()
+    first = transformer.portman_to_emswe(_variants("ATA")[0], "ATA")
+    second = transformer.portman_to_emswe(_variants("ATA")[2], "ATA")
+
+    assert first is not second
+    assert len(list(first.iter())) > len(list(second.iter()))
+
+
+@pytest.mark.parametrize("formality_types", [("VID", "NOA", "ATA"), ("ATA", "VID"), ("NOA",)])
+def test_render_many_shares_mai(formality_types):
+    """Documents rendered with a shared MAI are byte-identical to separately rendered ones."""
+    transformer = XMLTransformer()
+    for variant in range(4):
+        portman_data_by_type = {formality_type: _variants(formality_type)[variant] for formality_type in formality_types}
+
+        roots = transformer.portman_to_emswe_many(copy.deepcopy(portman_data_by_type))
+
+        assert list(roots) == list(formality_types)
+        for formality_type, portman_data in portman_data_by_type.items():
+            expected = transformer.portman_to_emswe(copy.deepcopy(portman_data), formality_type)
+            assert etree.tostring(roots[formality_type], pretty_print=True) == etree.tostring(expected, pretty_print=True)
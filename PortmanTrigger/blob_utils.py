@@ -1,47 +1,182 @@
+from azure.core.exceptions import ResourceExistsError
 from azure.storage.blob import BlobServiceClient, BlobSasPermissions, generate_blob_sas
 from datetime import datetime, timedelta, UTC
+from functools import lru_cache
+from urllib.parse import urlparse, unquote
 import os
 import logging
+import threading
+import time
+
+from config import BLOB_LINK_CONFIG
+
+# Process-wide clients: a BlobServiceClient keeps its HTTP connection pool, and the
+# container clients derived from it share that pool.
+_clients_lock = threading.RLock()
+_service_clients = {}
+_container_clients = {}
+
+
+def get_blob_service_client(connection_string=None):
+    """Return the process-wide BlobServiceClient for a connection string, creating it on first use."""
+    if not connection_string:
+        connection_string = os.environ.get("AzureWebJobsStorage")
+    client = _service_clients.get(connection_string)
+    if client is None:
+        with _clients_lock:
+            client = _service_clients.get(connection_string)
+            if client is None:
+                client = BlobServiceClient.from_connection_string(connection_string)
+                _service_clients[connection_string] = client
+    return client
+
+
+def get_container_client(container_name, connection_string=None):
+    """Return the process-wide ContainerClient of a container.
+
+    The container is checked, and created if missing, only the first time it is requested
+    in the process; after that no request is made before the caller's own operations.
+    """
+    if not connection_string:
+        connection_string = os.environ.get("AzureWebJobsStorage")
+    key = (connection_string, container_name)
+    client = _container_clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _container_clients.get(key)
+            if client is None:
+                client = _ensure_container(container_name, connection_string)
+                _container_clients[key] = client
+    return client
+
+
+def _ensure_container(container_name, connection_string):
+    container_client = get_blob_service_client(connection_string).get_container_client(container_name)
+    if not container_client.exists():
+        try:
+            container_client.create_container()
+            logging.info(f"Created blob container {container_name}")
+        except ResourceExistsError:
+            # Created concurrently by another worker
+            pass
+    return container_client
+
+
+def reset_blob_clients(container_name=None):
+    """Forget cached clients, e.g. after a container was deleted, so the next use checks it again.
+
+    With a container name only the container clients of that container are dropped.
+    """
+    with _clients_lock:
+        if container_name is None:
+            _service_clients.clear()
+            _container_clients.clear()
+        else:
+            for key in [key for key in _container_clients if key[1] == container_name]:
+                del _container_clients[key]
+
+
+def _signed_blob_url(blob_name, connection_string, expiry):
+    """Sign a read-only SAS URL of a "container/blob" path that expires at `expiry`."""
+    container_name = blob_name.split('/')[0]
+    blob_path = '/'.join(blob_name.split('/')[1:])
+
+    # Get account name from the shared client
+    account_name = get_blob_service_client(connection_string).account_name
+
+    # Get account key (needed for SAS token generation)
+    account_key = connection_string.split('AccountKey=')[1].split(';')[0]
+
+    sas_token = generate_blob_sas(
+        account_name=account_name,
+        container_name=container_name,
+        blob_name=blob_path,
+        account_key=account_key,
+        permission=BlobSasPermissions(read=True),
+        expiry=expiry,
+        content_type="application/xml",
+        content_disposition=f"attachment; filename={os.path.basename(blob_path)}"
+    )
+
+    # Create the URL with SAS token
+    return f"https://{account_name}.blob.core.windows.net/{container_name}/{blob_path}?{sas_token}"
+
 
 def generate_blob_storage_link(blob_name, connection_string=None):
-    """Generate a URL with SAS token to access the blob directly."""
+    """Generate a URL with SAS token to access the blob directly.
+
+    The link is valid for 7 days, for messages that outlive a request (e.g. Slack
+    notifications). Links handed out on request use generate_short_lived_link.
+    """
     try:
         # Get storage account connection string if not provided
         if not connection_string:
             connection_string = os.environ.get("AzureWebJobsStorage")
-        
+
         if not connection_string:
             logging.warning("Storage connection string not available, cannot generate direct link")
             return ""
 
-        container_name = blob_name.split('/')[0]
-        blob_path = '/'.join(blob_name.split('/')[1:])
+        # Generate SAS token with read permission that expires in 7 days
+        return _signed_blob_url(blob_name, connection_string, datetime.now(UTC) + timedelta(days=7))
+    except Exception as e:
+        logging.error(f"Error generating blob storage link: {e}")
+        return ""
 
-        # Create the BlobServiceClient
-        blob_service_client = BlobServiceClient.from_connection_string(connection_string)
 
-        # Get account name from connection string
-        account_name = blob_service_client.account_name
+@lru_cache(maxsize=4096)
+def _cached_blob_url(blob_name, connection_string, expiry_timestamp):
+    return _signed_blob_url(blob_name, connection_string, datetime.fromtimestamp(expiry_timestamp, UTC))
 
-        # Get account key (needed for SAS token generation)
-        account_key = connection_string.split('AccountKey=')[1].split(';')[0]
 
-        # Generate SAS token with read permission that expires in 7 days
-        sas_token = generate_blob_sas(
-            account_name=account_name,
-            container_name=container_name,
-            blob_name=blob_path,
-            account_key=account_key,
-            permission=BlobSasPermissions(read=True),
-            expiry=datetime.now(UTC) + timedelta(days=7),
-            content_type="application/xml",
-            content_disposition=f"attachment; filename={os.path.basename(blob_path)}"
-        )
-
-        # Create the URL with SAS token
-        blob_url = f"https://{account_name}.blob.core.windows.net/{container_name}/{blob_path}?{sas_token}"
-
-        return blob_url
+def generate_short_lived_link(blob_name, connection_string=None, now=None):
+    """Generate a short-lived URL with SAS token to access the blob directly.
+
+    Expiry times are rounded up to the end of a bucket of XML_LINK_SAS_BUCKET_MINUTES,
+    so all requests for a blob within a bucket share one cached signature. A link
+    stays valid for XML_LINK_SAS_TTL_MINUTES after its bucket ends.
+
+    Args:
+        blob_name: Blob path "container/blob"
+        connection_string: Storage connection string (default: AzureWebJobsStorage)
+        now: Current time as a Unix timestamp (for testing)
+
+    Returns:
+        Tuple (url, expiry datetime), or ("", None) if no link could be signed
+    """
+    try:
+        if not connection_string:
+            connection_string = os.environ.get("AzureWebJobsStorage")
+
+        if not connection_string:
+            logging.warning("Storage connection string not available, cannot generate direct link")
+            return "", None
+
+        bucket_seconds = max(1, BLOB_LINK_CONFIG["sas_bucket_minutes"] * 60)
+        now = time.time() if now is None else now
+        expiry_timestamp = (int(now) // bucket_seconds + 1) * bucket_seconds + BLOB_LINK_CONFIG["sas_ttl_minutes"] * 60
+        url = _cached_blob_url(blob_name, connection_string, expiry_timestamp)
+        return url, datetime.fromtimestamp(expiry_timestamp, UTC)
     except Exception as e:
         logging.error(f"Error generating blob storage link: {e}")
-        return "" 
\ No newline at end of file
+        return "", None
+
+
+def blob_path_from_url(url):
+    """Return the "container/blob" path of a stored XML document reference.
+
+    The `*_xml_url` columns hold blob paths; documents generated before links were
+    signed on demand are referenced by their full (SAS) URL instead.
+    """
+    if url and urlparse(url).scheme in ("http", "https"):
+        return unquote(urlparse(url).path.lstrip('/'))
+    return url
+
+
+def blob_path_from_response(response_data):
+    """Return the blob path of the document stored by the XML converter, or None.
+
+    Converters that still sign links at generation time answer with `sasUrl` (or
+    `url`) instead of `blobPath`.
+    """
+    return response_data.get('blobPath') or blob_path_from_url(response_data.get('sasUrl') or response_data.get('url'))
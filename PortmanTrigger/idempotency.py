@@ -0,0 +1,225 @@
+"""
+Idempotency keys for XML generation.
+
+An idempotency key identifies one generation event: the port call, the
+formality type and the normalized event value (e.g. the minute-level ETA of a
+NOA). Keys are claimed before the XML converter is called, completed in the
+same transaction that stores the resulting XML URL, and expire after a
+configurable time, so overlapping or retried runs drop duplicate events
+without calling the converter again.
+
+Completing a key deletes the older keys of the same port call and formality:
+only the latest generated event is a duplicate, so an ETA that changes A -> B
+-> A generates a NOA for the second A as well.
+
+The statements are PostgreSQL-only (INSERT ... ON CONFLICT ... RETURNING and
+INTERVAL arithmetic). save_results_to_db disables the keys when it runs on a
+SQLite connection.
+"""
+
+import logging
+
+from config import DATABASE_CONFIG, IDEMPOTENCY_CONFIG
+
+logger = logging.getLogger('PortmanTrigger')
+
+CREATE_IDEMPOTENCY_TABLE = """
+CREATE TABLE IF NOT EXISTS xml_idempotency_keys (
+    idempotency_key TEXT PRIMARY KEY,
+    portCallId INTEGER,
+    formality TEXT,
+    event_value TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    xml_url TEXT DEFAULT NULL,
+    created TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires TIMESTAMP NOT NULL
+);
+"""
+
+CREATE_IDEMPOTENCY_INDEX = """
+CREATE INDEX IF NOT EXISTS xml_idempotency_keys_expires_idx ON xml_idempotency_keys (expires);
+"""
+
+
+def make_idempotency_key(port_call_id, formality_type, event_value=None):
+    """
+    Build the idempotency key of a generation event.
+
+    Args:
+        port_call_id: Port call ID
+        formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+        event_value: Normalized event value, e.g. the minute-level ETA for NOA
+
+    Returns:
+        Idempotency key string
+    """
+    return f"{int(port_call_id)}:{formality_type}:{event_value or ''}"
+
+
+def split_idempotency_key(idempotency_key):
+    """
+    Split an idempotency key into its parts.
+
+    Args:
+        idempotency_key: Key built by make_idempotency_key
+
+    Returns:
+        Tuple (port_call_id, formality_type, event_value)
+    """
+    port_call_id, formality_type, event_value = idempotency_key.split(":", 2)
+    return int(port_call_id), formality_type, event_value or None
+
+
+def complete_idempotency_key(cursor, idempotency_key, xml_url):
+    """
+    Mark a claimed key as done and delete the keys it supersedes. Execute this in
+    the transaction that stores the XML URL.
+
+    Args:
+        cursor: Cursor of the transaction storing the result
+        idempotency_key: Claimed idempotency key
+        xml_url: URL of the generated XML document
+    """
+    port_call_id, formality_type, _ = split_idempotency_key(idempotency_key)
+    cursor.execute(
+        """
+        UPDATE xml_idempotency_keys
+        SET status = 'done', xml_url = %s, expires = CURRENT_TIMESTAMP + %s * INTERVAL '1 hour'
+        WHERE idempotency_key = %s
+        """,
+        (xml_url, IDEMPOTENCY_CONFIG["ttl_hours"], idempotency_key)
+    )
+    # Events generated before this one are no longer the current state of the port call
+    cursor.execute(
+        """
+        DELETE FROM xml_idempotency_keys
+        WHERE portCallId = %s AND formality = %s AND idempotency_key <> %s AND status = 'done'
+        """,
+        (port_call_id, formality_type, idempotency_key)
+    )
+
+
+class IdempotencyKeys:
+    """
+    Claims and releases idempotency keys on a dedicated autocommit connection,
+    so a claim is visible to overlapping runs as soon as it is made.
+    """
+
+    def __init__(self, get_connection, enabled=True):
+        """
+        Args:
+            get_connection: Callable returning a new connection to the Portman (PostgreSQL) database, or None
+            enabled: False to never touch the database, e.g. on SQLite; every key is then returned unclaimed
+        """
+        self._get_connection = get_connection
+        self._conn = None
+        self.enabled = enabled
+        self.duplicates = 0
+
+    def _cursor(self):
+        if not self.enabled:
+            return None
+        if self._conn is None:
+            conn = self._get_connection(DATABASE_CONFIG["dbname"])
+            if conn is None:
+                return None
+            conn.autocommit = True
+            self._conn = conn
+        return self._conn.cursor()
+
+    def claim(self, port_call_id, formality_type, event_value=None):
+        """
+        Claim the key of a generation event.
+
+        Args:
+            port_call_id: Port call ID
+            formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+            event_value: Normalized event value
+
+        Returns:
+            The claimed key, or None if the event was already generated (or is being
+            generated) and has not expired. If the database is unavailable the key is
+            returned unclaimed so that generation still happens.
+        """
+        idempotency_key = make_idempotency_key(port_call_id, formality_type, event_value)
+        try:
+            cursor = self._cursor()
+            if cursor is None:
+                return idempotency_key
+
+            # Insert a new claim, or take over an expired one
+            cursor.execute(
+                """
+                INSERT INTO xml_idempotency_keys
+                    (idempotency_key, portCallId, formality, event_value, status, created, expires)
+                VALUES (%s, %s, %s, %s, 'pending', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP + %s * INTERVAL '1 minute')
+                ON CONFLICT (idempotency_key) DO UPDATE SET
+                    status = 'pending', xml_url = NULL, created = CURRENT_TIMESTAMP, expires = EXCLUDED.expires
+                WHERE xml_idempotency_keys.expires < CURRENT_TIMESTAMP
+                RETURNING idempotency_key
+                """,
+                (idempotency_key, int(port_call_id), formality_type, event_value or "",
+                 IDEMPOTENCY_CONFIG["pending_timeout_minutes"])
+            )
+            claimed = cursor.fetchone()
+            cursor.close()
+        except Exception as e:
+            logger.info(f"Idempotency check unavailable for {idempotency_key}: {e}")
+            self.close()
+            return idempotency_key
+
+        if not claimed:
+            self.duplicates += 1
+            logger.info(f"Skipping duplicate {formality_type} generation for portCallId {port_call_id} "
+                        f"(idempotency key {idempotency_key})")
+            return None
+        return idempotency_key
+
+    def release(self, idempotency_key):
+        """
+        Release a claim whose generation failed, so a later run can retry it.
+
+        Args:
+            idempotency_key: Claimed idempotency key
+        """
+        try:
+            cursor = self._cursor()
+            if cursor is None:
+                return
+            cursor.execute(
+                "DELETE FROM xml_idempotency_keys WHERE idempotency_key = %s AND status = 'pending'",
+                (idempotency_key,)
+            )
+            cursor.close()
+        except Exception as e:
+            logger.info(f"Failed to release idempotency key {idempotency_key}: {e}")
+            self.close()
+
+    def purge_expired(self):
+        """
+        Delete expired keys.
+
+        Returns:
+            Number of deleted keys
+        """
+        try:
+            cursor = self._cursor()
+            if cursor is None:
+                return 0
+            cursor.execute("DELETE FROM xml_idempotency_keys WHERE expires < CURRENT_TIMESTAMP")
+            deleted = cursor.rowcount
+            cursor.close()
+            return max(deleted, 0)
+        except Exception as e:
+            logger.info(f"Failed to purge expired idempotency keys: {e}")
+            self.close()
+            return 0
+
+    def close(self):
+        """Close the connection."""
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
@@ -0,0 +1,145 @@
+"""
+Debouncing of ETA changes before NOA generation.
+
+Agents often revise an ETA several times in a short time. With a debounce
+window configured, an ETA change is held in the `pending_noas` table and only
+the latest ETA of a port call is turned into a NOA once it has been stable for
+the window, or immediately when the arrival is imminent.
+
+The statements are PostgreSQL-only (INSERT ... ON CONFLICT and DELETE ...
+RETURNING). save_results_to_db turns debouncing off when it runs on a SQLite
+connection.
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+
+from config import NOA_DEBOUNCE_CONFIG
+from PortmanXMLConverter.src.timestamps import to_naive_utc
+
+logger = logging.getLogger('PortmanTrigger')
+
+CREATE_PENDING_NOAS_TABLE = """
+CREATE TABLE IF NOT EXISTS pending_noas (
+    portCallId INTEGER PRIMARY KEY,
+    eta TIMESTAMP NOT NULL,
+    noa_data TEXT NOT NULL,
+    first_changed TIMESTAMP NOT NULL,
+    last_changed TIMESTAMP NOT NULL,
+    suppressed INTEGER DEFAULT 0
+);
+"""
+
+
+class NoaDebouncer:
+    """
+    Holds ETA changes per port call until they are stable.
+
+    All statements run on the caller's cursor, so held changes are committed
+    together with the voyage updates of the run.
+    """
+
+    def __init__(self, cursor, window_minutes=None, imminent_minutes=None, now=None):
+        """
+        Args:
+            cursor: Cursor of the Portman database connection
+            window_minutes: Minutes an ETA must be stable before its NOA is generated (0 disables debouncing,
+                and no statements are executed)
+            imminent_minutes: NOAs for arrivals within this many minutes are generated immediately
+            now: Current UTC time (for testing)
+        """
+        self.cursor = cursor
+        self.window = timedelta(minutes=NOA_DEBOUNCE_CONFIG["window_minutes"] if window_minutes is None
+                                else window_minutes)
+        self.imminent = timedelta(minutes=NOA_DEBOUNCE_CONFIG["imminent_minutes"] if imminent_minutes is None
+                                  else imminent_minutes)
+        self.now = to_naive_utc(now) if now is not None else datetime.now(timezone.utc).replace(tzinfo=None)
+
+        self.held = 0        # ETA changes held in this run
+        self.suppressed = 0  # Held ETA values replaced before a NOA was generated for them
+
+    @property
+    def enabled(self):
+        return self.window > timedelta(0)
+
+    def is_imminent(self, eta):
+        """Whether an arrival at `eta` is close enough to skip the debounce window."""
+        return to_naive_utc(eta) - self.now <= self.imminent
+
+    def hold(self, port_call_id, eta, noa_data):
+        """
+        Hold an ETA change, replacing any earlier held value of the port call.
+
+        Args:
+            port_call_id: Port call ID
+            eta: New ETA
+            noa_data: Data for NOA generation
+
+        Returns:
+            True if the change is held, False if the NOA should be generated now
+        """
+        if not self.enabled or self.is_imminent(eta):
+            self.discard(port_call_id)
+            return False
+
+        self.cursor.execute(
+            """
+            INSERT INTO pending_noas (portCallId, eta, noa_data, first_changed, last_changed, suppressed)
+            VALUES (%s, %s, %s, %s, %s, 0)
+            ON CONFLICT (portCallId) DO UPDATE SET
+                eta = EXCLUDED.eta,
+                noa_data = EXCLUDED.noa_data,
+                last_changed = EXCLUDED.last_changed,
+                suppressed = pending_noas.suppressed + 1
+            RETURNING suppressed
+            """,
+            (port_call_id, to_naive_utc(eta), json.dumps(noa_data, default=str), self.now, self.now)
+        )
+        row = self.cursor.fetchone()
+        self.held += 1
+        if row and row[0]:
+            self.suppressed += 1
+        logger.info(f"Holding ETA change for portCallId {port_call_id} (ETA {eta}) for {self.window}")
+        return True
+
+    def discard(self, port_call_id):
+        """
+        Drop the held ETA change of a port call, e.g. when a newer NOA is generated
+        immediately or the vessel has arrived.
+
+        Args:
+            port_call_id: Port call ID
+        """
+        if not self.enabled:
+            return
+        self.cursor.execute("DELETE FROM pending_noas WHERE portCallId = %s RETURNING suppressed",
+                            (port_call_id,))
+        if self.cursor.fetchone():
+            self.suppressed += 1
+
+    def due(self):
+        """
+        Get the held ETA changes that are stable for the window or imminent.
+
+        Returns:
+            List of (port_call_id, noa_data) tuples
+        """
+        if not self.enabled:
+            return []
+        self.cursor.execute(
+            "SELECT portCallId, noa_data FROM pending_noas WHERE last_changed <= %s OR eta <= %s ORDER BY eta",
+            (self.now - self.window, self.now + self.imminent)
+        )
+        return [(int(port_call_id), json.loads(noa_data)) for port_call_id, noa_data in self.cursor.fetchall()]
+
+    def done(self, port_call_id):
+        """
+        Remove a held ETA change whose NOA was generated.
+
+        Args:
+            port_call_id: Port call ID
+        """
+        if not self.enabled:
+            return
+        self.cursor.execute("DELETE FROM pending_noas WHERE portCallId = %s", (port_call_id,))
@@ -3,10 +3,14 @@ import json
 import azure.functions as func
 import pg8000
 from config import DATABASE_CONFIG, XML_CONVERTER_CONFIG
+from PortmanXMLConverter.src.log_events import log_event, LazyJSON
+from PortmanTrigger.blob_utils import blob_path_from_response, generate_short_lived_link
 import requests
 import os
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 def get_db_connection(dbName):
     """Establish and return a database connection to a specified database."""
     try:
@@ -98,7 +102,8 @@ def noa_generator(req: func.HttpRequest) -> func.HttpResponse:
         req: The HTTP request object containing portCallId parameter.
         
     Returns:
-        func.HttpResponse: The HTTP response containing operation status and SAS URL if successful.
+        func.HttpResponse: The HTTP response containing operation status, and the blob path and
+        a short-lived download link of the document if successful.
     """
     logging.info('NOA Generator function processing a request')
     
@@ -157,37 +162,42 @@ def noa_generator(req: func.HttpRequest) -> func.HttpResponse:
         else:
             xml_converterfunction_url += f"?code={xml_converter_function_key}"
     
-    logging.info(f"Calling xml-converter for NOA: {xml_converterfunction_url}")
+    log_event(logger, logging.INFO, "xml_converter.call", formality_type="NOA", port_call_id=portCallId,
+              url=XML_CONVERTER_CONFIG["function_url"])
     
     # Send the voyage data to the function for NOA generation
     try:
-        # Log the payload for debugging
-        logging.info(f"Payload to XML converter: {json.dumps({'portcall_data': voyage_data, 'formality_type': 'NOA'})}")
-        
+        log_event(logger, logging.DEBUG, "xml_converter.payload", formality_type="NOA", payload=LazyJSON(voyage_data))
+
         response = requests.post(
             xml_converterfunction_url,
             json={"portcall_data": voyage_data, "formality_type": "NOA"},
-            headers={"Content-Type": "application/json"}
+            headers={"Content-Type": "application/json"},
+            timeout=XML_CONVERTER_CONFIG["timeout_seconds"]
         )
         
         if response.status_code == 200:
             response_data = response.json()
-            # Get SAS URL from the response
-            sas_url = response_data.get('sasUrl')
+            # Get the blob path from the response
+            xml_path = blob_path_from_response(response_data)
             
-            if not sas_url:
+            if not xml_path:
                 return func.HttpResponse(
-                    json.dumps({"status": "error", "message": "No URL found in XML converter response"}),
+                    json.dumps({"status": "error", "message": "No blob path found in XML converter response"}),
                     mimetype="application/json",
                     status_code=500
                 )
             
-            # Update the database with the NOA XML URL
-            if update_noa_xml_url(portCallId, sas_url):
+            # The caller gets a short-lived link; only the blob path is stored
+            sas_url, _ = generate_short_lived_link(xml_path)
+            
+            # Update the database with the NOA XML blob path
+            if update_noa_xml_url(portCallId, xml_path):
                 return func.HttpResponse(
                     json.dumps({
                         "status": "success", 
                         "message": f"NOA XML generated and URL updated for portCallId {portCallId}",
+                        "blobPath": xml_path,
                         "sasUrl": sas_url
                     }),
                     mimetype="application/json"
@@ -197,6 +207,7 @@ def noa_generator(req: func.HttpRequest) -> func.HttpResponse:
                     json.dumps({
                         "status": "partial", 
                         "message": f"NOA XML generated but URL update failed for portCallId {portCallId}",
+                        "blobPath": xml_path,
                         "sasUrl": sas_url
                     }),
                     mimetype="application/json",
@@ -1,7 +1,6 @@
 import sqlite3
 import requests
 import pg8000
-from datetime import datetime
 import os
 import argparse
 import json
@@ -10,18 +9,37 @@ import natsort
 import logging
 
 from config import DATABASE_CONFIG, XML_CONVERTER_CONFIG
+from PortmanXMLConverter.src.timestamps import to_minute_key, to_display
+from PortmanXMLConverter.src.log_events import log_event, LazyJSON
+from PortmanXMLConverter.src.content_hash import CREATE_CONTENT_HASHES_TABLE
+from PortmanXMLConverter.src.catalog import CREATE_DOCUMENTS_TABLE, CREATE_DOCUMENTS_INDEXES
 # Import the blob utilities
 try:
-    from PortmanTrigger.blob_utils import generate_blob_storage_link
+    from PortmanTrigger.blob_utils import blob_path_from_response
 except ImportError:
-    try:
-        # Try alternative import path
-        from blob_utils import generate_blob_storage_link
-    except ImportError:
-        # Fallback definition if the module can't be imported
-        def generate_blob_storage_link(blob_name, connection_string=None):
-            log("Warning: generate_blob_storage_link function not available")
-            return ""
+    from blob_utils import blob_path_from_response
+try:
+    from PortmanTrigger.noa_debounce import NoaDebouncer, CREATE_PENDING_NOAS_TABLE
+except ImportError:
+    from noa_debounce import NoaDebouncer, CREATE_PENDING_NOAS_TABLE
+try:
+    from PortmanTrigger.retry_queue import (
+        RetryQueue, clear_retry_entry, is_retryable_status, CREATE_RETRY_QUEUE_TABLE, CREATE_RETRY_QUEUE_INDEX
+    )
+except ImportError:
+    from retry_queue import (
+        RetryQueue, clear_retry_entry, is_retryable_status, CREATE_RETRY_QUEUE_TABLE, CREATE_RETRY_QUEUE_INDEX
+    )
+try:
+    from PortmanTrigger.idempotency import (
+        IdempotencyKeys, complete_idempotency_key, split_idempotency_key,
+        CREATE_IDEMPOTENCY_TABLE, CREATE_IDEMPOTENCY_INDEX
+    )
+except ImportError:
+    from idempotency import (
+        IdempotencyKeys, complete_idempotency_key, split_idempotency_key,
+        CREATE_IDEMPOTENCY_TABLE, CREATE_IDEMPOTENCY_INDEX
+    )
 
 # Configure logging
 logging.basicConfig(
@@ -145,6 +163,25 @@ def create_database_and_tables():
         """
         cursor.execute(create_arrivals_table)
 
+        # Create the 'xml_idempotency_keys' table
+        cursor.execute(CREATE_IDEMPOTENCY_TABLE)
+        cursor.execute(CREATE_IDEMPOTENCY_INDEX)
+
+        # Create the 'pending_noas' table for debounced ETA changes
+        cursor.execute(CREATE_PENDING_NOAS_TABLE)
+
+        # Create the 'xml_retry_queue' table for failed XML generations
+        cursor.execute(CREATE_RETRY_QUEUE_TABLE)
+        cursor.execute(CREATE_RETRY_QUEUE_INDEX)
+
+        # Create the 'xml_content_hashes' table for skipping unchanged documents
+        cursor.execute(CREATE_CONTENT_HASHES_TABLE)
+
+        # Create the 'xml_documents' catalog of generated documents
+        cursor.execute(CREATE_DOCUMENTS_TABLE)
+        for create_index in CREATE_DOCUMENTS_INDEXES:
+            cursor.execute(create_index)
+
         conn.commit()
         cursor.close()
         conn.close()
@@ -241,6 +278,54 @@ def update_database_schema():
     except Exception as e:
         log(f"Error updating database schema: {e}")
 
+def purge_expired_idempotency_keys():
+    """Delete expired idempotency keys to keep the table small."""
+    idempotency_keys = IdempotencyKeys(get_db_connection)
+    deleted = idempotency_keys.purge_expired()
+    idempotency_keys.close()
+    if deleted:
+        log(f"Purged {deleted} expired idempotency keys.")
+
+def drain_retry_queue():
+    """Retry queued XML generations that are due, in batches.
+
+    Draining stops when a batch brings no success, so that an unavailable converter
+    does not hold up the run.
+    """
+    create_xml = {"VID": createVidXml, "NOA": createNoaXml, "ATA": createArrivalXml}
+    retry_queue = RetryQueue(get_db_connection)
+    idempotency_keys = IdempotencyKeys(get_db_connection)
+    succeeded = failed = 0
+    try:
+        while True:
+            entries = retry_queue.due()
+            batch_succeeded = 0
+            for entry in entries:
+                event_value = split_idempotency_key(entry.idempotency_key)[2] if entry.idempotency_key else None
+                idempotency_key = idempotency_keys.claim(entry.port_call_id, entry.formality, event_value)
+                if not idempotency_key:
+                    # Generated meanwhile by another run
+                    retry_queue.remove(entry.id)
+                    continue
+
+                log(f"Retrying {entry.formality} generation for portCallId {entry.port_call_id} "
+                    f"(attempt {entry.attempts + 1}).")
+                if create_xml[entry.formality](entry.data, idempotency_key, retry_queue):
+                    batch_succeeded += 1
+                else:
+                    idempotency_keys.release(idempotency_key)
+                    failed += 1
+            succeeded += batch_succeeded
+            if len(entries) < retry_queue.batch_size or not batch_succeeded:
+                break
+    finally:
+        idempotency_keys.close()
+        retry_queue.close()
+
+    if succeeded or failed:
+        log(f"Retried XML generations: {succeeded} succeeded, {failed} failed "
+            f"({retry_queue.dead_lettered} moved to dead-letter).")
+
 def parse_arguments():
     """Parse command-line arguments and environment variables."""
     parser = argparse.ArgumentParser(description="Portman JSON Input Options")
@@ -410,8 +495,12 @@ def process_query(data, tracked_vessels=None):
     log(f"Processed {len(results)} records.")
     return results
 
-def createNoaXml(voyage_data):
-    """Generate and store Notice of Arrival (NOA) XML document."""
+def createNoaXml(voyage_data, idempotency_key=None, retry_queue=None):
+    """Generate and store Notice of Arrival (NOA) XML document.
+
+    If an idempotency key is given, it is completed in the transaction that stores the XML URL.
+    If a retry queue is given, a failed converter call is recorded in it for a later retry.
+    """
     try:
         # Validate mandatory fields and data types
         required_fields = ["portCallId", "imoLloyds", "vesselName", "eta", "portAreaName"]
@@ -450,41 +539,25 @@ def createNoaXml(voyage_data):
             else:
                 xml_converterfunction_url += f"?code={xml_converter_function_key}"
         
-        log(f"Calling xml-converter for NOA: {xml_converterfunction_url}")
+        log_event(logger, logging.INFO, "xml_converter.call", formality_type="NOA",
+                  port_call_id=voyage_data.get("portCallId"), url=XML_CONVERTER_CONFIG["function_url"])
+        log_event(logger, logging.DEBUG, "xml_converter.payload", formality_type="NOA", payload=LazyJSON(voyage_data))
 
         # Send the voyage data to the function for NOA generation
         response = requests.post(
             xml_converterfunction_url,
             json={"portcall_data": voyage_data, "formality_type": "NOA"},
-            headers={"Content-Type": "application/json"}
+            headers={"Content-Type": "application/json"},
+            timeout=XML_CONVERTER_CONFIG["timeout_seconds"]
         )
         
         if response.status_code == 200:
             response_data = response.json()
-            # Get SAS URL from the response (new format uses sasUrl instead of url)
-            sas_url = response_data.get('sasUrl')
-            
-            if not sas_url:
-                # Fallback to old response format if sasUrl is not found
-                plain_url = response_data.get('url')
-                if not plain_url:
-                    log(f"No URL found in XML converter response for portCallId {voyage_data.get('portCallId')}")
-                    return None
-                    
-                # Extract the blob name from the URL for SAS token generation
-                try:
-                    blob_path = plain_url.split('.net/')[1]  # Get container_name/blob_path
-                except (IndexError, AttributeError):
-                    log(f"Could not parse blob path from URL: {plain_url}")
-                    blob_path = plain_url  # Fallback to using the URL as is
-                
-                # Generate the SAS URL using the shared utility function
-                storage_connection_string = os.getenv("AzureWebJobsStorage")
-                sas_url = generate_blob_storage_link(blob_path, storage_connection_string)
-                
-                if not sas_url:
-                    log(f"Failed to generate SAS URL for blob: {blob_path}")
-                    sas_url = plain_url  # Fallback to plain URL if SAS generation fails
+            # Only the blob path is stored; download links are signed on request by emswe-xml-link
+            xml_path = blob_path_from_response(response_data)
+            if not xml_path:
+                log(f"No blob path found in XML converter response for portCallId {voyage_data.get('portCallId')}")
+                return None
             
             log(f"NOA XML for portCallId {voyage_data.get('portCallId')} successfully generated and stored.")
             
@@ -497,34 +570,48 @@ def createNoaXml(voyage_data):
                 
                 cursor = conn.cursor()
                 
-                # Update the record with the NOA XML URL (use SAS URL if available)
+                # Update the record with the NOA XML blob path
                 cursor.execute(
                     "UPDATE voyages SET noa_xml_url = %s WHERE portCallId = %s",
-                    (sas_url, original_port_call_id)
+                    (xml_path, original_port_call_id)
                 )
                 
                 affected = cursor.rowcount
                 if affected > 0:
-                    log(f"NOA XML URL (with SAS token) stored in voyages table for portCallId {original_port_call_id}")
+                    log(f"NOA XML blob path stored in voyages table for portCallId {original_port_call_id}")
                 else:
                     log(f"No rows updated for portCallId {original_port_call_id}")
                 
+                if idempotency_key:
+                    complete_idempotency_key(cursor, idempotency_key, xml_path)
+                clear_retry_entry(cursor, original_port_call_id, "NOA")
+                
                 conn.commit()
                 cursor.close()
                 conn.close()
-                return sas_url
+                return xml_path
             except Exception as e:
                 log(f"Error storing NOA XML URL in voyages table: {str(e)}")
         else:
             log(f"Error with NOA XML generation/storage for portCallId {voyage_data.get('portCallId')}: Status {response.status_code}")
+            if retry_queue is not None:
+                retry_queue.record_failure(voyage_data.get('portCallId'), "NOA", voyage_data, idempotency_key,
+                                           f"HTTP {response.status_code}",
+                                           retryable=is_retryable_status(response.status_code))
             
     except Exception as e:
         log(f"Error triggering NOA XML function for portCallId {voyage_data.get('portCallId', 'unknown')}: {str(e)}")
+        if retry_queue is not None:
+            retry_queue.record_failure(voyage_data.get('portCallId'), "NOA", voyage_data, idempotency_key, str(e))
     
     return None
 
-def createArrivalXml(arrival_data):
-    """Generate and store Actual Time of Arrival (ATA) XML document."""
+def createArrivalXml(arrival_data, idempotency_key=None, retry_queue=None):
+    """Generate and store Actual Time of Arrival (ATA) XML document.
+
+    If an idempotency key is given, it is completed in the transaction that stores the XML URL.
+    If a retry queue is given, a failed converter call is recorded in it for a later retry.
+    """
     try:
         # Validate mandatory fields and data types
         required_fields = ["portCallId", "imoLloyds", "vesselName", "ata", "portAreaName"]
@@ -560,41 +647,25 @@ def createArrivalXml(arrival_data):
             else:
                 xml_converterfunction_url += f"?code={xml_converter_function_key}"
         
-        log(f"Calling xml-converter: {xml_converterfunction_url}")
+        log_event(logger, logging.INFO, "xml_converter.call", formality_type="ATA",
+                  port_call_id=arrival_data.get("portCallId"), url=XML_CONVERTER_CONFIG["function_url"])
+        log_event(logger, logging.DEBUG, "xml_converter.payload", formality_type="ATA", payload=LazyJSON(arrival_data))
 
         # Send the arrival data to the function
         response = requests.post(
             xml_converterfunction_url,
             json={"portcall_data": arrival_data, "formality_type": "ATA"},
-            headers={"Content-Type": "application/json"}
+            headers={"Content-Type": "application/json"},
+            timeout=XML_CONVERTER_CONFIG["timeout_seconds"]
         )
         
         if response.status_code == 200:
             response_data = response.json()
-            # Get SAS URL from the response (new format uses sasUrl instead of url)
-            sas_url = response_data.get('sasUrl')
-            
-            if not sas_url:
-                # Fallback to old response format if sasUrl is not found
-                plain_url = response_data.get('url')
-                if not plain_url:
-                    log(f"No URL found in XML converter response for portCallId {arrival_data.get('portCallId')}")
-                    return None
-                    
-                # Extract the blob name from the URL for SAS token generation
-                try:
-                    blob_path = plain_url.split('.net/')[1]  # Get container_name/blob_path
-                except (IndexError, AttributeError):
-                    log(f"Could not parse blob path from URL: {plain_url}")
-                    blob_path = plain_url  # Fallback to using the URL as is
-                
-                # Generate the SAS URL using the shared utility function
-                storage_connection_string = os.getenv("AzureWebJobsStorage")
-                sas_url = generate_blob_storage_link(blob_path, storage_connection_string)
-                
-                if not sas_url:
-                    log(f"Failed to generate SAS URL for blob: {blob_path}")
-                    sas_url = plain_url  # Fallback to plain URL if SAS generation fails
+            # Only the blob path is stored; download links are signed on request by emswe-xml-link
+            xml_path = blob_path_from_response(response_data)
+            if not xml_path:
+                log(f"No blob path found in XML converter response for portCallId {arrival_data.get('portCallId')}")
+                return None
             
             log(f"ATA XML for portCallId {arrival_data.get('portCallId')} successfully generated and stored.")
             
@@ -611,40 +682,54 @@ def createArrivalXml(arrival_data):
                     )
                     
                     result = cursor.fetchone()
+                    if idempotency_key:
+                        complete_idempotency_key(cursor, idempotency_key, xml_path)
+                    clear_retry_entry(cursor, arrival_data.get('portCallId'), "ATA")
                     if result:
                         arrival_id = result[0]
-                        # Then update that specific record with the SAS URL
+                        # Then update that specific record with the blob path
                         cursor.execute(
                             "UPDATE arrivals SET ata_xml_url = %s WHERE id = %s",
-                            (sas_url, arrival_id)
+                            (xml_path, arrival_id)
                         )
                         
                         # Also update the voyages table with the ATA XML URL
                         cursor.execute(
                             "UPDATE voyages SET ata_xml_url = %s WHERE portCallId = %s",
-                            (sas_url, arrival_data.get('portCallId'))
+                            (xml_path, arrival_data.get('portCallId'))
                         )
                         
                         conn.commit()
-                        log(f"XML URL (with SAS token) stored in arrivals and voyages tables for portCallId {arrival_data.get('portCallId')}")
+                        log(f"ATA XML blob path stored in arrivals and voyages tables for portCallId {arrival_data.get('portCallId')}")
                     else:
                         log(f"No arrival record found for portCallId {arrival_data.get('portCallId')}")
+                        conn.commit()
                     
                     cursor.close()
                     conn.close()
-                    return sas_url  # Return the XML URL on success
+                    return xml_path  # Return the blob path on success
             except Exception as e:
                 log(f"Error storing XML URL in arrivals table: {str(e)}")
         else:
             log(f"Error with XML generation/storage for portCallId {arrival_data.get('portCallId')}: Status {response.status_code}")
+            if retry_queue is not None:
+                retry_queue.record_failure(arrival_data.get('portCallId'), "ATA", arrival_data, idempotency_key,
+                                           f"HTTP {response.status_code}",
+                                           retryable=is_retryable_status(response.status_code))
             
     except Exception as e:
         log(f"Error triggering XML function for portCallId {arrival_data.get('portCallId', 'unknown')}: {str(e)}")
+        if retry_queue is not None:
+            retry_queue.record_failure(arrival_data.get('portCallId'), "ATA", arrival_data, idempotency_key, str(e))
     
     return None  # Return None if unsuccessful
 
-def createVidXml(voyage_data):
-    """Generate and store Vessel Information Data (VID) XML document."""
+def createVidXml(voyage_data, idempotency_key=None, retry_queue=None):
+    """Generate and store Vessel Information Data (VID) XML document.
+
+    If an idempotency key is given, it is completed in the transaction that stores the XML URL.
+    If a retry queue is given, a failed converter call is recorded in it for a later retry.
+    """
     try:
         # Validate mandatory fields and data types
         required_fields = ["portCallId", "imoLloyds", "vesselName", "eta", "portAreaName"]
@@ -683,41 +768,25 @@ def createVidXml(voyage_data):
             else:
                 xml_converterfunction_url += f"?code={xml_converter_function_key}"
         
-        log(f"Calling xml-converter for VID: {xml_converterfunction_url}")
+        log_event(logger, logging.INFO, "xml_converter.call", formality_type="VID",
+                  port_call_id=voyage_data.get("portCallId"), url=XML_CONVERTER_CONFIG["function_url"])
+        log_event(logger, logging.DEBUG, "xml_converter.payload", formality_type="VID", payload=LazyJSON(voyage_data))
 
         # Send the voyage data to the function for VID generation
         response = requests.post(
             xml_converterfunction_url,
             json={"portcall_data": voyage_data, "formality_type": "VID"},
-            headers={"Content-Type": "application/json"}
+            headers={"Content-Type": "application/json"},
+            timeout=XML_CONVERTER_CONFIG["timeout_seconds"]
         )
         
         if response.status_code == 200:
             response_data = response.json()
-            # Get SAS URL from the response (new format uses sasUrl instead of url)
-            sas_url = response_data.get('sasUrl')
-            
-            if not sas_url:
-                # Fallback to old response format if sasUrl is not found
-                plain_url = response_data.get('url')
-                if not plain_url:
-                    log(f"No URL found in XML converter response for portCallId {voyage_data.get('portCallId')}")
-                    return None
-                    
-                # Extract the blob name from the URL for SAS token generation
-                try:
-                    blob_path = plain_url.split('.net/')[1]  # Get container_name/blob_path
-                except (IndexError, AttributeError):
-                    log(f"Could not parse blob path from URL: {plain_url}")
-                    blob_path = plain_url  # Fallback to using the URL as is
-                
-                # Generate the SAS URL using the shared utility function
-                storage_connection_string = os.getenv("AzureWebJobsStorage")
-                sas_url = generate_blob_storage_link(blob_path, storage_connection_string)
-                
-                if not sas_url:
-                    log(f"Failed to generate SAS URL for blob: {blob_path}")
-                    sas_url = plain_url  # Fallback to plain URL if SAS generation fails
+            # Only the blob path is stored; download links are signed on request by emswe-xml-link
+            xml_path = blob_path_from_response(response_data)
+            if not xml_path:
+                log(f"No blob path found in XML converter response for portCallId {voyage_data.get('portCallId')}")
+                return None
             
             log(f"VID XML for portCallId {voyage_data.get('portCallId')} successfully generated and stored.")
             
@@ -730,29 +799,39 @@ def createVidXml(voyage_data):
                 
                 cursor = conn.cursor()
                 
-                # Update the record with the VID XML URL (use SAS URL if available)
+                # Update the record with the VID XML blob path
                 cursor.execute(
                     "UPDATE voyages SET vid_xml_url = %s WHERE portCallId = %s",
-                    (sas_url, original_port_call_id)
+                    (xml_path, original_port_call_id)
                 )
                 
                 affected = cursor.rowcount
                 if affected > 0:
-                    log(f"VID XML URL (with SAS token) stored in voyages table for portCallId {original_port_call_id}")
+                    log(f"VID XML blob path stored in voyages table for portCallId {original_port_call_id}")
                 else:
                     log(f"No rows updated for portCallId {original_port_call_id}")
                 
+                if idempotency_key:
+                    complete_idempotency_key(cursor, idempotency_key, xml_path)
+                clear_retry_entry(cursor, original_port_call_id, "VID")
+                
                 conn.commit()
                 cursor.close()
                 conn.close()
-                return sas_url
+                return xml_path
             except Exception as e:
                 log(f"Error storing VID XML URL in voyages table: {str(e)}")
         else:
             log(f"Error with VID XML generation/storage for portCallId {voyage_data.get('portCallId')}: Status {response.status_code}")
+            if retry_queue is not None:
+                retry_queue.record_failure(voyage_data.get('portCallId'), "VID", voyage_data, idempotency_key,
+                                           f"HTTP {response.status_code}",
+                                           retryable=is_retryable_status(response.status_code))
             
     except Exception as e:
         log(f"Error triggering VID XML function for portCallId {voyage_data.get('portCallId', 'unknown')}: {str(e)}")
+        if retry_queue is not None:
+            retry_queue.record_failure(voyage_data.get('portCallId'), "VID", voyage_data, idempotency_key, str(e))
     
     return None
 
@@ -785,6 +864,22 @@ def diagnose_database_structure():
     except Exception as e:
         log(f"Error diagnosing database structure: {str(e)}")
 
+def generate_noa(noa_data, idempotency_keys, retry_queue=None):
+    """Generate a NOA unless the same ETA was already generated.
+
+    Returns "generated", "duplicate" or "failed".
+    """
+    port_call_id = noa_data["portCallId"]
+    idempotency_key = idempotency_keys.claim(port_call_id, "NOA", noa_data["eta"])
+    if not idempotency_key:
+        return "duplicate"
+
+    if createNoaXml(noa_data, idempotency_key, retry_queue):
+        return "generated"
+
+    idempotency_keys.release(idempotency_key)
+    return "failed"
+
 def save_results_to_db(results, conn=None):
     """Save processed results into the 'voyages' table and trigger arrivals only when `ata` is updated at the minute level."""
     try:
@@ -798,11 +893,32 @@ def save_results_to_db(results, conn=None):
 
         cursor = conn.cursor()
 
+        # Detect if using SQLite
+        is_sqlite = isinstance(conn, sqlite3.Connection)
+        placeholder = "?" if is_sqlite else "%s"
+
         new_arrival_count = 0   # Track the count of new arrivals
         new_eta_count = 0       # Track the count of new eta timestamps for NOA generation
         new_voyage_count = 0    # Track count of new voyages for VID generation
         updated_voyage_count = 0 # Track count of updated existing voyages
 
+        # Idempotency keys drop events already generated by an overlapping or earlier run.
+        # Their SQL is PostgreSQL-only, so they are off on SQLite.
+        idempotency_keys = IdempotencyKeys(get_db_connection, enabled=not is_sqlite)
+
+        # Failed converter calls are queued and retried at the start of later runs.
+        # The queue's SQL is PostgreSQL-only, so failures are not queued on SQLite.
+        retry_queue = RetryQueue(get_db_connection, enabled=not is_sqlite)
+        if is_sqlite:
+            log("SQLite connection: idempotency keys and the retry queue are PostgreSQL-only and disabled.")
+
+        # ETA changes are held until stable when a debounce window is configured.
+        # The pending_noas SQL is PostgreSQL-only, so NOAs are not debounced on SQLite.
+        noa_debouncer = NoaDebouncer(cursor)
+        if is_sqlite and noa_debouncer.enabled:
+            log("SQLite connection: NOA debouncing is PostgreSQL-only and disabled.")
+            noa_debouncer = NoaDebouncer(cursor, window_minutes=0)
+
         # Extract unique portCallIds from JSON data
         port_call_ids = list(set(entry["portCallId"] for entry in results))
 
@@ -811,10 +927,6 @@ def save_results_to_db(results, conn=None):
         old_eta_map = {}
         existing_port_calls = set()
         if port_call_ids:
-            # Detect if using SQLite
-            is_sqlite = isinstance(conn, sqlite3.Connection)
-            placeholder = "?" if is_sqlite else "%s"
-
             # Fetch old ATA, ETA values and port call IDs using proper placeholders
             port_call_ids = list(set(entry["portCallId"] for entry in results))
             query = f"""
@@ -829,22 +941,17 @@ def save_results_to_db(results, conn=None):
                 port_call_id, old_ata, old_eta = row
                 existing_port_calls.add(int(port_call_id))
                 if old_ata:  # Only store valid timestamps
-                    old_ata_map[int(port_call_id)] = old_ata.strftime("%Y-%m-%dT%H:%M:00.000Z")  # Normalize to minute level
+                    old_ata_map[int(port_call_id)] = to_minute_key(old_ata)  # Normalize to minute level
                 if old_eta:  # Store valid ETA timestamps
-                    old_eta_map[int(port_call_id)] = old_eta.strftime("%Y-%m-%dT%H:%M:00.000Z")  # Normalize to minute level
+                    old_eta_map[int(port_call_id)] = to_minute_key(old_eta)  # Normalize to minute level
 
         for entry in results:
             port_call_id = int(entry["portCallId"])  # Ensure it's stored as an integer
             imo_number = int(entry["imoLloyds"]) if entry["imoLloyds"] is not None else None  # Ensure it's always an integer
             mmsi = int(entry["mmsi"]) if entry.get("mmsi") is not None else None  # Get mmsi if available
             
-            new_ata = entry["ata"]
-            if new_ata:
-                new_ata = datetime.strptime(new_ata, "%Y-%m-%dT%H:%M:%S.%f%z").strftime("%Y-%m-%dT%H:%M:00.000Z")  # Normalize
-
-            new_eta = entry["eta"]
-            if new_eta:
-                new_eta = datetime.strptime(new_eta, "%Y-%m-%dT%H:%M:%S.%f%z").strftime("%Y-%m-%dT%H:%M:00.000Z")  # Normalize
+            new_ata = to_minute_key(entry["ata"])  # Normalize to minute level
+            new_eta = to_minute_key(entry["eta"])  # Normalize to minute level
 
             # Fetch old values from the maps (default to None)
             old_ata = old_ata_map.get(port_call_id, None)
@@ -880,29 +987,29 @@ def save_results_to_db(results, conn=None):
                 # For existing port calls, use UPDATE
                 update_query = f"""
                 UPDATE voyages SET
-                    imoLloyds = %s,
-                    mmsi = %s,
-                    vesselTypeCode = %s,
-                    vesselName = %s,
-                    prevPort = %s,
-                    portToVisit = %s,
-                    nextPort = %s,
-                    agentName = %s,
-                    shippingCompany = %s,
-                    eta = %s,
-                    ata = %s,
-                    portAreaCode = %s,
-                    portAreaName = %s,
-                    berthCode = %s,
-                    berthName = %s,
-                    etd = %s,
-                    atd = %s,
-                    passengersOnArrival = %s,
-                    passengersOnDeparture = %s,
-                    crewOnArrival = %s,
-                    crewOnDeparture = %s,
+                    imoLloyds = {placeholder},
+                    mmsi = {placeholder},
+                    vesselTypeCode = {placeholder},
+                    vesselName = {placeholder},
+                    prevPort = {placeholder},
+                    portToVisit = {placeholder},
+                    nextPort = {placeholder},
+                    agentName = {placeholder},
+                    shippingCompany = {placeholder},
+                    eta = {placeholder},
+                    ata = {placeholder},
+                    portAreaCode = {placeholder},
+                    portAreaName = {placeholder},
+                    berthCode = {placeholder},
+                    berthName = {placeholder},
+                    etd = {placeholder},
+                    atd = {placeholder},
+                    passengersOnArrival = {placeholder},
+                    passengersOnDeparture = {placeholder},
+                    crewOnArrival = {placeholder},
+                    crewOnDeparture = {placeholder},
                     modified = CURRENT_TIMESTAMP
-                WHERE portCallId = %s
+                WHERE portCallId = {placeholder}
                 """
                 
                 cursor.execute(update_query, (
@@ -945,16 +1052,15 @@ def save_results_to_db(results, conn=None):
                 }
                 
                 # Generate and store the VID XML
-                createVidXml(vid_data)
+                idempotency_key = idempotency_keys.claim(port_call_id, "VID")
+                if idempotency_key and not createVidXml(vid_data, idempotency_key, retry_queue):
+                    idempotency_keys.release(idempotency_key)
 
             # Generate NOA XML when ETA changes are detected
             if old_eta is not None and old_eta != new_eta and new_eta is not None:
-                log(f"ETA change detected for portCallId {port_call_id}. Generating NOA-XML.")
+                log(f"ETA change detected for portCallId {port_call_id}.")
                 log(f"Old ETA: {old_eta}, New ETA: {new_eta}")
                 
-                # Commit to ensure all changes are saved
-                conn.commit()
-                
                 # Prepare data for NOA XML generation
                 noa_data = {
                     "portCallId": port_call_id,
@@ -975,14 +1081,23 @@ def save_results_to_db(results, conn=None):
                     "shippingCompany": entry.get("shippingCompany") or ""
                 }
                 
-                # Generate and store the NOA XML
-                noa_url = createNoaXml(noa_data)
-                if noa_url:
-                    new_eta_count += 1
-                    log(f"NOA XML generated for portCallId {port_call_id} due to ETA change")
+                # Hold the change until the ETA is stable, unless debouncing is off or the arrival is imminent
+                if not noa_debouncer.hold(port_call_id, new_eta, noa_data):
+                    log(f"Generating NOA-XML for portCallId {port_call_id}.")
+                    
+                    # Commit to ensure all changes are saved
+                    conn.commit()
+                    
+                    # Generate and store the NOA XML
+                    if generate_noa(noa_data, idempotency_keys, retry_queue) == "generated":
+                        new_eta_count += 1
+                        log(f"NOA XML generated for portCallId {port_call_id} due to ETA change")
 
             # Generate ATA XML for arrivals with updated ATA
             if old_ata != new_ata and new_ata is not None:
+                # The vessel has arrived, a held ETA change is no longer relevant
+                noa_debouncer.discard(port_call_id)
+
                 insert_arrival_query = f"""
                 INSERT INTO arrivals (portCallId, eta, old_ata, ata, vesselName, portAreaName, berthName, created)
                 VALUES ({','.join([placeholder] * 7)}, CURRENT_TIMESTAMP);
@@ -1006,13 +1121,13 @@ def save_results_to_db(results, conn=None):
                     f"Satama: {entry['portAreaName']}\n"
                     f"Laituri: {entry['berthName']}\n\n"
                     f"Saapuminen\n"
-                    f"Arvioitu saapumisaika (UTC): {datetime.strptime(entry['eta'], '%Y-%m-%dT%H:%M:%S.%f%z').strftime('%Y-%m-%d %H:%M') if entry.get('eta') else 'N/A'}\n"
-                    f"Toteutunut saapumisaika (UTC): {datetime.strptime(new_ata, '%Y-%m-%dT%H:%M:%S.%f%z').strftime('%Y-%m-%d %H:%M') if new_ata else 'N/A'}\n"
+                    f"Arvioitu saapumisaika (UTC): {to_display(entry.get('eta'))}\n"
+                    f"Toteutunut saapumisaika (UTC): {to_display(new_ata)}\n"
                     f"Miehistön lukumäärä: {entry['crewOnArrival']}\n"
                     f"Matkustajien lukumäärä: {entry['passengersOnArrival']}\n\n"
                     f"Lähtö\n"
-                    f"Arvioitu lähtöaika (UTC): {datetime.strptime(entry['etd'], '%Y-%m-%dT%H:%M:%S.%f%z').strftime('%Y-%m-%d %H:%M') if entry.get('etd') else 'N/A'}\n"
-                    f"Toteutunut lähtöaika (UTC): {datetime.strptime(entry['atd'], '%Y-%m-%dT%H:%M:%S.%f%z').strftime('%Y-%m-%d %H:%M') if entry.get('atd') else 'N/A'}\n"
+                    f"Arvioitu lähtöaika (UTC): {to_display(entry.get('etd'))}\n"
+                    f"Toteutunut lähtöaika (UTC): {to_display(entry.get('atd'))}\n"
                     f"Miehistön lukumäärä: {entry['crewOnDeparture']}\n"
                     f"Matkustajien lukumäärä: {entry['passengersOnDeparture']}\n"
                 )
@@ -1037,15 +1152,33 @@ def save_results_to_db(results, conn=None):
                     "shippingCompany": entry.get("shippingCompany") or ""
                 }
                 
-                createArrivalXml(ata_data)
+                idempotency_key = idempotency_keys.claim(port_call_id, "ATA", new_ata)
+                if idempotency_key and not createArrivalXml(ata_data, idempotency_key, retry_queue):
+                    idempotency_keys.release(idempotency_key)
+
+        # Generate NOAs for held ETA changes that have been stable for the debounce window.
+        # A failed generation is left to the retry queue.
+        for port_call_id, noa_data in noa_debouncer.due():
+            conn.commit()
+            status = generate_noa(noa_data, idempotency_keys, retry_queue)
+            noa_debouncer.done(port_call_id)
+            if status == "generated":
+                new_eta_count += 1
+                log(f"NOA XML generated for portCallId {port_call_id} after the ETA was stable")
 
         # Final commit at the end of processing all records
         conn.commit()
         cursor.close()
+        idempotency_keys.close()
+        retry_queue.close()
         if not connection_managed_elsewhere:
             conn.close()
         log(f"{len(results)} records saved/updated in the database.")
-        log(f"Total new voyages: {new_voyage_count}, updated voyages: {updated_voyage_count}, new arrivals: {new_arrival_count}, eta updated: {new_eta_count}")
+        log(f"Total new voyages: {new_voyage_count}, updated voyages: {updated_voyage_count}, new arrivals: {new_arrival_count}, eta updated: {new_eta_count}, duplicate events skipped: {idempotency_keys.duplicates}")
+        if retry_queue.queued or retry_queue.dead_lettered:
+            log(f"XML generations queued for retry: {retry_queue.queued}, moved to dead-letter: {retry_queue.dead_lettered}")
+        if noa_debouncer.enabled:
+            log(f"ETA changes held: {noa_debouncer.held}, NOAs suppressed by debouncing: {noa_debouncer.suppressed}")
 
     except Exception as e:
         log(f"Error saving results to the database: {e}")
@@ -1055,6 +1188,8 @@ def main(req=None):
     log("Program started.")
     create_database_and_tables()
     update_database_schema()
+    purge_expired_idempotency_keys()
+    drain_retry_queue()
     
     # Parse CLI arguments and environment variables
     args = {}
@@ -0,0 +1,342 @@
+"""
+Durable retry queue for failed XML generations.
+
+When the XML converter cannot be reached or answers with a retryable status
+(timeout, throttling, server error), the generation event is stored in the
+`xml_retry_queue` table and retried at the start of later runs with
+exponential backoff and jitter. An event that keeps failing, or fails with a
+non-retryable status, is moved to the dead-letter state, where it stays until
+it is requeued with the inspection command:
+
+    python -m PortmanTrigger.retry_queue list [--status dead]
+    python -m PortmanTrigger.retry_queue requeue [--id ID]
+
+The statements are PostgreSQL-only (SERIAL, INSERT ... ON CONFLICT ...
+RETURNING, IS NOT DISTINCT FROM and INTERVAL arithmetic). save_results_to_db
+disables the queue when it runs on a SQLite connection.
+"""
+
+import argparse
+import json
+import logging
+import random
+from collections import namedtuple
+
+from config import DATABASE_CONFIG, RETRY_QUEUE_CONFIG
+
+logger = logging.getLogger('PortmanTrigger')
+
+CREATE_RETRY_QUEUE_TABLE = """
+CREATE TABLE IF NOT EXISTS xml_retry_queue (
+    id SERIAL PRIMARY KEY,
+    portCallId INTEGER NOT NULL,
+    formality TEXT NOT NULL,
+    idempotency_key TEXT DEFAULT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT DEFAULT NULL,
+    next_attempt TIMESTAMP NOT NULL,
+    created TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (portCallId, formality)
+);
+"""
+
+CREATE_RETRY_QUEUE_INDEX = """
+CREATE INDEX IF NOT EXISTS xml_retry_queue_next_attempt_idx ON xml_retry_queue (status, next_attempt);
+"""
+
+RetryEntry = namedtuple("RetryEntry", ["id", "port_call_id", "formality", "idempotency_key", "data", "attempts"])
+
+
+def is_retryable_status(status_code):
+    """Whether an XML converter response status is worth retrying."""
+    return status_code in (408, 429) or status_code >= 500
+
+
+def backoff_delay(attempts, base_seconds=None, max_seconds=None, random_func=random.random):
+    """
+    Delay before the next attempt: exponential backoff with jitter.
+
+    The delay doubles with every attempt up to `max_seconds`; the second half
+    of it is randomized so that events failing together are not retried together.
+
+    Args:
+        attempts: Number of failed attempts so far (1 after the first failure)
+        base_seconds: Delay after the first failure
+        max_seconds: Upper bound of the delay
+        random_func: Function returning a float in [0, 1)
+
+    Returns:
+        Delay in seconds
+    """
+    base_seconds = RETRY_QUEUE_CONFIG["base_delay_seconds"] if base_seconds is None else base_seconds
+    max_seconds = RETRY_QUEUE_CONFIG["max_delay_seconds"] if max_seconds is None else max_seconds
+    delay = min(max_seconds, base_seconds * 2 ** max(attempts - 1, 0))
+    return delay / 2 + random_func() * delay / 2
+
+
+def clear_retry_entry(cursor, port_call_id, formality_type):
+    """
+    Remove the queued retry of a formality once it has been generated. Execute this
+    in the transaction that stores the XML URL, so an older queued event cannot
+    overwrite a newer document.
+
+    Args:
+        cursor: Cursor of the transaction storing the result
+        port_call_id: Port call ID
+        formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+    """
+    cursor.execute(
+        "DELETE FROM xml_retry_queue WHERE portCallId = %s AND formality = %s",
+        (int(port_call_id), formality_type)
+    )
+
+
+class RetryQueue:
+    """
+    Records failed generations and hands out the ones due for a retry.
+
+    Like the idempotency keys, the queue uses a dedicated autocommit connection,
+    so a recorded failure survives a rollback of the run's transaction.
+    """
+
+    def __init__(self, get_connection, max_attempts=None, batch_size=None, enabled=True):
+        """
+        Args:
+            get_connection: Callable returning a new connection to the Portman (PostgreSQL) database, or None
+            max_attempts: Attempts before an event is dead-lettered
+            batch_size: Events returned by due() at a time
+            enabled: False to never touch the database, e.g. on SQLite; failures are then not recorded
+        """
+        self._get_connection = get_connection
+        self._conn = None
+        self.enabled = enabled
+        self.max_attempts = RETRY_QUEUE_CONFIG["max_attempts"] if max_attempts is None else max_attempts
+        self.batch_size = RETRY_QUEUE_CONFIG["batch_size"] if batch_size is None else batch_size
+
+        self.queued = 0        # Failures scheduled for a retry in this run
+        self.dead_lettered = 0 # Failures moved to the dead-letter state in this run
+
+    def _cursor(self):
+        if not self.enabled:
+            return None
+        if self._conn is None:
+            conn = self._get_connection(DATABASE_CONFIG["dbname"])
+            if conn is None:
+                return None
+            conn.autocommit = True
+            self._conn = conn
+        return self._conn.cursor()
+
+    def record_failure(self, port_call_id, formality_type, data, idempotency_key=None, error="", retryable=True):
+        """
+        Record a failed generation. A failure of the same event increases its attempt
+        count; a failure of a newer event of the formality replaces the queued one.
+
+        Args:
+            port_call_id: Port call ID
+            formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+            data: Data sent to the XML converter
+            idempotency_key: Idempotency key of the event
+            error: Description of the failure
+            retryable: False to dead-letter the event immediately
+        """
+        try:
+            cursor = self._cursor()
+            if cursor is None:
+                return
+            cursor.execute(
+                """
+                INSERT INTO xml_retry_queue
+                    (portCallId, formality, idempotency_key, payload, status, attempts, last_error,
+                     next_attempt, created, modified)
+                VALUES (%s, %s, %s, %s, 'pending', 1, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                ON CONFLICT (portCallId, formality) DO UPDATE SET
+                    attempts = CASE
+                        WHEN xml_retry_queue.idempotency_key IS NOT DISTINCT FROM EXCLUDED.idempotency_key
+                        THEN xml_retry_queue.attempts + 1 ELSE 1 END,
+                    idempotency_key = EXCLUDED.idempotency_key,
+                    payload = EXCLUDED.payload,
+                    last_error = EXCLUDED.last_error,
+                    modified = CURRENT_TIMESTAMP
+                RETURNING id, attempts
+                """,
+                (int(port_call_id), formality_type, idempotency_key, json.dumps(data, default=str), str(error))
+            )
+            entry_id, attempts = cursor.fetchone()
+
+            if not retryable or attempts >= self.max_attempts:
+                cursor.execute(
+                    "UPDATE xml_retry_queue SET status = 'dead' WHERE id = %s",
+                    (entry_id,)
+                )
+                self.dead_lettered += 1
+                logger.info(f"{formality_type} generation for portCallId {port_call_id} moved to dead-letter "
+                            f"after {attempts} attempt(s): {error}")
+            else:
+                delay = backoff_delay(attempts)
+                cursor.execute(
+                    """
+                    UPDATE xml_retry_queue
+                    SET status = 'pending', next_attempt = CURRENT_TIMESTAMP + %s * INTERVAL '1 second'
+                    WHERE id = %s
+                    """,
+                    (delay, entry_id)
+                )
+                self.queued += 1
+                logger.info(f"{formality_type} generation for portCallId {port_call_id} queued for retry "
+                            f"in {delay:.0f}s (attempt {attempts}/{self.max_attempts}): {error}")
+            cursor.close()
+        except Exception as e:
+            logger.info(f"Failed to queue {formality_type} retry for portCallId {port_call_id}: {e}")
+            self.close()
+
+    def due(self, limit=None):
+        """
+        Get pending events whose next attempt is due, oldest first.
+
+        Args:
+            limit: Maximum number of events (default: the batch size)
+
+        Returns:
+            List of RetryEntry tuples
+        """
+        limit = self.batch_size if limit is None else limit
+        try:
+            cursor = self._cursor()
+            if cursor is None:
+                return []
+            cursor.execute(
+                """
+                SELECT id, portCallId, formality, idempotency_key, payload, attempts
+                FROM xml_retry_queue
+                WHERE status = 'pending' AND next_attempt <= CURRENT_TIMESTAMP
+                ORDER BY next_attempt
+                LIMIT %s
+                """,
+                (limit,)
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+        except Exception as e:
+            logger.info(f"Retry queue unavailable: {e}")
+            self.close()
+            return []
+        return [RetryEntry(entry_id, port_call_id, formality, idempotency_key, json.loads(payload), attempts)
+                for entry_id, port_call_id, formality, idempotency_key, payload, attempts in rows]
+
+    def remove(self, entry_id):
+        """
+        Remove an event from the queue.
+
+        Args:
+            entry_id: ID of the queued event
+        """
+        try:
+            cursor = self._cursor()
+            if cursor is None:
+                return
+            cursor.execute("DELETE FROM xml_retry_queue WHERE id = %s", (entry_id,))
+            cursor.close()
+        except Exception as e:
+            logger.info(f"Failed to remove retry queue entry {entry_id}: {e}")
+            self.close()
+
+    def entries(self, status=None):
+        """
+        List queued events for inspection.
+
+        Args:
+            status: Only list events in this state ("pending" or "dead")
+
+        Returns:
+            List of (id, portCallId, formality, status, attempts, next_attempt, last_error) tuples
+        """
+        cursor = self._cursor()
+        if cursor is None:
+            return []
+        query = ("SELECT id, portCallId, formality, status, attempts, next_attempt, last_error "
+                 "FROM xml_retry_queue")
+        params = ()
+        if status:
+            query += " WHERE status = %s"
+            params = (status,)
+        cursor.execute(query + " ORDER BY status, next_attempt", params)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+
+    def requeue(self, entry_id=None):
+        """
+        Move dead-lettered events back to the queue with a fresh attempt count.
+
+        Args:
+            entry_id: ID of the event to requeue, or None for all dead-lettered events
+
+        Returns:
+            Number of requeued events
+        """
+        cursor = self._cursor()
+        if cursor is None:
+            return 0
+        query = ("UPDATE xml_retry_queue SET status = 'pending', attempts = 0, "
+                 "next_attempt = CURRENT_TIMESTAMP, modified = CURRENT_TIMESTAMP WHERE status = 'dead'")
+        params = ()
+        if entry_id is not None:
+            query += " AND id = %s"
+            params = (entry_id,)
+        cursor.execute(query, params)
+        requeued = cursor.rowcount
+        cursor.close()
+        return max(requeued, 0)
+
+    def close(self):
+        """Close the connection."""
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+
+def main(argv=None):
+    """Inspect the retry queue or requeue dead-lettered events."""
+    parser = argparse.ArgumentParser(description="Inspect the XML generation retry queue")
+    subparsers = parser.add_subparsers(dest="command", help="Command to execute")
+
+    list_parser = subparsers.add_parser("list", help="List queued and dead-lettered events")
+    list_parser.add_argument("--status", choices=["pending", "dead"], help="Only list events in this state")
+
+    requeue_parser = subparsers.add_parser("requeue", help="Requeue dead-lettered events")
+    requeue_parser.add_argument("--id", type=int, help="ID of the event to requeue (default: all)")
+
+    args = parser.parse_args(argv)
+    if not args.command:
+        parser.print_help()
+        return 1
+
+    try:
+        from PortmanTrigger.portman import get_db_connection
+    except ImportError:
+        from portman import get_db_connection
+
+    retry_queue = RetryQueue(get_db_connection)
+    try:
+        if args.command == "list":
+            rows = retry_queue.entries(args.status)
+            for entry_id, port_call_id, formality, status, attempts, next_attempt, last_error in rows:
+                print(f"{entry_id:>6}  {port_call_id:>10}  {formality:<4}  {status:<7}  "
+                      f"attempts={attempts}  next={next_attempt}  error={last_error}")
+            print(f"{len(rows)} event(s)")
+        elif args.command == "requeue":
+            print(f"Requeued {retry_queue.requeue(args.id)} event(s)")
+    finally:
+        retry_queue.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,156 @@
+import logging
+import json
+from datetime import datetime
+import azure.functions as func
+from config import DATABASE_CONFIG
+from PortmanTrigger.blob_utils import blob_path_from_url
+from PortmanTrigger.portman import get_db_connection
+from PortmanXMLConverter.xml_converter import get_document_storage, get_document_catalog
+
+# Column of the latest document per formality type
+XML_PATH_COLUMNS = {
+    "ATA": "ata_xml_url",
+    "NOA": "noa_xml_url",
+    "VID": "vid_xml_url",
+}
+
+# Most documents returned by one emswe-xml-documents request
+MAX_DOCUMENTS = 1000
+
+
+def _error(message, status_code):
+    return func.HttpResponse(
+        json.dumps({"status": "error", "message": message}),
+        mimetype="application/json",
+        status_code=status_code
+    )
+
+
+def get_document_path(port_call_id, formality_type):
+    """Get the blob path of the latest document of a port call from the voyages table."""
+    conn = get_db_connection(DATABASE_CONFIG["dbname"])
+    if conn is None:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT {XML_PATH_COLUMNS[formality_type]} FROM voyages WHERE portCallId = %s",
+            (int(port_call_id),)
+        )
+        row = cursor.fetchone()
+        cursor.close()
+    finally:
+        conn.close()
+    return blob_path_from_url(row[0]) if row else None
+
+
+def xml_link(req: func.HttpRequest) -> func.HttpResponse:
+    """HTTP trigger that signs a short-lived download link of a stored XML document.
+
+    The document is given either as `path` (the blob path stored in the `*_xml_url`
+    columns) or as `portCallId` and `formality` (ATA, NOA or VID) for the latest
+    document of a port call. The response redirects to the link, or returns it as
+    JSON with `redirect=false`.
+    """
+    logging.info('XML link function processing a request')
+
+    blob_path = req.params.get('path')
+    looked_up = not blob_path
+    if looked_up:
+        port_call_id = req.params.get('portCallId')
+        formality_type = (req.params.get('formality') or "").upper()
+        if not port_call_id or formality_type not in XML_PATH_COLUMNS:
+            return _error("Please provide path, or portCallId and formality (ATA, NOA or VID)", 400)
+        if not port_call_id.isdigit():
+            return _error(f"Invalid portCallId: {port_call_id}", 400)
+        try:
+            blob_path = get_document_path(port_call_id, formality_type)
+        except Exception as e:
+            logging.error(f"Error looking up {formality_type} XML of portCallId {port_call_id}: {str(e)}")
+            return _error("Document lookup failed", 500)
+        if not blob_path:
+            return _error(f"No {formality_type} XML found for portCallId {port_call_id}", 404)
+    else:
+        blob_path = blob_path_from_url(blob_path)
+
+    # Only documents of the XML container have links; older rows may hold local file paths
+    storage = get_document_storage()
+    name = storage.name_from_path(blob_path)
+    if name is None:
+        return _error(f"Not an XML document path: {blob_path}", 404 if looked_up else 400)
+
+    url, expiry = storage.url(name)
+    if not url:
+        return _error("Could not sign a download link", 503)
+
+    if req.params.get('redirect', 'true').lower() == 'false':
+        return func.HttpResponse(
+            json.dumps({"status": "success", "blobPath": blob_path, "url": url,
+                        "expires": expiry.isoformat() if expiry else None}),
+            mimetype="application/json",
+            headers={"Cache-Control": "no-store"},
+            status_code=200
+        )
+    return func.HttpResponse(status_code=302, headers={"Location": url, "Cache-Control": "no-store"})
+
+
+def _parse_time(value):
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        raise ValueError(f"Time without a time zone: {value}")
+    return parsed
+
+
+def xml_documents(req: func.HttpRequest) -> func.HttpResponse:
+    """HTTP trigger that lists generated XML documents from the `xml_documents` catalog.
+
+    Documents are filtered by any of `portCallId`, `formality`, `imo`, `port`,
+    `since` and `until` (ISO 8601 with a time zone) and returned newest first,
+    at most `limit` (default 100) of them.
+    """
+    logging.info('XML documents function processing a request')
+
+    params = req.params
+    formality_type = params.get('formality', '').upper() or None
+    if formality_type is not None and formality_type not in XML_PATH_COLUMNS:
+        return _error(f"Invalid formality: {params.get('formality')} (expected ATA, NOA or VID)", 400)
+    for name in ('portCallId', 'imo', 'limit'):
+        if params.get(name) and not params.get(name).isdigit():
+            return _error(f"Invalid {name}: {params.get(name)}", 400)
+    try:
+        since = _parse_time(params['since']) if params.get('since') else None
+        until = _parse_time(params['until']) if params.get('until') else None
+    except ValueError as e:
+        return _error(f"Invalid time: {str(e)}", 400)
+    if not any((params.get('portCallId'), params.get('imo'), params.get('port'), since)):
+        return _error("Please provide portCallId, imo, port or since", 400)
+
+    try:
+        entries = get_document_catalog().find(
+            port_call_id=params.get('portCallId') or None,
+            formality=formality_type,
+            imo=int(params['imo']) if params.get('imo') else None,
+            port=params.get('port') or None,
+            since=since,
+            until=until,
+            limit=min(int(params.get('limit') or 100), MAX_DOCUMENTS)
+        )
+    except Exception as e:
+        logging.error(f"Error querying the document catalog: {str(e)}")
+        return _error("Document lookup failed", 500)
+
+    documents = [{
+        "blobPath": entry.document_path,
+        "formality": entry.formality,
+        "portCallId": entry.port_call_id,
+        "imo": entry.imo,
+        "port": entry.port,
+        "contentHash": entry.content_hash,
+        "size": entry.size,
+        "created": entry.created.isoformat()
+    } for entry in entries]
+    return func.HttpResponse(
+        json.dumps({"status": "success", "documents": documents}),
+        mimetype="application/json",
+        status_code=200
+    )
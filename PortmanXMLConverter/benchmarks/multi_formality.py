@@ -0,0 +1,50 @@
+"""
+Benchmark comparing separate per-formality conversions of a port call with
+the single-pass multi-formality conversion of convert_port_call.
+
+Usage (from the repository root):
+    python -m PortmanXMLConverter.benchmarks.multi_formality --iterations 1000
+"""
+
+import argparse
+import logging
+import time
+
+from PortmanXMLConverter.src.converter import EMSWeConverter, convert_port_call
+from PortmanXMLConverter.src.digitraffic_adapter import adapt_digitraffic_to_portman
+from PortmanXMLConverter.benchmarks.template_builder import SAMPLE_PORT_CALL
+
+FORMALITY_TYPES = ["VID", "NOA", "ATA"]
+
+
+def run_benchmark(iterations: int) -> None:
+    """Convert a port call to VID, NOA and ATA both ways and print port calls/second."""
+    converters = {formality_type: EMSWeConverter(formality_type) for formality_type in FORMALITY_TYPES}
+
+    def separate():
+        for formality_type in FORMALITY_TYPES:
+            portman_data = adapt_digitraffic_to_portman(SAMPLE_PORT_CALL, formality_type)
+            converters[formality_type].convert_to_emswe(portman_data)
+
+    def single_pass():
+        convert_port_call(SAMPLE_PORT_CALL, FORMALITY_TYPES)
+
+    rates = []
+    for func in (separate, single_pass):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        rates.append(iterations / (time.perf_counter() - start))
+
+    print(f"{'Formalities':<16}{'separate':>14}{'single pass':>16}{'speedup':>10}")
+    print(f"{','.join(FORMALITY_TYPES):<16}{rates[0]:>12.0f}/s{rates[1]:>14.0f}/s{rates[1] / rates[0]:>9.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the multi-formality conversion of a port call")
+    parser.add_argument("--iterations", type=int, default=1000, help="Port calls per variant (default: 1000)")
+    args = parser.parse_args()
+
+    # Per-document INFO logging would dominate the measurement
+    logging.disable(logging.INFO)
+    run_benchmark(args.iterations)
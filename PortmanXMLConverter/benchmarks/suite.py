@@ -0,0 +1,380 @@
+"""
+Throughput benchmark suite for EMSWe XML generation.
+
+Each stage runs per formality type over a synthetic corpus of Digitraffic
+port calls and reports documents/second, p50/p99 latency and peak memory:
+
+    adapt       adapt_digitraffic_to_portman
+    transform   XMLTransformer.portman_to_emswe
+    validate    XMLValidator.validate of the transformed documents
+    convert     EMSWeConverter.convert_to_emswe of the adapted data
+    end_to_end  adapt_digitraffic_to_portman + EMSWeConverter.convert_to_emswe
+
+Every measurement runs in a fresh process, so its peak resident memory
+(`peak_rss_kb`, including the prepared inputs of the stage) is not inflated
+by the measurements before it;
+`peak_python_kb` is the tracemalloc peak of a separate pass and counts Python
+objects only (lxml trees live in libxml2). Results are written as JSON and can
+be compared with a stored baseline; the exit code is 1 when a stage regressed
+beyond the tolerance.
+
+Usage (from the repository root):
+    python -m PortmanXMLConverter.benchmarks.suite --count 2000 --output-file bench.json
+    python -m PortmanXMLConverter.benchmarks.suite --count 2000 --baseline bench.json
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from lxml import etree
+
+from PortmanXMLConverter.src.converter import EMSWeConverter
+from PortmanXMLConverter.src.digitraffic_adapter import adapt_digitraffic_to_portman
+from PortmanXMLConverter.src.transformer import XMLTransformer
+from PortmanXMLConverter.src.validator import XMLValidator
+
+FORMALITY_TYPES = ("ATA", "NOA", "VID")
+STAGES = ("adapt", "transform", "validate", "convert", "end_to_end")
+
+# Metrics compared with a baseline, and whether a higher value is better
+METRICS = {"docs_per_second": True, "p50_ms": False, "p99_ms": False, "peak_rss_kb": False}
+
+# Finnish ports with their port areas and berths
+_PORTS = {
+    "FIHEL": [("LSAT", "Länsisatama", ["LJ5", "LJ6", "LJ7"]), ("ESAT", "Eteläsatama", ["ERIK", "KATA"]),
+              ("VUOS", "Vuosaari", ["VUO1", "VUO2", "VUO3"])],
+    "FITKU": [("PASSE", "Matkustajasatama", ["v1", "v2", "s1"]), ("PANSI", "Pansio", ["PAN1"])],
+    "FIKOK": [("MUSA", "Mussalo", ["MU1", "MU2", "MU3", "MU4"]), ("HSAT", "Hietanen", ["HIE1"])],
+    "FIHKO": [("HKO", "Hanko", ["L1", "L2"])],
+    "FIRAU": [("PETA", "Petäjäs", ["P1", "P2"])],
+    "FIOUL": [("VIHR", "Vihreäsaari", ["V1"]), ("OSAT", "Oritkari", ["OR1", "OR2"])],
+    "FIMHQ": [("MHQ", "Maarianhamina", ["WEST", "EAST"])],
+    "FIVAA": [("VAA", "Vaskiluoto", ["VAS1", "VAS2"])],
+}
+_VESSEL_WORDS = ["Viking", "Baltic", "Finn", "Nordic", "Aurora", "Gracia", "Star", "Queen", "Spirit", "Wind",
+                 "Trader", "Carrier", "Express", "Polaris", "Sea", "Helsinki", "Tallink", "Eckerö", "Arctic"]
+_COMPANIES = ["Viking Line Abp", "Tallink Silja Oy", "Finnlines Oyj", "Eckerö Line Ab Oy", "ESL Shipping Oy",
+              "Godby Shipping AB", "Bore Oy Ab", "Meriaura Oy", "Langh Ship Oy Ab"]
+_AGENTS = ["Viking Line Abp / Helsinki", "Finnlines Oyj / Helsinki", "Oy Lars Krogius Ab", "Backman-Trummer Oy",
+           "GAC Finland Oy", "John Nurminen Oy", ""]
+
+
+def synthetic_port_calls(count: int, seed: int = 1) -> List[Dict[str, Any]]:
+    """
+    Generate a deterministic corpus of Digitraffic port calls.
+
+    The corpus mixes passenger and cargo vessels over Finnish ports, with
+    the optional fields a live feed leaves out: no IMO number, no passenger
+    or crew counts, no agent, unknown berths and ETA-only calls without an ATA.
+
+    Args:
+        count: Number of port calls
+        seed: Random seed; the same seed gives the same corpus
+
+    Returns:
+        List of port call dictionaries
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    fleet = []
+    for _ in range(max(1, count // 8)):
+        fleet.append({
+            "vesselName": f"{rng.choice(_VESSEL_WORDS)} {rng.choice(_VESSEL_WORDS)}",
+            "imoLloyds": rng.randint(9000000, 9899999) if rng.random() > 0.05 else 0,
+            "mmsi": rng.choice([230, 265, 276, 257, 219]) * 1000000 + rng.randint(0, 999999),
+            "radioCallSign": "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789") for _ in range(rng.randint(4, 7))),
+            "shippingCompany": rng.choice(_COMPANIES),
+            "passenger": rng.random() < 0.4,
+        })
+
+    port_calls = []
+    for index in range(count):
+        vessel = fleet[rng.randrange(len(fleet))]
+        port = rng.choice(sorted(_PORTS))
+        area_code, area_name, berths = rng.choice(_PORTS[port])
+        eta = start + timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+        etd = eta + timedelta(hours=rng.randint(2, 72))
+
+        port_call = {
+            "portCallId": 3000000 + index,
+            "imoLloyds": vessel["imoLloyds"],
+            "mmsi": vessel["mmsi"],
+            "vesselName": vessel["vesselName"],
+            "radioCallSign": vessel["radioCallSign"],
+            "portToVisit": port,
+            "portAreaCode": area_code,
+            "portAreaName": area_name,
+            "berthCode": rng.choice(berths) if rng.random() > 0.1 else "",
+            "berthName": rng.choice(berths).lower() if rng.random() > 0.1 else "unknown",
+            "eta": eta.strftime("%Y-%m-%dT%H:%M:%S.000+00:00"),
+            "etd": etd.strftime("%Y-%m-%dT%H:%M:%S.000+00:00"),
+            "agentName": rng.choice(_AGENTS),
+            "shippingCompany": vessel["shippingCompany"],
+        }
+        if rng.random() < 0.6:
+            port_call["ata"] = (eta + timedelta(minutes=rng.randint(-30, 90))).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        if vessel["passenger"]:
+            port_call["passengersOnArrival"] = rng.randint(0, 2800)
+        if rng.random() < 0.8:
+            port_call["crewOnArrival"] = rng.randint(5, 200)
+        port_calls.append(port_call)
+
+    return port_calls
+
+
+def _prepare(stage: str, formality_type: str, port_calls: List[Dict[str, Any]]) -> Tuple[Callable[[Any], Any], List[Any]]:
+    """
+    Build the function measured by a stage and its inputs, which are prepared outside the measurement.
+
+    Returns:
+        Tuple (function of one input, inputs)
+    """
+    if stage == "adapt":
+        return lambda port_call: adapt_digitraffic_to_portman(port_call, formality_type), port_calls
+
+    portman_data = [adapt_digitraffic_to_portman(port_call, formality_type) for port_call in port_calls]
+    if stage == "transform":
+        transformer = XMLTransformer()
+        return lambda data: transformer.portman_to_emswe(data, formality_type), portman_data
+    if stage == "validate":
+        transformer = XMLTransformer()
+        validator = XMLValidator(formality_type)
+        return validator.validate, [transformer.portman_to_emswe(data, formality_type) for data in portman_data]
+
+    converter = EMSWeConverter(formality_type)
+    if stage == "convert":
+        return converter.convert_to_emswe, portman_data
+    if stage == "end_to_end":
+        return (lambda port_call: converter.convert_to_emswe(adapt_digitraffic_to_portman(port_call, formality_type)),
+                port_calls)
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def _failed(stage: str, result: Any) -> bool:
+    if stage in ("validate", "convert", "end_to_end"):
+        return not result[0]
+    return result is None
+
+
+def _percentile(sorted_values: Sequence[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    index = max(0, min(len(sorted_values) - 1, int(round(percent / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def _peak_rss_kb() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # bytes on macOS, kilobytes elsewhere
+
+
+def measure_stage(stage: str, formality_type: str, count: int, seed: int = 1, warmup: int = 20) -> Dict[str, Any]:
+    """
+    Measure one stage for one formality type.
+
+    Args:
+        stage: One of STAGES
+        formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+        count: Corpus size (documents measured)
+        seed: Corpus seed
+        warmup: Calls made before the measurement, which compile schemas and templates
+
+    Returns:
+        Dictionary with documents, failures, seconds, docs_per_second, p50_ms,
+        p99_ms, peak_rss_kb and peak_python_kb
+    """
+    port_calls = synthetic_port_calls(count, seed)
+    func, inputs = _prepare(stage, formality_type, port_calls)
+    for item in inputs[:warmup]:
+        func(item)
+
+    latencies = []
+    failures = 0
+    perf_counter = time.perf_counter
+    start = perf_counter()
+    for item in inputs:
+        call_start = perf_counter()
+        result = func(item)
+        latencies.append(perf_counter() - call_start)
+        if _failed(stage, result):
+            failures += 1
+    seconds = perf_counter() - start
+    peak_rss_kb = _peak_rss_kb()
+
+    tracemalloc.start()
+    for item in inputs:
+        func(item)
+    peak_python_kb = tracemalloc.get_traced_memory()[1] // 1024
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "documents": len(inputs),
+        "failures": failures,
+        "seconds": round(seconds, 6),
+        "docs_per_second": round(len(inputs) / seconds, 1) if seconds else None,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 4),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 4),
+        "peak_rss_kb": peak_rss_kb,
+        "peak_python_kb": peak_python_kb,
+    }
+
+
+def _measure_isolated(args: Tuple[str, str, int, int]) -> Dict[str, Any]:
+    # Per-document INFO logging would dominate the measurement
+    logging.disable(logging.INFO)
+    return measure_stage(*args)
+
+
+def run_suite(formality_types: Sequence[str] = FORMALITY_TYPES, stages: Sequence[str] = STAGES, count: int = 1000,
+              seed: int = 1, isolate: bool = True) -> Dict[str, Any]:
+    """
+    Run the benchmark suite.
+
+    Args:
+        formality_types: Formality types to measure
+        stages: Stages to measure
+        count: Corpus size per measurement
+        seed: Corpus seed
+        isolate: Run every measurement in a fresh process; in-process runs
+            report no peak_rss_kb, as the process high-water mark accumulates
+
+    Returns:
+        Results document with the environment and {formality_type: {stage: metrics}}
+    """
+    specs = [(stage, formality_type, count, seed) for formality_type in formality_types for stage in stages]
+
+    if isolate:
+        # A fresh interpreter per measurement (spawn, one task per child)
+        with multiprocessing.get_context("spawn").Pool(processes=1, maxtasksperchild=1) as pool:
+            measurements = pool.map(_measure_isolated, specs, chunksize=1)
+    else:
+        measurements = []
+        for spec in specs:
+            measurement = _measure_isolated(spec)
+            measurement["peak_rss_kb"] = None
+            measurements.append(measurement)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for (stage, formality_type, _, _), measurement in zip(specs, measurements):
+        results.setdefault(formality_type, {})[stage] = measurement
+
+    return {
+        "generated": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "environment": {
+            "python": platform.python_version(),
+            "lxml": ".".join(str(part) for part in etree.LXML_VERSION),
+            "libxml2": ".".join(str(part) for part in etree.LIBXML_VERSION),
+            "platform": platform.platform(),
+        },
+        "corpus": {"count": count, "seed": seed},
+        "isolated": isolate,
+        "results": results,
+    }
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 10.0) -> List[Dict[str, Any]]:
+    """
+    Compare results with a baseline.
+
+    Args:
+        current: Results of run_suite
+        baseline: Stored results of an earlier run
+        tolerance: Allowed change in percent before a metric counts as a regression
+
+    Returns:
+        One row per formality type, stage and metric measured in both runs, with
+        the baseline and current values, the change in percent and whether it is a regression
+    """
+    rows = []
+    for formality_type, stages in current["results"].items():
+        for stage, metrics in stages.items():
+            baseline_metrics = baseline.get("results", {}).get(formality_type, {}).get(stage)
+            if not baseline_metrics:
+                continue
+            for metric, higher_is_better in METRICS.items():
+                old, new = baseline_metrics.get(metric), metrics.get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old * 100
+                worse = -change if higher_is_better else change
+                rows.append({
+                    "formality_type": formality_type, "stage": stage, "metric": metric,
+                    "baseline": old, "current": new, "change_percent": round(change, 1),
+                    "regression": worse > tolerance,
+                })
+    return rows
+
+
+def _print_results(results: Dict[str, Any]) -> None:
+    print(f"{'Type':<6}{'Stage':<12}{'docs/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'peak RSS':>12}{'Python':>11}{'failed':>8}")
+    for formality_type, stages in results["results"].items():
+        for stage, m in stages.items():
+            rss = f"{m['peak_rss_kb'] / 1024:.1f} MiB" if m["peak_rss_kb"] is not None else "-"
+            print(f"{formality_type:<6}{stage:<12}{m['docs_per_second']:>10.0f}{m['p50_ms']:>10.3f}{m['p99_ms']:>10.3f}"
+                  f"{rss:>12}{m['peak_python_kb']:>7} KiB{m['failures']:>8}")
+
+
+def _print_comparison(rows: List[Dict[str, Any]]) -> None:
+    print(f"\n{'Type':<6}{'Stage':<12}{'Metric':<17}{'baseline':>12}{'current':>12}{'change':>9}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['formality_type']:<6}{row['stage']:<12}{row['metric']:<17}{row['baseline']:>12}"
+              f"{row['current']:>12}{row['change_percent']:>+8.1f}%{flag}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark EMSWe XML generation per stage and formality type")
+    parser.add_argument("--count", type=int, default=1000, help="Port calls in the synthetic corpus (default: 1000)")
+    parser.add_argument("--seed", type=int, default=1, help="Corpus seed (default: 1)")
+    parser.add_argument("--formality-types", nargs="+", choices=FORMALITY_TYPES, default=list(FORMALITY_TYPES))
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--in-process", action="store_true",
+                        help="Run all measurements in this process (faster, without peak RSS)")
+    parser.add_argument("--output-file", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=10.0,
+                        help="Change in percent that counts as a regression (default: 10)")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.formality_types, args.stages, args.count, args.seed, isolate=not args.in_process)
+    _print_results(results)
+
+    if args.output_file:
+        with open(args.output_file, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output_file}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("corpus") != results["corpus"]:
+            print(f"\nWarning: baseline corpus {baseline.get('corpus')} differs from {results['corpus']}")
+        rows = compare_results(results, baseline, args.tolerance)
+        _print_comparison(rows)
+        regressions = [row for row in rows if row["regression"]]
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed by more than {args.tolerance:g}%")
+            return 1
+        print(f"\nNo regressions beyond {args.tolerance:g}%")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Benchmark comparing the template-based envelope builder with the
+element-by-element builder of XMLTransformer.
+
+Usage (from the repository root):
+    python -m PortmanXMLConverter.benchmarks.template_builder --iterations 2000
+"""
+
+import argparse
+import logging
+import time
+
+from lxml import etree
+
+from PortmanXMLConverter.src.transformer import XMLTransformer
+from PortmanXMLConverter.src.digitraffic_adapter import adapt_digitraffic_to_portman
+
+SAMPLE_PORT_CALL = {
+    "portCallId": 3190880,
+    "imoLloyds": 9606900,
+    "mmsi": 257800000,
+    "vesselName": "Viking Grace",
+    "radioCallSign": "OJPV",
+    "portToVisit": "FITKU",
+    "portAreaCode": "PASSE",
+    "portAreaName": "Matkustajasatama",
+    "berthCode": "v1",
+    "berthName": "viking1",
+    "eta": "2024-03-13T10:00:00.000+00:00",
+    "ata": "2024-03-13T10:05:00.000Z",
+    "etd": "2024-03-13T20:00:00.000+00:00",
+    "passengersOnArrival": 235,
+    "crewOnArrival": 40,
+    "agentName": "Viking Line Abp / Helsinki",
+    "shippingCompany": "Viking Line Abp",
+}
+
+
+def run_benchmark(iterations: int) -> None:
+    """Build and serialize each formality type with both builders and print documents/second."""
+    element_transformer = XMLTransformer(use_templates=False)
+    template_transformer = XMLTransformer()
+
+    print(f"{'Type':<6}{'element builder':>20}{'template builder':>20}{'speedup':>10}")
+    for formality_type in ("ATA", "NOA", "VID"):
+        portman_data = adapt_digitraffic_to_portman(SAMPLE_PORT_CALL, formality_type)
+        rates = []
+        for transformer in (element_transformer, template_transformer):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                root = transformer.portman_to_emswe(portman_data, formality_type)
+                etree.tostring(root, pretty_print=True, xml_declaration=True, encoding="UTF-8")
+            rates.append(iterations / (time.perf_counter() - start))
+        print(f"{formality_type:<6}{rates[0]:>16.0f}/s{rates[1]:>16.0f}/s{rates[1] / rates[0]:>9.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the EMSWe envelope builders")
+    parser.add_argument("--iterations", type=int, default=2000, help="Documents per formality type (default: 2000)")
+    args = parser.parse_args()
+
+    # Per-document INFO logging would dominate the measurement
+    logging.disable(logging.INFO)
+    run_benchmark(args.iterations)
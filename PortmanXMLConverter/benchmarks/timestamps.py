@@ -0,0 +1,79 @@
+"""
+Micro-benchmark comparing the shared timestamp module with the strptime
+branches it replaced in the Digitraffic adapter and in save_results_to_db.
+
+Usage (from the repository root):
+    python -m PortmanXMLConverter.benchmarks.timestamps --iterations 200000 --distinct 500
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from PortmanXMLConverter.src import timestamps
+
+
+def legacy_xml_datetime(value):
+    """Adapter ETA/ETD formatting before the shared module."""
+    if '+' in value:
+        dt_part = value.split('+')[0]
+        if '.' in dt_part:
+            dt_obj = datetime.strptime(dt_part, "%Y-%m-%dT%H:%M:%S.%f")
+        else:
+            dt_obj = datetime.strptime(dt_part, "%Y-%m-%dT%H:%M:%S")
+    elif 'Z' in value:
+        dt_part = value.replace('Z', '')
+        if '.' in dt_part:
+            dt_obj = datetime.strptime(dt_part, "%Y-%m-%dT%H:%M:%S.%f")
+        else:
+            dt_obj = datetime.strptime(dt_part, "%Y-%m-%dT%H:%M:%S")
+    else:
+        if '.' in value:
+            dt_obj = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f")
+        else:
+            dt_obj = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S")
+    return dt_obj.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def legacy_minute_key(value):
+    """Change detection normalization in save_results_to_db before the shared module."""
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z").strftime("%Y-%m-%dT%H:%M:00.000Z")
+
+
+def _sample_values(count, distinct):
+    start = datetime(2024, 3, 13, 10, 0)
+    values = [(start + timedelta(minutes=7 * i)).strftime("%Y-%m-%dT%H:%M:%S.000+00:00") for i in range(distinct)]
+    return [values[i % distinct] for i in range(count)]
+
+
+def _rate(func, values):
+    start = time.perf_counter()
+    for value in values:
+        func(value)
+    return len(values) / (time.perf_counter() - start)
+
+
+def run_benchmark(iterations: int, distinct: int) -> None:
+    """Format the same set of timestamps with the legacy and shared implementations and print calls/second."""
+    values = _sample_values(iterations, distinct)
+    unique_values = _sample_values(iterations, iterations)
+
+    cases = [
+        ("xml datetime", legacy_xml_datetime, timestamps.to_xml_datetime),
+        ("minute key", legacy_minute_key, timestamps.to_minute_key),
+    ]
+    print(f"{'Operation':<28}{'legacy':>14}{'shared':>14}{'speedup':>10}")
+    for name, legacy, shared in cases:
+        for label, sample in ((f"{name} ({distinct} distinct)", values), (f"{name} (all distinct)", unique_values)):
+            timestamps.clear_cache()
+            legacy_rate = _rate(legacy, sample)
+            shared_rate = _rate(shared, sample)
+            print(f"{label:<28}{legacy_rate:>12.0f}/s{shared_rate:>12.0f}/s{shared_rate / legacy_rate:>9.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark timestamp parsing and formatting")
+    parser.add_argument("--iterations", type=int, default=200000, help="Timestamps per case (default: 200000)")
+    parser.add_argument("--distinct", type=int, default=500, help="Distinct timestamps in the repeated case (default: 500)")
+    args = parser.parse_args()
+    run_benchmark(args.iterations, args.distinct)
@@ -0,0 +1,248 @@
+"""
+Archive output for batches of generated EMSWe XML documents.
+
+Instead of one file per port call, a batch can be streamed into a single zip
+or tar archive (optionally compressed). Every archive ends with a manifest
+listing the port call ID, formality type, offset, size and SHA-256 hash of
+each document, which the reader uses to extract individual documents.
+"""
+
+import io
+import os
+import json
+import time
+import hashlib
+import logging
+import tarfile
+import zipfile
+from typing import Dict, Any, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+# Archive formats by file name suffix: (format, tarfile mode / zip compression)
+_TAR_SUFFIXES = {
+    ".tar": "",
+    ".tar.gz": "gz",
+    ".tgz": "gz",
+    ".tar.bz2": "bz2",
+    ".tar.xz": "xz",
+}
+
+
+def archive_format(archive_path: str) -> str:
+    """
+    Determine the archive format from the file name.
+
+    Args:
+        archive_path: Path of the archive (.zip, .tar, .tar.gz, .tgz, .tar.bz2 or .tar.xz)
+
+    Returns:
+        "zip" or the tar compression ("" for an uncompressed tar, "gz", "bz2", "xz")
+    """
+    lower_path = archive_path.lower()
+    if lower_path.endswith(".zip"):
+        return "zip"
+    for suffix, compression in sorted(_TAR_SUFFIXES.items(), key=lambda item: -len(item[0])):
+        if lower_path.endswith(suffix):
+            return compression
+    raise ValueError(f"Unsupported archive type: {archive_path} "
+                     f"(expected .zip, {', '.join(_TAR_SUFFIXES)})")
+
+
+class XMLArchiveWriter:
+    """
+    Streams generated XML documents into a single zip or tar archive.
+    """
+
+    def __init__(self, archive_path: str, compress: bool = True):
+        """
+        Open an archive for writing.
+
+        Args:
+            archive_path: Path of the archive; the format is taken from the suffix
+            compress: Deflate zip members (tar compression is selected by the suffix)
+        """
+        self.archive_path = archive_path
+        self.format = archive_format(archive_path)
+        self.entries: List[Dict[str, Any]] = []
+
+        output_dir = os.path.dirname(os.path.abspath(archive_path))
+        os.makedirs(output_dir, exist_ok=True)
+
+        if self.format == "zip":
+            compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+            self._zip = zipfile.ZipFile(archive_path, "w", compression=compression)
+            self._tar = None
+        else:
+            self._zip = None
+            self._tar = tarfile.open(archive_path, f"w:{self.format}")
+
+    def add(self, name: str, xml_content: Union[str, bytes], port_call_id: Any = None,
+            formality_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Add a document to the archive.
+
+        Args:
+            name: Member name of the document in the archive
+            xml_content: Serialized XML document
+            port_call_id: Port call ID of the document
+            formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+
+        Returns:
+            Manifest entry of the document
+        """
+        data = xml_content.encode("utf-8") if isinstance(xml_content, str) else xml_content
+
+        if self._zip is not None:
+            self._zip.writestr(name, data)
+            offset = self._zip.getinfo(name).header_offset
+        else:
+            tar_info = tarfile.TarInfo(name)
+            tar_info.size = len(data)
+            tar_info.mtime = int(time.time())
+            self._tar.addfile(tar_info, io.BytesIO(data))
+            # Offset of the member data in the (uncompressed) tar stream
+            offset = self._tar.offset - tarfile.BLOCKSIZE * ((len(data) + tarfile.BLOCKSIZE - 1) // tarfile.BLOCKSIZE)
+
+        entry = {
+            "name": name,
+            "portCallId": port_call_id,
+            "formality": formality_type,
+            "offset": offset,
+            "size": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+        }
+        self.entries.append(entry)
+        return entry
+
+    def close(self) -> None:
+        """Write the manifest and close the archive."""
+        manifest = json.dumps({"format": self.format or "tar", "documents": self.entries}, indent=2).encode("utf-8")
+
+        if self._zip is not None:
+            self._zip.writestr(MANIFEST_NAME, manifest)
+            self._zip.close()
+        else:
+            tar_info = tarfile.TarInfo(MANIFEST_NAME)
+            tar_info.size = len(manifest)
+            tar_info.mtime = int(time.time())
+            self._tar.addfile(tar_info, io.BytesIO(manifest))
+            self._tar.close()
+
+        logger.info(f"Wrote {len(self.entries)} documents to {self.archive_path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class XMLArchiveReader:
+    """
+    Reads individual documents from an archive written by XMLArchiveWriter.
+    """
+
+    def __init__(self, archive_path: str):
+        """
+        Open an archive for reading.
+
+        Args:
+            archive_path: Path of the archive
+        """
+        self.archive_path = archive_path
+        self.format = archive_format(archive_path)
+
+        if self.format == "zip":
+            self._zip = zipfile.ZipFile(archive_path, "r")
+            self._tar = None
+            manifest = self._zip.read(MANIFEST_NAME)
+        else:
+            self._zip = None
+            self._tar = tarfile.open(archive_path, f"r:{self.format}")
+            manifest = self._tar.extractfile(MANIFEST_NAME).read()
+
+        self.manifest = json.loads(manifest)
+        self._entries = {entry["name"]: entry for entry in self.manifest["documents"]}
+
+    @property
+    def documents(self) -> List[Dict[str, Any]]:
+        """Manifest entries of the documents in the archive."""
+        return self.manifest["documents"]
+
+    def find(self, port_call_id: Any, formality_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find the manifest entries of a port call.
+
+        Args:
+            port_call_id: Port call ID
+            formality_type: Optional formality type filter
+
+        Returns:
+            List of matching manifest entries
+        """
+        return [entry for entry in self.documents
+                if str(entry["portCallId"]) == str(port_call_id)
+                and (formality_type is None or entry["formality"] == formality_type)]
+
+    def read(self, name: str) -> bytes:
+        """
+        Read a document from the archive and verify its hash.
+
+        Args:
+            name: Member name of the document
+
+        Returns:
+            Serialized XML document
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"Document not found in archive: {name}")
+
+        if self._zip is not None:
+            data = self._zip.read(name)
+        elif self.format == "":
+            # Uncompressed tar: read the member data directly at its offset
+            with open(self.archive_path, "rb") as f:
+                f.seek(entry["offset"])
+                data = f.read(entry["size"])
+        else:
+            data = self._tar.extractfile(name).read()
+
+        if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            raise ValueError(f"Hash mismatch for document {name} in {self.archive_path}")
+
+        return data
+
+    def extract(self, name: str, output_path: str) -> str:
+        """
+        Extract a document to a file.
+
+        Args:
+            name: Member name of the document
+            output_path: Path of the output file
+
+        Returns:
+            Path of the extracted file
+        """
+        data = self.read(name)
+        output_dir = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(output_dir, exist_ok=True)
+        with open(output_path, "wb") as f:
+            f.write(data)
+        return output_path
+
+    def close(self) -> None:
+        """Close the archive."""
+        if self._zip is not None:
+            self._zip.close()
+        else:
+            self._tar.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,136 @@
+"""
+Blob metadata of generated EMSWe XML documents.
+
+The Slack notifier shows the port call ID, ATA/ETA, remarks and passenger and
+crew counts of every stored document. They are extracted once when the document
+is generated, from the rendered document before it is serialized, and written
+as blob metadata, so the notifier does not have to decompress and parse the XML
+on every notification. The values are exactly what the notifier extracts from
+the XML itself (see PortmanNotificator.slack_notificator.extract_info_from_xml),
+which remains the fallback for documents stored without metadata.
+
+Metadata values must be ASCII without line breaks, so they are percent-encoded.
+"""
+
+import logging
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote, unquote
+
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+# Metadata names, in the order of the notification fields
+NOTIFICATION_FIELDS = ("portcallid", "time", "remarks", "passengers", "crew")
+
+# Blob Storage limits the total size of the metadata names and values of a blob to 8 KiB
+MAX_METADATA_BYTES = 8192
+
+_NAMESPACES = {
+    'mai': 'urn:un:unece:uncefact:data:standard:MAI:MMTPlus',
+    'ata': 'urn:un:unece:uncefact:data:standard:ATA:MMTPlus',
+    'noa': 'urn:un:unece:uncefact:data:standard:NOA:MMTPlus',
+    'vid': 'urn:un:unece:uncefact:data:standard:VID:MMTPlus',
+    'ram': 'urn:un:unece:uncefact:data:standard:ReusableAggregateBusinessInformationEntity:30',
+    'qdt': 'urn:un:unece:uncefact:data:Standard:QualifiedDataType:30'
+}
+
+# Notification fields: (port call ID, time, remarks, passengers, crew)
+NotificationInfo = Tuple[str, str, str, str, str]
+
+
+def _text(root: etree._Element, path: str, default: str) -> str:
+    element = root.find(path, _NAMESPACES)
+    return element.text if element is not None else default
+
+
+def notification_info(root: etree._Element, formality_type: str) -> NotificationInfo:
+    """
+    Extract the fields of the Slack notification of a document.
+
+    Args:
+        root: Root element (Envelope) of the rendered document
+        formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+
+    Returns:
+        Tuple (port_call_id, time_value, remarks, passengers_count, crew_count)
+    """
+    # Port call ID from the MAI part, not in VID
+    port_call_id = "N/A"
+    if formality_type != "VID":
+        port_call_id = _text(root, './/mai:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent/ram:ID',
+                             "Unknown")
+
+    passengers_count = "N/A"
+    crew_count = "N/A"
+
+    if formality_type == "ATA":
+        time_value = _text(root, './/ata:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent'
+                                 '/ram:ActualArrivalRelatedDateTime/qdt:DateTimeString', "Unknown")
+        remarks = _text(root, './/ata:ExchangedDocument/ram:Remarks', "Unknown")
+    elif formality_type == "NOA":
+        time_value = _text(root, './/noa:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent'
+                                 '/ram:EstimatedTransportMeansArrivalOccurrenceDateTime/qdt:DateTimeString',
+                           "Unknown")
+        remarks = _text(root, './/noa:ExchangedDocument/ram:Remarks', "Unknown")
+        passengers_count = _text(root, './/noa:SpecifiedLogisticsTransportMovement/ram:PassengerQuantity', "N/A")
+        crew_count = _text(root, './/noa:SpecifiedLogisticsTransportMovement/ram:CrewQuantity', "N/A")
+    else:
+        means = './/vid:SpecifiedLogisticsTransportMovement/ram:UsedLogisticsTransportMeans/'
+        call = './/vid:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent/'
+        vessel_name = _text(root, means + 'ram:Name', "Unknown Vessel")
+        imo = _text(root, means + 'ram:IMOID', "N/A")
+        mmsi = _text(root, means + 'ram:MMSIID', "N/A")
+        time_value = _text(root, call + 'ram:EstimatedTransportMeansArrivalOccurrenceDateTime/qdt:DateTimeString',
+                           "Unknown")
+        port = _text(root, call + 'ram:OccurrenceLogisticsLocation/ram:ID', "Unknown")
+        # The document ID is shown in place of the port call ID
+        port_call_id = _text(root, './/mai:ExchangedDocument/ram:ID', "Unknown")
+        remarks = f"Vessel: {vessel_name}\nIMO: {imo}\nMMSI: {mmsi}\nDestination: {port}"
+
+    return port_call_id, time_value, remarks, passengers_count, crew_count
+
+
+def notification_metadata(root: etree._Element, formality_type: str) -> Dict[str, str]:
+    """
+    Build the blob metadata of a document.
+
+    Args:
+        root: Root element (Envelope) of the rendered document
+        formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+
+    Returns:
+        Metadata dictionary, or an empty dictionary if the fields could not be
+        extracted or do not fit the metadata size limit
+    """
+    try:
+        info = notification_info(root, formality_type)
+    except Exception as e:
+        logger.warning(f"Could not extract notification metadata of a {formality_type} document: {str(e)}")
+        return {}
+    metadata = {"formality": formality_type}
+    metadata.update((name, quote(value or "", safe=" ")) for name, value in zip(NOTIFICATION_FIELDS, info))
+    if sum(len(name) + len(value) for name, value in metadata.items()) > MAX_METADATA_BYTES:
+        logger.info(f"Notification metadata of a {formality_type} document exceeds {MAX_METADATA_BYTES} bytes, "
+                    f"storing it without")
+        return {}
+    return metadata
+
+
+def info_from_metadata(metadata: Optional[Dict[str, str]]) -> Optional[NotificationInfo]:
+    """
+    Read the notification fields from blob metadata.
+
+    Args:
+        metadata: Blob metadata (names are matched case-insensitively)
+
+    Returns:
+        Tuple (port_call_id, time_value, remarks, passengers_count, crew_count), or
+        None if the blob has no notification metadata
+    """
+    if not isinstance(metadata, dict):
+        return None
+    metadata = {str(name).lower(): value for name, value in metadata.items()}
+    if not all(name in metadata for name in NOTIFICATION_FIELDS):
+        return None
+    return tuple(unquote(metadata[name]) for name in NOTIFICATION_FIELDS)
@@ -0,0 +1,240 @@
+"""
+Bulk processing of EMSWe XML files.
+
+Directories and glob patterns are expanded into XML files, which are processed
+in a process pool. The formality type of each document is detected from its
+MAI TypeCode, and each worker process keeps one converter per formality type,
+so every schema is compiled once per process rather than once per file.
+"""
+
+import glob
+import os
+import re
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from lxml import etree
+
+from .converter import EMSWeConverter
+from .parser import detect_formality_type
+
+logger = logging.getLogger(__name__)
+
+# Converters of the current process, per formality type
+_converters: Dict[str, EMSWeConverter] = {}
+
+# Location prefix of validator error messages ("Line X, Column Y: ")
+_ERROR_LOCATION = re.compile(r"^Line -?\d+, Column -?\d+: ")
+
+
+def expand_inputs(inputs: Sequence[str]) -> List[str]:
+    """
+    Expand directories and glob patterns into a list of XML files.
+
+    Directories are searched recursively for *.xml and gzip-compressed *.xml.gz
+    files. Plain paths are kept
+    as given, so missing files are reported per file rather than dropped.
+
+    Args:
+        inputs: Directories, glob patterns or file paths
+
+    Returns:
+        Sorted file paths of each input, in input order and without duplicates
+    """
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = sorted(glob.glob(os.path.join(item, "**", "*.xml"), recursive=True)
+                             + glob.glob(os.path.join(item, "**", "*.xml.gz"), recursive=True))
+        elif glob.has_magic(item):
+            matches = sorted(path for path in glob.glob(item, recursive=True) if os.path.isfile(path))
+        else:
+            matches = [item]
+        paths.extend(matches)
+
+    return list(dict.fromkeys(paths))
+
+
+def _get_converter(formality_type: str) -> EMSWeConverter:
+    converter = _converters.get(formality_type)
+    if converter is None:
+        converter = _converters[formality_type] = EMSWeConverter(formality_type=formality_type)
+    return converter
+
+
+def _load(xml_file_path: str, result: Dict[str, Any]) -> Optional[etree._Element]:
+    """
+    Parse a file and detect its formality type into `result`.
+
+    Returns:
+        Root element, or None with the reason appended to result["errors"]
+    """
+    try:
+        parser = etree.XMLParser(remove_blank_text=True)
+        xml_root = etree.parse(xml_file_path, parser).getroot()
+    except (OSError, etree.XMLSyntaxError) as e:
+        result["errors"].append(f"Error parsing XML file: {str(e)}")
+        return None
+
+    result["formality_type"] = detect_formality_type(xml_root)
+    if result["formality_type"] is None:
+        result["errors"].append("Could not detect the formality type")
+        return None
+
+    return xml_root
+
+
+def convert_file(xml_file_path: str) -> Dict[str, Any]:
+    """
+    Parse, validate and convert one EMSWe XML file to Portman data.
+
+    Args:
+        xml_file_path: Path to the XML file
+
+    Returns:
+        Dictionary with the file name, detected formality type, success flag,
+        Portman data (None on failure) and error messages
+    """
+    result = {"file": xml_file_path, "formality_type": None, "success": False, "data": None, "errors": []}
+
+    xml_root = _load(xml_file_path, result)
+    if xml_root is None:
+        return result
+
+    try:
+        converter = _get_converter(result["formality_type"])
+    except (ValueError, OSError, etree.LxmlError) as e:
+        result["errors"].append(str(e))
+        return result
+
+    is_valid, errors = converter.validator.validate(xml_root)
+    if not is_valid:
+        result["errors"].extend(errors)
+        return result
+
+    portman_data = converter.transformer.emswe_to_portman(xml_root)
+    if not portman_data:
+        result["errors"].append("Failed to transform XML to Portman format")
+        return result
+
+    result["success"] = True
+    result["data"] = portman_data
+    return result
+
+
+def validate_file(xml_file_path: str) -> Dict[str, Any]:
+    """
+    Validate one EMSWe XML file against the schema of its detected formality type.
+
+    Args:
+        xml_file_path: Path to the XML file
+
+    Returns:
+        Dictionary with the file name, detected formality type, status ("valid",
+        "invalid", or "error" when the file could not be validated at all),
+        error messages and the time taken in seconds
+    """
+    start_time = time.perf_counter()
+    result = {"file": xml_file_path, "formality_type": None, "status": "error", "errors": [], "seconds": 0.0}
+
+    xml_root = _load(xml_file_path, result)
+    if xml_root is not None:
+        try:
+            converter = _get_converter(result["formality_type"])
+        except (ValueError, OSError, etree.LxmlError) as e:
+            result["errors"].append(str(e))
+        else:
+            is_valid, errors = converter.validator.validate(xml_root)
+            result["status"] = "valid" if is_valid else "invalid"
+            result["errors"].extend(errors)
+
+    result["seconds"] = round(time.perf_counter() - start_time, 6)
+    return result
+
+
+def summarize_validation(results: Iterable[Dict[str, Any]], top_errors: int = 20) -> Dict[str, Any]:
+    """
+    Aggregate validation results of `validate_file`.
+
+    Error messages are counted without their line and column, so the same
+    schema violation in different documents is counted as one kind of error.
+
+    Args:
+        results: Validation results
+        top_errors: Number of most frequent error messages to include
+
+    Returns:
+        Dictionary with file counts per status and per formality type, the
+        total validation time and the most frequent error messages
+    """
+    summary = {"files": 0, "valid": 0, "invalid": 0, "error": 0, "seconds": 0.0, "formality_types": {}}
+    error_counts: Dict[str, int] = {}
+
+    for result in results:
+        status = result["status"]
+        summary["files"] += 1
+        summary[status] += 1
+        summary["seconds"] += result["seconds"]
+
+        counters = summary["formality_types"].setdefault(
+            result["formality_type"] or "unknown", {"files": 0, "valid": 0, "invalid": 0, "error": 0})
+        counters["files"] += 1
+        counters[status] += 1
+
+        for error in result["errors"]:
+            message = _ERROR_LOCATION.sub("", error)
+            error_counts[message] = error_counts.get(message, 0) + 1
+
+    summary["seconds"] = round(summary["seconds"], 6)
+    summary["errors"] = [
+        {"message": message, "count": count}
+        for message, count in sorted(error_counts.items(), key=lambda item: (-item[1], item[0]))[:top_errors]
+    ]
+    return summary
+
+
+def map_in_processes(func: Callable[[Any], Any], items: Sequence[Any], workers: int = 1,
+                     initializer: Optional[Callable[..., None]] = None, initargs: tuple = ()) -> Iterator[Any]:
+    """
+    Apply `func` to each item in a process pool, yielding results in item order as they complete.
+
+    Items are sent to the workers in chunks of up to 64, about four chunks per
+    worker, to keep the inter-process overhead low for small items.
+
+    Args:
+        func: Module-level function taking an item (it runs in worker processes)
+        items: Picklable items
+        workers: Number of worker processes (1 processes in the current process)
+        initializer: Module-level function run once in each worker process before
+            its first item (and in the current process when not using workers)
+        initargs: Arguments of `initializer`
+
+    Returns:
+        Iterator of the results of `func`
+    """
+    if workers <= 1 or len(items) <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        yield from map(func, items)
+        return
+
+    chunksize = max(1, min(64, len(items) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as executor:
+        yield from executor.map(func, items, chunksize=chunksize)
+
+
+def process_files(func: Callable[[str], Dict[str, Any]], paths: Sequence[str], workers: int = 1) -> Iterator[Dict[str, Any]]:
+    """
+    Apply `func` to each file, yielding results in file order as they complete.
+
+    Args:
+        func: Module-level function taking a file path (it runs in worker processes)
+        paths: File paths
+        workers: Number of worker processes (1 processes in the current process)
+
+    Returns:
+        Iterator of the results of `func`
+    """
+    return map_in_processes(func, paths, workers)
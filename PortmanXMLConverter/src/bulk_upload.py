@@ -0,0 +1,180 @@
+"""
+Concurrent uploads of generated EMSWe XML documents.
+
+Generating many documents at once (batch conversion, backfills) is limited by
+the latency of one blocking upload after another rather than by CPU. The
+BulkUploader runs the uploads of a batch in a bounded thread pool, retries
+uploads rejected by throttling (HTTP 429 or 503) with exponential backoff and
+jitter, and reports progress while the batch is streamed in.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Union
+
+from .converter_config import (
+    BULK_UPLOAD_CONCURRENCY, BULK_UPLOAD_MAX_ATTEMPTS, BULK_UPLOAD_BASE_DELAY_SECONDS,
+    BULK_UPLOAD_MAX_DELAY_SECONDS, BULK_UPLOAD_PROGRESS_EVERY
+)
+from .log_events import log_event
+
+logger = logging.getLogger(__name__)
+
+# Status codes of storage responses that ask the client to slow down
+THROTTLING_STATUS_CODES = (429, 503)
+
+UploadResult = namedtuple("UploadResult", ["name", "success", "attempts", "error"])
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    """
+    Whether an upload failed because the storage service throttled it.
+
+    Args:
+        error: Exception raised by the upload function; Azure SDK errors carry
+            the HTTP status as ``status_code``
+
+    Returns:
+        True for HTTP 429 and 503 responses
+    """
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return status_code in THROTTLING_STATUS_CODES
+
+
+class BulkUploader:
+    """
+    Uploads documents concurrently with a bounded number of uploads in flight.
+
+    submit() blocks while the pool is full, so a batch streamed into the
+    uploader never holds more than a few documents per thread in memory.
+    """
+
+    def __init__(self, upload: Callable[[str, Union[str, bytes]], None], concurrency: Optional[int] = None,
+                 max_attempts: Optional[int] = None, base_delay: Optional[float] = None,
+                 max_delay: Optional[float] = None,
+                 progress: Optional[Callable[[int, int, int], None]] = None,
+                 progress_every: Optional[int] = None, sleep: Callable[[float], None] = time.sleep,
+                 random_source: Callable[[], float] = random.random):
+        """
+        Initialize the uploader.
+
+        Args:
+            upload: Function uploading one document, called as upload(name, data);
+                it must be safe to call from several threads
+            concurrency: Uploads in flight (defaults to BULK_UPLOAD_CONCURRENCY)
+            max_attempts: Attempts per document when throttled (defaults to BULK_UPLOAD_MAX_ATTEMPTS)
+            base_delay: Seconds before the first retry, doubled on each further retry
+            max_delay: Upper bound of the retry delay in seconds
+            progress: Called as progress(done, submitted, failed) after every
+                `progress_every` finished uploads and when the batch is complete
+                (defaults to an ``upload.progress`` log event)
+            progress_every: Finished uploads between progress reports
+            sleep: Function sleeping for a number of seconds
+            random_source: Function returning a float in [0, 1)
+        """
+        self._upload = upload
+        self.concurrency = max(1, BULK_UPLOAD_CONCURRENCY if concurrency is None else concurrency)
+        self.max_attempts = max(1, BULK_UPLOAD_MAX_ATTEMPTS if max_attempts is None else max_attempts)
+        self.base_delay = BULK_UPLOAD_BASE_DELAY_SECONDS if base_delay is None else base_delay
+        self.max_delay = BULK_UPLOAD_MAX_DELAY_SECONDS if max_delay is None else max_delay
+        self._progress = progress or self._log_progress
+        self.progress_every = max(1, BULK_UPLOAD_PROGRESS_EVERY if progress_every is None else progress_every)
+        self._sleep = sleep
+        self._random = random_source
+
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="bulk-upload")
+        # Uploads submitted but not finished: the running ones and one queued per thread
+        self._slots = threading.BoundedSemaphore(self.concurrency * 2)
+        self._lock = threading.Lock()
+        self._futures = []
+        self._closed = False
+
+        self.submitted = 0
+        self.done = 0
+        self.failed = 0
+        self.retries = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def submit(self, name: str, data: Union[str, bytes]) -> None:
+        """
+        Queue a document for upload, waiting while the pool is full.
+
+        Args:
+            name: Blob name of the document
+            data: Serialized document
+        """
+        if self._closed:
+            raise RuntimeError("BulkUploader is closed")
+        self._slots.acquire()
+        self.submitted += 1
+        try:
+            self._futures.append(self._executor.submit(self._run, name, data))
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _retry_delay(self, attempts: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay / 2 + self._random() * delay / 2
+
+    def _run(self, name: str, data: Union[str, bytes]) -> UploadResult:
+        try:
+            attempts = 0
+            while True:
+                attempts += 1
+                try:
+                    self._upload(name, data)
+                    result = UploadResult(name, True, attempts, None)
+                    break
+                except Exception as e:
+                    if attempts >= self.max_attempts or not is_throttling_error(e):
+                        logger.error(f"Upload of {name} failed after {attempts} attempt(s): {str(e)}")
+                        result = UploadResult(name, False, attempts, str(e))
+                        break
+                    with self._lock:
+                        self.retries += 1
+                    self._sleep(self._retry_delay(attempts))
+            self._finished(result.success)
+            return result
+        finally:
+            self._slots.release()
+
+    def _finished(self, success: bool) -> None:
+        with self._lock:
+            self.done += 1
+            if not success:
+                self.failed += 1
+            report = self.done % self.progress_every == 0
+            counts = (self.done, self.submitted, self.failed)
+        if report:
+            self._progress(*counts)
+
+    def _log_progress(self, done: int, submitted: int, failed: int) -> None:
+        log_event(logger, logging.INFO, "upload.progress", done=done, submitted=submitted, failed=failed,
+                  retries=self.retries)
+
+    def close(self) -> List[UploadResult]:
+        """
+        Wait for all queued uploads to finish.
+
+        Returns:
+            UploadResult of every submitted document, in submission order
+        """
+        if self._closed:
+            return [future.result() for future in self._futures]
+        self._closed = True
+        self._executor.shutdown(wait=True)
+        if self.done % self.progress_every:
+            self._progress(self.done, self.submitted, self.failed)
+        return [future.result() for future in self._futures]
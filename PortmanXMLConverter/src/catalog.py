@@ -0,0 +1,237 @@
+"""
+Catalog of generated EMSWe XML documents.
+
+Every stored document is recorded with its document path, formality type,
+port call, vessel (IMO), port, semantic hash, size and creation time when it
+is generated, so the documents of a port call, vessel or port are found with
+an indexed query instead of listing the container and parsing file names.
+
+Documents are named `<YYYY>/<MM>/<DD>/<port>/<formality>_<portCallId>_<timestamp>.xml`;
+the basename keeps the formality prefix that the Slack notifier relies on.
+"""
+
+import re
+import threading
+from collections import namedtuple
+from datetime import datetime, UTC
+from typing import Iterable, List, Optional
+
+CatalogEntry = namedtuple("CatalogEntry", [
+    "document_path", "formality", "port_call_id", "imo", "port", "content_hash", "size", "created"
+])
+
+# Port of documents whose port call has no valid port to visit
+UNKNOWN_PORT = "unknown"
+
+# Results returned by a query unless a limit is given
+DEFAULT_QUERY_LIMIT = 100
+
+_PORT_PATTERN = re.compile(r"^[A-Z0-9]{2,10}$")
+
+
+def normalize_port(port: Optional[str]) -> str:
+    """Port code (UN/LOCODE) as used in document names and the catalog."""
+    port = (port or "").strip().upper()
+    return port if _PORT_PATTERN.match(port) else UNKNOWN_PORT
+
+
+def document_name(formality_type: str, port_call_id, port: Optional[str], created: datetime) -> str:
+    """
+    Name of a generated document, prefixed with its generation date and port.
+
+    Args:
+        formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+        port_call_id: Port call ID
+        port: Port to visit (UN/LOCODE)
+        created: Generation time
+
+    Returns:
+        Document name "<YYYY>/<MM>/<DD>/<port>/<formality>_<portCallId>_<timestamp>.xml"
+    """
+    return (f"{created.strftime('%Y/%m/%d')}/{normalize_port(port)}/"
+            f"{formality_type}_{port_call_id}_{created.strftime('%Y%m%d%H%M%S')}.xml")
+
+
+def make_entry(document_path: str, formality_type: str, port_call_id, imo=None, port: Optional[str] = None,
+               content_hash: Optional[str] = None, size: Optional[int] = None,
+               created: Optional[datetime] = None) -> CatalogEntry:
+    """
+    Build the catalog entry of a stored document.
+
+    Args:
+        document_path: Document path "container/name"
+        formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+        port_call_id: Port call ID
+        imo: IMO number of the vessel
+        port: Port to visit (UN/LOCODE)
+        content_hash: Semantic hash of the document (see content_hash.semantic_hash)
+        size: Size of the XML document in bytes
+        created: Generation time (default: now)
+
+    Returns:
+        CatalogEntry
+    """
+    try:
+        imo = int(imo) if imo not in (None, "") else None
+    except (TypeError, ValueError):
+        imo = None
+    return CatalogEntry(document_path, formality_type, None if port_call_id is None else str(port_call_id), imo,
+                        normalize_port(port), content_hash, size, created or datetime.now(UTC))
+
+
+class DocumentCatalog:
+    """
+    Keeps the catalog in process memory.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def add(self, entry: CatalogEntry) -> None:
+        """
+        Record a stored document; a document path already in the catalog is kept as it is.
+
+        Args:
+            entry: CatalogEntry of the document
+        """
+        self.add_many([entry])
+
+    def add_many(self, entries: Iterable[CatalogEntry]) -> None:
+        """Record several stored documents."""
+        with self._lock:
+            for entry in entries:
+                self._entries.setdefault(entry.document_path, entry)
+
+    def find(self, port_call_id=None, formality: Optional[str] = None, imo=None, port: Optional[str] = None,
+             since: Optional[datetime] = None, until: Optional[datetime] = None,
+             limit: int = DEFAULT_QUERY_LIMIT) -> List[CatalogEntry]:
+        """
+        Find documents, newest first.
+
+        Args:
+            port_call_id: Only documents of this port call
+            formality: Only documents of this formality type
+            imo: Only documents of this vessel
+            port: Only documents of this port
+            since: Only documents created at or after this time
+            until: Only documents created before this time
+            limit: Maximum number of documents returned
+
+        Returns:
+            List of CatalogEntry
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+        matches = [
+            entry for entry in entries
+            if (port_call_id is None or entry.port_call_id == str(port_call_id))
+            and (formality is None or entry.formality == formality)
+            and (imo is None or entry.imo == int(imo))
+            and (port is None or entry.port == normalize_port(port))
+            and (since is None or entry.created >= since)
+            and (until is None or entry.created < until)
+        ]
+        return sorted(matches, key=lambda entry: entry.created, reverse=True)[:limit]
+
+
+# Created with the other tables in create_database_and_tables
+CREATE_DOCUMENTS_TABLE = """
+    CREATE TABLE IF NOT EXISTS xml_documents (
+        document_path TEXT PRIMARY KEY,
+        formality TEXT NOT NULL,
+        portCallId TEXT,
+        imo INTEGER,
+        port TEXT NOT NULL,
+        content_hash TEXT,
+        size INTEGER,
+        created TIMESTAMPTZ NOT NULL
+    );
+"""
+
+# One index per lookup: port call, vessel and port, each newest first, and the creation time
+CREATE_DOCUMENTS_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS xml_documents_port_call_idx ON xml_documents (portCallId, formality, created DESC);",
+    "CREATE INDEX IF NOT EXISTS xml_documents_imo_idx ON xml_documents (imo, created DESC);",
+    "CREATE INDEX IF NOT EXISTS xml_documents_port_idx ON xml_documents (port, created DESC);",
+    "CREATE INDEX IF NOT EXISTS xml_documents_created_idx ON xml_documents (created);",
+)
+
+_COLUMNS = "document_path, formality, portCallId, imo, port, content_hash, size, created"
+
+
+class DatabaseDocumentCatalog(DocumentCatalog):
+    """
+    Keeps the catalog in the `xml_documents` table so it is shared by all
+    function instances.
+    """
+
+    def __init__(self, connect):
+        """
+        Initialize the catalog.
+
+        Args:
+            connect: Callable returning a new DB-API connection
+        """
+        super().__init__()
+        self._connect = connect
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = self._connect()
+        return self._conn
+
+    def _execute(self, query, params, many=False, fetch=False):
+        with self._lock:
+            try:
+                cursor = self._connection().cursor()
+                if many:
+                    cursor.executemany(query, params)
+                else:
+                    cursor.execute(query, params)
+                rows = cursor.fetchall() if fetch else None
+                self._conn.commit()
+                cursor.close()
+                return rows
+            except Exception:
+                # Drop the connection so the next call reconnects
+                if self._conn is not None:
+                    try:
+                        self._conn.close()
+                    except Exception:
+                        pass
+                    self._conn = None
+                raise
+
+    def add_many(self, entries: Iterable[CatalogEntry]) -> None:
+        rows = [tuple(entry) for entry in entries]
+        if not rows:
+            return
+        self._execute(
+            f"""
+            INSERT INTO xml_documents ({_COLUMNS})
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (document_path) DO NOTHING
+            """,
+            rows, many=True)
+
+    def find(self, port_call_id=None, formality: Optional[str] = None, imo=None, port: Optional[str] = None,
+             since: Optional[datetime] = None, until: Optional[datetime] = None,
+             limit: int = DEFAULT_QUERY_LIMIT) -> List[CatalogEntry]:
+        conditions = []
+        params = []
+        for condition, value in (("portCallId = %s", None if port_call_id is None else str(port_call_id)),
+                                 ("formality = %s", formality),
+                                 ("imo = %s", None if imo is None else int(imo)),
+                                 ("port = %s", None if port is None else normalize_port(port)),
+                                 ("created >= %s", since),
+                                 ("created < %s", until)):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._execute(
+            f"SELECT {_COLUMNS} FROM xml_documents {where} ORDER BY created DESC LIMIT %s",
+            tuple(params) + (int(limit),), fetch=True)
+        return [CatalogEntry(*row) for row in rows]
@@ -0,0 +1,220 @@
+"""
+Content-addressed deduplication of generated EMSWe XML documents.
+
+A semantic hash covers the canonical form of a document without the values
+that change on every generation (message and declaration IDs, signature
+timestamp, and date/times the converter defaults to the current time). The
+hash of the latest stored document is kept per port call and formality type,
+so regenerating an unchanged document can skip the upload and reuse the
+existing blob.
+"""
+
+import copy
+import hashlib
+import logging
+import threading
+from collections import namedtuple
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+from lxml import etree
+
+from .converter_config import NAMESPACES
+
+logger = logging.getLogger(__name__)
+
+# Elements whose values differ between generations of the same content
+_VOLATILE_PATHS = [
+    etree.XPath(path, namespaces=NAMESPACES) for path in (
+        "mai:MAI/mai:ExchangedDocument/ram:ID",
+        "mai:MAI/mai:ExchangedDocument/ram:FirstSignatoryDocumentAuthentication",
+        "mai:MAI/mai:ExchangedDeclaration/ram:ID",
+    )
+]
+
+# Date/time elements filled from Digitraffic port call fields; without any of the
+# fields the converter puts the current time there, which is volatile too
+_ATA_EVENTS = "ata:ATA/ata:SpecifiedLogisticsTransportMovement/"
+_NOA_STOP = "noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:ItineraryTransportRoute/ram:ItineraryStopTransportEvent/"
+_NOA_CALL = "noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent/"
+_DEFAULTED_TIMESTAMPS = {
+    "ATA": (
+        (("ata", "eta"), _ATA_EVENTS + "ram:ArrivalTransportEvent/ram:ActualArrivalRelatedDateTime"),
+        (("ata", "eta"), _ATA_EVENTS + "ram:CallTransportEvent/ram:ActualArrivalRelatedDateTime"),
+    ),
+    "NOA": (
+        (("eta",), _NOA_STOP + "ram:ArrivalRelatedDateTime"),
+        (("etd",), _NOA_STOP + "ram:DepartureRelatedDateTime"),
+        (("eta",), _NOA_CALL + "ram:EstimatedTransportMeansArrivalOccurrenceDateTime"),
+        (("etd",), _NOA_CALL + "ram:EstimatedTransportMeansDepartureOccurrenceDateTime"),
+    ),
+    "VID": (
+        (("eta",), "vid:VID/vid:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent/"
+                   "ram:EstimatedTransportMeansArrivalOccurrenceDateTime"),
+    ),
+}
+
+StoredDocument = namedtuple("StoredDocument", ["content_hash", "blob_name"])
+
+
+@lru_cache(maxsize=None)
+def _xpath(path: str) -> etree.XPath:
+    return etree.XPath(path, namespaces=NAMESPACES)
+
+
+def defaulted_timestamp_paths(port_call: Dict[str, Any], formality_type: str) -> Tuple[str, ...]:
+    """
+    Get the date/time elements of a document that hold the generation time
+    because the port call has no value for them.
+
+    Args:
+        port_call: Digitraffic port call the document was generated from
+        formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+
+    Returns:
+        Element paths relative to the Envelope, to pass to semantic_hash
+    """
+    return tuple(path for fields, path in _DEFAULTED_TIMESTAMPS.get(formality_type, ())
+                 if not any(port_call.get(field) for field in fields))
+
+
+def semantic_hash(xml_content: Union[str, bytes, etree._Element], volatile_paths: Iterable[str] = ()) -> str:
+    """
+    Compute the semantic hash of an EMSWe document.
+
+    Args:
+        xml_content: XML content as string, bytes, or lxml Element
+        volatile_paths: Paths of further elements to leave out, relative to the
+            Envelope (see defaulted_timestamp_paths)
+
+    Returns:
+        Hex SHA-256 of the canonical document without volatile values
+    """
+    if isinstance(xml_content, (str, bytes)):
+        if isinstance(xml_content, str):
+            xml_content = xml_content.encode("utf-8")
+        xml_root = etree.fromstring(xml_content, etree.XMLParser(remove_blank_text=True))
+    else:
+        xml_root = copy.deepcopy(xml_content)
+
+    for xpath in _VOLATILE_PATHS + [_xpath(path) for path in volatile_paths]:
+        for element in xpath(xml_root):
+            element.getparent().remove(element)
+
+    # Whitespace-only text is formatting (pretty printing), not content
+    for element in xml_root.iter():
+        if element.text is not None and not element.text.strip():
+            element.text = None
+        element.tail = None
+
+    return hashlib.sha256(etree.tostring(xml_root, method="c14n")).hexdigest()
+
+
+class ContentHashStore:
+    """
+    Keeps the hash and blob name of the latest document per port call and
+    formality type in process memory.
+    """
+
+    def __init__(self):
+        self._documents = {}
+        self._lock = threading.Lock()
+
+    def get(self, port_call_id, formality_type: str) -> Optional[StoredDocument]:
+        """
+        Get the latest stored document of a port call.
+
+        Args:
+            port_call_id: Port call ID
+            formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+
+        Returns:
+            StoredDocument or None if nothing is stored
+        """
+        with self._lock:
+            return self._documents.get((str(port_call_id), formality_type))
+
+    def put(self, port_call_id, formality_type: str, content_hash: str, blob_name: str) -> None:
+        """
+        Record the latest stored document of a port call.
+
+        Args:
+            port_call_id: Port call ID
+            formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+            content_hash: Semantic hash of the document
+            blob_name: Name of the blob the document was stored in
+        """
+        with self._lock:
+            self._documents[(str(port_call_id), formality_type)] = StoredDocument(content_hash, blob_name)
+
+
+# Created with the other tables in create_database_and_tables
+CREATE_CONTENT_HASHES_TABLE = """
+    CREATE TABLE IF NOT EXISTS xml_content_hashes (
+        portCallId TEXT NOT NULL,
+        formality TEXT NOT NULL,
+        content_hash TEXT NOT NULL,
+        blob_name TEXT NOT NULL,
+        modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (portCallId, formality)
+    );
+"""
+
+
+class DatabaseContentHashStore(ContentHashStore):
+    """
+    Keeps the latest document hashes in the `xml_content_hashes` table so they
+    are shared by all function instances.
+    """
+
+    def __init__(self, connect):
+        """
+        Initialize the store.
+
+        Args:
+            connect: Callable returning a new DB-API connection
+        """
+        super().__init__()
+        self._connect = connect
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = self._connect()
+        return self._conn
+
+    def _execute(self, query, params, fetch=False):
+        with self._lock:
+            try:
+                cursor = self._connection().cursor()
+                cursor.execute(query, params)
+                row = cursor.fetchone() if fetch else None
+                self._conn.commit()
+                cursor.close()
+                return row
+            except Exception:
+                # Drop the connection so the next call reconnects
+                if self._conn is not None:
+                    try:
+                        self._conn.close()
+                    except Exception:
+                        pass
+                    self._conn = None
+                raise
+
+    def get(self, port_call_id, formality_type: str) -> Optional[StoredDocument]:
+        row = self._execute(
+            "SELECT content_hash, blob_name FROM xml_content_hashes WHERE portCallId = %s AND formality = %s",
+            (str(port_call_id), formality_type), fetch=True)
+        return StoredDocument(*row) if row else None
+
+    def put(self, port_call_id, formality_type: str, content_hash: str, blob_name: str) -> None:
+        self._execute(
+            """
+            INSERT INTO xml_content_hashes (portCallId, formality, content_hash, blob_name, modified)
+            VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (portCallId, formality) DO UPDATE SET
+                content_hash = EXCLUDED.content_hash,
+                blob_name = EXCLUDED.blob_name,
+                modified = CURRENT_TIMESTAMP
+            """,
+            (str(port_call_id), formality_type, content_hash, blob_name))
@@ -4,13 +4,17 @@ Main converter module for EMSWe-compliant XML conversion.
 
 import os
 import logging
-from typing import Dict, Any, Optional, Tuple, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
 from lxml import etree
 
 from .converter_config import OUTPUT_DIR
 from .validator import XMLValidator
 from .parser import XMLParser
 from .transformer import XMLTransformer
+from .validation_policy import ValidationPolicy, get_validation_policy
+from .serialization import serialize_xml
+from .digitraffic_adapter import adapt_digitraffic_multi
+from .generated_validators import validate_portman_data
 
 # Configure logging
 logging.basicConfig(
@@ -24,15 +28,20 @@ class EMSWeConverter:
     Main converter class for EMSWe-compliant XML.
     """
 
-    def __init__(self, formality_type: str = "ATA"):
+    def __init__(self, formality_type: str = "ATA", validation_policy: Optional[ValidationPolicy] = None,
+                 pretty_print: bool = True):
         """
         Initialize the EMSWe converter.
 
         Args:
             formality_type: Type of formality to handle (e.g., "ATA")
+            validation_policy: Validation policy for generated documents (defaults to the process-wide policy)
+            pretty_print: Indent generated documents; False serializes them compact for machine consumers
         """
         self.formality_type = formality_type
+        self.pretty_print = pretty_print
         self.validator = XMLValidator(formality_type)
+        self.validation_policy = validation_policy or get_validation_policy()
         self.parser = XMLParser()
         self.transformer = XMLTransformer()
 
@@ -59,39 +68,66 @@ class EMSWeConverter:
         logger.info("XML validation successful")
         return True, "XML validation successful"
 
-    def convert_to_emswe(self, portman_data: Dict[str, Any], output_filename: str = None) -> Tuple[bool, str]:
+    def render_emswe(self, portman_data: Dict[str, Any]) -> Tuple[bool, Union[etree._Element, str]]:
         """
-        Convert Portman agent data to EMSWe-compliant XML.
+        Build and validate the EMSWe XML document of Portman agent data without serializing it.
 
         Args:
             portman_data: Dictionary containing Portman agent data
-            output_filename: Name of the output file (optional)
 
         Returns:
-            Tuple containing (success, output_path_or_error)
+            Tuple containing (success, root_element_or_error)
         """
-
         try:
+            # Check the values used as they are against the schema facets before building any XML
+            data_errors = validate_portman_data(portman_data, self.formality_type)
+            if data_errors:
+                error_message = "\n".join(data_errors)
+                logger.error(f"Portman data validation failed: {error_message}")
+                return False, error_message
+
             # Transform data to EMSWe XML
             xml_root = self.transformer.portman_to_emswe(portman_data, self.formality_type)
 
             if xml_root is None:
                 return False, "Failed to transform data to EMSWe XML"
 
-            # Validate the generated XML
-            is_valid, errors = self.validator.validate(xml_root)
+            # Validate the generated XML (structural rules always, XSD according to the policy)
+            is_valid, errors = self.validation_policy.validate(xml_root, self.formality_type, self.validator)
 
             if not is_valid:
                 error_message = "\n".join(errors)
                 logger.error(f"Generated XML validation failed: {error_message}")
                 return False, error_message
 
+            return True, xml_root
+
+        except Exception as e:
+            logger.error(f"Error converting to EMSWe: {str(e)}")
+            return False, f"Error: {str(e)}"
+
+    def convert_to_emswe(self, portman_data: Dict[str, Any], output_filename: str = None) -> Tuple[bool, str]:
+        """
+        Convert Portman agent data to EMSWe-compliant XML.
+
+        Args:
+            portman_data: Dictionary containing Portman agent data
+            output_filename: Name of the output file (optional)
+
+        Returns:
+            Tuple containing (success, output_path_or_error)
+        """
+        success, xml_root = self.render_emswe(portman_data)
+        if not success:
+            return False, xml_root
+
+        try:
             # Save to file if output filename is provided
             if output_filename:
                 if not output_filename.endswith('.xml'):
                     output_filename += '.xml'
 
-                output_path = self.transformer.save_xml(xml_root, output_filename)
+                output_path = self.transformer.save_xml(xml_root, output_filename, self.pretty_print)
 
                 if not output_path:
                     return False, "Failed to save XML to file"
@@ -99,8 +135,7 @@ class EMSWeConverter:
                 return True, output_path
 
             # Return XML as string if no output filename
-            xml_string = etree.tostring(xml_root, pretty_print=True, xml_declaration=True, encoding="UTF-8").decode("utf-8")
-            return True, xml_string
+            return True, serialize_xml(xml_root, self.pretty_print)
 
         except Exception as e:
             logger.error(f"Error converting to EMSWe: {str(e)}")
@@ -142,3 +177,69 @@ class EMSWeConverter:
         except Exception as e:
             logger.error(f"Error converting from EMSWe: {str(e)}")
             return False, f"Error: {str(e)}"
+
+
+def convert_port_call(port_call: Dict[str, Any], formality_types: List[str],
+                      validation_policy: Optional[ValidationPolicy] = None,
+                      pretty_print: bool = True) -> Dict[str, Tuple[bool, str]]:
+    """
+    Convert one Digitraffic port call to EMSWe XML for several formality types in one pass.
+
+    The port call is adapted once for all types, the Portman data of each type
+    is checked against its schema facets before rendering, the documents share one
+    rendered MAI element whose structural rules are checked once, and each
+    document is validated against the cached schema of its type. The documents
+    are the same as converting the port call for each type separately.
+
+    Args:
+        port_call: Dictionary containing Digitraffic port call data
+        formality_types: Types of formality to generate (e.g., ["VID", "NOA", "ATA"])
+        validation_policy: Validation policy for generated documents (defaults to the process-wide policy)
+        pretty_print: Indent generated documents; False serializes them compact
+
+    Returns:
+        Dictionary {formality_type: (success, xml_string_or_error)}, in the order of `formality_types`
+    """
+    validation_policy = validation_policy or get_validation_policy()
+    results = {}
+
+    try:
+        portman_data_by_type = adapt_digitraffic_multi(port_call, formality_types)
+        order = list(portman_data_by_type)
+        for formality_type in order:
+            data_errors = validate_portman_data(portman_data_by_type[formality_type], formality_type)
+            if data_errors:
+                logger.error(f"{formality_type} Portman data validation failed: {'; '.join(data_errors)}")
+                results[formality_type] = (False, "\n".join(data_errors))
+                del portman_data_by_type[formality_type]
+        roots = XMLTransformer().portman_to_emswe_many(portman_data_by_type)
+    except Exception as e:
+        logger.error(f"Error converting port call to EMSWe: {str(e)}")
+        return {formality_type: (False, f"Error: {str(e)}") for formality_type in formality_types}
+
+    # Validate in the rendering order of the shared MAI (VID last, as its MAI is
+    # a subset of the others), so the MAI rules run on the first document only
+    mai_checked = False
+    for formality_type in sorted(roots, key=lambda t: t == "VID"):
+        xml_root = roots[formality_type]
+        if xml_root is None:
+            results[formality_type] = (False, "Failed to transform data to EMSWe XML")
+            continue
+
+        try:
+            is_valid, errors = validation_policy.validate(xml_root, formality_type, XMLValidator(formality_type),
+                                                          mai_checked)
+        except Exception as e:
+            logger.error(f"Error validating {formality_type}: {str(e)}")
+            results[formality_type] = (False, f"Error: {str(e)}")
+            continue
+
+        if not is_valid:
+            error_message = "\n".join(errors)
+            logger.error(f"Generated {formality_type} XML validation failed: {error_message}")
+            results[formality_type] = (False, error_message)
+        else:
+            results[formality_type] = (True, serialize_xml(xml_root, pretty_print))
+            mai_checked = True
+
+    return {formality_type: results[formality_type] for formality_type in order}
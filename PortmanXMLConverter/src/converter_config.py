@@ -47,3 +47,26 @@ NAMESPACES = {
 
 # Default output directory for generated files
 OUTPUT_DIR = os.path.join(PROJECT_ROOT, "output")
+
+# XSD validation of generated documents: "always", "never" or "sampled".
+# Generated documents always pass the structural checks, and the first
+# document of each formality type in a process is always XSD-validated.
+VALIDATION_XSD_MODE = os.getenv("XML_VALIDATION_XSD_MODE", "always").lower()
+VALIDATION_XSD_SAMPLE_PERCENT = float(os.getenv("XML_VALIDATION_XSD_SAMPLE_PERCENT", "10"))
+
+# Structured log events (see src/log_events.py).
+# Sample rates per event as "event=rate,..." where the rate is 0..1; "*" sets the default.
+LOG_EVENT_SAMPLE_RATES = os.getenv("LOG_EVENT_SAMPLE_RATES", "")
+# Emitted records per event and minute, 0 disables the limit
+LOG_EVENT_RATE_LIMIT_PER_MINUTE = int(os.getenv("LOG_EVENT_RATE_LIMIT_PER_MINUTE", "0"))
+# Rendered payloads longer than this are truncated, 0 disables truncation
+LOG_PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "4000"))
+
+# Concurrent uploads of batch output (see src/bulk_upload.py)
+BULK_UPLOAD_CONCURRENCY = int(os.getenv("BULK_UPLOAD_CONCURRENCY", "8"))
+# Attempts per document when the storage service throttles (HTTP 429/503)
+BULK_UPLOAD_MAX_ATTEMPTS = int(os.getenv("BULK_UPLOAD_MAX_ATTEMPTS", "5"))
+BULK_UPLOAD_BASE_DELAY_SECONDS = float(os.getenv("BULK_UPLOAD_BASE_DELAY_SECONDS", "0.5"))
+BULK_UPLOAD_MAX_DELAY_SECONDS = float(os.getenv("BULK_UPLOAD_MAX_DELAY_SECONDS", "30"))
+# Finished uploads between progress reports
+BULK_UPLOAD_PROGRESS_EVERY = int(os.getenv("BULK_UPLOAD_PROGRESS_EVERY", "100"))
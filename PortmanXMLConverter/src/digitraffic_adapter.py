@@ -1,14 +1,245 @@
 """
 Adapter module for converting Digitraffic port call data to the format expected by the EMSWe converter.
+
+The Portman data is described by a declarative field mapping (`FIELD_MAPPING`):
+each field names its Digitraffic source field or a derivation from the fields
+mapped before it, a transform, a default and the formality types it applies
+to. The mapping is compiled once per formality type into a list of steps, so
+adapting a port call is a single pass over that list, and adding a field is
+an edit of the table. Several formality types of one port call can be adapted
+together, mapping the fields they have in common only once.
 """
 
-import json
 import logging
+from collections import namedtuple
 from datetime import datetime
-from typing import Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .log_events import log_event
+from .timestamps import to_xml_datetime
 
 logger = logging.getLogger(__name__)
 
+# A field of the Portman data. `source` fields take the Digitraffic value (or `default`
+# when it is missing or None) through `transform`; derived fields (`derive`) are computed
+# from the Portman data mapped so far, the Digitraffic data, the formality type and the
+# generation time. `formalities` limits the field to those formality types; when the
+# type is not known all fields are mapped. `optional` fields are left out when None.
+# `per_formality` marks derived fields whose value depends on the formality type.
+Field = namedtuple("Field", ["target", "source", "transform", "default", "derive", "formalities", "optional",
+                             "per_formality"])
+
+
+def _field(target: str, source: Optional[str] = None, transform: Optional[Callable[[Any], Any]] = None,
+           default: Any = None, derive: Optional[Callable[..., Any]] = None,
+           formalities: Optional[Tuple[str, ...]] = None, optional: bool = False,
+           per_formality: bool = False) -> Field:
+    return Field(target, source, transform, default, derive, formalities, optional, per_formality)
+
+
+UNKNOWN_LOCATIONS = ("unknown", "ei tiedossa", "")
+
+DEFAULT_DECLARANT_ID = "FI123456789012"
+
+DECLARANT_ADDRESS = {
+    "postcode": "00000",
+    "street": "Port Street",
+    "city": "Port City",
+    "country": "FI",
+    "building": "1"
+}
+
+
+def _now_utc_string() -> str:
+    return datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+# Transforms of Digitraffic values
+
+def _imo(value: Any) -> Any:
+    # IMO number 0 is treated as not present for all XML types
+    return None if value in (0, "0", "unknown") else value
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    # None indicates "not provided" rather than 0 (which means "zero passengers/crew")
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _xml_datetime(value: Any) -> Any:
+    try:
+        return to_xml_datetime(value)
+    except Exception as e:
+        logger.warning(f"Could not format datetime {value}: {str(e)}, using original value")
+        return value
+
+
+# Derived fields
+
+def _destination(out: Dict[str, Any]) -> str:
+    # Destination string, excluding unknown or empty values
+    parts = [out["portToVisit"]]
+    for key in ("portAreaName", "berthName"):
+        if out[key].lower() not in UNKNOWN_LOCATIONS:
+            parts.append(out[key])
+    return "/".join(parts)
+
+
+def _remarks(out, data, xml_type, now):
+    remarks = f"{out['vesselName']}"
+    if out.get("imoLloyds"):
+        remarks += f" (IMO: {out['imoLloyds']})"
+    return remarks + f" {'port arrival ->' if xml_type == 'ATA' else '->'} {_destination(out)}"
+
+
+def _arrival_datetime(out, data, xml_type, now):
+    return data.get("ata") or out["eta"] or now
+
+
+def _declarant(out, data, xml_type, now):
+    agent_name = data.get("agentName") or ""
+    return {
+        "id": f"FI{out['imoLloyds']}" if out.get("imoLloyds") else DEFAULT_DECLARANT_ID,
+        "name": agent_name or data.get("shippingCompany") or "Unknown Agent",
+        "role_code": "AG",
+        "contact": {
+            "name": agent_name or "Port Agent",
+            "phone": "+358-00-0000000",
+            "email": "contact@example.com"
+        },
+        "address": dict(DECLARANT_ADDRESS)
+    }
+
+
+FIELD_MAPPING: List[Field] = [
+    # Vessel and port call
+    _field("call_id", "portCallId", str, default="unknown"),
+    _field("vesselName", "vesselName", default="unknown"),
+    _field("imoLloyds", "imoLloyds", _imo, optional=True),
+    _field("mmsi", "mmsi", default="unknown"),
+    _field("radioCallSign", "radioCallSign", default="", formalities=("VID",)),
+
+    # Times, formatted for XML without milliseconds
+    _field("eta", "eta", _xml_datetime),
+    _field("etd", "etd", _xml_datetime),
+
+    # Port and berth
+    _field("portToVisit", "portToVisit", default=""),
+    _field("portAreaCode", "portAreaCode", default=""),
+    _field("portAreaName", "portAreaName", default=""),
+    _field("berthCode", "berthCode", default=""),
+    _field("berthName", "berthName", default=""),
+    _field("location", "portToVisit", default=""),
+
+    # Passenger and crew counts
+    _field("passengersOnArrival", "passengersOnArrival", _optional_int, formalities=("NOA",), optional=True),
+    _field("crewOnArrival", "crewOnArrival", _optional_int, formalities=("NOA",), optional=True),
+
+    # Document header
+    _field("document_id", derive=lambda out, data, xml_type, now: f"MSGID-{out['call_id']}"),
+    _field("declaration_id", derive=lambda out, data, xml_type, now: f"DECL-PT-{out['call_id']}"),
+    _field("timestamp", derive=lambda out, data, xml_type, now: now),
+    _field("remarks", derive=_remarks, per_formality=True),
+    _field("declarant", derive=_declarant),
+
+    # Arrival and call events
+    _field("arrival_datetime", derive=_arrival_datetime),
+    _field("call_datetime", derive=_arrival_datetime),
+    _field("anchorage_indicator", derive=lambda out, data, xml_type, now: "0"),
+]
+
+
+def compile_mapping(mapping: List[Field], xml_type: Optional[str] = None) -> Callable[[Dict[str, Any], str], Dict[str, Any]]:
+    """
+    Compile a field mapping for a formality type into an adapter function.
+
+    Args:
+        mapping: List of fields
+        xml_type: Type of XML formality (ATA, NOA, VID), or None to map all fields
+
+    Returns:
+        Function taking the Digitraffic data and the generation time string and
+        returning the Portman data
+    """
+    steps = _steps(field for field in mapping
+                   if xml_type is None or field.formalities is None or xml_type in field.formalities)
+
+    def adapt(data: Dict[str, Any], now: str) -> Dict[str, Any]:
+        return _run_steps(steps, {}, data, xml_type, now)
+
+    return adapt
+
+
+def compile_multi_mapping(mapping: List[Field],
+                          xml_types: Tuple[str, ...]) -> Callable[[Dict[str, Any], str], Dict[str, Dict[str, Any]]]:
+    """
+    Compile a field mapping for several formality types of the same port call.
+
+    Fields that apply to all formality types and do not depend on the type are
+    mapped once; each type adds its own fields to a copy of them. Fields common
+    to all types must therefore not derive from type-specific fields.
+
+    Args:
+        mapping: List of fields
+        xml_types: Types of XML formality (ATA, NOA, VID)
+
+    Returns:
+        Function taking the Digitraffic data and the generation time string and
+        returning the Portman data per formality type
+    """
+    common_steps = _steps(field for field in mapping if field.formalities is None and not field.per_formality)
+    type_steps = [
+        (xml_type, _steps(field for field in mapping
+                          if (field.formalities is None and field.per_formality)
+                          or (field.formalities is not None and xml_type in field.formalities)))
+        for xml_type in xml_types
+    ]
+
+    def adapt(data: Dict[str, Any], now: str) -> Dict[str, Dict[str, Any]]:
+        common = _run_steps(common_steps, {}, data, None, now)
+        return {xml_type: _run_steps(steps, dict(common), data, xml_type, now) for xml_type, steps in type_steps}
+
+    return adapt
+
+
+def _steps(fields) -> Tuple[tuple, ...]:
+    return tuple(
+        (field.target, field.source, field.transform, field.default, field.derive, field.optional) for field in fields
+    )
+
+
+def _run_steps(steps: Tuple[tuple, ...], out: Dict[str, Any], data: Dict[str, Any], xml_type: Optional[str],
+               now: str) -> Dict[str, Any]:
+    for target, source, transform, default, derive, optional in steps:
+        if derive is not None:
+            value = derive(out, data, xml_type, now)
+        else:
+            value = data.get(source)
+            if value is None:
+                value = default
+            elif transform is not None:
+                value = transform(value)
+        if value is None and optional:
+            continue
+        out[target] = value
+    return out
+
+
+_compiled: Dict[Optional[str], Callable[[Dict[str, Any], str], Dict[str, Any]]] = {}
+
+
+_compiled_multi: Dict[Tuple[str, ...], Callable[[Dict[str, Any], str], Dict[str, Dict[str, Any]]]] = {}
+
+
+def _get_adapter(xml_type: Optional[str]) -> Callable[[Dict[str, Any], str], Dict[str, Any]]:
+    adapter = _compiled.get(xml_type)
+    if adapter is None:
+        adapter = _compiled[xml_type] = compile_mapping(FIELD_MAPPING, xml_type)
+    return adapter
+
 
 def adapt_digitraffic_to_portman(digitraffic_data: Dict[str, Any], xml_type=None) -> Dict[str, Any]:
     """
@@ -21,255 +252,96 @@ def adapt_digitraffic_to_portman(digitraffic_data: Dict[str, Any], xml_type=None
     Returns:
         Dictionary in Portman format suitable for EMSWe conversion
     """
+    return _adapt(_get_adapter(xml_type), digitraffic_data, _now_utc_string())
+
+
+def adapt_digitraffic_batch(port_calls: List[Dict[str, Any]], xml_type=None) -> List[Dict[str, Any]]:
+    """
+    Adapt a list of Digitraffic port calls in one pass.
+
+    Args:
+        port_calls: List of Digitraffic port call dictionaries
+        xml_type: Type of XML formality (ATA, NOA, VID)
+
+    Returns:
+        List of dictionaries in Portman format, in the order of `port_calls`
+    """
+    adapter = _get_adapter(xml_type)
+    now = _now_utc_string()
+    return [_adapt(adapter, digitraffic_data, now) for digitraffic_data in port_calls]
+
+
+def adapt_digitraffic_multi(digitraffic_data: Dict[str, Any], xml_types: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Adapt Digitraffic port call data for several formality types in one pass.
+
+    Args:
+        digitraffic_data: Dictionary containing Digitraffic port call data
+        xml_types: Types of XML formality (ATA, NOA, VID)
+
+    Returns:
+        Dictionary {xml_type: Portman data}, equal to adapting the port call for
+        each type separately
+    """
+    xml_types = tuple(xml_types)
+    adapter = _compiled_multi.get(xml_types)
+    if adapter is None:
+        adapter = _compiled_multi[xml_types] = compile_multi_mapping(FIELD_MAPPING, xml_types)
+
+    now = _now_utc_string()
     try:
-        # Basic port call information
-        port_call_id = digitraffic_data.get("portCallId", "unknown")
-        vessel_name = digitraffic_data.get("vesselName", "unknown")
-        imo_lloyds = digitraffic_data.get("imoLloyds", "unknown")
-        mmsi = digitraffic_data.get("mmsi", "unknown")  # Extract MMSI
-        
-        # Check and handle IMO number 0 case - treat as not present for all XML types
-        if imo_lloyds == "0" or imo_lloyds == 0 or imo_lloyds == "unknown":
-            logger.info(f"IMO number is {imo_lloyds} for port call {port_call_id}. Setting to None for XML generation.")
-            imo_lloyds = None
-        
-        # Log original values for debugging
-        logger.info(f"Adapting data for port call {port_call_id} - Original vesselName: {vessel_name}, imoLloyds: {imo_lloyds}, mmsi: {mmsi}")
-
-        # Arrival information
-        eta = digitraffic_data.get("eta")
-        ata = digitraffic_data.get("ata")
-        etd = digitraffic_data.get("etd")
-
-        # Log original eta value
-        logger.info(f"Original ETA value: {eta}")
-        logger.info(f"Original ETD value: {etd}")
-        
-        # Format ETA for XML usage if available
-        formatted_eta = None
-        if eta:
-            try:
-                # Handle different datetime formats
-                if isinstance(eta, str):
-                    # Try to standardize the format for ETA
-                    if '+' in eta:
-                        # Handle timezone offset format
-                        dt_part = eta.split('+')[0]
-                        if '.' in dt_part:
-                            dt_obj = datetime.strptime(dt_part, "%Y-%m-%dT%H:%M:%S.%f")
-                        else:
-                            dt_obj = datetime.strptime(dt_part, "%Y-%m-%dT%H:%M:%S")
-                        formatted_eta = dt_obj.strftime("%Y-%m-%dT%H:%M:%SZ")
-                    elif 'Z' in eta:
-                        # Already in UTC format but ensure no milliseconds
-                        dt_part = eta.replace('Z', '')
-                        if '.' in dt_part:
-                            dt_obj = datetime.strptime(dt_part, "%Y-%m-%dT%H:%M:%S.%f")
-                        else:
-                            dt_obj = datetime.strptime(dt_part, "%Y-%m-%dT%H:%M:%S")
-                        formatted_eta = dt_obj.strftime("%Y-%m-%dT%H:%M:%SZ")
-                    else:
-                        # No timezone, treat as UTC and add Z
-                        if '.' in eta:
-                            dt_obj = datetime.strptime(eta, "%Y-%m-%dT%H:%M:%S.%f")
-                        else:
-                            dt_obj = datetime.strptime(eta, "%Y-%m-%dT%H:%M:%S")
-                        formatted_eta = dt_obj.strftime("%Y-%m-%dT%H:%M:%SZ")
-                logger.info(f"Formatted ETA: {formatted_eta}")
-            except Exception as e:
-                logger.warning(f"Could not format ETA: {str(e)}, using original value")
-                formatted_eta = eta
-        
-        # Format ETD for XML usage if available
-        formatted_etd = None
-        if etd:
-            try:
-                # Handle different datetime formats
-                if isinstance(etd, str):
-                    # Try to standardize the format for ETD
-                    if '+' in etd:
-                        # Handle timezone offset format
-                        dt_part = etd.split('+')[0]
-                        if '.' in dt_part:
-                            dt_obj = datetime.strptime(dt_part, "%Y-%m-%dT%H:%M:%S.%f")
-                        else:
-                            dt_obj = datetime.strptime(dt_part, "%Y-%m-%dT%H:%M:%S")
-                        formatted_etd = dt_obj.strftime("%Y-%m-%dT%H:%M:%SZ")
-                    elif 'Z' in etd:
-                        # Already in UTC format but ensure no milliseconds
-                        dt_part = etd.replace('Z', '')
-                        if '.' in dt_part:
-                            dt_obj = datetime.strptime(dt_part, "%Y-%m-%dT%H:%M:%S.%f")
-                        else:
-                            dt_obj = datetime.strptime(dt_part, "%Y-%m-%dT%H:%M:%S")
-                        formatted_etd = dt_obj.strftime("%Y-%m-%dT%H:%M:%SZ")
-                    else:
-                        # No timezone, treat as UTC and add Z
-                        if '.' in etd:
-                            dt_obj = datetime.strptime(etd, "%Y-%m-%dT%H:%M:%S.%f")
-                        else:
-                            dt_obj = datetime.strptime(etd, "%Y-%m-%dT%H:%M:%S")
-                        formatted_etd = dt_obj.strftime("%Y-%m-%dT%H:%M:%SZ")
-                logger.info(f"Formatted ETD: {formatted_etd}")
-            except Exception as e:
-                logger.warning(f"Could not format ETD: {str(e)}, using original value")
-                formatted_etd = etd
-        
-        port_area_name = digitraffic_data.get("portAreaName", "")
-        port_area_code = digitraffic_data.get("portAreaCode", "")
-        berth_name = digitraffic_data.get("berthName", "")
-        berth_code = digitraffic_data.get("berthCode", "")
-        port_to_visit = digitraffic_data.get("portToVisit", "")
-        
-        # Passenger and crew information - ensure they're integers or None
-        # We use None to indicate "not provided" rather than 0 (which means "zero passengers/crew")
-        passengers_on_arrival = digitraffic_data.get("passengersOnArrival")
-        crew_on_arrival = digitraffic_data.get("crewOnArrival")
-
-        # Ensure we have valid integer values or None
-        if passengers_on_arrival is not None:
-            try:
-                passengers_on_arrival = int(passengers_on_arrival)
-            except (ValueError, TypeError):
-                # If conversion fails, set to None to indicate missing data
-                passengers_on_arrival = None
-        
-        if crew_on_arrival is not None:
-            try:
-                crew_on_arrival = int(crew_on_arrival)
-            except (ValueError, TypeError):
-                # If conversion fails, set to None to indicate missing data
-                crew_on_arrival = None
-
-        # Log passenger and crew counts for debugging
-        logger.info(f"Adapting port call {port_call_id} with passengers: {passengers_on_arrival}, crew: {crew_on_arrival}")
-
-        # Build destination string, excluding unknown or empty values
-        destination_parts = [port_to_visit]
-        if port_area_name.lower() not in ["unknown", "ei tiedossa", ""]:
-            destination_parts.append(port_area_name)
-        if berth_name.lower() not in ["unknown", "ei tiedossa", ""]:
-            destination_parts.append(berth_name)
-        destination = "/".join(destination_parts)
-
-        # Agent information
-        agent_name = digitraffic_data.get("agentName", "")
-        shipping_company = digitraffic_data.get("shippingCompany", "")
-        
-        # Format remarks based on available IMO
-        remarks_text = f"{vessel_name}"
-        if imo_lloyds:
-            remarks_text += f" (IMO: {imo_lloyds})"
-        remarks_text += f" {'port arrival ->' if xml_type == 'ATA' else '->'} {destination}"
-
-        # Create portman data structure with required fields for EMSWe conversion
-        portman_data = {
-            "document_id": f"MSGID-{port_call_id}",
-            "declaration_id": f"DECL-PT-{port_call_id}",
-            "timestamp": datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "call_id": str(port_call_id),
-            "remarks": remarks_text,
-
-            # Required fields for ArrivalTransportEvent
-            "arrival_datetime": ata or formatted_eta or datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "location": port_to_visit,  # Use validated port code here
-
-            # Required field for CallTransportEvent
-            "call_datetime": ata or formatted_eta or datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "anchorage_indicator": "0",
-            
-            # Add original ETA and ETD for XML
-            "eta": formatted_eta or eta,
-            "etd": formatted_etd or etd,
-            
-            # Add standardized port and berth codes
-            "portToVisit": port_to_visit,
-            "portAreaCode": port_area_code,
-            "portAreaName": port_area_name,
-            "berthCode": berth_code,
-            "berthName": berth_name,
-
-            # Add vessel information directly - IMPORTANT for VID schema
-            "vesselName": vessel_name,
-            "mmsi": mmsi,
-            
-            # Pass radio call sign if available (for VID XML)
-            "radioCallSign": digitraffic_data.get("radioCallSign", ""),
-            
-            # Required declarant information
-            "declarant": {
-                "id": f"FI{imo_lloyds}" if imo_lloyds else "FI123456789012",
-                "name": agent_name or shipping_company or "Unknown Agent",
-                "role_code": "AG",
-                "contact": {
-                    "name": agent_name or "Port Agent",
-                    "phone": "+358-00-0000000",
-                    "email": "contact@example.com"
-                },
-                "address": {
-                    "postcode": "00000",
-                    "street": "Port Street",
-                    "city": "Port City",
-                    "country": "FI",
-                    "building": "1"
-                }
-            }
-        }
-        
-        # Only add IMO if it's valid (not None)
-        if imo_lloyds is not None:
-            portman_data["imoLloyds"] = imo_lloyds
-        
-        # Add passenger and crew counts if available (only if they have actual values)
-        if passengers_on_arrival is not None:
-            portman_data["passengersOnArrival"] = passengers_on_arrival
-            
-        if crew_on_arrival is not None:
-            portman_data["crewOnArrival"] = crew_on_arrival
-                
-        # Log the vessel info we're passing through
-        logger.info(f"Adapted Portman data contains vesselName: {portman_data.get('vesselName')}, imoLloyds: {portman_data.get('imoLloyds')}, mmsi: {portman_data.get('mmsi')}, eta: {portman_data.get('eta')}")
-
-        return portman_data
+        return adapter(digitraffic_data, now)
+    except Exception as e:
+        logger.error(f"Error adapting Digitraffic data: {str(e)}")
+        return {xml_type: _fallback_portman_data(digitraffic_data) for xml_type in xml_types}
+
 
+def _adapt(adapter: Callable[[Dict[str, Any], str], Dict[str, Any]], digitraffic_data: Dict[str, Any],
+           now: str) -> Dict[str, Any]:
+    try:
+        portman_data = adapter(digitraffic_data, now)
     except Exception as e:
         logger.error(f"Error adapting Digitraffic data: {str(e)}")
-        # Return minimal valid structure
-        return {
-            "document_id": f"MSGID-{datetime.now().timestamp()}",
-            "declaration_id": f"DECL-PT-{datetime.now().strftime('%y%m%d%H%M')}",
-            "timestamp": datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "call_id": f"CALL-{datetime.now().strftime('%Y%m%d')}-001",
-            "remarks": "Adapted from Digitraffic data",
-            "arrival_datetime": datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "location": "UNKNW",  # Ensure 5 characters
-            "call_datetime": datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "anchorage_indicator": "0",
-            "eta": digitraffic_data.get("eta", datetime.now().strftime("%Y-%m-%dT%H:%M:%S.000Z")),
-            "portToVisit": "PORTX",
-            "portAreaCode": "",  # Allow empty value 
-            "portAreaName": "Unknown Area",
-            "berthCode": "",  # Allow empty value
-            "berthName": "Unknown Berth",
-            "vesselName": digitraffic_data.get("vesselName", "Unknown Vessel"),
-            # Do not include default IMO value for fallback
-            "mmsi": digitraffic_data.get("mmsi"),  # Include MMSI in fallback but no default
-            "radioCallSign": digitraffic_data.get("radioCallSign", ""),  # Include radio call sign in fallback
-            "declarant": {
-                "id": "FI123456789012",
-                "name": "Unknown Agent",
-                "role_code": "AG",
-                "contact": {
-                    "name": "Port Agent",
-                    "phone": "+358-00-0000000",
-                    "email": "contact@example.com"
-                },
-                "address": {
-                    "postcode": "00000",
-                    "street": "Port Street",
-                    "city": "Port City",
-                    "country": "FI",
-                    "building": "1"
-                }
-            }
+        return _fallback_portman_data(digitraffic_data)
+    log_event(logger, logging.DEBUG, "adapter.port_call", call_id=portman_data["call_id"],
+              vessel_name=portman_data["vesselName"], imo=portman_data.get("imoLloyds"), mmsi=portman_data["mmsi"],
+              eta=portman_data["eta"])
+    return portman_data
+
+
+def _fallback_portman_data(digitraffic_data: Any) -> Dict[str, Any]:
+    """Minimal valid Portman data for port call data that cannot be adapted."""
+    if not isinstance(digitraffic_data, dict):
+        digitraffic_data = {}
+    return {
+        "document_id": f"MSGID-{datetime.now().timestamp()}",
+        "declaration_id": f"DECL-PT-{datetime.now().strftime('%y%m%d%H%M')}",
+        "timestamp": _now_utc_string(),
+        "call_id": f"CALL-{datetime.now().strftime('%Y%m%d')}-001",
+        "remarks": "Adapted from Digitraffic data",
+        "arrival_datetime": _now_utc_string(),
+        "location": "UNKNW",  # Ensure 5 characters
+        "call_datetime": _now_utc_string(),
+        "anchorage_indicator": "0",
+        "eta": digitraffic_data.get("eta", datetime.now().strftime("%Y-%m-%dT%H:%M:%S.000Z")),
+        "portToVisit": "PORTX",
+        "portAreaCode": "",  # Allow empty value
+        "portAreaName": "Unknown Area",
+        "berthCode": "",  # Allow empty value
+        "berthName": "Unknown Berth",
+        "vesselName": digitraffic_data.get("vesselName", "Unknown Vessel"),
+        # Do not include default IMO value for fallback
+        "mmsi": digitraffic_data.get("mmsi"),  # Include MMSI in fallback but no default
+        "radioCallSign": digitraffic_data.get("radioCallSign", ""),  # Include radio call sign in fallback
+        "declarant": {
+            "id": DEFAULT_DECLARANT_ID,
+            "name": "Unknown Agent",
+            "role_code": "AG",
+            "contact": {
+                "name": "Port Agent",
+                "phone": "+358-00-0000000",
+                "email": "contact@example.com"
+            },
+            "address": dict(DECLARANT_ADDRESS)
         }
+    }
@@ -0,0 +1,1196 @@
+"""
+Validators of Portman data, generated from the EMSWe XSD schemas.
+
+Each function checks the Portman data values that the envelope templates put
+into the document as they are against the XSD facets of their elements, before
+any XML is built. Generated by `python -m PortmanXMLConverter.src.validator_codegen`
+from its DATA_FIELDS table; do not edit.
+
+STRUCTURAL_RULES applies the same checks to the elements of rendered documents
+(see validation_policy.StructuralValidator).
+"""
+
+import re
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+_MISSING = object()
+
+_WHITESPACE = re.compile(r"[\t\n\r ]+")
+_DECIMAL = re.compile(r"[+-]?(\d+(\.\d*)?|\.\d+)")
+_BOOLEAN = ("true", "false", "1", "0")
+
+
+def _lookup(portman_data: Dict[str, Any], key: Tuple[str, ...]) -> Any:
+    value = portman_data
+    for part in key:
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _collapse(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip(" ")
+
+
+def _digits(text: str) -> Tuple[int, int]:
+    """Total and fraction digits of a decimal, without insignificant zeros."""
+    integer, _, fraction = text.lstrip("+-").partition(".")
+    integer = integer.lstrip("0")
+    fraction = fraction.rstrip("0")
+    return len(integer) + len(fraction) or 1, len(fraction)
+
+
+_CODES_1 = frozenset([
+    'AD', 'AE', 'AF', 'AG', 'AI', 'AL', 'AM', 'AO', 'AQ', 'AR', 'AS', 'AT', 'AU', 'AW', 'AX', 'AZ',
+    'BA', 'BB', 'BD', 'BE', 'BF', 'BG', 'BH', 'BI', 'BJ', 'BL', 'BM', 'BN', 'BO', 'BQ', 'BR', 'BS',
+    'BT', 'BV', 'BW', 'BY', 'BZ', 'CA', 'CC', 'CD', 'CF', 'CG', 'CH', 'CI', 'CK', 'CL', 'CM', 'CN',
+    'CO', 'CR', 'CU', 'CV', 'CW', 'CX', 'CY', 'CZ', 'DE', 'DJ', 'DK', 'DM', 'DO', 'DZ', 'EC', 'EE',
+    'EG', 'EH', 'ER', 'ES', 'ET', 'FI', 'FJ', 'FK', 'FM', 'FO', 'FR', 'GA', 'GB', 'GD', 'GE', 'GF',
+    'GG', 'GH', 'GI', 'GL', 'GM', 'GN', 'GP', 'GQ', 'GR', 'GS', 'GT', 'GU', 'GW', 'GY', 'HK', 'HM',
+    'HN', 'HR', 'HT', 'HU', 'ID', 'IE', 'IL', 'IM', 'IN', 'IO', 'IQ', 'IR', 'IS', 'IT', 'JE', 'JM',
+    'JO', 'JP', 'KE', 'KG', 'KH', 'KI', 'KM', 'KN', 'KP', 'KR', 'KW', 'KY', 'KZ', 'LA', 'LB', 'LC',
+    'LI', 'LK', 'LR', 'LS', 'LT', 'LU', 'LV', 'LY', 'MA', 'MC', 'MD', 'ME', 'MF', 'MG', 'MH', 'MK',
+    'ML', 'MM', 'MN', 'MO', 'MP', 'MQ', 'MR', 'MS', 'MT', 'MU', 'MV', 'MW', 'MX', 'MY', 'MZ', 'NA',
+    'NC', 'NE', 'NF', 'NG', 'NI', 'NL', 'NO', 'NP', 'NR', 'NU', 'NZ', 'OM', 'PA', 'PE', 'PF', 'PG',
+    'PH', 'PK', 'PL', 'PM', 'PN', 'PR', 'PS', 'PT', 'PW', 'PY', 'QA', 'RE', 'RO', 'RS', 'RU', 'RW',
+    'SA', 'SB', 'SC', 'SD', 'SE', 'SG', 'SH', 'SI', 'SJ', 'SK', 'SL', 'SM', 'SN', 'SO', 'SR', 'SS',
+    'ST', 'SV', 'SX', 'SY', 'SZ', 'TC', 'TD', 'TF', 'TG', 'TH', 'TJ', 'TK', 'TL', 'TM', 'TN', 'TO',
+    'TR', 'TT', 'TV', 'TW', 'TZ', 'UA', 'UG', 'UM', 'US', 'UY', 'UZ', 'VA', 'VC', 'VE', 'VG', 'VI',
+    'VN', 'VU', 'WF', 'WS', 'YE', 'YT', 'ZA', 'ZM', 'ZW',
+])
+_PATTERN_1 = re.compile('1')
+_PATTERN_2 = re.compile('0')
+_CODES_2 = frozenset([
+    '1', '150', '1501', '1502', '1503', '1504', '1505', '1506', '151', '1511', '1512', '1513',
+    '1514', '1515', '1516', '1517', '1518', '1519', '152', '1521', '1522', '1523', '1524', '1525',
+    '153', '1531', '1532', '1533', '1534', '154', '1541', '1542', '1543', '155', '1551', '1552',
+    '1553', '157', '159', '1591', '1592', '1593', '1594', '160', '1601', '1602', '1603', '1604',
+    '1605', '1606', '1607', '170', '1711', '1712', '172', '1721', '1723', '1724', '1725', '1726',
+    '1727', '1728', '1729', '173', '174', '175', '1751', '1752', '1753', '176', '1761', '1762',
+    '1763', '1764', '1765', '1766', '177', '178', '1781', '1782', '180', '181', '182', '183', '184',
+    '185', '186', '187', '189', '190', '191', '192', '802', '8021', '8022', '8023', '803', '804',
+    '810', '811', '812', '813', '814', '815', '816', '8161', '8162', '8163', '817', '818', '821',
+    '822', '823', '824', '825', '826', '827', '828', '829', '831', '832', '833', '834', '835',
+    '836', '837', '838', '839', '840', '841', '842', '843', '844', '8441', '8442', '8443', '8444',
+    '8445', '8446', '8447', '8448', '845', '8451', '8452', '8453', '8454', '846', '847', '848',
+    '849', '850', '851',
+])
+
+
+def _check_token_max70(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if len(text) > 70:
+        return f"value has length {len(text)}, maximum is 70"
+    return None
+
+
+def _check_token_max22(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if len(text) > 22:
+        return f"value has length {len(text)}, maximum is 22"
+    return None
+
+
+def _check_token_max17(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if len(text) > 17:
+        return f"value has length {len(text)}, maximum is 17"
+    return None
+
+
+def _check_string_max70(text: str) -> Optional[str]:
+    if len(text) > 70:
+        return f"value has length {len(text)}, maximum is 70"
+    return None
+
+
+def _check_token_max3_codes(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if len(text) > 3:
+        return f"value has length {len(text)}, maximum is 3"
+    if text not in ('AG', 'CA', 'CPE', 'POA'):
+        return f"value '{text}' is not one of ['AG', 'CA', 'CPE', 'POA']"
+    return None
+
+
+def _check_string_max35(text: str) -> Optional[str]:
+    if len(text) > 35:
+        return f"value has length {len(text)}, maximum is 35"
+    return None
+
+
+def _check_token_max256(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if len(text) > 256:
+        return f"value has length {len(text)}, maximum is 256"
+    return None
+
+
+def _check_token_length2_codes(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if len(text) != 2:
+        return f"value '{text}' has length {len(text)}, expected 2"
+    if text not in _CODES_1:
+        return f"value '{text}' is not in the code list"
+    return None
+
+
+def _check_token_max35(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if len(text) > 35:
+        return f"value has length {len(text)}, maximum is 35"
+    return None
+
+
+def _check_string_max512(text: str) -> Optional[str]:
+    if len(text) > 512:
+        return f"value has length {len(text)}, maximum is 512"
+    return None
+
+
+def _check_boolean_pattern(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if text not in _BOOLEAN:
+        return f"value '{text}' is not a boolean"
+    if not _PATTERN_1.fullmatch(text) and not _PATTERN_2.fullmatch(text):
+        return f"value '{text}' does not match '1 | 0'"
+    return None
+
+
+def _check_token_max3_codes_2(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if len(text) > 3:
+        return f"value has length {len(text)}, maximum is 3"
+    if text not in ('ATA',):
+        return f"value '{text}' is not one of ['ATA']"
+    return None
+
+
+def _check_token_max3_codes_3(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if len(text) > 3:
+        return f"value has length {len(text)}, maximum is 3"
+    if text not in ('1', '9'):
+        return f"value '{text}' is not one of ['1', '9']"
+    return None
+
+
+def _check_string(text: str) -> Optional[str]:
+
+    return None
+
+
+def _check_token_length1_codes(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if len(text) != 1:
+        return f"value '{text}' has length {len(text)}, expected 1"
+    if text not in ('1',):
+        return f"value '{text}' is not one of ['1']"
+    return None
+
+
+def _check_string_max256(text: str) -> Optional[str]:
+    if len(text) > 256:
+        return f"value has length {len(text)}, maximum is 256"
+    return None
+
+
+def _check_token_max3(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if len(text) > 3:
+        return f"value has length {len(text)}, maximum is 3"
+    return None
+
+
+def _check_token_max4_codes(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if len(text) > 4:
+        return f"value has length {len(text)}, maximum is 4"
+    if text not in _CODES_2:
+        return f"value '{text}' is not in the code list"
+    return None
+
+
+def _check_token_length5(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if len(text) != 5:
+        return f"value '{text}' has length {len(text)}, expected 5"
+    return None
+
+
+def _check_token_max3_codes_4(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if len(text) > 3:
+        return f"value has length {len(text)}, maximum is 3"
+    if text not in ('NOA',):
+        return f"value '{text}' is not one of ['NOA']"
+    return None
+
+
+def _check_decimal_digits8(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if not _DECIMAL.fullmatch(text):
+        return f"value '{text}' is not a number"
+    if _digits(text)[0] > 8:
+        return f"value '{text}' has more than 8 digits"
+    if Decimal(text) <= Decimal('0'):
+        return f"value '{text}' is out of range (min_exclusive 0)"
+    return None
+
+
+def _check_decimal_digits4(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if not _DECIMAL.fullmatch(text):
+        return f"value '{text}' is not a number"
+    if _digits(text)[0] > 4:
+        return f"value '{text}' has more than 4 digits"
+    if Decimal(text) <= Decimal('0'):
+        return f"value '{text}' is out of range (min_exclusive 0)"
+    return None
+
+
+def _check_decimal_digits5(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if not _DECIMAL.fullmatch(text):
+        return f"value '{text}' is not a number"
+    if _digits(text)[0] > 5:
+        return f"value '{text}' has more than 5 digits"
+    return None
+
+
+def _check_token_max7(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if len(text) > 7:
+        return f"value has length {len(text)}, maximum is 7"
+    return None
+
+
+def _check_token_max3_codes_5(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if len(text) > 3:
+        return f"value has length {len(text)}, maximum is 3"
+    if text not in ('VID',):
+        return f"value '{text}' is not one of ['VID']"
+    return None
+
+
+def _check_token_length7(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if len(text) != 7:
+        return f"value '{text}' has length {len(text)}, expected 7"
+    return None
+
+
+def _check_token_length9(text: str) -> Optional[str]:
+    text = _collapse(text)
+    if len(text) != 9:
+        return f"value '{text}' has length {len(text)}, expected 9"
+    return None
+
+
+def validate_ata(portman_data: Dict[str, Any]) -> List[str]:
+    """Check Portman data against the ATA schema facets."""
+    errors = []
+
+    value = _lookup(portman_data, ('declarant',))
+    if value is not _MISSING and not isinstance(value, dict):
+        errors.append('declarant: value must be a dict')
+
+    value = _lookup(portman_data, ('declarant', 'address'))
+    if value is not _MISSING and not isinstance(value, dict):
+        errors.append('declarant.address: value must be a dict')
+
+    value = _lookup(portman_data, ('declarant', 'contact'))
+    if value is not _MISSING and not isinstance(value, dict):
+        errors.append('declarant.contact: value must be a dict')
+
+    # mai:MAI/mai:ExchangedDocument/ram:ID (token)
+    value = _lookup(portman_data, ('document_id',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('document_id: value must be a string')
+        else:
+            error = _check_token_max70(value)
+            if error:
+                errors.append('document_id: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:ID (token)
+    value = _lookup(portman_data, ('declaration_id',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declaration_id: value must be a string')
+        else:
+            error = _check_token_max22(value)
+            if error:
+                errors.append('declaration_id: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:ID (token)
+    value = _lookup(portman_data, ('declarant', 'id'))
+    if value is _MISSING:
+        errors.append('declarant.id: required value is missing')
+    else:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.id: value must be a string')
+        else:
+            error = _check_token_max17(value)
+            if error:
+                errors.append('declarant.id: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:Name (string)
+    value = _lookup(portman_data, ('declarant', 'name'))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.name: value must be a string')
+        else:
+            error = _check_string_max70(value)
+            if error:
+                errors.append('declarant.name: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:RoleCode (token)
+    value = _lookup(portman_data, ('declarant', 'role_code'))
+    if value is _MISSING:
+        errors.append('declarant.role_code: required value is missing')
+    else:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.role_code: value must be a string')
+        else:
+            error = _check_token_max3_codes(value)
+            if error:
+                errors.append('declarant.role_code: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:DefinedTradeContact/ram:PersonName (string)
+    value = _lookup(portman_data, ('declarant', 'contact', 'name'))
+    if value is _MISSING and isinstance(_lookup(portman_data, ('declarant', 'contact')), dict):
+        errors.append('declarant.contact.name: required value is missing')
+    elif value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.contact.name: value must be a string')
+        else:
+            error = _check_string_max70(value)
+            if error:
+                errors.append('declarant.contact.name: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:DefinedTradeContact/ram:TelephoneUniversalCommunication/ram:CompleteNumber (string)
+    value = _lookup(portman_data, ('declarant', 'contact', 'phone'))
+    if value is _MISSING and isinstance(_lookup(portman_data, ('declarant', 'contact')), dict):
+        errors.append('declarant.contact.phone: required value is missing')
+    elif value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.contact.phone: value must be a string')
+        else:
+            error = _check_string_max35(value)
+            if error:
+                errors.append('declarant.contact.phone: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:DefinedTradeContact/ram:EmailURIUniversalCommunication/ram:URIID (token)
+    value = _lookup(portman_data, ('declarant', 'contact', 'email'))
+    if value is _MISSING and isinstance(_lookup(portman_data, ('declarant', 'contact')), dict):
+        errors.append('declarant.contact.email: required value is missing')
+    elif value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.contact.email: value must be a string')
+        else:
+            error = _check_token_max256(value)
+            if error:
+                errors.append('declarant.contact.email: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:PostcodeCode (token)
+    value = _lookup(portman_data, ('declarant', 'address', 'postcode'))
+    if value is _MISSING and isinstance(_lookup(portman_data, ('declarant', 'address')), dict):
+        errors.append('declarant.address.postcode: required value is missing')
+    elif value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.address.postcode: value must be a string')
+        else:
+            error = _check_token_max17(value)
+            if error:
+                errors.append('declarant.address.postcode: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:StreetName (string)
+    value = _lookup(portman_data, ('declarant', 'address', 'street'))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.address.street: value must be a string')
+        else:
+            error = _check_string_max70(value)
+            if error:
+                errors.append('declarant.address.street: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:CityName (string)
+    value = _lookup(portman_data, ('declarant', 'address', 'city'))
+    if value is _MISSING and isinstance(_lookup(portman_data, ('declarant', 'address')), dict):
+        errors.append('declarant.address.city: required value is missing')
+    elif value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.address.city: value must be a string')
+        else:
+            error = _check_string_max35(value)
+            if error:
+                errors.append('declarant.address.city: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:CountryID (token)
+    value = _lookup(portman_data, ('declarant', 'address', 'country'))
+    if value is _MISSING and isinstance(_lookup(portman_data, ('declarant', 'address')), dict):
+        errors.append('declarant.address.country: required value is missing')
+    elif value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.address.country: value must be a string')
+        else:
+            error = _check_token_length2_codes(value)
+            if error:
+                errors.append('declarant.address.country: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:BuildingNumber (string)
+    value = _lookup(portman_data, ('declarant', 'address', 'building'))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.address.building: value must be a string')
+        else:
+            error = _check_string_max35(value)
+            if error:
+                errors.append('declarant.address.building: ' + error)
+
+    # mai:MAI/mai:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent/ram:ID (token)
+    value = _lookup(portman_data, ('call_id',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('call_id: value must be a string')
+        else:
+            error = _check_token_max35(value)
+            if error:
+                errors.append('call_id: ' + error)
+
+    # ata:ATA/ata:ExchangedDocument/ram:Remarks (string)
+    value = _lookup(portman_data, ('remarks',))
+    if value is _MISSING:
+        errors.append('remarks: required value is missing')
+    else:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('remarks: value must be a string')
+        else:
+            error = _check_string_max512(value)
+            if error:
+                errors.append('remarks: ' + error)
+
+    # ata:ATA/ata:SpecifiedLogisticsTransportMovement/ram:ArrivalTransportEvent/ram:OccurrenceLogisticsLocation/ram:ID (token)
+    value = _lookup(portman_data, ('location',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('location: value must be a string')
+        else:
+            error = _check_token_max70(value)
+            if error:
+                errors.append('location: ' + error)
+
+    # ata:ATA/ata:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent/ram:MaritimeAnchorageIndicator (boolean)
+    value = _lookup(portman_data, ('anchorage_indicator',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('anchorage_indicator: value must be a string')
+        else:
+            error = _check_boolean_pattern(value)
+            if error:
+                errors.append('anchorage_indicator: ' + error)
+
+    return errors
+
+
+def validate_noa(portman_data: Dict[str, Any]) -> List[str]:
+    """Check Portman data against the NOA schema facets."""
+    errors = []
+
+    value = _lookup(portman_data, ('declarant',))
+    if value is not _MISSING and not isinstance(value, dict):
+        errors.append('declarant: value must be a dict')
+
+    value = _lookup(portman_data, ('declarant', 'address'))
+    if value is not _MISSING and not isinstance(value, dict):
+        errors.append('declarant.address: value must be a dict')
+
+    value = _lookup(portman_data, ('declarant', 'contact'))
+    if value is not _MISSING and not isinstance(value, dict):
+        errors.append('declarant.contact: value must be a dict')
+
+    # mai:MAI/mai:ExchangedDocument/ram:ID (token)
+    value = _lookup(portman_data, ('document_id',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('document_id: value must be a string')
+        else:
+            error = _check_token_max70(value)
+            if error:
+                errors.append('document_id: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:ID (token)
+    value = _lookup(portman_data, ('declaration_id',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declaration_id: value must be a string')
+        else:
+            error = _check_token_max22(value)
+            if error:
+                errors.append('declaration_id: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:ID (token)
+    value = _lookup(portman_data, ('declarant', 'id'))
+    if value is _MISSING:
+        errors.append('declarant.id: required value is missing')
+    else:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.id: value must be a string')
+        else:
+            error = _check_token_max17(value)
+            if error:
+                errors.append('declarant.id: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:Name (string)
+    value = _lookup(portman_data, ('declarant', 'name'))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.name: value must be a string')
+        else:
+            error = _check_string_max70(value)
+            if error:
+                errors.append('declarant.name: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:RoleCode (token)
+    value = _lookup(portman_data, ('declarant', 'role_code'))
+    if value is _MISSING:
+        errors.append('declarant.role_code: required value is missing')
+    else:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.role_code: value must be a string')
+        else:
+            error = _check_token_max3_codes(value)
+            if error:
+                errors.append('declarant.role_code: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:DefinedTradeContact/ram:PersonName (string)
+    value = _lookup(portman_data, ('declarant', 'contact', 'name'))
+    if value is _MISSING and isinstance(_lookup(portman_data, ('declarant', 'contact')), dict):
+        errors.append('declarant.contact.name: required value is missing')
+    elif value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.contact.name: value must be a string')
+        else:
+            error = _check_string_max70(value)
+            if error:
+                errors.append('declarant.contact.name: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:DefinedTradeContact/ram:TelephoneUniversalCommunication/ram:CompleteNumber (string)
+    value = _lookup(portman_data, ('declarant', 'contact', 'phone'))
+    if value is _MISSING and isinstance(_lookup(portman_data, ('declarant', 'contact')), dict):
+        errors.append('declarant.contact.phone: required value is missing')
+    elif value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.contact.phone: value must be a string')
+        else:
+            error = _check_string_max35(value)
+            if error:
+                errors.append('declarant.contact.phone: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:DefinedTradeContact/ram:EmailURIUniversalCommunication/ram:URIID (token)
+    value = _lookup(portman_data, ('declarant', 'contact', 'email'))
+    if value is _MISSING and isinstance(_lookup(portman_data, ('declarant', 'contact')), dict):
+        errors.append('declarant.contact.email: required value is missing')
+    elif value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.contact.email: value must be a string')
+        else:
+            error = _check_token_max256(value)
+            if error:
+                errors.append('declarant.contact.email: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:PostcodeCode (token)
+    value = _lookup(portman_data, ('declarant', 'address', 'postcode'))
+    if value is _MISSING and isinstance(_lookup(portman_data, ('declarant', 'address')), dict):
+        errors.append('declarant.address.postcode: required value is missing')
+    elif value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.address.postcode: value must be a string')
+        else:
+            error = _check_token_max17(value)
+            if error:
+                errors.append('declarant.address.postcode: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:StreetName (string)
+    value = _lookup(portman_data, ('declarant', 'address', 'street'))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.address.street: value must be a string')
+        else:
+            error = _check_string_max70(value)
+            if error:
+                errors.append('declarant.address.street: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:CityName (string)
+    value = _lookup(portman_data, ('declarant', 'address', 'city'))
+    if value is _MISSING and isinstance(_lookup(portman_data, ('declarant', 'address')), dict):
+        errors.append('declarant.address.city: required value is missing')
+    elif value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.address.city: value must be a string')
+        else:
+            error = _check_string_max35(value)
+            if error:
+                errors.append('declarant.address.city: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:CountryID (token)
+    value = _lookup(portman_data, ('declarant', 'address', 'country'))
+    if value is _MISSING and isinstance(_lookup(portman_data, ('declarant', 'address')), dict):
+        errors.append('declarant.address.country: required value is missing')
+    elif value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.address.country: value must be a string')
+        else:
+            error = _check_token_length2_codes(value)
+            if error:
+                errors.append('declarant.address.country: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:BuildingNumber (string)
+    value = _lookup(portman_data, ('declarant', 'address', 'building'))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.address.building: value must be a string')
+        else:
+            error = _check_string_max35(value)
+            if error:
+                errors.append('declarant.address.building: ' + error)
+
+    # mai:MAI/mai:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent/ram:ID (token)
+    value = _lookup(portman_data, ('call_id',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('call_id: value must be a string')
+        else:
+            error = _check_token_max35(value)
+            if error:
+                errors.append('call_id: ' + error)
+
+    # noa:NOA/noa:ExchangedDocument/ram:Remarks (string)
+    value = _lookup(portman_data, ('remarks',))
+    if value is not _MISSING:
+        value = value if isinstance(value, str) else ''
+        error = _check_string_max512(value)
+        if error:
+            errors.append('remarks: ' + error)
+
+    # noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:ModeCode (token)
+    value = _lookup(portman_data, ('mode_code',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('mode_code: value must be a string')
+        else:
+            error = _check_token_length1_codes(value)
+            if error:
+                errors.append('mode_code: ' + error)
+
+    # noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:ID (token)
+    value = _lookup(portman_data, ('voyage_id',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('voyage_id: value must be a string')
+        else:
+            error = _check_token_max17(value)
+            if error:
+                errors.append('voyage_id: ' + error)
+
+    # noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:ID (token)
+    value = _lookup(portman_data, ('call_id',))
+    if value is not _MISSING and _lookup(portman_data, ('voyage_id',)) is _MISSING:
+        value = 'VYG-{}'.format(value)
+        error = _check_token_max17(value)
+        if error:
+            errors.append('call_id (default of voyage_id): ' + error)
+
+    # noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:CargoDescription (string)
+    value = _lookup(portman_data, ('cargo_description',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('cargo_description: value must be a string')
+        else:
+            error = _check_string_max256(value)
+            if error:
+                errors.append('cargo_description: ' + error)
+
+    # noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:DangerousGoodsIndicator (boolean)
+    value = _lookup(portman_data, ('dangerous_goods_indicator',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('dangerous_goods_indicator: value must be a string')
+        else:
+            error = _check_boolean_pattern(value)
+            if error:
+                errors.append('dangerous_goods_indicator: ' + error)
+
+    # noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:CallPurposeCode (token)
+    value = _lookup(portman_data, ('call_purpose_code',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('call_purpose_code: value must be a string')
+        else:
+            error = _check_token_max3(value)
+            if error:
+                errors.append('call_purpose_code: ' + error)
+
+    # noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:RegularServiceIndicator (boolean)
+    value = _lookup(portman_data, ('regular_service_indicator',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('regular_service_indicator: value must be a string')
+        else:
+            error = _check_boolean_pattern(value)
+            if error:
+                errors.append('regular_service_indicator: ' + error)
+
+    # noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:FoundStowawayIndicator (boolean)
+    value = _lookup(portman_data, ('found_stowaway_indicator',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('found_stowaway_indicator: value must be a string')
+        else:
+            error = _check_boolean_pattern(value)
+            if error:
+                errors.append('found_stowaway_indicator: ' + error)
+
+    # noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:UsedLogisticsTransportMeans/ram:TypeCode (token)
+    value = _lookup(portman_data, ('vesselTypeCode',))
+    if value is not _MISSING and any(key in portman_data for key in ('imoLloyds', 'vesselName')):
+        value = str(value)
+        error = _check_token_max4_codes(value)
+        if error:
+            errors.append('vesselTypeCode: ' + error)
+
+    # noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:UsedLogisticsTransportMeans/ram:RegistrationTransportEvent/ram:ID (token)
+    value = _lookup(portman_data, ('imoLloyds',))
+    if value is not _MISSING:
+        value = str(value)
+        if value not in ('0', 'None'):
+            error = _check_token_max35(value)
+            if error:
+                errors.append('imoLloyds: ' + error)
+
+    # noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:UsedLogisticsTransportMeans/ram:ShipCompanyTradeParty/ram:Name (string)
+    value = _lookup(portman_data, ('shippingCompany',))
+    if value is not _MISSING and any(key in portman_data for key in ('imoLloyds', 'vesselName')):
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('shippingCompany: value must be a string')
+        else:
+            error = _check_string_max70(value)
+            if error:
+                errors.append('shippingCompany: ' + error)
+
+    # noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:ItineraryTransportRoute/ram:ItineraryStopTransportEvent/ram:OccurrenceLogisticsLocation/ram:ID (token)
+    value = _lookup(portman_data, ('portToVisit',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('portToVisit: value must be a string')
+        else:
+            error = _check_token_length5(value)
+            if error:
+                errors.append('portToVisit: ' + error)
+
+    # noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:ItineraryTransportRoute/ram:ItineraryStopTransportEvent/ram:OccurrenceLogisticsLocation/ram:ID (token)
+    value = _lookup(portman_data, ('location',))
+    if value is not _MISSING and _lookup(portman_data, ('portToVisit',)) is _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('location (default of portToVisit): value must be a string')
+        else:
+            error = _check_token_length5(value)
+            if error:
+                errors.append('location (default of portToVisit): ' + error)
+
+    # noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent/ram:ExpectedArrivalPortAreaRelatedLogisticsLocation/ram:Name (string)
+    value = _lookup(portman_data, ('berthName',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('berthName: value must be a string')
+        else:
+            error = _check_string_max70(value)
+            if error:
+                errors.append('berthName: ' + error)
+
+    # noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent/ram:ExpectedArrivalPortAreaRelatedLogisticsLocation/ram:Name (string)
+    value = _lookup(portman_data, ('berthCode',))
+    if value is not _MISSING and _lookup(portman_data, ('berthName',)) is _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('berthCode (default of berthName): value must be a string')
+        else:
+            error = _check_string_max70(value)
+            if error:
+                errors.append('berthCode (default of berthName): ' + error)
+
+    return errors
+
+
+def validate_vid(portman_data: Dict[str, Any]) -> List[str]:
+    """Check Portman data against the VID schema facets."""
+    errors = []
+
+    value = _lookup(portman_data, ('declarant',))
+    if value is not _MISSING and not isinstance(value, dict):
+        errors.append('declarant: value must be a dict')
+
+    value = _lookup(portman_data, ('declarant', 'address'))
+    if value is not _MISSING and not isinstance(value, dict):
+        errors.append('declarant.address: value must be a dict')
+
+    value = _lookup(portman_data, ('declarant', 'contact'))
+    if value is not _MISSING and not isinstance(value, dict):
+        errors.append('declarant.contact: value must be a dict')
+
+    # mai:MAI/mai:ExchangedDocument/ram:ID (token)
+    value = _lookup(portman_data, ('document_id',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('document_id: value must be a string')
+        else:
+            error = _check_token_max70(value)
+            if error:
+                errors.append('document_id: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:ID (token)
+    value = _lookup(portman_data, ('declaration_id',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declaration_id: value must be a string')
+        else:
+            error = _check_token_max22(value)
+            if error:
+                errors.append('declaration_id: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:ID (token)
+    value = _lookup(portman_data, ('declarant', 'id'))
+    if value is _MISSING:
+        errors.append('declarant.id: required value is missing')
+    else:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.id: value must be a string')
+        else:
+            error = _check_token_max17(value)
+            if error:
+                errors.append('declarant.id: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:Name (string)
+    value = _lookup(portman_data, ('declarant', 'name'))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.name: value must be a string')
+        else:
+            error = _check_string_max70(value)
+            if error:
+                errors.append('declarant.name: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:RoleCode (token)
+    value = _lookup(portman_data, ('declarant', 'role_code'))
+    if value is _MISSING:
+        errors.append('declarant.role_code: required value is missing')
+    else:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.role_code: value must be a string')
+        else:
+            error = _check_token_max3_codes(value)
+            if error:
+                errors.append('declarant.role_code: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:DefinedTradeContact/ram:PersonName (string)
+    value = _lookup(portman_data, ('declarant', 'contact', 'name'))
+    if value is _MISSING and isinstance(_lookup(portman_data, ('declarant', 'contact')), dict):
+        errors.append('declarant.contact.name: required value is missing')
+    elif value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.contact.name: value must be a string')
+        else:
+            error = _check_string_max70(value)
+            if error:
+                errors.append('declarant.contact.name: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:DefinedTradeContact/ram:TelephoneUniversalCommunication/ram:CompleteNumber (string)
+    value = _lookup(portman_data, ('declarant', 'contact', 'phone'))
+    if value is _MISSING and isinstance(_lookup(portman_data, ('declarant', 'contact')), dict):
+        errors.append('declarant.contact.phone: required value is missing')
+    elif value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.contact.phone: value must be a string')
+        else:
+            error = _check_string_max35(value)
+            if error:
+                errors.append('declarant.contact.phone: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:DefinedTradeContact/ram:EmailURIUniversalCommunication/ram:URIID (token)
+    value = _lookup(portman_data, ('declarant', 'contact', 'email'))
+    if value is _MISSING and isinstance(_lookup(portman_data, ('declarant', 'contact')), dict):
+        errors.append('declarant.contact.email: required value is missing')
+    elif value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.contact.email: value must be a string')
+        else:
+            error = _check_token_max256(value)
+            if error:
+                errors.append('declarant.contact.email: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:PostcodeCode (token)
+    value = _lookup(portman_data, ('declarant', 'address', 'postcode'))
+    if value is _MISSING and isinstance(_lookup(portman_data, ('declarant', 'address')), dict):
+        errors.append('declarant.address.postcode: required value is missing')
+    elif value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.address.postcode: value must be a string')
+        else:
+            error = _check_token_max17(value)
+            if error:
+                errors.append('declarant.address.postcode: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:StreetName (string)
+    value = _lookup(portman_data, ('declarant', 'address', 'street'))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.address.street: value must be a string')
+        else:
+            error = _check_string_max70(value)
+            if error:
+                errors.append('declarant.address.street: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:CityName (string)
+    value = _lookup(portman_data, ('declarant', 'address', 'city'))
+    if value is _MISSING and isinstance(_lookup(portman_data, ('declarant', 'address')), dict):
+        errors.append('declarant.address.city: required value is missing')
+    elif value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.address.city: value must be a string')
+        else:
+            error = _check_string_max35(value)
+            if error:
+                errors.append('declarant.address.city: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:CountryID (token)
+    value = _lookup(portman_data, ('declarant', 'address', 'country'))
+    if value is _MISSING and isinstance(_lookup(portman_data, ('declarant', 'address')), dict):
+        errors.append('declarant.address.country: required value is missing')
+    elif value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.address.country: value must be a string')
+        else:
+            error = _check_token_length2_codes(value)
+            if error:
+                errors.append('declarant.address.country: ' + error)
+
+    # mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:BuildingNumber (string)
+    value = _lookup(portman_data, ('declarant', 'address', 'building'))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('declarant.address.building: value must be a string')
+        else:
+            error = _check_string_max35(value)
+            if error:
+                errors.append('declarant.address.building: ' + error)
+
+    # vid:VID/vid:SpecifiedLogisticsTransportMovement/ram:UsedLogisticsTransportMeans/ram:Name (string)
+    value = _lookup(portman_data, ('vesselName',))
+    if value is not _MISSING:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('vesselName: value must be a string')
+        else:
+            error = _check_string_max70(value)
+            if error:
+                errors.append('vesselName: ' + error)
+
+    # vid:VID/vid:SpecifiedLogisticsTransportMovement/ram:UsedLogisticsTransportMeans/ram:TypeCode
+    value = _lookup(portman_data, ('vesselTypeCode',))
+    if value is not _MISSING:
+        errors.append('vesselTypeCode: element vid:SpecifiedLogisticsTransportMovement/ram:UsedLogisticsTransportMeans/ram:TypeCode is not allowed by the VID schema')
+
+    # vid:VID/vid:SpecifiedLogisticsTransportMovement/ram:UsedLogisticsTransportMeans/ram:CallSignID (token)
+    value = _lookup(portman_data, ('radioCallSign',))
+    if value is not _MISSING and value:
+        if not isinstance(value, str):
+            errors.append('radioCallSign: value must be a string')
+        else:
+            value = value.strip()
+            if value not in ('',):
+                error = _check_token_max7(value)
+                if error:
+                    errors.append('radioCallSign: ' + error)
+
+    # vid:VID/vid:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent/ram:OccurrenceLogisticsLocation/ram:ID (token)
+    value = _lookup(portman_data, ('portToVisit',))
+    if value is not _MISSING and value:
+        value = '' if value is None else value
+        if not isinstance(value, str):
+            errors.append('portToVisit: value must be a string')
+        else:
+            error = _check_token_length5(value)
+            if error:
+                errors.append('portToVisit: ' + error)
+
+    return errors
+
+
+VALIDATORS = {
+    'ATA': validate_ata,
+    'NOA': validate_noa,
+    'VID': validate_vid,
+}
+
+# Rules for rendered documents: (element path relative to the Envelope, required, check of the element text)
+STRUCTURAL_RULES = {
+    'ATA': (
+        ('mai:MAI/mai:ExchangedDocument/ram:TypeCode', True, _check_token_max3_codes_2),
+        ('mai:MAI/mai:ExchangedDocument/ram:PurposeCode', True, _check_token_max3_codes_3),
+        ('mai:MAI/mai:ExchangedDocument/ram:VersionID', True, _check_token_max17),
+        ('mai:MAI/mai:ExchangedDocument/ram:FirstSignatoryDocumentAuthentication/ram:ActualDateTime/udt:DateTimeString', False, _check_string),
+        ('mai:MAI/mai:ExchangedDocument/ram:ID', True, _check_token_max70),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:ID', False, _check_token_max22),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:ID', True, _check_token_max17),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:Name', False, _check_string_max70),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:RoleCode', True, _check_token_max3_codes),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:DefinedTradeContact/ram:PersonName', False, _check_string_max70),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:DefinedTradeContact/ram:TelephoneUniversalCommunication/ram:CompleteNumber', False, _check_string_max35),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:DefinedTradeContact/ram:EmailURIUniversalCommunication/ram:URIID', False, _check_token_max256),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:PostcodeCode', False, _check_token_max17),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:StreetName', False, _check_string_max70),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:CityName', False, _check_string_max35),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:CountryID', False, _check_token_length2_codes),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:BuildingNumber', False, _check_string_max35),
+        ('mai:MAI/mai:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent/ram:ID', False, _check_token_max35),
+        ('ata:ATA/ata:ExchangedDocument/ram:Remarks', False, _check_string_max512),
+        ('ata:ATA/ata:SpecifiedLogisticsTransportMovement/ram:ArrivalTransportEvent/ram:OccurrenceLogisticsLocation/ram:ID', False, _check_token_max70),
+        ('ata:ATA/ata:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent/ram:MaritimeAnchorageIndicator', False, _check_boolean_pattern),
+    ),
+    'NOA': (
+        ('mai:MAI/mai:ExchangedDocument/ram:TypeCode', True, _check_token_max3_codes_4),
+        ('mai:MAI/mai:ExchangedDocument/ram:PurposeCode', True, _check_token_max3_codes_3),
+        ('mai:MAI/mai:ExchangedDocument/ram:VersionID', True, _check_token_max17),
+        ('mai:MAI/mai:ExchangedDocument/ram:FirstSignatoryDocumentAuthentication/ram:ActualDateTime/udt:DateTimeString', False, _check_string),
+        ('mai:MAI/mai:ExchangedDocument/ram:ID', True, _check_token_max70),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:ID', False, _check_token_max22),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:ID', True, _check_token_max17),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:Name', False, _check_string_max70),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:RoleCode', True, _check_token_max3_codes),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:DefinedTradeContact/ram:PersonName', False, _check_string_max70),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:DefinedTradeContact/ram:TelephoneUniversalCommunication/ram:CompleteNumber', False, _check_string_max35),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:DefinedTradeContact/ram:EmailURIUniversalCommunication/ram:URIID', False, _check_token_max256),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:PostcodeCode', False, _check_token_max17),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:StreetName', False, _check_string_max70),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:CityName', False, _check_string_max35),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:CountryID', False, _check_token_length2_codes),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:BuildingNumber', False, _check_string_max35),
+        ('mai:MAI/mai:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent/ram:ID', False, _check_token_max35),
+        ('noa:NOA/noa:ExchangedDocument/ram:Remarks', False, _check_string_max512),
+        ('noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:ModeCode', False, _check_token_length1_codes),
+        ('noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:ID', False, _check_token_max17),
+        ('noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:CargoDescription', False, _check_string_max256),
+        ('noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:DangerousGoodsIndicator', False, _check_boolean_pattern),
+        ('noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:CallPurposeCode', True, _check_token_max3),
+        ('noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:RegularServiceIndicator', False, _check_boolean_pattern),
+        ('noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:FoundStowawayIndicator', False, _check_boolean_pattern),
+        ('noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:UsedLogisticsTransportMeans/ram:TypeCode', False, _check_token_max4_codes),
+        ('noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:UsedLogisticsTransportMeans/ram:RegistrationTransportEvent/ram:ID', False, _check_token_max35),
+        ('noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:UsedLogisticsTransportMeans/ram:ShipCompanyTradeParty/ram:Name', False, _check_string_max70),
+        ('noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:ItineraryTransportRoute/ram:ItineraryStopTransportEvent/ram:OccurrenceLogisticsLocation/ram:ID', True, _check_token_length5),
+        ('noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent/ram:ExpectedArrivalPortAreaRelatedLogisticsLocation/ram:Name', False, _check_string_max70),
+        ('noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:PassengerQuantity', False, _check_decimal_digits8),
+        ('noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:CrewQuantity', False, _check_decimal_digits4),
+        ('noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:TotalOnboardPersonQuantity', False, _check_decimal_digits8),
+        ('noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:ItineraryTransportRoute/ram:ItineraryStopTransportEvent/ram:SequenceNumeric', True, _check_decimal_digits5),
+    ),
+    'VID': (
+        ('mai:MAI/mai:ExchangedDocument/ram:TypeCode', True, _check_token_max3_codes_5),
+        ('mai:MAI/mai:ExchangedDocument/ram:PurposeCode', True, _check_token_max3_codes_3),
+        ('mai:MAI/mai:ExchangedDocument/ram:VersionID', True, _check_token_max17),
+        ('mai:MAI/mai:ExchangedDocument/ram:FirstSignatoryDocumentAuthentication/ram:ActualDateTime/udt:DateTimeString', False, _check_string),
+        ('mai:MAI/mai:ExchangedDocument/ram:ID', True, _check_token_max70),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:ID', False, _check_token_max22),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:ID', True, _check_token_max17),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:Name', False, _check_string_max70),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:RoleCode', True, _check_token_max3_codes),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:DefinedTradeContact/ram:PersonName', False, _check_string_max70),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:DefinedTradeContact/ram:TelephoneUniversalCommunication/ram:CompleteNumber', False, _check_string_max35),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:DefinedTradeContact/ram:EmailURIUniversalCommunication/ram:URIID', False, _check_token_max256),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:PostcodeCode', False, _check_token_max17),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:StreetName', False, _check_string_max70),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:CityName', False, _check_string_max35),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:CountryID', False, _check_token_length2_codes),
+        ('mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/ram:PostalTradeAddress/ram:BuildingNumber', False, _check_string_max35),
+        ('vid:VID/vid:SpecifiedLogisticsTransportMovement/ram:UsedLogisticsTransportMeans/ram:Name', False, _check_string_max70),
+        ('vid:VID/vid:SpecifiedLogisticsTransportMovement/ram:UsedLogisticsTransportMeans/ram:CallSignID', False, _check_token_max7),
+        ('vid:VID/vid:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent/ram:OccurrenceLogisticsLocation/ram:ID', True, _check_token_length5),
+        ('vid:VID/vid:SpecifiedLogisticsTransportMovement/ram:UsedLogisticsTransportMeans/ram:IMONumberIndicator', True, _check_boolean_pattern),
+        ('vid:VID/vid:SpecifiedLogisticsTransportMovement/ram:UsedLogisticsTransportMeans/ram:IMOID', False, _check_token_length7),
+        ('vid:VID/vid:SpecifiedLogisticsTransportMovement/ram:UsedLogisticsTransportMeans/ram:MMSIID', False, _check_token_length9),
+    ),
+}
+
+
+def validate_portman_data(portman_data: Dict[str, Any], formality_type: str) -> List[str]:
+    """
+    Check Portman data against the schema facets of a formality type.
+
+    Args:
+        portman_data: Dictionary containing Portman agent data
+        formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+
+    Returns:
+        Error messages; empty if the data is valid or the type has no validator
+    """
+    validator = VALIDATORS.get(formality_type)
+    return validator(portman_data) if validator is not None else []
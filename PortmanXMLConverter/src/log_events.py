@@ -0,0 +1,227 @@
+"""
+Structured log events with lazy payload rendering, sampling and rate limits.
+
+An event is a dotted name and key=value fields, e.g.
+``converter.request formality_type=NOA call_id=3190880``. Nothing is formatted
+unless the logger is enabled for the level of the event, and payloads wrapped
+in LazyJSON are serialized only when a handler formats the record. Noisy events
+can be sampled or rate limited per event name from the environment.
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .converter_config import LOG_EVENT_SAMPLE_RATES, LOG_EVENT_RATE_LIMIT_PER_MINUTE, LOG_PAYLOAD_MAX_CHARS
+
+logger = logging.getLogger(__name__)
+
+
+class LazyJSON:
+    """
+    Payload rendered as JSON when the log record is formatted.
+    """
+
+    __slots__ = ("value", "max_chars")
+
+    def __init__(self, value: Any, max_chars: Optional[int] = None):
+        """
+        Initialize the payload.
+
+        Args:
+            value: JSON-serializable value; other values are rendered with str()
+            max_chars: Truncate longer renderings, 0 disables truncation
+                (defaults to LOG_PAYLOAD_MAX_CHARS)
+        """
+        self.value = value
+        self.max_chars = LOG_PAYLOAD_MAX_CHARS if max_chars is None else max_chars
+
+    def __str__(self) -> str:
+        text = json.dumps(self.value, default=str)
+        if self.max_chars and len(text) > self.max_chars:
+            return f"{text[:self.max_chars]}...<{len(text) - self.max_chars} more chars>"
+        return text
+
+    __repr__ = __str__
+
+
+class Lazy:
+    """
+    Field value computed by a callable when the log record is formatted.
+    """
+
+    __slots__ = ("func",)
+
+    def __init__(self, func: Callable[[], Any]):
+        self.func = func
+
+    def __str__(self) -> str:
+        return str(self.func())
+
+    __repr__ = __str__
+
+
+class _EventMessage:
+    """Log record message that renders the event and its fields once, on demand."""
+
+    __slots__ = ("event", "fields", "_text")
+
+    def __init__(self, event: str, fields: Dict[str, Any]):
+        self.event = event
+        self.fields = fields
+        self._text = None
+
+    def __str__(self) -> str:
+        # Every handler formats the record, the fields are rendered for the first one only
+        if self._text is None:
+            parts = [self.event]
+            for key, value in self.fields.items():
+                text = str(value)
+                if not text or (" " in text and not isinstance(value, LazyJSON)):
+                    text = json.dumps(text)
+                parts.append(f"{key}={text}")
+            self._text = " ".join(parts)
+        return self._text
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """
+    Parse sample rates in the format "event=rate,event=rate".
+
+    Args:
+        spec: Comma-separated assignments; "*" sets the rate of other events
+
+    Returns:
+        Dictionary {event: rate} with rates clamped to 0..1
+    """
+    rates = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        event, sep, rate = item.partition("=")
+        try:
+            if not sep:
+                raise ValueError("missing '='")
+            rates[event.strip()] = min(1.0, max(0.0, float(rate)))
+        except ValueError as e:
+            logger.warning(f"Ignoring invalid log sample rate '{item.strip()}': {str(e)}")
+    return rates
+
+
+class EventSampler:
+    """
+    Decides which events are emitted, by sample rate and by a per-minute limit.
+
+    Events suppressed by the rate limit are counted, and the count is added to
+    the next emitted record of the event as the field ``suppressed``.
+    """
+
+    def __init__(self, sample_rates: Optional[Dict[str, float]] = None, rate_limit_per_minute: int = 0,
+                 clock: Callable[[], float] = time.monotonic, random_source: Callable[[], float] = random.random):
+        """
+        Initialize the sampler.
+
+        Args:
+            sample_rates: Dictionary {event: rate}; "*" sets the default rate (1.0 if not given)
+            rate_limit_per_minute: Emitted records per event and minute, 0 disables the limit
+            clock: Monotonic time source in seconds
+            random_source: Function returning a float in [0, 1)
+        """
+        self.sample_rates = dict(sample_rates or {})
+        self.rate_limit_per_minute = rate_limit_per_minute
+        self._clock = clock
+        self._random = random_source
+        self._lock = threading.Lock()
+        # event -> [window start, records emitted in the window, records suppressed]
+        self._windows: Dict[str, list] = {}
+
+    def admit(self, event: str) -> Optional[int]:
+        """
+        Decide whether a record of an event is emitted.
+
+        Args:
+            event: Event name
+
+        Returns:
+            None if the record is dropped, otherwise the number of records
+            suppressed by the rate limit since the last emitted one
+        """
+        rate = self.sample_rates.get(event, self.sample_rates.get("*", 1.0))
+        if rate < 1.0 and self._random() >= rate:
+            return None
+        if not self.rate_limit_per_minute:
+            return 0
+
+        now = self._clock()
+        with self._lock:
+            window = self._windows.get(event)
+            if window is None or now - window[0] >= 60:
+                suppressed = window[2] if window else 0
+                self._windows[event] = [now, 1, 0]
+                return suppressed
+            if window[1] >= self.rate_limit_per_minute:
+                window[2] += 1
+                return None
+            window[1] += 1
+            suppressed, window[2] = window[2], 0
+            return suppressed
+
+
+_default_sampler: Optional[EventSampler] = None
+
+
+def get_event_sampler() -> EventSampler:
+    """
+    Get the process-wide event sampler configured from the environment.
+
+    Returns:
+        EventSampler instance shared by all log_event calls in the process
+    """
+    global _default_sampler
+    if _default_sampler is None:
+        _default_sampler = EventSampler(parse_sample_rates(LOG_EVENT_SAMPLE_RATES), LOG_EVENT_RATE_LIMIT_PER_MINUTE)
+    return _default_sampler
+
+
+def set_event_sampler(sampler: Optional[EventSampler]) -> None:
+    """
+    Replace the process-wide event sampler.
+
+    Args:
+        sampler: Sampler to use, or None to configure a new one from the environment
+    """
+    global _default_sampler
+    _default_sampler = sampler
+
+
+def log_event(log: logging.Logger, level: int, event: str, **fields: Any) -> bool:
+    """
+    Log a structured event.
+
+    The level check comes first, so a disabled event costs one method call.
+    Field values are converted to text only when the record is formatted; wrap
+    expensive values in LazyJSON or Lazy rather than formatting them here.
+    The fields are also attached to the record as ``event`` and ``event_fields``
+    for handlers that ship structured logs.
+
+    Args:
+        log: Logger to emit the record on
+        level: Logging level of the event
+        event: Dotted event name used for sampling and rate limits
+        **fields: Event fields
+
+    Returns:
+        True if the record was emitted
+    """
+    if not log.isEnabledFor(level):
+        return False
+    suppressed = get_event_sampler().admit(event)
+    if suppressed is None:
+        return False
+    if suppressed:
+        fields["suppressed"] = suppressed
+    log.log(level, _EventMessage(event, fields), extra={"event": event, "event_fields": fields})
+    return True
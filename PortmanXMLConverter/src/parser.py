@@ -5,12 +5,138 @@ XML parser module for EMSWe-compliant XML documents.
 import os
 import logging
 from lxml import etree
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, Optional, Tuple, Union
 
 from .converter_config import NAMESPACES
+from .serialization import decompress_xml
 
 logger = logging.getLogger(__name__)
 
+
+def _first(path: str) -> etree.XPath:
+    """Compile an XPath selecting the first match of `path` in document order, like Element.find."""
+    return etree.XPath(f"({path})[1]", namespaces=NAMESPACES)
+
+
+def _fields(*fields: Tuple[str, str]) -> Tuple[Tuple[str, etree.XPath], ...]:
+    return tuple((key, _first(path)) for key, path in fields)
+
+
+# Precompiled XPath expressions, evaluated relative to the element named in the comment
+
+# Envelope
+_MAI = _first(".//mai:MAI")
+_TYPE_CODE = _first("mai:MAI/mai:ExchangedDocument/ram:TypeCode")
+
+# MAI element
+_MAI_FIELDS = _fields(
+    ("document_id", ".//ram:ID"),
+    ("type_code", ".//ram:TypeCode"),
+    ("purpose_code", ".//ram:PurposeCode"),
+    ("version_id", ".//ram:VersionID"),
+    ("timestamp", ".//udt:DateTimeString"),
+    ("declaration_id", ".//mai:ExchangedDeclaration/ram:ID"),
+)
+_DECLARANT = _first(".//ram:DeclarantTradeParty")
+_CALL_ID = _first(".//mai:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent/ram:ID")
+
+# DeclarantTradeParty element
+_DECLARANT_FIELDS = _fields(
+    ("id", ".//ram:ID"),
+    ("name", ".//ram:Name"),
+    ("role_code", ".//ram:RoleCode"),
+)
+_CONTACT = _first(".//ram:DefinedTradeContact")
+_ADDRESS = _first(".//ram:PostalTradeAddress")
+
+# DefinedTradeContact element
+_CONTACT_FIELDS = _fields(
+    ("name", ".//ram:PersonName"),
+    ("phone", ".//ram:TelephoneUniversalCommunication/ram:CompleteNumber"),
+    ("email", ".//ram:EmailURIUniversalCommunication/ram:URIID"),
+)
+
+# PostalTradeAddress element
+_ADDRESS_FIELDS = _fields(
+    ("postcode", ".//ram:PostcodeCode"),
+    ("street", ".//ram:StreetName"),
+    ("city", ".//ram:CityName"),
+    ("country", ".//ram:CountryID"),
+    ("building", ".//ram:BuildingNumber"),
+)
+
+# Formality element, per formality type
+_ATA_ARRIVAL_EVENT = "(.//ata:SpecifiedLogisticsTransportMovement/ram:ArrivalTransportEvent)[1]"
+_ATA_CALL_EVENT = "(.//ata:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent)[1]"
+_FORMALITY_FIELDS = {
+    "ATA": _fields(
+        ("remarks", ".//ram:Remarks"),
+        ("arrival_datetime", f"{_ATA_ARRIVAL_EVENT}//qdt:DateTimeString"),
+        ("location", f"{_ATA_ARRIVAL_EVENT}//ram:OccurrenceLogisticsLocation/ram:ID"),
+        ("call_datetime", f"{_ATA_CALL_EVENT}//qdt:DateTimeString"),
+        ("anchorage_indicator", f"{_ATA_CALL_EVENT}//ram:MaritimeAnchorageIndicator"),
+    ),
+}
+_FORMALITY_ELEMENTS = {}
+
+
+def _formality_element_xpath(formality_type: str) -> etree.XPath:
+    xpath = _FORMALITY_ELEMENTS.get(formality_type)
+    if xpath is None:
+        xpath = _FORMALITY_ELEMENTS[formality_type] = _first(f".//{formality_type.lower()}:{formality_type}")
+    return xpath
+
+
+def detect_formality_type(xml_root: etree._Element) -> Optional[str]:
+    """
+    Detect the formality type of an EMSWe document.
+
+    The type is read from the MAI ExchangedDocument TypeCode; documents without
+    one fall back to the name of the first envelope element that is not MAI.
+
+    Args:
+        xml_root: Root element of the XML document
+
+    Returns:
+        Formality type (e.g., "ATA", "NOA", "VID"), or None if it cannot be detected
+    """
+    result = _TYPE_CODE(xml_root)
+    if result and result[0].text and result[0].text.strip():
+        return result[0].text.strip()
+
+    for child in xml_root:
+        if not isinstance(child.tag, str):
+            continue
+        tag = etree.QName(child).localname
+        if tag != "MAI":
+            return tag
+    return None
+
+
+def _find(xpath: etree.XPath, element: etree._Element) -> Optional[etree._Element]:
+    result = xpath(element)
+    return result[0] if result else None
+
+
+def _found_texts(element: etree._Element, fields: Tuple[Tuple[str, etree.XPath], ...]) -> Dict[str, Any]:
+    """Text of each field found below `element`; fields that are not found are left out."""
+    data = {}
+    for key, xpath in fields:
+        result = xpath(element)
+        if result:
+            data[key] = result[0].text
+    return data
+
+
+def _texts(element: etree._Element, fields: Tuple[Tuple[str, etree.XPath], ...]) -> Dict[str, Any]:
+    """Text of each field below `element`, None for fields that are not found."""
+    data = {}
+    for key, xpath in fields:
+        result = xpath(element)
+        data[key] = result[0].text if result else None
+    return data
+
+
 class XMLParser:
     """
     Parser for EMSWe-compliant XML documents.
@@ -48,12 +174,14 @@ class XMLParser:
         Parse XML content from a string or bytes.
 
         Args:
-            xml_content: XML content as string or bytes
+            xml_content: XML content as string or bytes (plain or gzip-compressed)
 
         Returns:
             Parsed XML as lxml Element or None if parsing fails
         """
         try:
+            if isinstance(xml_content, bytes):
+                xml_content = decompress_xml(xml_content)
             parser = etree.XMLParser(remove_blank_text=True)
             return etree.fromstring(xml_content, parser)
         except Exception as e:
@@ -85,14 +213,13 @@ class XMLParser:
                     break
 
             # Extract MAI data
-            mai_element = xml_root.find(".//mai:MAI", namespaces=self.namespaces)
+            mai_element = _find(_MAI, xml_root)
             if mai_element is not None:
                 result["mai_data"] = self._extract_mai_data(mai_element)
 
             # Extract formality-specific data (e.g., ATA)
             if result["document_type"]:
-                formality_element = xml_root.find(f".//{result['document_type'].lower()}:{result['document_type']}",
-                                                  namespaces=self.namespaces)
+                formality_element = _find(_formality_element_xpath(result["document_type"]), xml_root)
                 if formality_element is not None:
                     result["formality_data"] = self._extract_formality_data(formality_element, result["document_type"])
 
@@ -114,68 +241,26 @@ class XMLParser:
         mai_data = {}
 
         try:
-            # Extract document ID
-            doc_id = mai_element.find(".//ram:ID", namespaces=self.namespaces)
-            if doc_id is not None:
-                mai_data["document_id"] = doc_id.text
-
-            # Extract document type code
-            type_code = mai_element.find(".//ram:TypeCode", namespaces=self.namespaces)
-            if type_code is not None:
-                mai_data["type_code"] = type_code.text
-
-            # Extract purpose code
-            purpose_code = mai_element.find(".//ram:PurposeCode", namespaces=self.namespaces)
-            if purpose_code is not None:
-                mai_data["purpose_code"] = purpose_code.text
-
-            # Extract version ID
-            version_id = mai_element.find(".//ram:VersionID", namespaces=self.namespaces)
-            if version_id is not None:
-                mai_data["version_id"] = version_id.text
-
-            # Extract timestamp
-            timestamp = mai_element.find(".//udt:DateTimeString", namespaces=self.namespaces)
-            if timestamp is not None:
-                mai_data["timestamp"] = timestamp.text
-
-            # Extract declaration ID
-            decl_id = mai_element.find(".//mai:ExchangedDeclaration/ram:ID", namespaces=self.namespaces)
-            if decl_id is not None:
-                mai_data["declaration_id"] = decl_id.text
+            # Extract document ID, type and purpose codes, version, timestamp and declaration ID
+            mai_data.update(_found_texts(mai_element, _MAI_FIELDS))
 
             # Extract declarant info
-            declarant = mai_element.find(".//ram:DeclarantTradeParty", namespaces=self.namespaces)
+            declarant = _find(_DECLARANT, mai_element)
             if declarant is not None:
-                mai_data["declarant"] = {
-                    "id": self._get_element_text(declarant, ".//ram:ID"),
-                    "name": self._get_element_text(declarant, ".//ram:Name"),
-                    "role_code": self._get_element_text(declarant, ".//ram:RoleCode"),
-                }
+                mai_data["declarant"] = _texts(declarant, _DECLARANT_FIELDS)
 
                 # Extract contact info
-                contact = declarant.find(".//ram:DefinedTradeContact", namespaces=self.namespaces)
+                contact = _find(_CONTACT, declarant)
                 if contact is not None:
-                    mai_data["declarant"]["contact"] = {
-                        "name": self._get_element_text(contact, ".//ram:PersonName"),
-                        "phone": self._get_element_text(contact, ".//ram:TelephoneUniversalCommunication/ram:CompleteNumber"),
-                        "email": self._get_element_text(contact, ".//ram:EmailURIUniversalCommunication/ram:URIID"),
-                    }
+                    mai_data["declarant"]["contact"] = _texts(contact, _CONTACT_FIELDS)
 
                 # Extract address
-                address = declarant.find(".//ram:PostalTradeAddress", namespaces=self.namespaces)
+                address = _find(_ADDRESS, declarant)
                 if address is not None:
-                    mai_data["declarant"]["address"] = {
-                        "postcode": self._get_element_text(address, ".//ram:PostcodeCode"),
-                        "street": self._get_element_text(address, ".//ram:StreetName"),
-                        "city": self._get_element_text(address, ".//ram:CityName"),
-                        "country": self._get_element_text(address, ".//ram:CountryID"),
-                        "building": self._get_element_text(address, ".//ram:BuildingNumber"),
-                    }
+                    mai_data["declarant"]["address"] = _texts(address, _ADDRESS_FIELDS)
 
             # Extract call ID
-            call_event = mai_element.find(".//mai:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent/ram:ID",
-                                          namespaces=self.namespaces)
+            call_event = _find(_CALL_ID, mai_element)
             if call_event is not None:
                 mai_data["call_id"] = call_event.text
 
@@ -195,49 +280,12 @@ class XMLParser:
         Returns:
             Dictionary containing formality data
         """
-        formality_data = {}
-
         try:
-            if formality_type == "ATA":
-                # Extract remarks
-                remarks = formality_element.find(".//ram:Remarks", namespaces=self.namespaces)
-                if remarks is not None:
-                    formality_data["remarks"] = remarks.text
-
-                # Extract arrival event data
-                arrival_event = formality_element.find(".//ata:SpecifiedLogisticsTransportMovement/ram:ArrivalTransportEvent",
-                                                       namespaces=self.namespaces)
-                if arrival_event is not None:
-                    # Extract arrival date/time
-                    arrival_datetime = arrival_event.find(".//qdt:DateTimeString", namespaces=self.namespaces)
-                    if arrival_datetime is not None:
-                        formality_data["arrival_datetime"] = arrival_datetime.text
-
-                    # Extract location
-                    location = arrival_event.find(".//ram:OccurrenceLogisticsLocation/ram:ID", namespaces=self.namespaces)
-                    if location is not None:
-                        formality_data["location"] = location.text
-
-                # Extract call event data
-                call_event = formality_element.find(".//ata:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent",
-                                                    namespaces=self.namespaces)
-                if call_event is not None:
-                    # Extract call arrival date/time
-                    call_datetime = call_event.find(".//qdt:DateTimeString", namespaces=self.namespaces)
-                    if call_datetime is not None:
-                        formality_data["call_datetime"] = call_datetime.text
-
-                    # Extract anchorage indicator
-                    anchorage = call_event.find(".//ram:MaritimeAnchorageIndicator", namespaces=self.namespaces)
-                    if anchorage is not None:
-                        formality_data["anchorage_indicator"] = anchorage.text
-
-            # Add support for other formality types as needed
-
-            return formality_data
+            # Add support for other formality types to _FORMALITY_FIELDS as needed
+            return _found_texts(formality_element, _FORMALITY_FIELDS.get(formality_type, ()))
         except Exception as e:
             logger.error(f"Error extracting {formality_type} data: {str(e)}")
-            return formality_data
+            return {}
 
     def _get_element_text(self, parent: etree._Element, xpath: str) -> Optional[str]:
         """
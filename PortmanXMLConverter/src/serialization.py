@@ -0,0 +1,75 @@
+"""
+Serialization of EMSWe XML documents for storage and transfer.
+
+Documents are serialized pretty-printed for people or compact (without
+indentation) for machine consumers, and can be gzip-compressed for storage
+with the blob's Content-Encoding set to gzip. Readers pass stored content
+through `decompress_xml`, which recognizes gzip by its magic bytes, so
+compressed and plain documents are read the same way.
+"""
+
+import gzip
+from typing import Optional, Tuple, Union
+
+from lxml import etree
+
+XML_CONTENT_TYPE = "application/xml"
+GZIP_CONTENT_ENCODING = "gzip"
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def serialize_xml(xml_root: etree._Element, pretty_print: bool = True) -> str:
+    """
+    Serialize an XML document with an XML declaration.
+
+    Args:
+        xml_root: Root element of the XML document
+        pretty_print: Indent the document; False writes it without whitespace between elements
+
+    Returns:
+        XML document as string
+    """
+    return etree.tostring(xml_root, pretty_print=pretty_print, xml_declaration=True, encoding="UTF-8").decode("utf-8")
+
+
+def encode_xml(xml_content: Union[str, bytes], compress: bool = False) -> Tuple[bytes, Optional[str]]:
+    """
+    Encode an XML document for storage.
+
+    Args:
+        xml_content: XML document as string or bytes
+        compress: Compress the document with gzip
+
+    Returns:
+        Tuple (data, content_encoding); content_encoding is "gzip" for compressed
+        data and None otherwise
+    """
+    if isinstance(xml_content, str):
+        xml_content = xml_content.encode("utf-8")
+    if compress:
+        # mtime=0 keeps the compressed bytes of a document the same between generations
+        return gzip.compress(xml_content, mtime=0), GZIP_CONTENT_ENCODING
+    return xml_content, None
+
+
+def is_gzip(data: bytes) -> bool:
+    """Whether `data` is gzip-compressed."""
+    return data[:2] == _GZIP_MAGIC
+
+
+def decompress_xml(data: Union[str, bytes]) -> bytes:
+    """
+    Read stored XML content, decompressing it if it is gzip-compressed.
+
+    Args:
+        data: Stored content as bytes (or an already decoded string)
+
+    Returns:
+        Uncompressed XML document as bytes
+    """
+    if isinstance(data, str):
+        return data.encode("utf-8")
+    if is_gzip(data):
+        return gzip.decompress(data)
+    return data
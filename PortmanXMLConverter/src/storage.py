@@ -0,0 +1,335 @@
+"""
+Storage of generated EMSWe XML documents.
+
+Documents are stored by name in a container and referenced everywhere else by
+their document path "container/name" (the `*_xml_url` columns, the converter's
+`blobPath`). DocumentStorage is the interface used to store and read them:
+
+- AzureBlobStorage keeps documents in a Blob Storage container (the function app);
+- LocalFileStorage keeps them in files under a local directory (command-line
+  usage and offline benchmarks);
+- MemoryStorage keeps them in a dictionary (tests).
+
+Stored content is encoded with `encode_xml` and read back through
+`decompress_xml`, so gzip-compressed and plain documents are read the same way
+on every backend. Documents can carry metadata (string names and values), such
+as the notification fields written by src/blob_metadata.py.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from posixpath import normpath
+
+from .serialization import encode_xml, decompress_xml, XML_CONTENT_TYPE
+
+try:
+    from azure.core.exceptions import ResourceNotFoundError
+    from azure.storage.blob import ContentSettings
+except ImportError:
+    # For command-line usage without Azure SDK
+    ContentSettings = None
+
+    class ResourceNotFoundError(Exception):
+        pass
+
+# A download link and its expiry; ("", None) when no link can be made
+Link = Tuple[str, Optional[datetime]]
+
+# Suffix of the metadata files of LocalFileStorage
+_METADATA_SUFFIX = ".metadata.json"
+
+
+def is_valid_document_name(name: str) -> bool:
+    """Whether `name` is a relative document name that stays inside its container."""
+    return (bool(name) and normpath(name) == name and not name.startswith(("/", ".."))
+            and "\\" not in name)
+
+
+class DocumentStorage:
+    """
+    Interface of a document storage backend.
+
+    Subclasses implement put, get, get_metadata, exists and list; url returns
+    no link unless the backend can hand one out.
+    """
+
+    def __init__(self, container_name: str, compress: bool = False):
+        """
+        Initialize the storage.
+
+        Args:
+            container_name: Container of the documents, the first part of their document paths
+            compress: Store documents gzip-compressed
+        """
+        self.container_name = container_name
+        self.compress = compress
+
+    def path(self, name: str) -> str:
+        """Document path "container/name" of a document."""
+        return f"{self.container_name}/{name}"
+
+    def name_from_path(self, document_path: str) -> Optional[str]:
+        """
+        Name of the document at a document path.
+
+        Returns:
+            The document name, or None if the path is not a document of this container
+        """
+        container_name, _, name = (document_path or "").partition("/")
+        if container_name != self.container_name or not is_valid_document_name(name):
+            return None
+        return name
+
+    def _check_name(self, name: str) -> None:
+        if not is_valid_document_name(name):
+            raise ValueError(f"Invalid document name: {name!r}")
+
+    def put(self, name: str, xml_content: Union[str, bytes], metadata: Optional[Dict[str, str]] = None) -> str:
+        """
+        Store a document, replacing an existing document of the same name.
+
+        Args:
+            name: Document name
+            xml_content: XML document as string or bytes
+            metadata: Metadata of the document
+
+        Returns:
+            Document path of the stored document
+        """
+        raise NotImplementedError
+
+    def get(self, name: str) -> bytes:
+        """
+        Read a stored document.
+
+        Returns:
+            Uncompressed XML document as bytes
+
+        Raises:
+            KeyError: No document of that name is stored
+        """
+        raise NotImplementedError
+
+    def get_metadata(self, name: str) -> Dict[str, str]:
+        """
+        Read the metadata of a stored document.
+
+        Raises:
+            KeyError: No document of that name is stored
+        """
+        raise NotImplementedError
+
+    def exists(self, name: str) -> bool:
+        """Whether a document of that name is stored."""
+        raise NotImplementedError
+
+    def list(self, prefix: str = "") -> List[str]:
+        """
+        List stored documents.
+
+        Args:
+            prefix: Only list names starting with this prefix
+
+        Returns:
+            Sorted document names
+        """
+        raise NotImplementedError
+
+    def url(self, name: str) -> Link:
+        """
+        Download link of a stored document.
+
+        Returns:
+            Tuple (url, expiry datetime or None), or ("", None) if the backend has no links
+        """
+        return "", None
+
+
+class AzureBlobStorage(DocumentStorage):
+    """
+    Documents stored as blobs in an Azure Blob Storage container.
+
+    The Azure clients are provided by the caller (PortmanTrigger.blob_utils in
+    the function app), so the storage shares their process-wide connection pool.
+    """
+
+    def __init__(self, container_name: str, container_client: Callable[[], object],
+                 sign_link: Optional[Callable[[str], Link]] = None,
+                 reset_client: Optional[Callable[[], None]] = None, compress: bool = False):
+        """
+        Initialize the storage.
+
+        Args:
+            container_name: Blob container of the documents
+            container_client: Function returning the ContainerClient of the container
+            sign_link: Function returning a short-lived (url, expiry) link of a document path
+            reset_client: Function dropping a cached ContainerClient, called when the
+                container is not found so it is checked again on the next use
+            compress: Store documents gzip-compressed with Content-Encoding: gzip
+        """
+        super().__init__(container_name, compress)
+        self._container_client = container_client
+        self._sign_link = sign_link
+        self._reset_client = reset_client
+
+    def _blob_client(self, name: str):
+        self._check_name(name)
+        return self._container_client().get_blob_client(name)
+
+    def put(self, name: str, xml_content: Union[str, bytes], metadata: Optional[Dict[str, str]] = None) -> str:
+        data, content_encoding = encode_xml(xml_content, self.compress)
+        try:
+            self._blob_client(name).upload_blob(
+                data, overwrite=True, metadata=metadata or None,
+                content_settings=ContentSettings(content_type=XML_CONTENT_TYPE, content_encoding=content_encoding))
+        except ResourceNotFoundError:
+            # The container may have been deleted: check it again on the next upload
+            if self._reset_client:
+                self._reset_client()
+            raise
+        return self.path(name)
+
+    def get(self, name: str) -> bytes:
+        try:
+            return decompress_xml(self._blob_client(name).download_blob().readall())
+        except ResourceNotFoundError:
+            raise KeyError(name)
+
+    def get_metadata(self, name: str) -> Dict[str, str]:
+        try:
+            return dict(self._blob_client(name).get_blob_properties().metadata or {})
+        except ResourceNotFoundError:
+            raise KeyError(name)
+
+    def exists(self, name: str) -> bool:
+        return self._blob_client(name).exists()
+
+    def list(self, prefix: str = "") -> List[str]:
+        return sorted(blob.name for blob in self._container_client().list_blobs(name_starts_with=prefix or None))
+
+    def url(self, name: str) -> Link:
+        self._check_name(name)
+        if self._sign_link is None:
+            return "", None
+        return self._sign_link(self.path(name))
+
+
+class LocalFileStorage(DocumentStorage):
+    """
+    Documents stored as files under `<root>/<container>/`, with their metadata
+    in a `<name>.metadata.json` file next to the document.
+    """
+
+    def __init__(self, container_name: str, root: str, compress: bool = False):
+        """
+        Initialize the storage.
+
+        Args:
+            container_name: Container of the documents, a directory under `root`
+            root: Root directory of the storage
+            compress: Store documents gzip-compressed
+        """
+        super().__init__(container_name, compress)
+        self.directory = os.path.abspath(os.path.join(root, container_name))
+
+    def _file(self, name: str) -> str:
+        self._check_name(name)
+        return os.path.join(self.directory, *name.split("/"))
+
+    @staticmethod
+    def _write(file_path: str, data: bytes) -> None:
+        # Readers never see a partly written file
+        temp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, file_path)
+
+    def put(self, name: str, xml_content: Union[str, bytes], metadata: Optional[Dict[str, str]] = None) -> str:
+        file_path = self._file(name)
+        data, _ = encode_xml(xml_content, self.compress)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        if metadata:
+            self._write(file_path + _METADATA_SUFFIX, json.dumps(metadata).encode("utf-8"))
+        elif os.path.exists(file_path + _METADATA_SUFFIX):
+            os.remove(file_path + _METADATA_SUFFIX)
+        self._write(file_path, data)
+        return self.path(name)
+
+    def get(self, name: str) -> bytes:
+        try:
+            with open(self._file(name), "rb") as f:
+                return decompress_xml(f.read())
+        except FileNotFoundError:
+            raise KeyError(name)
+
+    def get_metadata(self, name: str) -> Dict[str, str]:
+        if not self.exists(name):
+            raise KeyError(name)
+        try:
+            with open(self._file(name) + _METADATA_SUFFIX, "rb") as f:
+                return json.loads(f.read())
+        except FileNotFoundError:
+            return {}
+
+    def exists(self, name: str) -> bool:
+        return os.path.isfile(self._file(name))
+
+    def list(self, prefix: str = "") -> List[str]:
+        names = []
+        for directory, _, files in os.walk(self.directory):
+            relative = os.path.relpath(directory, self.directory)
+            for file_name in files:
+                if file_name.endswith((".tmp", _METADATA_SUFFIX)):
+                    continue
+                name = file_name if relative == "." else "/".join(relative.split(os.sep) + [file_name])
+                if name.startswith(prefix):
+                    names.append(name)
+        return sorted(names)
+
+    def url(self, name: str) -> Link:
+        file_path = self._file(name)
+        if not os.path.isfile(file_path):
+            return "", None
+        return Path(file_path).as_uri(), None
+
+
+class MemoryStorage(DocumentStorage):
+    """
+    Documents kept in memory, for tests and benchmarks without storage.
+    """
+
+    def __init__(self, container_name: str, compress: bool = False):
+        super().__init__(container_name, compress)
+        self._lock = threading.Lock()
+        # Encoded documents and their metadata by name
+        self.documents: Dict[str, bytes] = {}
+        self.metadata: Dict[str, Dict[str, str]] = {}
+
+    def put(self, name: str, xml_content: Union[str, bytes], metadata: Optional[Dict[str, str]] = None) -> str:
+        self._check_name(name)
+        data, _ = encode_xml(xml_content, self.compress)
+        with self._lock:
+            self.documents[name] = data
+            self.metadata[name] = dict(metadata or {})
+        return self.path(name)
+
+    def get(self, name: str) -> bytes:
+        with self._lock:
+            data = self.documents[name]
+        return decompress_xml(data)
+
+    def get_metadata(self, name: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self.metadata[name])
+
+    def exists(self, name: str) -> bool:
+        with self._lock:
+            return name in self.documents
+
+    def list(self, prefix: str = "") -> List[str]:
+        with self._lock:
+            return sorted(name for name in self.documents if name.startswith(prefix))
@@ -0,0 +1,528 @@
+"""
+Template module for building EMSWe envelopes from pre-built skeleton trees.
+
+Each formality type (ATA, NOA, VID) is described once as a tree of nodes. The
+tree is compiled into a skeleton lxml document containing every element the
+document can have, together with precomputed element positions for the values
+that change per document and for the optional elements that may be pruned.
+Rendering a document clones the skeleton, fills in the values and removes the
+optional elements whose conditions are not met. Documents of several formality
+types for the same port call can share one rendered MAI element (`render_many`).
+"""
+
+import copy
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from lxml import etree
+
+from .converter_config import NAMESPACES
+from .log_events import log_event
+
+logger = logging.getLogger(__name__)
+
+# Formality types that have a compiled template
+TEMPLATE_FORMALITY_TYPES = ("ATA", "NOA", "VID")
+
+# The parts of a rendered MAI element that differ between formality types
+_MAI_TYPE_CODE = etree.XPath("mai:ExchangedDocument/ram:TypeCode", namespaces=NAMESPACES)
+_MAI_MOVEMENT = etree.XPath("mai:SpecifiedLogisticsTransportMovement", namespaces=NAMESPACES)
+
+
+class _Node:
+    """
+    Declarative description of one element in an envelope template.
+
+    ``text`` and attribute values are either static strings (stored in the
+    skeleton) or callables taking ``(portman_data, context)`` that are evaluated
+    per document. A callable attribute value returning None leaves the attribute
+    out. ``when`` is an optional callable with the same signature; when it returns
+    a false value the element and its subtree are pruned from the document.
+    """
+
+    __slots__ = ("tag", "children", "text", "attrib", "when")
+
+    def __init__(self, prefix: str, name: str, *children: "_Node", text=None, attrib=None, when=None):
+        self.tag = f"{{{NAMESPACES[prefix]}}}{name}"
+        self.children = children
+        self.text = text
+        self.attrib = attrib or {}
+        self.when = when
+
+
+def _now_utc_string() -> str:
+    return datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _has(key: str) -> Callable[[Dict[str, Any], Dict[str, Any]], bool]:
+    return lambda d, c: key in d
+
+
+def _has_any(*keys: str) -> Callable[[Dict[str, Any], Dict[str, Any]], bool]:
+    return lambda d, c: any(key in d for key in keys)
+
+
+def _get(key: str) -> Callable[[Dict[str, Any], Dict[str, Any]], Any]:
+    return lambda d, c: d[key]
+
+
+def _ctx(key: str) -> Callable[[Dict[str, Any], Dict[str, Any]], Any]:
+    return lambda d, c: c[key]
+
+
+class EnvelopeTemplate:
+    """
+    Compiled envelope template for a single formality type.
+    """
+
+    def __init__(self, formality_type: str, body: _Node,
+                 prepare: Callable[[Dict[str, Any], Callable[[Any], str]], Dict[str, Any]]):
+        """
+        Compile the template.
+
+        Args:
+            formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+            body: Node tree of the formality-specific element
+            prepare: Function computing the per-document context from the Portman
+                data and the datetime formatter
+        """
+        self.formality_type = formality_type
+        self._prepare = prepare
+
+        nsmap = {
+            None: "",  # Default namespace
+            "mai": NAMESPACES["mai"],
+            "qdt": NAMESPACES["qdt"],
+            "ram": NAMESPACES["ram"],
+            "udt": NAMESPACES["udt"],
+            formality_type.lower(): NAMESPACES[formality_type.lower()],
+        }
+        self._skeleton = etree.Element("Envelope", nsmap=nsmap)
+
+        # (element index, guard indices of the element and its ancestors, value callable)
+        self._text_slots: List[Tuple[int, Tuple[int, ...], Callable]] = []
+        self._attrib_slots: List[Tuple[int, Tuple[int, ...], str, Callable]] = []
+        # (element index, guard indices of the ancestors, condition callable)
+        self._guards: List[Tuple[int, Tuple[int, ...], Callable]] = []
+
+        # Element indices follow the document order of ``Element.iter()``; the
+        # root envelope has index 0 and the MAI subtree ends before ``_mai_end``.
+        self._size = 1
+        self._compile(_mai_node(formality_type), self._skeleton, ())
+        self._mai_end = self._size
+        self._compile(body, self._skeleton, ())
+
+        # Skeleton without the MAI element, for documents that reuse a rendered MAI
+        self._body_skeleton = copy.deepcopy(self._skeleton)
+        del self._body_skeleton[0]
+
+    def _compile(self, node: _Node, parent: etree._Element, guards: Tuple[int, ...]) -> None:
+        """
+        Add a node to the skeleton and record its slots.
+
+        Args:
+            node: Node to compile
+            parent: Skeleton element the node is appended to
+            guards: Indices of the conditional ancestors of the node
+        """
+        element = etree.SubElement(parent, node.tag)
+        index = self._size
+        self._size += 1
+
+        if node.when is not None:
+            self._guards.append((index, guards, node.when))
+            guards = guards + (index,)
+
+        if callable(node.text):
+            self._text_slots.append((index, guards, node.text))
+        elif node.text is not None:
+            element.text = node.text
+
+        for name, value in node.attrib.items():
+            if callable(value):
+                self._attrib_slots.append((index, guards, name, value))
+            else:
+                element.set(name, value)
+
+        for child in node.children:
+            self._compile(child, element, guards)
+
+    def render(self, portman_data: Dict[str, Any], format_datetime: Callable[[Any], str],
+               mai: Optional[etree._Element] = None) -> etree._Element:
+        """
+        Render a document from the template.
+
+        Args:
+            portman_data: Dictionary containing Portman agent data
+            format_datetime: Function formatting datetime strings for XML
+            mai: Rendered MAI element of another formality type of the same port
+                call to reuse instead of rendering the MAI of this document
+
+        Returns:
+            Root element of the generated XML document
+        """
+        context = self._prepare(portman_data, format_datetime)
+
+        if mai is None:
+            root = copy.deepcopy(self._skeleton)
+            elements = list(root.iter())
+            first = 1
+        else:
+            # Keep the element indices of the full skeleton; the MAI slots are not rendered
+            root = copy.deepcopy(self._body_skeleton)
+            elements = [root] + [None] * (self._mai_end - 1) + list(root.iter())[1:]
+            first = self._mai_end
+
+        # Evaluate conditions top-down; descendants of a pruned element are
+        # pruned with it and their conditions are never evaluated.
+        pruned = set()
+        for index, guards, when in self._guards:
+            if index >= first and (not pruned.isdisjoint(guards) or not when(portman_data, context)):
+                pruned.add(index)
+
+        for index, guards, value in self._text_slots:
+            if index >= first and pruned.isdisjoint(guards):
+                elements[index].text = value(portman_data, context)
+
+        for index, guards, name, value in self._attrib_slots:
+            if index >= first and pruned.isdisjoint(guards):
+                attribute = value(portman_data, context)
+                if attribute is not None:
+                    elements[index].set(name, attribute)
+
+        for index in pruned:
+            element = elements[index]
+            element.getparent().remove(element)
+
+        if mai is not None:
+            root.insert(0, self._reuse_mai(mai))
+
+        return root
+
+    def _reuse_mai(self, mai: etree._Element) -> etree._Element:
+        """Copy a MAI element rendered for another formality type and adjust it to this one."""
+        mai = copy.deepcopy(mai)
+        for type_code in _MAI_TYPE_CODE(mai):
+            type_code.text = self.formality_type
+        if self.formality_type == "VID":
+            # Transport movement with call ID - ONLY for ATA and NOA, NOT for VID
+            for movement in _MAI_MOVEMENT(mai):
+                mai.remove(movement)
+        return mai
+
+
+def _mai_node(formality_type: str) -> _Node:
+    """
+    Describe the MAI element for a formality type.
+
+    Args:
+        formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+
+    Returns:
+        Node tree of the MAI element
+    """
+    declarant = lambda d: d["declarant"]
+    contact = lambda d: d["declarant"]["contact"]
+    address = lambda d: d["declarant"]["address"]
+
+    children = [
+        _Node("mai", "ExchangedDocument",
+              _Node("ram", "ID", text=lambda d, c: d.get("document_id", f"MSGID{int(datetime.now().timestamp())}")),
+              _Node("ram", "TypeCode", text=formality_type),
+              _Node("ram", "PurposeCode", text="9"),  # Original
+              _Node("ram", "VersionID", text="1.0"),
+              _Node("ram", "FirstSignatoryDocumentAuthentication",
+                    _Node("ram", "ActualDateTime",
+                          _Node("udt", "DateTimeString", text=_ctx("timestamp"))))),
+        _Node("mai", "ExchangedDeclaration",
+              _Node("ram", "ID",
+                    text=lambda d, c: d.get("declaration_id", f"DECL-PT-{datetime.now().strftime('%y-%m%d%H%M')}")),
+              _Node("ram", "DeclarantTradeParty",
+                    _Node("ram", "ID", when=lambda d, c: "id" in declarant(d), text=lambda d, c: declarant(d)["id"]),
+                    _Node("ram", "Name", when=lambda d, c: "name" in declarant(d), text=lambda d, c: declarant(d)["name"]),
+                    _Node("ram", "RoleCode", when=lambda d, c: "role_code" in declarant(d),
+                          text=lambda d, c: declarant(d)["role_code"]),
+                    _Node("ram", "DefinedTradeContact",
+                          _Node("ram", "PersonName", when=lambda d, c: "name" in contact(d),
+                                text=lambda d, c: contact(d)["name"]),
+                          _Node("ram", "TelephoneUniversalCommunication",
+                                _Node("ram", "CompleteNumber", text=lambda d, c: contact(d)["phone"]),
+                                when=lambda d, c: "phone" in contact(d)),
+                          _Node("ram", "EmailURIUniversalCommunication",
+                                _Node("ram", "URIID", text=lambda d, c: contact(d)["email"]),
+                                when=lambda d, c: "email" in contact(d)),
+                          when=lambda d, c: "contact" in declarant(d)),
+                    _Node("ram", "PostalTradeAddress",
+                          _Node("ram", "PostcodeCode", when=lambda d, c: "postcode" in address(d),
+                                text=lambda d, c: address(d)["postcode"]),
+                          _Node("ram", "StreetName", when=lambda d, c: "street" in address(d),
+                                text=lambda d, c: address(d)["street"]),
+                          _Node("ram", "CityName", when=lambda d, c: "city" in address(d),
+                                text=lambda d, c: address(d)["city"]),
+                          _Node("ram", "CountryID", when=lambda d, c: "country" in address(d),
+                                text=lambda d, c: address(d)["country"]),
+                          _Node("ram", "BuildingNumber", when=lambda d, c: "building" in address(d),
+                                text=lambda d, c: address(d)["building"]),
+                          when=lambda d, c: "address" in declarant(d)),
+                    when=_has("declarant"))),
+    ]
+
+    # Transport movement with call ID - ONLY for ATA and NOA, NOT for VID
+    if formality_type != "VID":
+        children.append(
+            _Node("mai", "SpecifiedLogisticsTransportMovement",
+                  _Node("ram", "CallTransportEvent",
+                        _Node("ram", "ID", text=_get("call_id"))),
+                  when=_has("call_id")))
+
+    return _Node("mai", "MAI", *children)
+
+
+def _prepare_common(portman_data: Dict[str, Any], format_datetime: Callable[[Any], str]) -> Dict[str, Any]:
+    return {"timestamp": format_datetime(portman_data.get("timestamp", _now_utc_string()))}
+
+
+def _prepare_ata(portman_data: Dict[str, Any], format_datetime: Callable[[Any], str]) -> Dict[str, Any]:
+    context = _prepare_common(portman_data, format_datetime)
+    if "arrival_datetime" in portman_data:
+        context["arrival_datetime"] = format_datetime(portman_data["arrival_datetime"])
+    if "call_datetime" in portman_data:
+        context["call_datetime"] = format_datetime(portman_data["call_datetime"])
+    return context
+
+
+def _positive_count(portman_data: Dict[str, Any], key: str) -> Optional[int]:
+    """
+    Read an optional person count; only values >= 1 are included in the NOA.
+    """
+    if key not in portman_data or portman_data[key] is None:
+        return None
+    try:
+        value = portman_data[key]
+        count = value if isinstance(value, int) else int(value)
+    except (ValueError, TypeError):
+        return None
+    return count if count > 0 else None
+
+
+def _prepare_noa(portman_data: Dict[str, Any], format_datetime: Callable[[Any], str]) -> Dict[str, Any]:
+    context = _prepare_common(portman_data, format_datetime)
+
+    passenger_count = _positive_count(portman_data, "passengersOnArrival")
+    crew_count = _positive_count(portman_data, "crewOnArrival")
+
+    # Schema requires at least 1 person on board
+    total_count = max(1, (passenger_count or 0) + (crew_count or 0))
+
+    log_event(logger, logging.DEBUG, "noa.persons", passengers_on_arrival=portman_data.get("passengersOnArrival"),
+              crew_on_arrival=portman_data.get("crewOnArrival"), passenger_count=passenger_count,
+              crew_count=crew_count, total_count=total_count)
+
+    context["passenger_count"] = passenger_count
+    context["crew_count"] = crew_count
+    context["total_count"] = total_count
+
+    context["has_itinerary"] = "portToVisit" in portman_data or "location" in portman_data
+    if context["has_itinerary"]:
+        context["itinerary_eta"] = format_datetime(portman_data.get("eta", _now_utc_string()))
+        context["itinerary_etd"] = format_datetime(portman_data.get("etd", _now_utc_string()))
+
+    context["call_eta"] = format_datetime(
+        portman_data.get("eta", portman_data.get("arrival_datetime", _now_utc_string())))
+    context["call_etd"] = format_datetime(
+        portman_data.get("etd", portman_data.get("departure_datetime", _now_utc_string())))
+    return context
+
+
+def _prepare_vid(portman_data: Dict[str, Any], format_datetime: Callable[[Any], str]) -> Dict[str, Any]:
+    context = _prepare_common(portman_data, format_datetime)
+
+    # IMO number is included only when valid (not None or zero), padded/truncated to 7 digits
+    imo_value = portman_data.get("imoLloyds")
+    has_valid_imo = bool(imo_value and str(imo_value) != "0" and str(imo_value) != "unknown")
+    context["has_valid_imo"] = has_valid_imo
+    if has_valid_imo:
+        imo_text = str(imo_value)
+        if len(imo_text) < 7:
+            imo_text = imo_text.zfill(7)
+        if len(imo_text) > 7:
+            imo_text = imo_text[-7:]
+        context["imo"] = imo_text
+
+    # MMSIID must be exactly 9 numeric characters and not 0
+    context["mmsi"] = None
+    if portman_data.get("mmsi"):
+        mmsi_value = str(portman_data["mmsi"]).strip()
+        if len(mmsi_value) == 9 and mmsi_value.isdigit() and mmsi_value != "000000000":
+            context["mmsi"] = mmsi_value
+        else:
+            logger.warning(f"MMSI value {mmsi_value} is invalid (must be 9 digits). Skipping MMSIID element.")
+
+    context["call_sign"] = None
+    if "radioCallSign" in portman_data and portman_data["radioCallSign"]:
+        call_sign = portman_data["radioCallSign"].strip()
+        if call_sign:
+            context["call_sign"] = call_sign
+
+    # Prioritize the standard 'eta' field, then arrival_datetime
+    eta_value = None
+    if "eta" in portman_data and portman_data["eta"]:
+        eta_value = portman_data["eta"]
+    elif "arrival_datetime" in portman_data and portman_data["arrival_datetime"]:
+        eta_value = portman_data["arrival_datetime"]
+
+    if eta_value:
+        context["eta"] = format_datetime(eta_value)
+    else:
+        # Only use current time + 1 hour as a fallback if no ETA provided
+        context["eta"] = format_datetime((datetime.now() + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%S.000Z"))
+        logger.warning(f"No ETA provided for VID, using generated timestamp: {context['eta']}")
+
+    context["location"] = portman_data["portToVisit"] if portman_data.get("portToVisit") else "XXXXX"
+    log_event(logger, logging.DEBUG, "vid.identifiers", imo=context.get("imo"), mmsi=context["mmsi"],
+              call_sign=context["call_sign"])
+    return context
+
+
+_ATA_NODE = _Node(
+    "ata", "ATA",
+    _Node("ata", "ExchangedDocument",
+          _Node("ram", "Remarks", when=_has("remarks"), text=_get("remarks"))),
+    _Node("ata", "SpecifiedLogisticsTransportMovement",
+          _Node("ram", "ArrivalTransportEvent",
+                _Node("ram", "ActualArrivalRelatedDateTime",
+                      _Node("qdt", "DateTimeString", text=_ctx("arrival_datetime")),
+                      when=_has("arrival_datetime")),
+                _Node("ram", "OccurrenceLogisticsLocation",
+                      _Node("ram", "ID", text=_get("location")),
+                      when=_has("location")),
+                when=_has_any("arrival_datetime", "location")),
+          _Node("ram", "CallTransportEvent",
+                _Node("ram", "ActualArrivalRelatedDateTime",
+                      _Node("qdt", "DateTimeString", text=_ctx("call_datetime")),
+                      when=_has("call_datetime")),
+                _Node("ram", "MaritimeAnchorageIndicator", when=_has("anchorage_indicator"),
+                      text=_get("anchorage_indicator")),
+                when=_has_any("call_datetime", "anchorage_indicator"))),
+)
+
+_NOA_NODE = _Node(
+    "noa", "NOA",
+    _Node("noa", "ExchangedDocument",
+          _Node("ram", "Remarks", when=_has("remarks"),
+                text=lambda d, c: d["remarks"] if isinstance(d["remarks"], str) else None,
+                attrib={"languageID": lambda d, c: "EN" if isinstance(d["remarks"], str) else None})),
+    _Node("noa", "SpecifiedLogisticsTransportMovement",
+          _Node("ram", "ModeCode", text=lambda d, c: d.get("mode_code", "1")),  # 1 = maritime transport
+          _Node("ram", "ID",
+                text=lambda d, c: d.get("voyage_id", f"VYG-{d.get('call_id', str(int(datetime.now().timestamp())))}")),
+          _Node("ram", "PassengerQuantity", when=lambda d, c: c["passenger_count"] is not None,
+                text=lambda d, c: str(c["passenger_count"])),
+          _Node("ram", "CrewQuantity", when=lambda d, c: c["crew_count"] is not None,
+                text=lambda d, c: str(c["crew_count"])),
+          _Node("ram", "CargoDescription", text=lambda d, c: d.get("cargo_description", "Standard cargo"),
+                attrib={"languageID": "EN"}),
+          _Node("ram", "DangerousGoodsIndicator", text=lambda d, c: d.get("dangerous_goods_indicator", "0")),
+          _Node("ram", "CallPurposeCode", text=lambda d, c: d.get("call_purpose_code", "1")),
+          _Node("ram", "RegularServiceIndicator", text=lambda d, c: d.get("regular_service_indicator", "0")),
+          _Node("ram", "TotalOnboardPersonQuantity", text=lambda d, c: str(c["total_count"])),
+          _Node("ram", "FoundStowawayIndicator", text=lambda d, c: d.get("found_stowaway_indicator", "0")),
+          _Node("ram", "UsedLogisticsTransportMeans",
+                _Node("ram", "TypeCode", when=_has("vesselTypeCode"), text=lambda d, c: str(d["vesselTypeCode"])),
+                _Node("ram", "RegistrationTransportEvent",
+                      _Node("ram", "ID", text=lambda d, c: str(d["imoLloyds"])),
+                      when=lambda d, c: "imoLloyds" in d and d["imoLloyds"] is not None and str(d["imoLloyds"]) != "0"),
+                _Node("ram", "ShipCompanyTradeParty",
+                      _Node("ram", "Name", text=_get("shippingCompany")),
+                      when=_has("shippingCompany")),
+                when=_has_any("imoLloyds", "vesselName")),
+          _Node("ram", "ItineraryTransportRoute",
+                _Node("ram", "ItineraryStopTransportEvent",
+                      _Node("ram", "ArrivalRelatedDateTime",
+                            _Node("qdt", "DateTimeString", text=_ctx("itinerary_eta"))),
+                      _Node("ram", "DepartureRelatedDateTime",
+                            _Node("qdt", "DateTimeString", text=_ctx("itinerary_etd"))),
+                      _Node("ram", "SequenceNumeric", text="1"),
+                      _Node("ram", "OccurrenceLogisticsLocation",
+                            _Node("ram", "ID", text=lambda d, c: d.get("portToVisit", d.get("location", "PORT1"))))),
+                when=_ctx("has_itinerary")),
+          _Node("ram", "CallTransportEvent",
+                _Node("ram", "EstimatedTransportMeansArrivalOccurrenceDateTime",
+                      _Node("qdt", "DateTimeString", text=_ctx("call_eta"))),
+                _Node("ram", "EstimatedTransportMeansDepartureOccurrenceDateTime",
+                      _Node("qdt", "DateTimeString", text=_ctx("call_etd"))),
+                _Node("ram", "ExpectedArrivalPortAreaRelatedLogisticsLocation",
+                      _Node("ram", "Name", text=lambda d, c: d.get("berthName", d.get("berthCode", ""))),
+                      when=_has_any("berthCode", "berthName")))),
+)
+
+_VID_NODE = _Node(
+    "vid", "VID",
+    _Node("vid", "SpecifiedLogisticsTransportMovement",
+          # The VID schema requires UsedLogisticsTransportMeans before CallTransportEvent
+          _Node("ram", "UsedLogisticsTransportMeans",
+                _Node("ram", "Name", text=lambda d, c: d.get("vesselName", "")),
+                _Node("ram", "IMONumberIndicator", text=lambda d, c: "1" if c["has_valid_imo"] else "0"),
+                _Node("ram", "IMOID", when=_ctx("has_valid_imo"), text=_ctx("imo")),
+                _Node("ram", "MMSIID", when=lambda d, c: c["mmsi"] is not None, text=_ctx("mmsi")),
+                _Node("ram", "TypeCode", when=_has("vesselTypeCode"), text=lambda d, c: str(d["vesselTypeCode"])),
+                _Node("ram", "CallSignID", when=_ctx("call_sign"), text=_ctx("call_sign"))),
+          _Node("ram", "CallTransportEvent",
+                _Node("ram", "EstimatedTransportMeansArrivalOccurrenceDateTime",
+                      _Node("qdt", "DateTimeString", text=_ctx("eta"))),
+                _Node("ram", "OccurrenceLogisticsLocation",
+                      _Node("ram", "ID", text=_ctx("location"))))),
+)
+
+_TEMPLATE_DEFINITIONS = {
+    "ATA": (_ATA_NODE, _prepare_ata),
+    "NOA": (_NOA_NODE, _prepare_noa),
+    "VID": (_VID_NODE, _prepare_vid),
+}
+
+_templates: Dict[str, EnvelopeTemplate] = {}
+
+
+def render_many(portman_data_by_type: Dict[str, Dict[str, Any]],
+                format_datetime: Callable[[Any], str]) -> Dict[str, etree._Element]:
+    """
+    Render documents of several formality types for the same port call, sharing one rendered MAI.
+
+    The MAI is rendered once, for the first type that carries the call ID
+    (i.e. not VID), and copied into the other documents with their own type code.
+
+    Args:
+        portman_data_by_type: Portman data of the same port call per formality type
+            (all types must have a template)
+        format_datetime: Function formatting datetime strings for XML
+
+    Returns:
+        Dictionary {formality_type: root element}, in the order of `portman_data_by_type`
+    """
+    roots = {}
+    mai = None
+    for formality_type in sorted(portman_data_by_type, key=lambda t: t == "VID"):
+        root = get_template(formality_type).render(portman_data_by_type[formality_type], format_datetime, mai)
+        if mai is None:
+            mai = root[0]
+        roots[formality_type] = root
+    return {formality_type: roots[formality_type] for formality_type in portman_data_by_type}
+
+
+def get_template(formality_type: str) -> Optional[EnvelopeTemplate]:
+    """
+    Get the compiled template for a formality type, compiling it on first use.
+
+    Args:
+        formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+
+    Returns:
+        Compiled template or None if the formality type has no template
+    """
+    template = _templates.get(formality_type)
+    if template is None and formality_type in _TEMPLATE_DEFINITIONS:
+        body, prepare = _TEMPLATE_DEFINITIONS[formality_type]
+        template = EnvelopeTemplate(formality_type, body, prepare)
+        _templates[formality_type] = template
+    return template
@@ -0,0 +1,130 @@
+"""
+Shared timestamp normalization for Digitraffic and EMSWe datetime strings.
+
+Digitraffic sends ISO-8601 timestamps in a few variants
+("2024-03-13T10:00:00.000+00:00", "2024-03-13T10:05:00.000Z", with or without
+fractional seconds). Every timestamp is parsed once with `datetime.fromisoformat`,
+converted to UTC, and the parsed and formatted values are memoized, because the
+same ETA/ATA strings are seen many times per run (change detection, adapter,
+XML builder, logging).
+"""
+
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional, Union
+
+# Output formats used across the project
+XML_FORMAT = "%Y-%m-%dT%H:%M:%SZ"          # EMSWe DateTimeString, no fractional seconds
+MINUTE_FORMAT = "%Y-%m-%dT%H:%M:00.000Z"   # Minute-level key used for change detection
+DISPLAY_FORMAT = "%Y-%m-%d %H:%M"          # Human-readable UTC time
+
+_FALLBACK_FORMATS = (
+    "%Y-%m-%dT%H:%M:%S.%f%z",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+)
+
+_CACHE_SIZE = 4096
+
+Timestamp = Union[str, datetime]
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _parse_string(value: str) -> datetime:
+    text = value.strip()
+    if text.endswith("Z"):
+        text = text[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        # fromisoformat before Python 3.11 only accepts 3 or 6 fractional digits
+        for fmt in _FALLBACK_FORMATS:
+            try:
+                parsed = datetime.strptime(text, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            raise ValueError(f"Unrecognized timestamp: {value!r}")
+    return _to_utc(parsed)
+
+
+def _to_utc(value: datetime) -> datetime:
+    # Timestamps without an offset are UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def parse_timestamp(value: Optional[Timestamp]) -> Optional[datetime]:
+    """
+    Parse a timestamp into a timezone-aware UTC datetime.
+
+    Args:
+        value: ISO-8601 string or datetime; naive values are taken as UTC
+
+    Returns:
+        UTC datetime, or None for an empty value
+
+    Raises:
+        ValueError: If the string is not a recognized timestamp
+    """
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return _to_utc(value)
+    return _parse_string(value)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _format_string(value: str, fmt: str) -> str:
+    return _parse_string(value).strftime(fmt)
+
+
+def format_timestamp(value: Optional[Timestamp], fmt: str = XML_FORMAT) -> Optional[str]:
+    """
+    Format a timestamp in UTC.
+
+    Args:
+        value: ISO-8601 string or datetime
+        fmt: strftime format, e.g. XML_FORMAT, MINUTE_FORMAT or DISPLAY_FORMAT
+
+    Returns:
+        Formatted string, or None for an empty value
+
+    Raises:
+        ValueError: If the string is not a recognized timestamp
+    """
+    if not value:
+        return None
+    if isinstance(value, str):
+        return _format_string(value, fmt)
+    return _to_utc(value).strftime(fmt)
+
+
+def to_xml_datetime(value: Optional[Timestamp]) -> Optional[str]:
+    """Format a timestamp as an EMSWe DateTimeString, e.g. "2024-03-13T10:00:00Z"."""
+    return format_timestamp(value, XML_FORMAT)
+
+
+def to_minute_key(value: Optional[Timestamp]) -> Optional[str]:
+    """Normalize a timestamp to the minute, e.g. "2024-03-13T10:00:00.000Z"."""
+    return format_timestamp(value, MINUTE_FORMAT)
+
+
+def to_display(value: Optional[Timestamp], default: str = "N/A") -> str:
+    """Format a timestamp for display, e.g. "2024-03-13 10:00", or `default` for an empty value."""
+    return format_timestamp(value, DISPLAY_FORMAT) or default
+
+
+def to_naive_utc(value: Optional[Timestamp]) -> Optional[datetime]:
+    """Convert a timestamp to a naive UTC datetime, as stored in TIMESTAMP columns."""
+    parsed = parse_timestamp(value)
+    return parsed.replace(tzinfo=None) if parsed else None
+
+
+def clear_cache() -> None:
+    """Clear the memoized parse and format results."""
+    _parse_string.cache_clear()
+    _format_string.cache_clear()
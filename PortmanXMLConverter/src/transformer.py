@@ -10,6 +10,8 @@ from lxml import etree
 
 from .converter_config import NAMESPACES, OUTPUT_DIR
 from .parser import XMLParser
+from .templates import get_template, render_many
+from .timestamps import to_xml_datetime
 
 logger = logging.getLogger(__name__)
 
@@ -18,12 +20,17 @@ class XMLTransformer:
     Transforms data between Portman agent format and EMSWe-compliant XML.
     """
 
-    def __init__(self):
+    def __init__(self, use_templates: bool = True):
         """
         Initialize the XML transformer.
+
+        Args:
+            use_templates: Build documents from the precompiled envelope templates
+                instead of element by element
         """
         self.namespaces = NAMESPACES
         self.parser = XMLParser()
+        self.use_templates = use_templates
 
         # Ensure output directory exists
         #os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -40,6 +47,12 @@ class XMLTransformer:
             Root element of the generated XML document or None if transformation fails
         """
         try:
+            # Clone the precompiled skeleton for known formality types
+            if self.use_templates:
+                template = get_template(formality_type)
+                if template is not None:
+                    return template.render(portman_data, self._format_datetime_for_xml)
+
             # Create root element with namespaces
             nsmap = {
                 None: "",  # Default namespace
@@ -79,6 +92,28 @@ class XMLTransformer:
             logger.error(f"Error transforming Portman data to EMSWe: {str(e)}")
             return None
 
+    def portman_to_emswe_many(self, portman_data_by_type: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[etree._Element]]:
+        """
+        Transform Portman data of one port call to EMSWe XML for several formality types.
+
+        With templates the MAI element is rendered once and shared by the documents.
+
+        Args:
+            portman_data_by_type: Portman data of the same port call per formality type
+
+        Returns:
+            Dictionary {formality_type: root element or None if transformation fails}
+        """
+        if self.use_templates and all(get_template(formality_type) is not None
+                                      for formality_type in portman_data_by_type):
+            try:
+                return render_many(portman_data_by_type, self._format_datetime_for_xml)
+            except Exception as e:
+                logger.error(f"Error transforming Portman data to EMSWe: {str(e)}")
+
+        return {formality_type: self.portman_to_emswe(portman_data, formality_type)
+                for formality_type, portman_data in portman_data_by_type.items()}
+
     def emswe_to_portman(self, xml_root: etree._Element) -> Dict[str, Any]:
         """
         Transform EMSWe-compliant XML to Portman agent data.
@@ -101,13 +136,14 @@ class XMLTransformer:
             logger.error(f"Error transforming EMSWe to Portman data: {str(e)}")
             return {}
 
-    def save_xml(self, xml_root: etree._Element, filename: str) -> str:
+    def save_xml(self, xml_root: etree._Element, filename: str, pretty_print: bool = True) -> str:
         """
         Save XML document to file.
 
         Args:
             xml_root: Root element of the XML document
             filename: Name of the output file
+            pretty_print: Indent the document; False writes it compact
 
         Returns:
             Path to the saved file
@@ -125,8 +161,8 @@ class XMLTransformer:
             # Create XML tree
             tree = etree.ElementTree(xml_root)
 
-            # Write to file with pretty formatting
-            tree.write(output_path, pretty_print=True, xml_declaration=True, encoding="UTF-8")
+            # Write to file, pretty formatted unless compact output is requested
+            tree.write(output_path, pretty_print=pretty_print, xml_declaration=True, encoding="UTF-8")
 
             logger.info(f"XML saved to {output_path}")
             return output_path
@@ -683,32 +719,8 @@ class XMLTransformer:
             return datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
             
         try:
-            # Handle multiple possible formats
-            dt_obj = None
-            if '.' in dt_string and 'Z' in dt_string:
-                # Format with milliseconds and Z
-                dt_obj = datetime.strptime(dt_string, "%Y-%m-%dT%H:%M:%S.%fZ")
-            elif '+' in dt_string:
-                # Format with timezone offset
-                dt_part = dt_string.split('+')[0]
-                if '.' in dt_part:
-                    dt_obj = datetime.strptime(dt_part, "%Y-%m-%dT%H:%M:%S.%f")
-                else:
-                    dt_obj = datetime.strptime(dt_part, "%Y-%m-%dT%H:%M:%S")
-            elif 'Z' in dt_string:
-                # Format without milliseconds but with Z
-                try:
-                    dt_obj = datetime.strptime(dt_string, "%Y-%m-%dT%H:%M:%SZ")
-                except ValueError:
-                    # Try removing Z and parsing
-                    dt_string_no_z = dt_string.replace('Z', '')
-                    dt_obj = datetime.strptime(dt_string_no_z, "%Y-%m-%dT%H:%M:%S")
-            else:
-                # Try basic format without Z
-                dt_obj = datetime.strptime(dt_string, "%Y-%m-%dT%H:%M:%S")
-            
-            # Format to the required XML format without milliseconds
-            return dt_obj.strftime("%Y-%m-%dT%H:%M:%SZ")
+            # Parsed once per distinct string, offsets converted to UTC
+            return to_xml_datetime(dt_string)
         except ValueError as e:
             # If parsing fails, return as is
             logger.warning(f"Could not format datetime string: {dt_string} - {str(e)}")
@@ -0,0 +1,221 @@
+"""
+Tiered validation policy for generated EMSWe XML documents.
+
+Every generated document is checked by a fast structural rule set (required
+elements, length limits, code lists, patterns and number formats), generated
+from the EMSWe XSD facets together with the Portman data validators by
+`validator_codegen`. Full XSD validation runs always, never, or on a sampled
+percentage of documents, and always on the first document of each formality
+type in a worker process, i.e. the first document after a deploy.
+"""
+
+import random
+import logging
+import threading
+from collections import namedtuple
+from typing import Callable, Dict, List, Optional, Tuple
+from lxml import etree
+
+from .converter_config import NAMESPACES, VALIDATION_XSD_MODE, VALIDATION_XSD_SAMPLE_PERCENT
+from .generated_validators import STRUCTURAL_RULES
+
+logger = logging.getLogger(__name__)
+
+XSD_MODES = ("always", "never", "sampled")
+
+# A structural rule on the text of every element matched by `path` (relative to the Envelope).
+# `check` returns an error message for an invalid text, or None.
+Rule = namedtuple("Rule", ["path", "required", "check"])
+
+_MAI_PATH = "mai:MAI/"
+
+
+class StructuralValidator:
+    """
+    Fast structural checks for generated EMSWe documents.
+
+    The rules cover the XSD facets the transformer can violate with bad input
+    data. They do not replace the XSD, which also checks element order and
+    content models.
+    """
+
+    def __init__(self, formality_type: str = "ATA"):
+        """
+        Initialize the structural validator for a specific formality type.
+
+        Args:
+            formality_type: The type of formality (e.g., "ATA", "NOA")
+        """
+        if formality_type not in STRUCTURAL_RULES:
+            raise ValueError(f"No structural rules defined for formality type: {formality_type}")
+
+        self.formality_type = formality_type
+        self.rules = [Rule(*rule) for rule in STRUCTURAL_RULES[formality_type]]
+        self._compiled = [(rule, etree.XPath(rule.path, namespaces=NAMESPACES)) for rule in self.rules]
+        self._body_compiled = [(rule, xpath) for rule, xpath in self._compiled if not rule.path.startswith(_MAI_PATH)]
+
+    def validate(self, xml_root: etree._Element, mai_checked: bool = False) -> Tuple[bool, List[str]]:
+        """
+        Check a generated document against the structural rules.
+
+        Args:
+            xml_root: Envelope element of the document
+            mai_checked: Skip the MAI rules, because the document shares its MAI
+                element with a document that already passed them
+
+        Returns:
+            Tuple containing (is_valid, error_messages)
+        """
+        errors = []
+
+        for rule, xpath in (self._body_compiled if mai_checked else self._compiled):
+            elements = xpath(xml_root)
+
+            if not elements:
+                if rule.required:
+                    errors.append(f"{rule.path}: required element is missing")
+                continue
+
+            for element in elements:
+                error = rule.check(element.text or "")
+                if error:
+                    errors.append(f"{rule.path}: {error}")
+
+        return not errors, errors
+
+
+class ValidationPolicy:
+    """
+    Decides which validation tiers a generated document goes through and
+    counts what each tier caught.
+    """
+
+    def __init__(self, xsd_mode: str = "always", xsd_sample_percent: float = 100.0,
+                 random_func: Callable[[], float] = random.random):
+        """
+        Initialize the validation policy.
+
+        Args:
+            xsd_mode: "always", "never" or "sampled"
+            xsd_sample_percent: Percentage of documents validated against the XSD in "sampled" mode
+            random_func: Source of random numbers in [0, 1) used for sampling
+        """
+        if xsd_mode not in XSD_MODES:
+            raise ValueError(f"Invalid XSD validation mode: {xsd_mode} (expected one of {', '.join(XSD_MODES)})")
+
+        self.xsd_mode = xsd_mode
+        self.xsd_sample_percent = max(0.0, min(100.0, float(xsd_sample_percent)))
+        self._random = random_func
+        self._structural_validators: Dict[str, StructuralValidator] = {}
+        self._xsd_validated_types = set()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def validate(self, xml_root: etree._Element, formality_type: str, xsd_validator,
+                 mai_checked: bool = False) -> Tuple[bool, List[str]]:
+        """
+        Validate a generated document according to the policy.
+
+        Args:
+            xml_root: Envelope element of the document
+            formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+            xsd_validator: XMLValidator for the formality type
+            mai_checked: Skip the structural MAI rules, because the document shares
+                its MAI element with a document that already passed them
+
+        Returns:
+            Tuple containing (is_valid, error_messages)
+        """
+        self._count(formality_type, "documents")
+
+        is_valid, errors = self._structural_validator(formality_type).validate(xml_root, mai_checked)
+        if not is_valid:
+            self._count(formality_type, "structural_failed")
+            logger.debug(f"Structural validation failed for {formality_type}: {errors}")
+            return False, errors
+
+        if not self._should_run_xsd(formality_type):
+            self._count(formality_type, "xsd_skipped")
+            return True, []
+
+        self._count(formality_type, "xsd_validated")
+        is_valid, errors = xsd_validator.validate(xml_root)
+        if not is_valid:
+            # The document passed the structural rules, so this is something only the XSD catches
+            self._count(formality_type, "xsd_failed")
+            logger.warning(f"XSD validation caught errors missed by the structural rules for {formality_type}")
+
+        return is_valid, errors
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get the counters of each validation tier per formality type.
+
+        Returns:
+            Dictionary {formality_type: {counter: value}}
+        """
+        with self._lock:
+            return {formality_type: dict(counters) for formality_type, counters in self._counters.items()}
+
+    def reset_stats(self) -> None:
+        """Reset the counters."""
+        with self._lock:
+            self._counters.clear()
+
+    def _structural_validator(self, formality_type: str) -> StructuralValidator:
+        validator = self._structural_validators.get(formality_type)
+        if validator is None:
+            validator = self._structural_validators[formality_type] = StructuralValidator(formality_type)
+        return validator
+
+    def _should_run_xsd(self, formality_type: str) -> bool:
+        with self._lock:
+            if formality_type not in self._xsd_validated_types:
+                # First document of this type since the process started
+                self._xsd_validated_types.add(formality_type)
+                return True
+
+        if self.xsd_mode == "always":
+            return True
+        if self.xsd_mode == "never":
+            return False
+        return self._random() * 100.0 < self.xsd_sample_percent
+
+    def _count(self, formality_type: str, counter: str) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(formality_type, {
+                "documents": 0,
+                "structural_failed": 0,
+                "xsd_validated": 0,
+                "xsd_skipped": 0,
+                "xsd_failed": 0,
+            })
+            counters[counter] += 1
+
+
+_default_policy: Optional[ValidationPolicy] = None
+
+
+def get_validation_policy() -> ValidationPolicy:
+    """
+    Get the process-wide validation policy configured from the environment.
+
+    Returns:
+        ValidationPolicy instance shared by all converters in the process
+    """
+    global _default_policy
+    if _default_policy is None:
+        _default_policy = ValidationPolicy(VALIDATION_XSD_MODE, VALIDATION_XSD_SAMPLE_PERCENT)
+        logger.info(f"XSD validation mode: {_default_policy.xsd_mode}"
+                    + (f" ({_default_policy.xsd_sample_percent}%)" if _default_policy.xsd_mode == "sampled" else ""))
+    return _default_policy
+
+
+def get_validation_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Get the counters of the process-wide validation policy.
+
+    Returns:
+        Dictionary {formality_type: {counter: value}}
+    """
+    return get_validation_policy().stats()
@@ -11,6 +11,9 @@ from .converter_config import SCHEMA_PATHS, NAMESPACES
 
 logger = logging.getLogger(__name__)
 
+# Compiled schemas per formality type, shared by all validators in the process
+_schema_cache: Dict[str, etree.XMLSchema] = {}
+
 class XMLValidator:
     """
     Validates XML documents against EMSWe XSD schemas.
@@ -36,6 +39,11 @@ class XMLValidator:
         if not self.schema_paths:
             raise ValueError(f"No schema paths defined for formality type: {self.formality_type}")
 
+        cached_schema = _schema_cache.get(self.formality_type)
+        if cached_schema is not None:
+            self.schema = cached_schema
+            return
+
         try:
             main_schema_path = self.schema_paths.get("main")
             if not main_schema_path or not os.path.exists(main_schema_path):
@@ -53,6 +61,7 @@ class XMLValidator:
             # Load and parse the schema
             schema_doc = etree.parse(main_schema_path, parser)
             self.schema = etree.XMLSchema(schema_doc)
+            _schema_cache[self.formality_type] = self.schema
 
             logger.info(f"Successfully loaded schema for {self.formality_type}")
         except Exception as e:
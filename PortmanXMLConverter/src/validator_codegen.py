@@ -0,0 +1,756 @@
+"""
+Code generator for validators of Portman data.
+
+Reads the ATA, NOA and VID envelope schemas, resolves the XSD facets of every
+element the envelope templates fill with a value taken verbatim from the
+Portman data (`DATA_FIELDS`), and emits `generated_validators.py`: one plain
+Python function per formality type that checks the Portman data dict against
+those facets before any XML is built.
+
+The generated module is committed. Regenerate it after a schema update or a
+change of `DATA_FIELDS` with:
+
+    python -m PortmanXMLConverter.src.validator_codegen
+
+and check that it is up to date with `--check`.
+"""
+
+import os
+import re
+import sys
+import argparse
+import textwrap
+import logging
+from collections import namedtuple
+from typing import Any, Dict, List, Optional, Tuple
+
+from lxml import etree
+
+from .converter_config import NAMESPACES, SCHEMA_PATHS
+
+logger = logging.getLogger(__name__)
+
+XS = "http://www.w3.org/2001/XMLSchema"
+
+GENERATED_MODULE_PATH = os.path.join(os.path.dirname(__file__), "generated_validators.py")
+
+# A Portman data value the templates put into an element.
+#
+#   key: key path into the Portman data, e.g. ("declarant", "id")
+#   path: element path relative to the Envelope
+#   formality_types: formality types whose template fills the element from `key`
+#   transform: how the template turns the value into element text:
+#       "text": the value itself; None leaves the element empty and other
+#           non-strings cannot be rendered
+#       "optional_text": strings; other values leave the element empty
+#       "str": str(value)
+#       "strip": value.strip()
+#       a format string such as "VYG-{}": the formatted value
+#   skip: element texts the template leaves out or replaces with a default,
+#       which are therefore not checked
+#   truthy: the template only uses true values and leaves out or replaces the others
+#   conditional: the template leaves the element out when `key` is missing
+#   default_of: the value is only used as the default of this other key, when it is missing
+#   within: the template leaves out an enclosing element, and the element with it,
+#       unless one of these top-level keys is present
+DataField = namedtuple("DataField", ["key", "path", "formality_types", "transform", "skip", "truthy",
+                                     "conditional", "default_of", "within"])
+
+
+def _field(key: Tuple[str, ...], path: str, formality_types: Tuple[str, ...] = ("ATA", "NOA", "VID"),
+           transform: str = "text", skip: Tuple[str, ...] = (), truthy: bool = False, conditional: bool = True,
+           default_of: Optional[Tuple[str, ...]] = None, within: Tuple[str, ...] = ()) -> DataField:
+    return DataField(key, path, formality_types, transform, skip, truthy, conditional, default_of, within)
+
+
+_PARTY = "mai:MAI/mai:ExchangedDeclaration/ram:DeclarantTradeParty/"
+_CONTACT = _PARTY + "ram:DefinedTradeContact/"
+_ADDRESS = _PARTY + "ram:PostalTradeAddress/"
+_ATA = "ata:ATA/ata:SpecifiedLogisticsTransportMovement/"
+_NOA = "noa:NOA/noa:SpecifiedLogisticsTransportMovement/"
+_NOA_MEANS = _NOA + "ram:UsedLogisticsTransportMeans/"
+_NOA_STOP = _NOA + "ram:ItineraryTransportRoute/ram:ItineraryStopTransportEvent/"
+_NOA_BERTH = _NOA + "ram:CallTransportEvent/ram:ExpectedArrivalPortAreaRelatedLogisticsLocation/"
+_VID = "vid:VID/vid:SpecifiedLogisticsTransportMovement/"
+_VID_MEANS = _VID + "ram:UsedLogisticsTransportMeans/"
+# The NOA template renders UsedLogisticsTransportMeans only for data with either key
+_NOA_MEANS_KEYS = ("imoLloyds", "vesselName")
+
+DATA_FIELDS = [
+    _field(("document_id",), "mai:MAI/mai:ExchangedDocument/ram:ID", conditional=False),
+    _field(("declaration_id",), "mai:MAI/mai:ExchangedDeclaration/ram:ID", conditional=False),
+    _field(("declarant", "id"), _PARTY + "ram:ID"),
+    _field(("declarant", "name"), _PARTY + "ram:Name"),
+    _field(("declarant", "role_code"), _PARTY + "ram:RoleCode"),
+    _field(("declarant", "contact", "name"), _CONTACT + "ram:PersonName"),
+    _field(("declarant", "contact", "phone"), _CONTACT + "ram:TelephoneUniversalCommunication/ram:CompleteNumber"),
+    _field(("declarant", "contact", "email"), _CONTACT + "ram:EmailURIUniversalCommunication/ram:URIID"),
+    _field(("declarant", "address", "postcode"), _ADDRESS + "ram:PostcodeCode"),
+    _field(("declarant", "address", "street"), _ADDRESS + "ram:StreetName"),
+    _field(("declarant", "address", "city"), _ADDRESS + "ram:CityName"),
+    _field(("declarant", "address", "country"), _ADDRESS + "ram:CountryID"),
+    _field(("declarant", "address", "building"), _ADDRESS + "ram:BuildingNumber"),
+    _field(("call_id",), "mai:MAI/mai:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent/ram:ID",
+           ("ATA", "NOA")),
+
+    _field(("remarks",), "ata:ATA/ata:ExchangedDocument/ram:Remarks", ("ATA",)),
+    _field(("location",), _ATA + "ram:ArrivalTransportEvent/ram:OccurrenceLogisticsLocation/ram:ID", ("ATA",)),
+    _field(("anchorage_indicator",), _ATA + "ram:CallTransportEvent/ram:MaritimeAnchorageIndicator", ("ATA",)),
+
+    _field(("remarks",), "noa:NOA/noa:ExchangedDocument/ram:Remarks", ("NOA",), transform="optional_text"),
+    _field(("mode_code",), _NOA + "ram:ModeCode", ("NOA",), conditional=False),
+    _field(("voyage_id",), _NOA + "ram:ID", ("NOA",), conditional=False),
+    _field(("call_id",), _NOA + "ram:ID", ("NOA",), transform="VYG-{}", conditional=False,
+           default_of=("voyage_id",)),
+    _field(("cargo_description",), _NOA + "ram:CargoDescription", ("NOA",), conditional=False),
+    _field(("dangerous_goods_indicator",), _NOA + "ram:DangerousGoodsIndicator", ("NOA",), conditional=False),
+    _field(("call_purpose_code",), _NOA + "ram:CallPurposeCode", ("NOA",), conditional=False),
+    _field(("regular_service_indicator",), _NOA + "ram:RegularServiceIndicator", ("NOA",), conditional=False),
+    _field(("found_stowaway_indicator",), _NOA + "ram:FoundStowawayIndicator", ("NOA",), conditional=False),
+    _field(("vesselTypeCode",), _NOA_MEANS + "ram:TypeCode", ("NOA",), transform="str", within=_NOA_MEANS_KEYS),
+    _field(("imoLloyds",), _NOA_MEANS + "ram:RegistrationTransportEvent/ram:ID", ("NOA",), transform="str",
+           skip=("0", "None"), within=_NOA_MEANS_KEYS),
+    _field(("shippingCompany",), _NOA_MEANS + "ram:ShipCompanyTradeParty/ram:Name", ("NOA",),
+           within=_NOA_MEANS_KEYS),
+    _field(("portToVisit",), _NOA_STOP + "ram:OccurrenceLogisticsLocation/ram:ID", ("NOA",), conditional=False),
+    _field(("location",), _NOA_STOP + "ram:OccurrenceLogisticsLocation/ram:ID", ("NOA",), conditional=False,
+           default_of=("portToVisit",)),
+    _field(("berthName",), _NOA_BERTH + "ram:Name", ("NOA",)),
+    _field(("berthCode",), _NOA_BERTH + "ram:Name", ("NOA",), default_of=("berthName",)),
+
+    _field(("vesselName",), _VID_MEANS + "ram:Name", ("VID",), conditional=False),
+    _field(("vesselTypeCode",), _VID_MEANS + "ram:TypeCode", ("VID",), transform="str"),
+    _field(("radioCallSign",), _VID_MEANS + "ram:CallSignID", ("VID",), transform="strip", skip=("",),
+           truthy=True),
+    _field(("portToVisit",), _VID + "ram:CallTransportEvent/ram:OccurrenceLogisticsLocation/ram:ID", ("VID",),
+           truthy=True, conditional=False),
+]
+
+# Elements the templates fill with fixed codes or values they compute themselves
+# (counts, sanitized identifiers). They are not checked in the Portman data, but the
+# structural rules check them in the rendered documents along with the DATA_FIELDS elements.
+_MAI_DOCUMENT = "mai:MAI/mai:ExchangedDocument/"
+_COMPUTED_ELEMENTS = {
+    "ATA": (),
+    "NOA": (
+        _NOA + "ram:PassengerQuantity",
+        _NOA + "ram:CrewQuantity",
+        _NOA + "ram:TotalOnboardPersonQuantity",
+        _NOA_STOP + "ram:SequenceNumeric",
+    ),
+    "VID": (
+        _VID_MEANS + "ram:IMONumberIndicator",
+        _VID_MEANS + "ram:IMOID",
+        _VID_MEANS + "ram:MMSIID",
+    ),
+}
+_MAI_COMPUTED_ELEMENTS = (
+    _MAI_DOCUMENT + "ram:TypeCode",
+    _MAI_DOCUMENT + "ram:PurposeCode",
+    _MAI_DOCUMENT + "ram:VersionID",
+    _MAI_DOCUMENT + "ram:FirstSignatoryDocumentAuthentication/ram:ActualDateTime/udt:DateTimeString",
+)
+
+# Elements the templates always include, whatever the Portman data
+_ALWAYS_RENDERED = (
+    "mai:MAI/mai:ExchangedDocument",
+    "mai:MAI/mai:ExchangedDeclaration",
+    "ata:ATA/ata:ExchangedDocument",
+    "ata:ATA/ata:SpecifiedLogisticsTransportMovement",
+    "noa:NOA/noa:ExchangedDocument",
+    "noa:NOA/noa:SpecifiedLogisticsTransportMovement",
+    "noa:NOA/noa:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent",
+    "vid:VID/vid:SpecifiedLogisticsTransportMovement",
+    "vid:VID/vid:SpecifiedLogisticsTransportMovement/ram:UsedLogisticsTransportMeans",
+    "vid:VID/vid:SpecifiedLogisticsTransportMovement/ram:CallTransportEvent",
+)
+
+# Elements the templates include exactly when a dict of the Portman data is present
+_CONTAINERS = {
+    ("declarant",): _PARTY.rstrip("/"),
+    ("declarant", "contact"): _CONTACT.rstrip("/"),
+    ("declarant", "address"): _ADDRESS.rstrip("/"),
+}
+
+# The facets of a simple type, merged over its derivation chain
+#
+#   occurs: per path step, whether the element is required in its parent
+#   base: built-in XSD type the chain ends in, e.g. "token" or "decimal"
+#   patterns: one tuple of alternative patterns per derivation step; a value
+#       must match one pattern of every step
+ElementFacets = namedtuple("ElementFacets", [
+    "path", "occurs", "base", "length", "min_length", "max_length", "patterns", "enumeration",
+    "total_digits", "fraction_digits", "min_inclusive", "max_inclusive", "min_exclusive", "max_exclusive",
+])
+
+_BOUND_FACETS = ("minInclusive", "maxInclusive", "minExclusive", "maxExclusive")
+
+
+class SchemaSet:
+    """
+    The global components of an XSD and the schemas it imports.
+    """
+
+    def __init__(self, main_schema_path: str):
+        """
+        Load a schema and, recursively, the schemas it imports.
+
+        Args:
+            main_schema_path: Path to the main XSD file
+        """
+        self.elements: Dict[Tuple[str, str], etree._Element] = {}
+        self.types: Dict[Tuple[str, str], etree._Element] = {}
+        self._loaded = set()
+        self._load(os.path.abspath(main_schema_path))
+
+    def _load(self, schema_path: str) -> None:
+        if schema_path in self._loaded:
+            return
+        self._loaded.add(schema_path)
+
+        schema = etree.parse(schema_path).getroot()
+        namespace = schema.get("targetNamespace", "")
+        for child in schema:
+            name = child.get("name")
+            if child.tag == f"{{{XS}}}element":
+                self.elements[(namespace, name)] = child
+            elif child.tag in (f"{{{XS}}}complexType", f"{{{XS}}}simpleType"):
+                self.types[(namespace, name)] = child
+            elif child.tag in (f"{{{XS}}}import", f"{{{XS}}}include") and child.get("schemaLocation"):
+                self._load(os.path.join(os.path.dirname(schema_path), child.get("schemaLocation")))
+
+    @staticmethod
+    def _qname(node: etree._Element, value: str) -> Tuple[str, str]:
+        """Resolve a prefixed name in a schema attribute to (namespace, local name)."""
+        prefix, _, local = value.rpartition(":")
+        return node.nsmap.get(prefix or None, ""), local
+
+    @staticmethod
+    def _target_namespace(node: etree._Element) -> str:
+        schema = node.getroottree().getroot()
+        return schema.get("targetNamespace", "") if schema.get("elementFormDefault") == "qualified" else ""
+
+    def _element_type(self, element: etree._Element) -> Optional[etree._Element]:
+        """The named or anonymous type of an element declaration (None for built-in types)."""
+        if element.get("ref"):
+            element = self.elements[self._qname(element, element.get("ref"))]
+        if element.get("type"):
+            return self.types.get(self._qname(element, element.get("type")))
+        for child in element:
+            if child.tag in (f"{{{XS}}}complexType", f"{{{XS}}}simpleType"):
+                return child
+        return None
+
+    def _builtin_type(self, element: etree._Element) -> Optional[str]:
+        if element.get("ref"):
+            element = self.elements[self._qname(element, element.get("ref"))]
+        if element.get("type"):
+            namespace, local = self._qname(element, element.get("type"))
+            if namespace == XS:
+                return local
+        return None
+
+    def _particles(self, node: etree._Element, required: bool = True):
+        """
+        Yield (element declaration, required) for the child elements of a complex type.
+
+        An element is required when it and all its enclosing groups have a
+        minOccurs above 0 and it is not one of several alternatives of a choice.
+        """
+        for child in node:
+            if child.tag == f"{{{XS}}}element":
+                yield child, required and child.get("minOccurs", "1") != "0"
+            elif child.tag in (f"{{{XS}}}sequence", f"{{{XS}}}choice", f"{{{XS}}}all"):
+                group_required = required and child.get("minOccurs", "1") != "0"
+                if child.tag == f"{{{XS}}}choice" and len(child.findall(f"{{{XS}}}*")) > 1:
+                    group_required = False
+                yield from self._particles(child, group_required)
+            elif child.tag == f"{{{XS}}}complexContent":
+                for derivation in child:
+                    if derivation.tag == f"{{{XS}}}extension":
+                        base = self.types.get(self._qname(derivation, derivation.get("base")))
+                        if base is not None:
+                            yield from self._particles(base, required)
+                    if derivation.tag in (f"{{{XS}}}extension", f"{{{XS}}}restriction"):
+                        yield from self._particles(derivation, required)
+
+    def _child(self, parent_type: etree._Element, namespace: str, local: str) -> Tuple[etree._Element, bool]:
+        for element, required in self._particles(parent_type):
+            if element.get("ref"):
+                name = self._qname(element, element.get("ref"))
+            else:
+                name = (self._target_namespace(element), element.get("name"))
+            if name == (namespace, local):
+                return element, required
+        raise KeyError(f"{{{namespace}}}{local}")
+
+    def resolve(self, root_element: str, path: str) -> ElementFacets:
+        """
+        Resolve the facets of the element at `path`.
+
+        Args:
+            root_element: Name of the global root element in no namespace (e.g. "Envelope")
+            path: Element path of prefixed names (see NAMESPACES) relative to the root element
+
+        Returns:
+            ElementFacets of the element's simple content
+        """
+        element = self.elements[("", root_element)]
+        occurs = []
+        for step in path.split("/"):
+            prefix, local = step.split(":")
+            element, required = self._child(self._element_type(element), NAMESPACES[prefix], local)
+            occurs.append(required)
+
+        facets: Dict[str, Any] = {"patterns": [], "enumeration": None}
+        base = self._builtin_type(element)
+        simple_type = self._element_type(element)
+        while base is None and simple_type is not None:
+            simple_type, base = self._derive(simple_type, facets)
+
+        return ElementFacets(
+            path=path, occurs=tuple(occurs), base=base or "string",
+            length=facets.get("length"), min_length=facets.get("minLength"), max_length=facets.get("maxLength"),
+            patterns=tuple(facets["patterns"]), enumeration=facets["enumeration"],
+            total_digits=facets.get("totalDigits"), fraction_digits=facets.get("fractionDigits"),
+            min_inclusive=facets.get("minInclusive"), max_inclusive=facets.get("maxInclusive"),
+            min_exclusive=facets.get("minExclusive"), max_exclusive=facets.get("maxExclusive"),
+        )
+
+    def _derive(self, type_node: etree._Element, facets: Dict[str, Any]) -> Tuple[Optional[etree._Element], Optional[str]]:
+        """
+        Merge the facets of one derivation step into `facets`.
+
+        Returns:
+            Tuple (base type node, built-in base type name); one of them is None
+        """
+        derivation = None
+        for node in type_node.iter(f"{{{XS}}}restriction", f"{{{XS}}}extension"):
+            derivation = node
+            break
+        if derivation is None:
+            return None, None
+
+        if derivation.tag == f"{{{XS}}}restriction":
+            patterns = []
+            enumeration = []
+            for facet in derivation:
+                name = etree.QName(facet).localname
+                value = facet.get("value")
+                if name == "pattern":
+                    patterns.append(value)
+                elif name == "enumeration":
+                    enumeration.append(value)
+                elif name in ("length", "totalDigits", "fractionDigits"):
+                    facets.setdefault(name, int(value))
+                elif name == "minLength":
+                    facets[name] = max(facets.get(name, 0), int(value))
+                elif name == "maxLength":
+                    facets[name] = min(facets.get(name, int(value)), int(value))
+                elif name in _BOUND_FACETS:
+                    facets.setdefault(name, value)
+            if patterns:
+                facets["patterns"].append(tuple(patterns))
+            if enumeration and facets["enumeration"] is None:
+                facets["enumeration"] = tuple(enumeration)
+
+        namespace, local = self._qname(derivation, derivation.get("base"))
+        if namespace == XS:
+            return None, local
+        return self.types.get((namespace, local)), None
+
+
+# Built-in types whose values are whitespace-collapsed before the facets are checked
+_COLLAPSED_TYPES = {"token", "NMTOKEN", "language", "Name", "NCName", "ID", "IDREF", "anyURI",
+                    "boolean", "decimal", "integer", "nonNegativeInteger", "positiveInteger", "int", "long",
+                    "short", "byte", "date", "dateTime", "time"}
+_REPLACED_TYPES = {"normalizedString"}
+_DECIMAL_TYPES = {"decimal", "integer", "nonNegativeInteger", "positiveInteger", "int", "long", "short", "byte"}
+
+_HEADER = '''"""
+Validators of Portman data, generated from the EMSWe XSD schemas.
+
+Each function checks the Portman data values that the envelope templates put
+into the document as they are against the XSD facets of their elements, before
+any XML is built. Generated by `python -m PortmanXMLConverter.src.validator_codegen`
+from its DATA_FIELDS table; do not edit.
+
+STRUCTURAL_RULES applies the same checks to the elements of rendered documents
+(see validation_policy.StructuralValidator).
+"""
+
+import re
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+_MISSING = object()
+
+_WHITESPACE = re.compile(r"[\\t\\n\\r ]+")
+_DECIMAL = re.compile(r"[+-]?(\\d+(\\.\\d*)?|\\.\\d+)")
+_BOOLEAN = ("true", "false", "1", "0")
+
+
+def _lookup(portman_data: Dict[str, Any], key: Tuple[str, ...]) -> Any:
+    value = portman_data
+    for part in key:
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _collapse(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip(" ")
+
+
+def _digits(text: str) -> Tuple[int, int]:
+    """Total and fraction digits of a decimal, without insignificant zeros."""
+    integer, _, fraction = text.lstrip("+-").partition(".")
+    integer = integer.lstrip("0")
+    fraction = fraction.rstrip("0")
+    return len(integer) + len(fraction) or 1, len(fraction)
+'''
+
+_FOOTER = '''
+
+VALIDATORS = {
+%s
+}
+
+# Rules for rendered documents: (element path relative to the Envelope, required, check of the element text)
+STRUCTURAL_RULES = {
+%s
+}
+
+
+def validate_portman_data(portman_data: Dict[str, Any], formality_type: str) -> List[str]:
+    """
+    Check Portman data against the schema facets of a formality type.
+
+    Args:
+        portman_data: Dictionary containing Portman agent data
+        formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+
+    Returns:
+        Error messages; empty if the data is valid or the type has no validator
+    """
+    validator = VALIDATORS.get(formality_type)
+    return validator(portman_data) if validator is not None else []
+'''
+
+
+def _xsd_pattern(pattern: str) -> str:
+    """
+    Translate an XSD pattern to a Python regular expression.
+
+    XSD patterns are implicitly anchored (the generated code uses fullmatch)
+    and have no anchors of their own, so literal ^ and $ are escaped.
+    """
+    return re.sub(r"(?<!\\)([\^$])(?![^\[]*\])", r"\\\1", pattern)
+
+
+class _ModuleWriter:
+    """
+    Collects the constants and check functions of the generated module,
+    sharing identical ones between fields and formality types.
+    """
+
+    def __init__(self):
+        self.constants: List[str] = []
+        self.checks: List[str] = []
+        self._constant_names: Dict[str, str] = {}
+        self._check_names: Dict[str, str] = {}
+
+    def constant(self, prefix: str, expression: str) -> str:
+        name = self._constant_names.get(expression)
+        if name is None:
+            count = sum(1 for existing in self._constant_names.values() if existing.startswith(f"_{prefix}_"))
+            name = self._constant_names[expression] = f"_{prefix}_{count + 1}"
+            self.constants.append(f"{name} = {expression}")
+        return name
+
+    def check(self, stem: str, body: List[str]) -> str:
+        key = "\n".join(body)
+        name = self._check_names.get(key)
+        if name is None:
+            name = f"_check_{stem}"
+            used = set(self._check_names.values())
+            suffix = 2
+            while name in used:
+                name = f"_check_{stem}_{suffix}"
+                suffix += 1
+            self._check_names[key] = name
+            self.checks.append(f"def {name}(text: str) -> Optional[str]:\n" + key + "\n    return None\n")
+        return name
+
+    def check_body(self, facets: ElementFacets) -> List[str]:
+        """Statements checking `text` against the facets, returning the first error."""
+        lines = []
+        if facets.base in _COLLAPSED_TYPES:
+            lines.append("    text = _collapse(text)")
+        elif facets.base in _REPLACED_TYPES:
+            lines.append("    text = _WHITESPACE.sub(' ', text)")
+
+        if facets.base == "boolean":
+            lines += ["    if text not in _BOOLEAN:",
+                      "        return f\"value '{text}' is not a boolean\""]
+        elif facets.base in _DECIMAL_TYPES:
+            lines += ["    if not _DECIMAL.fullmatch(text):",
+                      "        return f\"value '{text}' is not a number\""]
+            if facets.base != "decimal":
+                lines += ["    if '.' in text:",
+                          "        return f\"value '{text}' is not an integer\""]
+
+        if facets.length is not None:
+            lines += [f"    if len(text) != {facets.length}:",
+                      f"        return f\"value '{{text}}' has length {{len(text)}}, expected {facets.length}\""]
+        if facets.min_length is not None:
+            lines += [f"    if len(text) < {facets.min_length}:",
+                      f"        return f\"value has length {{len(text)}}, minimum is {facets.min_length}\""]
+        if facets.max_length is not None:
+            lines += [f"    if len(text) > {facets.max_length}:",
+                      f"        return f\"value has length {{len(text)}}, maximum is {facets.max_length}\""]
+        for patterns in facets.patterns:
+            compiled = [self.constant("PATTERN", f"re.compile({_xsd_pattern(pattern)!r})") for pattern in patterns]
+            condition = " and ".join(f"not {name}.fullmatch(text)" for name in compiled)
+            lines += [f"    if {condition}:",
+                      f"        return f\"value '{{text}}' does not match {' | '.join(patterns)!r}\""]
+        if facets.enumeration is not None:
+            if len(facets.enumeration) <= 8:
+                lines += [f"    if text not in {facets.enumeration!r}:",
+                          f"        return f\"value '{{text}}' is not one of {list(facets.enumeration)!r}\""]
+            else:
+                codes = textwrap.fill(", ".join(repr(code) for code in sorted(facets.enumeration)), width=100,
+                                      initial_indent="    ", subsequent_indent="    ", break_on_hyphens=False)
+                name = self.constant("CODES", f"frozenset([\n{codes},\n])")
+                lines += [f"    if text not in {name}:",
+                          "        return f\"value '{text}' is not in the code list\""]
+        if facets.base in _DECIMAL_TYPES:
+            if facets.total_digits is not None:
+                lines += [f"    if _digits(text)[0] > {facets.total_digits}:",
+                          f"        return f\"value '{{text}}' has more than {facets.total_digits} digits\""]
+            if facets.fraction_digits is not None:
+                lines += [f"    if _digits(text)[1] > {facets.fraction_digits}:",
+                          f"        return f\"value '{{text}}' has more than {facets.fraction_digits} fraction digits\""]
+            for bound, operator in (("min_inclusive", "<"), ("max_inclusive", ">"),
+                                    ("min_exclusive", "<="), ("max_exclusive", ">=")):
+                value = getattr(facets, bound)
+                if value is not None:
+                    lines += [f"    if Decimal(text) {operator} Decimal({value!r}):",
+                              f"        return f\"value '{{text}}' is out of range ({bound} {value})\""]
+        return lines
+
+
+def _check_stem(facets: ElementFacets) -> str:
+    """Name of the check function of a facet set, e.g. "token_max17"."""
+    parts = [facets.base.lower()]
+    for label, value in (("length", facets.length), ("min", facets.min_length), ("max", facets.max_length),
+                         ("digits", facets.total_digits), ("fraction", facets.fraction_digits)):
+        if value is not None:
+            parts.append(f"{label}{value}")
+    if facets.patterns:
+        parts.append("pattern")
+    if facets.enumeration is not None:
+        parts.append("codes")
+    return "_".join(parts)
+
+
+def _required_condition(field: DataField, facets: Optional[ElementFacets]) -> Optional[str]:
+    """
+    Condition under which a missing value makes the document invalid.
+
+    The template leaves out the element of a missing conditional value. That is
+    an error when the element is required all the way up from the Envelope or
+    from an element the template always includes, or when it is required in
+    the element of its enclosing dict and that dict is present.
+
+    Returns:
+        Python expression, "True", or None if a missing value is never an error
+    """
+    if facets is None or not field.conditional:
+        return None
+    steps = field.path.split("/")
+    for depth in range(len(steps) - 1, -1, -1):
+        if depth == 0 or "/".join(steps[:depth]) in _ALWAYS_RENDERED:
+            if all(facets.occurs[depth:]):
+                return "True"
+            break
+    container = _CONTAINERS.get(field.key[:-1])
+    if container is not None and all(facets.occurs[container.count("/") + 1:]):
+        return f"isinstance(_lookup(portman_data, {field.key[:-1]!r}), dict)"
+    return None
+
+
+def _field_statements(writer: _ModuleWriter, field: DataField, formality_type: str,
+                      facets: Optional[ElementFacets]) -> List[str]:
+    """Statements of a validator function checking one field."""
+    name = ".".join(field.key)
+    if field.default_of:
+        name += f" (default of {'.'.join(field.default_of)})"
+    lines = [f"    # {field.path}" + ("" if facets is None else f" ({facets.base})"),
+             f"    value = _lookup(portman_data, {field.key!r})"]
+
+    conditions = ["value is not _MISSING"]
+    if field.default_of:
+        conditions.append(f"_lookup(portman_data, {field.default_of!r}) is _MISSING")
+    if field.truthy:
+        conditions.append("value")
+    required = _required_condition(field, facets)
+    # A present value of one of the `within` keys renders the enclosing element itself
+    if field.within and field.key not in [(key,) for key in field.within]:
+        rendered = f"any(key in portman_data for key in {field.within!r})"
+        conditions.append(rendered)
+        if required:
+            required = rendered if required == "True" else f"{required} and {rendered}"
+    if required:
+        # Past an unconditional required check the value is known to be present
+        present = conditions[1:] if required == "True" else conditions
+        lines += ["    if value is _MISSING:" if required == "True" else f"    if value is _MISSING and {required}:",
+                  f"        errors.append({name + ': required value is missing'!r})",
+                  "    elif " + " and ".join(present) + ":" if present else "    else:"]
+    else:
+        lines.append("    if " + " and ".join(conditions) + ":")
+
+    if facets is None:
+        message = f"{name}: element {field.path.split('/', 1)[1]} is not allowed by the {formality_type} schema"
+        lines.append(f"        errors.append({message!r})")
+        return lines
+
+    indent = "        "
+    if field.transform in ("text", "strip"):
+        if field.transform == "text":
+            lines.append(indent + "value = '' if value is None else value")
+        lines += [indent + "if not isinstance(value, str):",
+                  indent + f"    errors.append({name + ': value must be a string'!r})",
+                  indent + "else:"]
+        indent += "    "
+        if field.transform == "strip":
+            lines.append(indent + "value = value.strip()")
+    elif field.transform == "optional_text":
+        lines.append(indent + "value = value if isinstance(value, str) else ''")
+    elif field.transform == "str":
+        lines.append(indent + "value = str(value)")
+    else:
+        lines.append(indent + f"value = {field.transform!r}.format(value)")
+
+    if field.skip:
+        lines.append(indent + f"if value not in {field.skip!r}:")
+        indent += "    "
+
+    check = writer.check(_check_stem(facets), writer.check_body(facets))
+    lines += [indent + f"error = {check}(value)",
+              indent + "if error:",
+              indent + f"    errors.append({name + ': '!r} + error)"]
+    return lines
+
+
+def generate_module(formality_types=("ATA", "NOA", "VID")) -> str:
+    """
+    Generate the source of the validators module.
+
+    Args:
+        formality_types: Formality types to generate a validator for
+
+    Returns:
+        Python source code
+    """
+    writer = _ModuleWriter()
+    functions = []
+    rules = []
+
+    for formality_type in formality_types:
+        schema_set = SchemaSet(SCHEMA_PATHS[formality_type]["main"])
+        lines = [f"def validate_{formality_type.lower()}(portman_data: Dict[str, Any]) -> List[str]:",
+                 f'    """Check Portman data against the {formality_type} schema facets."""',
+                 "    errors = []"]
+        # The templates index into a present container, so it must be a dict
+        used = {field.key for field in DATA_FIELDS if formality_type in field.formality_types}
+        for key in sorted(_CONTAINERS):
+            if any(field_key[:len(key)] == key for field_key in used):
+                lines += ["",
+                          f"    value = _lookup(portman_data, {key!r})",
+                          "    if value is not _MISSING and not isinstance(value, dict):",
+                          f"        errors.append({'.'.join(key) + ': value must be a dict'!r})"]
+        for field in DATA_FIELDS:
+            if formality_type not in field.formality_types:
+                continue
+            try:
+                facets = schema_set.resolve("Envelope", field.path)
+            except KeyError:
+                facets = None
+            lines.append("")
+            lines += _field_statements(writer, field, formality_type, facets)
+        lines += ["", "    return errors", ""]
+        functions.append("\n".join(lines))
+        rules.append(_structural_rules(writer, schema_set, formality_type))
+
+    validators = "\n".join(f"    {formality_type!r}: validate_{formality_type.lower()},"
+                           for formality_type in formality_types)
+    parts = [_HEADER, "\n".join(writer.constants) + "\n", *writer.checks, *functions]
+    return ("\n\n".join(part.rstrip("\n") + "\n" for part in parts).rstrip("\n") + "\n"
+            + _FOOTER % (validators, "\n".join(rules)))
+
+
+def _structural_rules(writer: _ModuleWriter, schema_set: SchemaSet, formality_type: str) -> str:
+    """
+    Entry of the STRUCTURAL_RULES table of a formality type.
+
+    The rules cover the elements of DATA_FIELDS that the schema allows and the
+    computed elements. An element is required when it is required all the way
+    up from the Envelope.
+    """
+    paths = list(_MAI_COMPUTED_ELEMENTS)
+    for field in DATA_FIELDS:
+        if formality_type in field.formality_types and field.path not in paths:
+            paths.append(field.path)
+    paths += _COMPUTED_ELEMENTS[formality_type]
+
+    lines = [f"    {formality_type!r}: ("]
+    for path in paths:
+        try:
+            facets = schema_set.resolve("Envelope", path)
+        except KeyError:
+            continue
+        check = writer.check(_check_stem(facets), writer.check_body(facets))
+        lines.append(f"        ({path!r}, {all(facets.occurs)}, {check}),")
+    lines.append("    ),")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Write the generated validators module, or with --check compare it with the committed one.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv)
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description="Generate Portman data validators from the EMSWe XSD schemas")
+    parser.add_argument("--output-file", default=GENERATED_MODULE_PATH, help="Path of the generated module")
+    parser.add_argument("--check", action="store_true", help="Only check that the module is up to date")
+    args = parser.parse_args(argv)
+
+    source = generate_module()
+
+    if args.check:
+        try:
+            with open(args.output_file, encoding="utf-8") as f:
+                current = f.read()
+        except OSError:
+            current = None
+        if current != source:
+            print(f"{args.output_file} is out of date; regenerate it with python -m PortmanXMLConverter.src.validator_codegen")
+            return 1
+        print(f"{args.output_file} is up to date")
+        return 0
+
+    with open(args.output_file, "w", encoding="utf-8") as f:
+        f.write(source)
+    print(f"Wrote {args.output_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,16 +11,44 @@ import json
 import argparse
 import logging
 import datetime
+import time
+from collections import namedtuple
 from typing import Dict, Any
 
 try:
     # Try importing with package prefix
     from PortmanXMLConverter.src.converter import EMSWeConverter
-    from PortmanXMLConverter.src.digitraffic_adapter import adapt_digitraffic_to_portman
+    from PortmanXMLConverter.src.digitraffic_adapter import adapt_digitraffic_to_portman, adapt_digitraffic_batch
+    from PortmanXMLConverter.src.validation_policy import get_validation_stats
+    from PortmanXMLConverter.src.archive import XMLArchiveWriter, XMLArchiveReader
+    from PortmanXMLConverter.src.content_hash import semantic_hash, defaulted_timestamp_paths, DatabaseContentHashStore
+    from PortmanXMLConverter.src.serialization import XML_CONTENT_TYPE, serialize_xml
+    from PortmanXMLConverter.src.log_events import log_event, LazyJSON
+    from PortmanXMLConverter.src.bulk_upload import BulkUploader
+    from PortmanXMLConverter.src.storage import AzureBlobStorage, LocalFileStorage, MemoryStorage
+    from PortmanXMLConverter.src.catalog import DatabaseDocumentCatalog, document_name, make_entry
+    from PortmanXMLConverter.src.blob_metadata import notification_metadata
+    from PortmanXMLConverter.src.converter_config import OUTPUT_DIR
+    from PortmanXMLConverter.src.bulk import (
+        expand_inputs, convert_file, validate_file, process_files, map_in_processes, summarize_validation
+    )
 except ImportError:
     # Try importing directly when running from within the package directory
     from src.converter import EMSWeConverter
-    from src.digitraffic_adapter import adapt_digitraffic_to_portman
+    from src.digitraffic_adapter import adapt_digitraffic_to_portman, adapt_digitraffic_batch
+    from src.validation_policy import get_validation_stats
+    from src.archive import XMLArchiveWriter, XMLArchiveReader
+    from src.content_hash import semantic_hash, defaulted_timestamp_paths, DatabaseContentHashStore
+    from src.serialization import XML_CONTENT_TYPE, serialize_xml
+    from src.log_events import log_event, LazyJSON
+    from src.bulk_upload import BulkUploader
+    from src.storage import AzureBlobStorage, LocalFileStorage, MemoryStorage
+    from src.catalog import DatabaseDocumentCatalog, document_name, make_entry
+    from src.blob_metadata import notification_metadata
+    from src.converter_config import OUTPUT_DIR
+    from src.bulk import (
+        expand_inputs, convert_file, validate_file, process_files, map_in_processes, summarize_validation
+    )
 try:
     import azure.functions as func
 except ImportError:
@@ -31,20 +59,30 @@ try:
 except ImportError:
     # For command-line usage without Azure SDK
     BlobServiceClient = None
-from config import AZURE_STORAGE_CONFIG
+from config import AZURE_STORAGE_CONFIG, DATABASE_CONFIG, DOCUMENT_STORAGE_CONFIG, XML_CONVERTER_CONFIG
 
 # Try to import the shared blob utilities
 try:
-    from PortmanTrigger.blob_utils import generate_blob_storage_link
+    from PortmanTrigger.blob_utils import generate_short_lived_link, get_container_client, reset_blob_clients
 except ImportError:
     try:
         # Try alternative import path
-        from blob_utils import generate_blob_storage_link
+        from blob_utils import generate_short_lived_link, get_container_client, reset_blob_clients
     except ImportError:
-        # Fallback definition if the module can't be imported
-        def generate_blob_storage_link(blob_name, connection_string=None):
-            logging.warning("generate_blob_storage_link function not available in XML Converter")
-            return None
+        # Fallback definitions if the module can't be imported
+        def generate_short_lived_link(blob_name, connection_string=None, now=None):
+            logging.warning("generate_short_lived_link function not available in XML Converter")
+            return "", None
+
+        def get_container_client(container_name, connection_string=None):
+            container_client = BlobServiceClient.from_connection_string(connection_string).get_container_client(
+                container_name)
+            if not container_client.exists():
+                container_client.create_container()
+            return container_client
+
+        def reset_blob_clients(container_name=None):
+            pass
 
 # Configure logging
 logging.basicConfig(
@@ -81,6 +119,13 @@ Examples:
 
   # Convert Digitraffic port call data to EMSWe XML
   python3 xml_converter.py from-digitraffic --json-file /path/to/portcall.json --output-file emswe_output.xml --formality-type ATA
+
+  # Convert a batch of port calls using 8 worker processes
+  python3 xml_converter.py from-digitraffic --json-file /path/to/portcalls.json --output-file out/emswe.xml --formality-type ATA --batch --workers 8
+
+  # Convert a batch of port calls into a single archive and extract one document
+  python3 xml_converter.py from-digitraffic --json-file /path/to/portcalls.json --formality-type NOA --batch --archive out/noa.tar.gz
+  python3 xml_converter.py extract-archive --archive out/noa.tar.gz --port-call-id 3190880 --output-file noa.xml
         """
     )
 
@@ -88,20 +133,39 @@ Examples:
 
     # Validate command
     validate_parser = subparsers.add_parser("validate", help="Validate an EMSWe XML file")
-    validate_parser.add_argument("--xml-file", required=True, help="Path to the XML file to validate")
-    validate_parser.add_argument("--formality-type", default="ATA", help="Formality type (default: ATA)")
+    validate_input = validate_parser.add_mutually_exclusive_group(required=True)
+    validate_input.add_argument("--xml-file", help="Path to the XML file to validate")
+    validate_input.add_argument("--input", nargs="+",
+                                help="Directories or glob patterns of XML files to validate, detecting the "
+                                     "formality type of each document")
+    validate_parser.add_argument("--formality-type", default="ATA",
+                                 help="Formality type of --xml-file (default: ATA)")
+    validate_parser.add_argument("--workers", type=int, default=1,
+                                 help="Number of worker processes for --input (default: 1)")
+    validate_parser.add_argument("--report",
+                                 help="Path to save the JSON validation report of --input (default: stdout)")
 
     # From EMSWe command
     from_emswe_parser = subparsers.add_parser("from-emswe", help="Convert EMSWe XML to Portman JSON")
-    from_emswe_parser.add_argument("--xml-file", required=True, help="Path to the EMSWe XML file")
-    from_emswe_parser.add_argument("--output-file", help="Path to save the output JSON file (default: stdout)")
-    from_emswe_parser.add_argument("--formality-type", default="ATA", help="Formality type (default: ATA)")
+    from_emswe_input = from_emswe_parser.add_mutually_exclusive_group(required=True)
+    from_emswe_input.add_argument("--xml-file", help="Path to the EMSWe XML file")
+    from_emswe_input.add_argument("--input", nargs="+",
+                                  help="Directories or glob patterns of EMSWe XML files to convert in bulk "
+                                       "to JSON Lines, detecting the formality type of each document")
+    from_emswe_parser.add_argument("--output-file",
+                                   help="Path to save the output JSON (JSON Lines with --input) file (default: stdout)")
+    from_emswe_parser.add_argument("--formality-type", default="ATA",
+                                   help="Formality type of --xml-file (default: ATA)")
+    from_emswe_parser.add_argument("--workers", type=int, default=1,
+                                   help="Number of worker processes for --input (default: 1)")
 
     # To EMSWe command
     to_emswe_parser = subparsers.add_parser("to-emswe", help="Convert Portman JSON to EMSWe XML")
     to_emswe_parser.add_argument("--json-file", required=True, help="Path to the Portman JSON file")
     to_emswe_parser.add_argument("--output-file", help="Path to save the output XML file (default: stdout)")
     to_emswe_parser.add_argument("--formality-type", default="ATA", help="Formality type (default: ATA)")
+    to_emswe_parser.add_argument("--compact", action="store_true",
+                                 help="Write the XML without indentation for machine consumers")
 
     # From Digitraffic command (new)
     from_digitraffic_parser = subparsers.add_parser("from-digitraffic",
@@ -109,14 +173,40 @@ Examples:
     from_digitraffic_parser.add_argument("--json-file", required=True, help="Path to the Digitraffic JSON file")
     from_digitraffic_parser.add_argument("--output-file", help="Path to save the output XML file (default: stdout)")
     from_digitraffic_parser.add_argument("--formality-type", default="ATA", help="Formality type (default: ATA)")
+    from_digitraffic_parser.add_argument("--compact", action="store_true",
+                                         help="Write the XML without indentation for machine consumers")
     from_digitraffic_parser.add_argument("--batch", action="store_true",
                                          help="Process multiple port calls in batch mode")
+    from_digitraffic_parser.add_argument("--workers", type=int, default=1,
+                                         help="Number of worker processes in batch mode (default: 1)")
+    from_digitraffic_parser.add_argument("--archive",
+                                         help="Write batch output into a single archive (.zip, .tar, .tar.gz, "
+                                              ".tgz, .tar.bz2 or .tar.xz) instead of one file per port call")
+    from_digitraffic_parser.add_argument("--no-compress", action="store_true",
+                                         help="Store zip archive members without compression")
+    from_digitraffic_parser.add_argument("--upload", action="store_true",
+                                         help="Store batch output in the document storage (XML_STORAGE_BACKEND, "
+                                              "Blob Storage by default) instead of writing one file per port call")
+    from_digitraffic_parser.add_argument("--upload-concurrency", type=int,
+                                         help="Uploads in flight with --upload (default: BULK_UPLOAD_CONCURRENCY "
+                                              "or 8)")
+
+    # Extract archive command
+    extract_archive_parser = subparsers.add_parser("extract-archive",
+                                                   help="List or extract documents of a batch archive")
+    extract_archive_parser.add_argument("--archive", required=True, help="Path to the archive")
+    extract_archive_parser.add_argument("--port-call-id", help="Port call ID of the document to extract")
+    extract_archive_parser.add_argument("--name", help="Name of the document to extract")
+    extract_archive_parser.add_argument("--output-file", help="Path to save the extracted XML file (default: stdout)")
 
     return parser.parse_args()
 
 
 def validate_xml(args):
     """Validate an EMSWe XML file."""
+    if args.input:
+        return validate_xml_bulk(args)
+
     converter = EMSWeConverter(formality_type=args.formality_type)
     is_valid, message = converter.validate_xml(args.xml_file)
 
@@ -131,8 +221,54 @@ def validate_xml(args):
         return 1
 
 
+def validate_xml_bulk(args):
+    """Validate EMSWe XML files in bulk and write a JSON report with per-file results and error statistics."""
+    paths = expand_inputs(args.input)
+    if not paths:
+        logger.error(f"No XML files found: {' '.join(args.input)}")
+        print(f"No XML files found: {' '.join(args.input)}", file=sys.stderr)
+        return 1
+
+    workers = max(1, args.workers)
+    start_time = time.time()
+    results = list(process_files(validate_file, paths, workers))
+    elapsed = time.time() - start_time
+
+    summary = summarize_validation(results)
+    report = {
+        "generated": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "inputs": args.input,
+        "workers": workers,
+        "elapsed_seconds": round(elapsed, 3),
+        "summary": summary,
+        "files": results,
+    }
+
+    if args.report:
+        report_dir = os.path.dirname(args.report)
+        if report_dir:
+            os.makedirs(report_dir, exist_ok=True)
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Validation report saved to: {args.report}")
+    else:
+        print(json.dumps(report, indent=2))
+
+    message = (f"{summary['valid']} of {summary['files']} files valid "
+               f"({summary['invalid']} invalid, {summary['error']} not validated) "
+               f"in {elapsed:.2f}s with {workers} worker(s)")
+    logger.info(message)
+    # Keep stdout for the report when no report file is given
+    print(message, file=sys.stdout if args.report else sys.stderr)
+
+    return 0 if summary["valid"] == summary["files"] else 1
+
+
 def convert_from_emswe(args):
     """Convert EMSWe XML to Portman JSON."""
+    if args.input:
+        return convert_from_emswe_bulk(args)
+
     converter = EMSWeConverter(formality_type=args.formality_type)
     success, result = converter.convert_from_emswe(args.xml_file)
 
@@ -156,6 +292,41 @@ def convert_from_emswe(args):
     return 0
 
 
+def convert_from_emswe_bulk(args):
+    """Convert EMSWe XML files in bulk to Portman JSON Lines, one object per document."""
+    paths = expand_inputs(args.input)
+    if not paths:
+        logger.error(f"No XML files found: {' '.join(args.input)}")
+        print(f"No XML files found: {' '.join(args.input)}", file=sys.stderr)
+        return 1
+
+    workers = max(1, args.workers)
+    start_time = time.time()
+    success_count = 0
+
+    output = open(args.output_file, 'w') if args.output_file else sys.stdout
+    try:
+        for result in process_files(convert_file, paths, workers):
+            if result["success"]:
+                success_count += 1
+            else:
+                logger.error(f"Conversion failed for {result['file']}: {'; '.join(result['errors'])}")
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+    finally:
+        if args.output_file:
+            output.close()
+
+    elapsed = time.time() - start_time
+    summary = (f"{success_count} of {len(paths)} documents converted successfully "
+               f"in {elapsed:.2f}s with {workers} worker(s)")
+    logger.info(summary)
+    # Keep stdout for the JSON Lines when no output file is given
+    print(summary, file=sys.stdout if args.output_file else sys.stderr)
+
+    return 0 if success_count > 0 else 1
+
+
 def convert_to_emswe(args):
     """Convert Portman JSON to EMSWe XML."""
     # Read JSON file
@@ -168,7 +339,7 @@ def convert_to_emswe(args):
         return 1
 
     # Convert to EMSWe XML
-    converter = EMSWeConverter(formality_type=args.formality_type)
+    converter = EMSWeConverter(formality_type=args.formality_type, pretty_print=not args.compact)
     success, result = converter.convert_to_emswe(portman_data, args.output_file)
 
     if not success:
@@ -186,6 +357,80 @@ def convert_to_emswe(args):
     return 0
 
 
+def _batch_output_file(output_file, index):
+    """Output file name of the port call at `index` in a batch."""
+    if output_file:
+        norm_path = os.path.normpath(output_file)
+        base_name = os.path.splitext(norm_path)[0]
+        ext = os.path.splitext(norm_path)[1] or ".xml"
+        return f"{base_name}_{index + 1}{ext}"
+
+    return os.path.join("output", f"portcall_{index + 1}.xml")
+
+
+# Converter of the current batch worker process. Each worker builds its own
+# converter, so schemas and templates are compiled once per process.
+_batch_converter = None
+# Whether the batch workers also return the notification metadata of the documents
+_batch_metadata = False
+
+
+def _init_batch_worker(formality_type, pretty_print=True, with_metadata=False):
+    """Initialize a batch worker process."""
+    global _batch_converter, _batch_metadata
+    _batch_converter = EMSWeConverter(formality_type=formality_type, pretty_print=pretty_print)
+    _batch_metadata = with_metadata
+    # Forked workers inherit the parent's counters; count only this batch
+    _batch_converter.validation_policy.reset_stats()
+
+
+def _convert_batch_item(task):
+    """Convert one port call of a batch in the current worker process."""
+    i, portman_data, output_file = task
+
+    # Convert the adapted Portman data to EMSWe XML
+    metadata = None
+    if _batch_metadata and not output_file:
+        # Read the notification fields from the rendered document before serializing it
+        success, result = _batch_converter.render_emswe(portman_data)
+        if success:
+            metadata = notification_metadata(result, _batch_converter.formality_type)
+            result = serialize_xml(result, _batch_converter.pretty_print)
+    else:
+        success, result = _batch_converter.convert_to_emswe(portman_data, output_file)
+
+    return i, success, result, metadata, os.getpid(), get_validation_stats()
+
+
+def _run_batch(tasks, formality_type, workers, pretty_print=True, with_metadata=False):
+    """
+    Convert batch tasks, yielding results in task order as they complete.
+
+    Args:
+        tasks: List of (index, portman_data, output_file) tuples
+        formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+        workers: Number of worker processes (1 converts in the current process)
+        pretty_print: Indent the documents; False serializes them compact
+        with_metadata: Also return the notification metadata of documents returned as XML
+
+    Returns:
+        Iterator of (index, success, result, metadata, worker_pid, validation_stats) tuples
+    """
+    return map_in_processes(_convert_batch_item, tasks, workers, _init_batch_worker,
+                            (formality_type, pretty_print, with_metadata))
+
+
+def _merge_validation_stats(stats_list):
+    """Sum validation counters reported by the batch workers."""
+    merged = {}
+    for stats in stats_list:
+        for formality_type, counters in stats.items():
+            totals = merged.setdefault(formality_type, {})
+            for name, value in counters.items():
+                totals[name] = totals.get(name, 0) + value
+    return merged
+
+
 def convert_from_digitraffic(args):
     """Convert Digitraffic port call data to EMSWe XML."""
     # Read JSON file
@@ -197,9 +442,6 @@ def convert_from_digitraffic(args):
         print(f"Error reading JSON file: {str(e)}")
         return 1
 
-    # Initialize converter
-    converter = EMSWeConverter(formality_type=args.formality_type)
-
     # Check if we're processing multiple port calls
     if args.batch:
         # Determine if it's a list of port calls or a structure with a portCalls field
@@ -212,53 +454,114 @@ def convert_from_digitraffic(args):
 
         logger.info(f"Processing {len(port_calls)} port calls in batch mode")
 
+        if args.upload:
+            try:
+                storage = get_document_storage()
+            except ValueError as e:
+                logger.error(str(e))
+                print(str(e))
+                return 1
+
         # Create output directory if needed
-        if args.output_file:
+        if args.archive:
+            try:
+                archive = XMLArchiveWriter(args.archive, compress=not args.no_compress)
+            except Exception as e:
+                logger.error(f"Error creating archive: {str(e)}")
+                print(f"Error creating archive: {str(e)}")
+                return 1
+            print(f"Writing batch output to archive: {args.archive}")
+        elif args.output_file and not args.upload:
             # Normalize path to handle both forward and backslashes
             norm_path = os.path.normpath(args.output_file)
             output_dir = os.path.dirname(norm_path)
             if output_dir:  # If there's a directory part in the path
                 os.makedirs(output_dir, exist_ok=True)
                 print(f"Created output directory: {output_dir}")
-        else:
+        elif not args.upload:
             output_dir = "output"
             os.makedirs(output_dir, exist_ok=True)
             print(f"Created default output directory: {output_dir}")
 
-        # Process each port call
+        # Uploads run concurrently while the batch is being converted
+        uploader = None
+        # Notification metadata of the submitted uploads, built by the workers
+        upload_metadata = {}
+        if args.upload:
+            uploader = BulkUploader(
+                lambda name, xml_content: storage.put(name, xml_content, upload_metadata.get(name)),
+                concurrency=args.upload_concurrency,
+                progress=lambda done, submitted, failed: print(
+                    f"Uploaded {done - failed} of {submitted} documents ({failed} failed)"))
+            print(f"Uploading batch output to container: {storage.container_name}")
+
+        # Process each port call, in worker processes if requested. In archive and upload
+        # mode the workers return the XML and the documents are streamed into the archive
+        # and the uploader here.
+        output_files = [_batch_output_file(args.output_file, i) for i in range(len(port_calls))]
+        workers = max(1, args.workers or 1)
         success_count = 0
-        for i, port_call in enumerate(port_calls):
-            # Adapt Digitraffic data to Portman format
-            portman_data = adapt_digitraffic_to_portman(port_call)
-
-            # Generate output filename
-            if args.output_file:
-                norm_path = os.path.normpath(args.output_file)
-                base_name = os.path.splitext(norm_path)[0]
-                ext = os.path.splitext(norm_path)[1] or ".xml"
-                output_file = f"{base_name}_{i + 1}{ext}"
-                print(f"base_name: {base_name}")
-                print(f"ext: {ext}")
-                print(f"output_file: {output_file}")
-            else:
-                output_dir = "output"
-                os.makedirs(output_dir, exist_ok=True)
-                output_file = os.path.join(output_dir, f"portcall_{i + 1}.xml")
+        worker_stats = {}
+        start_time = time.perf_counter()
 
-            # Convert to EMSWe XML
-            success, result = converter.convert_to_emswe(portman_data, output_file)
+        # Adapt all port calls to Portman format in one pass before converting
+        portman_batch = adapt_digitraffic_batch(port_calls, args.formality_type)
+        tasks = [(i, portman_data, None if args.archive or args.upload else output_files[i])
+                 for i, portman_data in enumerate(portman_batch)]
+        batch_created = datetime.datetime.now(datetime.timezone.utc)
+        # Catalog entries of the submitted uploads, recorded once they are stored
+        catalog_entries = {}
 
-            if success:
-                logger.info(f"Port call {i + 1} converted successfully: {result}")
-                print(f"Port call {i + 1} converted successfully: {result}")
-                success_count += 1
-            else:
-                logger.error(f"Port call {i + 1} conversion failed: {result}")
-                print(f"Port call {i + 1} conversion failed: {result}")
+        try:
+            for i, success, result, metadata, pid, stats in _run_batch(tasks, args.formality_type, workers,
+                                                                       not args.compact, uploader is not None):
+                worker_stats[pid] = stats
+                xml_content = result
+                if success and args.archive:
+                    result = archive.add(os.path.basename(output_files[i]), xml_content,
+                                         port_calls[i].get("portCallId"), args.formality_type)["name"]
+                if success and uploader is not None:
+                    port_call_id = port_calls[i].get("portCallId") or i + 1
+                    result = document_name(args.formality_type, port_call_id, port_calls[i].get("portToVisit"),
+                                           batch_created)
+                    catalog_entries[result] = make_entry(
+                        storage.path(result), args.formality_type, port_call_id, portman_batch[i].get("imoLloyds"),
+                        port_calls[i].get("portToVisit"), size=len(xml_content.encode("utf-8")), created=batch_created)
+                    upload_metadata[result] = metadata
+                    uploader.submit(result, xml_content)
+                if success:
+                    logger.info(f"Port call {i + 1} converted successfully: {result}")
+                    print(f"Port call {i + 1} converted successfully: {result}")
+                    success_count += 1
+                else:
+                    logger.error(f"Port call {i + 1} conversion failed: {result}")
+                    print(f"Port call {i + 1} conversion failed: {result}")
+        finally:
+            if args.archive:
+                archive.close()
+            if uploader is not None:
+                upload_results = uploader.close()
+                record_documents([catalog_entries[upload_result.name] for upload_result in upload_results
+                                  if upload_result.success])
+
+        elapsed = time.perf_counter() - start_time
 
         logger.info(
             f"Batch processing complete. {success_count} of {len(port_calls)} port calls converted successfully.")
         print(f"Batch processing complete. {success_count} of {len(port_calls)} port calls converted successfully.")
+        print(f"Throughput: {len(port_calls)} port calls in {elapsed:.2f} s with {workers} worker(s) "
+              f"({len(port_calls) / elapsed if elapsed > 0 else 0:.1f} port calls/s)")
+        for formality_type, counters in _merge_validation_stats(worker_stats.values()).items():
+            print(f"Validation ({formality_type}): " + ", ".join(f"{name}={value}" for name, value in counters.items()))
+
+        if uploader is not None:
+            print(f"Upload complete. {uploader.done - uploader.failed} of {uploader.submitted} documents uploaded "
+                  f"({uploader.retries} throttled attempts retried)")
+            for upload_result in upload_results:
+                if not upload_result.success:
+                    print(f"Upload of {upload_result.name} failed: {upload_result.error}")
+            if uploader.failed:
+                return 1
 
         return 0 if success_count > 0 else 1
     else:
@@ -270,6 +573,9 @@ def convert_from_digitraffic(args):
         else:
             port_call = digitraffic_data
 
+        # Initialize converter
+        converter = EMSWeConverter(formality_type=args.formality_type, pretty_print=not args.compact)
+
         # Adapt Digitraffic data to Portman format
         portman_data = adapt_digitraffic_to_portman(port_call)
 
@@ -298,10 +604,178 @@ def convert_from_digitraffic(args):
 
         return 0
     
-def convert_from_portcall_data(portcall_data, xml_type=None):
-    """Convert Digitraffic port call data to EMSWe XML."""
-    # Read JSON file
-    converter = EMSWeConverter(formality_type=xml_type)
+def extract_archive(args):
+    """List or extract documents of a batch archive."""
+    try:
+        reader = XMLArchiveReader(args.archive)
+    except Exception as e:
+        logger.error(f"Error reading archive: {str(e)}")
+        print(f"Error reading archive: {str(e)}")
+        return 1
+
+    with reader:
+        if args.name:
+            names = [args.name]
+        elif args.port_call_id:
+            names = [entry["name"] for entry in reader.find(args.port_call_id)]
+        else:
+            # List the archive contents
+            for entry in reader.documents:
+                print(f"{entry['name']}\t{entry['portCallId']}\t{entry['formality']}\t{entry['size']}\t{entry['sha256']}")
+            return 0
+
+        if not names:
+            print(f"No documents found for port call {args.port_call_id}")
+            return 1
+
+        try:
+            data = reader.read(names[-1])
+        except (KeyError, ValueError) as e:
+            logger.error(str(e))
+            print(str(e))
+            return 1
+
+    if args.output_file:
+        with open(args.output_file, "wb") as f:
+            f.write(data)
+        print(f"Extracted {names[-1]} to: {args.output_file}")
+    else:
+        print(data.decode("utf-8"))
+
+    return 0
+
+
+def _connect_database():
+    """Open a new connection to the Portman database."""
+    import pg8000
+    return pg8000.connect(
+        database=DATABASE_CONFIG["dbname"],
+        user=DATABASE_CONFIG["user"],
+        password=DATABASE_CONFIG["password"],
+        host=DATABASE_CONFIG["host"],
+        port=DATABASE_CONFIG["port"]
+    )
+
+
+_content_hash_store = None
+
+
+def get_content_hash_store():
+    """Get the process-wide store of the latest document hash per port call and formality."""
+    global _content_hash_store
+    if _content_hash_store is None:
+        _content_hash_store = DatabaseContentHashStore(_connect_database)
+    return _content_hash_store
+
+
+_document_catalog = None
+
+
+def get_document_catalog():
+    """Get the process-wide catalog of generated documents (the `xml_documents` table)."""
+    global _document_catalog
+    if _document_catalog is None:
+        _document_catalog = DatabaseDocumentCatalog(_connect_database)
+    return _document_catalog
+
+
+def record_documents(entries):
+    """Record stored documents in the catalog; a failure is logged and does not fail the generation."""
+    if not XML_CONVERTER_CONFIG.get("catalog", True):
+        return
+    try:
+        get_document_catalog().add_many(entries)
+    except Exception as e:
+        logger.warning(f"Failed to record {len(entries)} document(s) in the catalog: {str(e)}")
+
+
+_document_storage = None
+
+
+def get_document_storage():
+    """
+    Get the process-wide storage of generated documents.
+
+    The backend is selected by XML_STORAGE_BACKEND: "azure" (Blob Storage),
+    "local" (files under XML_STORAGE_LOCAL_DIR) or "memory". Without a setting,
+    documents go to Blob Storage when AzureWebJobsStorage is configured and to
+    local files otherwise.
+    """
+    global _document_storage
+    if _document_storage is None:
+        container_name = AZURE_STORAGE_CONFIG["container_name"]
+        connection_string = AZURE_STORAGE_CONFIG["connection_string"]
+        compress = XML_CONVERTER_CONFIG.get("gzip", False)
+        backend = DOCUMENT_STORAGE_CONFIG["backend"] or ("azure" if connection_string else "local")
+        if backend == "azure":
+            # Shared clients; the container is checked and created once per process
+            _document_storage = AzureBlobStorage(
+                container_name,
+                lambda: get_container_client(container_name, connection_string),
+                sign_link=lambda document_path: generate_short_lived_link(document_path, connection_string),
+                reset_client=lambda: reset_blob_clients(container_name),
+                compress=compress)
+        elif backend == "local":
+            _document_storage = LocalFileStorage(container_name, DOCUMENT_STORAGE_CONFIG["local_dir"] or OUTPUT_DIR,
+                                                 compress=compress)
+        elif backend == "memory":
+            _document_storage = MemoryStorage(container_name, compress=compress)
+        else:
+            raise ValueError(f"Unknown XML_STORAGE_BACKEND: {backend} (expected azure, local or memory)")
+        logger.info(f"Storing XML documents with the {backend} backend in {container_name}")
+    return _document_storage
+
+
+def find_unchanged_document(xml_content, port_call_id, formality_type, storage, volatile_paths=()):
+    """
+    Compare a generated document with the latest stored document of the port call.
+
+    Args:
+        xml_content: Generated XML document
+        port_call_id: Port call ID
+        formality_type: Type of formality (e.g., "ATA", "NOA", "VID")
+        storage: DocumentStorage of the documents
+        volatile_paths: Elements of the document left out of the hash (see defaulted_timestamp_paths)
+
+    Returns:
+        Tuple (content_hash, stored_name); stored_name is None unless an
+        existing document has the same content
+    """
+    try:
+        content_hash = semantic_hash(xml_content, volatile_paths)
+        stored = get_content_hash_store().get(port_call_id, formality_type)
+        if (stored is not None and stored.content_hash == content_hash
+                and storage.exists(stored.blob_name)):
+            logger.info(f"{formality_type} XML for port call {port_call_id} is unchanged, "
+                        f"reusing document {stored.blob_name}")
+            return content_hash, stored.blob_name
+        return content_hash, None
+    except Exception as e:
+        # Deduplication is an optimization; never fail the generation because of it
+        logger.warning(f"Content deduplication unavailable: {str(e)}")
+        return None, None
+
+
+# A generated document and what store_xml records about it; volatile_paths are the
+# elements that hold the generation time, metadata the notification fields of the document
+GeneratedDocument = namedtuple("GeneratedDocument", [
+    "xml_content", "filename", "port_call_id", "formality_type", "volatile_paths", "imo", "port", "created",
+    "metadata"
+])
+
+
+def generate_xml_from_portcall_data(portcall_data, xml_type=None):
+    """
+    Convert Digitraffic port call data to an EMSWe XML document without storing it.
+
+    Args:
+        portcall_data: Digitraffic port call, or a structure with a portCalls list
+        xml_type: Type of formality (e.g., "ATA", "NOA", "VID")
+
+    Returns:
+        GeneratedDocument, or None if the conversion failed
+    """
+    converter = EMSWeConverter(formality_type=xml_type, pretty_print=XML_CONVERTER_CONFIG.get("pretty_print", True))
 
     # Process single port call (either the whole file or the first port call)
     if isinstance(portcall_data, dict) and "portCalls" in portcall_data and portcall_data["portCalls"]:
@@ -338,72 +812,142 @@ def convert_from_portcall_data(portcall_data, xml_type=None):
             portman_data['imoLloyds'] = port_call['imoLloyds']
         logger.info(f"Final Portman data for VID - vesselName: {portman_data.get('vesselName')}, imoLloyds: {portman_data.get('imoLloyds')}, eta: {portman_data.get('eta')}")
 
-    # Generate a unique filename based on formality type
+    # Generate a unique filename based on formality type, under a date and port prefix
     port_call_id = portcall_data.get('portCallId')
-    timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+    created = datetime.datetime.now(datetime.timezone.utc)
     
     # Use appropriate prefix based on the XML type (default to ATA if not specified)
     xml_prefix = xml_type if xml_type in ["ATA", "NOA", "VID"] else "ATA"
-    filename = f"{xml_prefix}_{port_call_id}_{timestamp}.xml"
+    filename = document_name(xml_prefix, port_call_id, port_call.get('portToVisit'), created)
 
     # Convert to EMSWe XML
-    success, result = converter.convert_to_emswe(portman_data)
+    success, xml_root = converter.render_emswe(portman_data)
 
     if not success:
-        logger.error(f"Conversion failed: {result}")
-        print(f"Conversion failed: {result}")
+        logger.error(f"Conversion failed: {xml_root}")
+        print(f"Conversion failed: {xml_root}")
         return None
 
-    # Get storage connection string from app settings
-    connection_string = AZURE_STORAGE_CONFIG["connection_string"]
-    container_name = AZURE_STORAGE_CONFIG["container_name"]
-    
-    if (not connection_string or not container_name or 'PYTEST_CURRENT_TEST' in os.environ):
-        # For local/command-line usage, save to a local file
-        os.makedirs("output", exist_ok=True)
-        local_filename = os.path.join("output", filename)
-        with open(local_filename, "w", encoding="utf-8") as f:
-            f.write(result)
-        logger.info(f"Saved XML to local file: {local_filename}")
-        return local_filename
-    
-    try:
-        # Connect to blob storage
-        blob_service_client = BlobServiceClient.from_connection_string(connection_string)
-        container_client = blob_service_client.get_container_client(container_name)
-        
-        # Create container if it doesn't exist
-        if not container_client.exists():
-            container_client.create_container()
-        
-        # Upload XML to Blob Storage
-        blob_client = container_client.get_blob_client(filename)
-        blob_client.upload_blob(result, overwrite=True, content_type="application/xml")
-        
-        # Get the full blob path for generating SAS URL
-        blob_path = f"{container_name}/{filename}"
-        
-        # Generate SAS URL using the shared utility function
-        sas_url = generate_blob_storage_link(blob_path, connection_string)
-        
-        # If SAS URL generation failed, fall back to plain URL
-        if not sas_url:
-            logger.warning(f"Failed to generate SAS URL, falling back to plain URL")
-            sas_url = blob_client.url
-        
-        logger.info(f"XML stored with SAS URL: {sas_url}")
-        
-        return sas_url
-    except Exception as e:
-        # Handle storage-related exceptions
-        logger.error(f"Error storing XML to Azure Blob Storage: {str(e)}")
-        # Fall back to local file storage
-        os.makedirs("output", exist_ok=True)
-        local_filename = os.path.join("output", filename)
-        with open(local_filename, "w", encoding="utf-8") as f:
-            f.write(result)
-        logger.info(f"Saved XML to local file: {local_filename}")
-        return local_filename
+    # The Slack notifier reads its fields from the blob metadata; read them from the
+    # rendered document so the stored XML is never parsed again
+    metadata = notification_metadata(xml_root, xml_prefix)
+    result = serialize_xml(xml_root, converter.pretty_print)
+
+    return GeneratedDocument(result, filename, port_call_id, xml_prefix, defaulted_timestamp_paths(port_call, xml_prefix),
+                             portman_data.get('imoLloyds'), port_call.get('portToVisit'), created, metadata)
+
+
+def store_xml(result, filename, port_call_id, xml_prefix, volatile_paths=(), imo=None, port=None, created=None,
+              metadata=None):
+    """
+    Store a generated EMSWe XML document with its notification metadata in the document
+    storage and record it in the catalog.
+
+    Args:
+        result: XML document
+        filename: Name of the document
+        port_call_id: Port call ID
+        xml_prefix: Type of formality (e.g., "ATA", "NOA", "VID")
+        volatile_paths: Elements left out of the deduplication hash
+        imo: IMO number of the vessel, for the catalog
+        port: Port to visit, for the catalog
+        created: Generation time, for the catalog
+        metadata: Notification metadata of the document (see blob_metadata.notification_metadata)
+
+    Returns:
+        Document path "container/name" of the stored (or reused unchanged) document;
+        download links are signed on request by emswe-xml-link
+
+    Raises:
+        Exception: The document could not be stored
+    """
+    storage = get_document_storage()
+
+    # Reuse the latest stored document of this port call if its content is unchanged
+    content_hash = None
+    stored_name = None
+    if XML_CONVERTER_CONFIG.get("deduplicate"):
+        content_hash, stored_name = find_unchanged_document(
+            result, port_call_id, xml_prefix, storage, volatile_paths)
+
+    if stored_name:
+        filename = stored_name
+    else:
+        # The Slack notifier reads its fields from the metadata instead of parsing the document
+        storage.put(filename, result, metadata)
+
+        if content_hash:
+            try:
+                get_content_hash_store().put(port_call_id, xml_prefix, content_hash, filename)
+            except Exception as e:
+                logger.warning(f"Failed to record content hash for {filename}: {str(e)}")
+
+        if XML_CONVERTER_CONFIG.get("catalog", True):
+            if content_hash is None:
+                try:
+                    content_hash = semantic_hash(result, volatile_paths)
+                except Exception as e:
+                    logger.warning(f"Failed to hash {filename} for the catalog: {str(e)}")
+            record_documents([make_entry(storage.path(filename), xml_prefix, port_call_id, imo, port, content_hash,
+                                         len(result.encode("utf-8")) if isinstance(result, str) else len(result),
+                                         created)])
+
+    # The document path is stored; links are signed when someone asks for one
+    document_path = storage.path(filename)
+    logger.info(f"XML stored: {document_path}")
+
+    return document_path
+
+
+def convert_from_portcall_data(portcall_data, xml_type=None):
+    """Convert Digitraffic port call data to EMSWe XML and store it."""
+    document = generate_xml_from_portcall_data(portcall_data, xml_type)
+    if document is None:
+        return None
+    return store_xml(*document)
+
+def _storage_error_response(formality_type, error):
+    """Response of a document that was generated but could not be stored; the caller may retry."""
+    logger.error(f"Error storing {formality_type} XML: {str(error)}")
+    return func.HttpResponse(
+        json.dumps({"status": "error", "message": f"{formality_type} XML could not be stored"}),
+        mimetype="application/json",
+        status_code=503
+    )
+
+
+def _inline_xml_response(portcall_data, formality_type, store):
+    """Generate an XML document and return it as the response body, storing it too if requested."""
+    document = generate_xml_from_portcall_data(portcall_data, formality_type)
+    if document is None:
+        return func.HttpResponse(
+            json.dumps({"status": "error", "message": f"{formality_type} XML generation failed"}),
+            mimetype="application/json",
+            status_code=422
+        )
+
+    xml_content, filename = document.xml_content, document.filename
+    headers = {"Content-Disposition": f'inline; filename="{os.path.basename(filename)}"'}
+    if store:
+        # A short-lived link of the stored document travels in a header next to the XML body
+        try:
+            stored_path = store_xml(*document)
+        except Exception as e:
+            return _storage_error_response(formality_type, e)
+        headers["X-Blob-Path"] = stored_path
+        storage = get_document_storage()
+        sas_url, _ = storage.url(storage.name_from_path(stored_path))
+        if sas_url:
+            headers["X-Sas-Url"] = sas_url
+
+    return func.HttpResponse(
+        body=xml_content.encode("utf-8"),
+        mimetype=XML_CONTENT_TYPE,
+        charset="utf-8",
+        headers=headers,
+        status_code=200
+    )
+
 
 def xml_converter(req: func.HttpRequest) -> func.HttpResponse:
     logging.info('Portman XML converter function processing a request')
@@ -418,9 +962,9 @@ def xml_converter(req: func.HttpRequest) -> func.HttpResponse:
         
         portcall_data = req_body.get('portcall_data')
         
-        # Log detailed port call data for debugging
-        logging.info(f"Received port call data: {json.dumps(portcall_data)}")
-        
+        # The full payload is rendered only when debug logging is enabled
+        log_event(logger, logging.DEBUG, "converter.payload", payload=LazyJSON(portcall_data))
+
         formality_type = req_body.get('formality_type', 'ATA')  # Default to ATA if not specified
         
         # Validate formality type
@@ -431,22 +975,48 @@ def xml_converter(req: func.HttpRequest) -> func.HttpResponse:
                 status_code=400
             )
         
-        logging.info(f"Generating {formality_type}-XML message from: {portcall_data}")
-        sas_url = convert_from_portcall_data(portcall_data, formality_type)
+        # Inline mode returns the XML document itself, optionally without storing it
+        return_xml = req_body.get('return_xml', False)
+        store = req_body.get('store', True)
+        if not isinstance(return_xml, bool) or not isinstance(store, bool):
+            return func.HttpResponse(
+                json.dumps({"status": "error", "message": "return_xml and store must be booleans"}),
+                mimetype="application/json",
+                status_code=400
+            )
+        if not return_xml and not store:
+            return func.HttpResponse(
+                json.dumps({"status": "error", "message": "Nothing to do: set return_xml or store"}),
+                mimetype="application/json",
+                status_code=400
+            )
+
+        log_event(logger, logging.INFO, "converter.request", formality_type=formality_type,
+                  call_id=portcall_data.get("portCallId") if isinstance(portcall_data, dict) else None,
+                  return_xml=return_xml, store=store)
+        if return_xml:
+            return _inline_xml_response(portcall_data, formality_type, store)
 
-        if sas_url is None:
+        document = generate_xml_from_portcall_data(portcall_data, formality_type)
+
+        if document is None:
             return func.HttpResponse(
                 json.dumps({"status": "success", "message": f"{formality_type} XML generated but not stored"}),
                 mimetype="application/json",
                 status_code=200
             )
         else:
-            # Use only sasUrl in the response - standardize the format
+            try:
+                stored_path = store_xml(*document)
+            except Exception as e:
+                return _storage_error_response(formality_type, e)
+
+            # Only the document path is returned; emswe-xml-link signs download links on request
             return func.HttpResponse(
                 json.dumps({
                     "status": "success", 
                     "message": f"{formality_type} XML generated and stored successfully", 
-                    "sasUrl": sas_url
+                    "blobPath": stored_path
                 }),
                 mimetype="application/json",
                 status_code=200
@@ -471,6 +1041,8 @@ if __name__ == "__main__":
         sys.exit(convert_to_emswe(args))
     elif args.command == "from-digitraffic":
         sys.exit(convert_from_digitraffic(args))
+    elif args.command == "extract-archive":
+        sys.exit(extract_archive(args))
     else:
         print("Invalid command. Run with --help for usage information.")
         sys.exit(1)
@@ -15,7 +15,60 @@ AZURE_STORAGE_CONFIG = {
     "container_name": os.getenv("AZURE_STORAGE_CONTAINER_NAME", "emswe-xml-messages"),
 }
 
+# Storage backend of generated XML documents (see PortmanXMLConverter/src/storage.py)
+DOCUMENT_STORAGE_CONFIG = {
+    # "azure", "local" or "memory"; empty selects Azure when AzureWebJobsStorage is set, else local files
+    "backend": os.getenv("XML_STORAGE_BACKEND", "").lower(),
+    # Root directory of the local backend (default: PortmanXMLConverter/output)
+    "local_dir": os.getenv("XML_STORAGE_LOCAL_DIR", "")
+}
+
+# Download links of stored XML documents, signed on demand by the emswe-xml-link function
+BLOB_LINK_CONFIG = {
+    # Minutes a link stays valid after its signing bucket ends
+    "sas_ttl_minutes": int(os.getenv("XML_LINK_SAS_TTL_MINUTES", 15)),
+    # Links of a blob requested within the same bucket share one signature
+    "sas_bucket_minutes": int(os.getenv("XML_LINK_SAS_BUCKET_MINUTES", 5))
+}
+
 XML_CONVERTER_CONFIG = {
     "function_url": os.getenv("XML_CONVERTER_FUNCTION_URL", "http://localhost:7071/api/emswe-xml-converter"),
-    "function_key": os.getenv("XML_CONVERTER_FUNCTION_KEY", "")
+    "function_key": os.getenv("XML_CONVERTER_FUNCTION_KEY", ""),
+    # Seconds to wait for the converter before the call is queued for a retry
+    "timeout_seconds": float(os.getenv("XML_CONVERTER_TIMEOUT_SECONDS", 60)),
+    # Skip the upload when a regenerated document has the same content as the latest stored one
+    "deduplicate": os.getenv("XML_CONVERTER_DEDUPLICATE", "true").lower() == "true",
+    # Indent generated documents; "false" serializes them compact for machine consumers
+    "pretty_print": os.getenv("XML_CONVERTER_PRETTY_PRINT", "true").lower() == "true",
+    # Store documents gzip-compressed with Content-Encoding: gzip
+    "gzip": os.getenv("XML_CONVERTER_GZIP", "false").lower() == "true",
+    # Record every stored document in the xml_documents catalog table
+    "catalog": os.getenv("XML_CONVERTER_CATALOG", "true").lower() == "true"
+}
+
+# Idempotency keys for XML generation
+IDEMPOTENCY_CONFIG = {
+    # How long a generated event is remembered
+    "ttl_hours": int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", 72)),
+    # How long a claim of an event being generated blocks other runs
+    "pending_timeout_minutes": int(os.getenv("IDEMPOTENCY_PENDING_TIMEOUT_MINUTES", 15))
+}
+
+# Debouncing of ETA changes before NOA generation
+NOA_DEBOUNCE_CONFIG = {
+    # Minutes an ETA must be stable before a NOA is generated (0 = generate on every change)
+    "window_minutes": int(os.getenv("NOA_DEBOUNCE_MINUTES", 0)),
+    # NOAs for arrivals within this many minutes are generated without waiting
+    "imminent_minutes": int(os.getenv("NOA_DEBOUNCE_IMMINENT_MINUTES", 120))
+}
+
+# Retry queue for failed XML generations
+RETRY_QUEUE_CONFIG = {
+    # Attempts before an event is moved to the dead-letter state
+    "max_attempts": int(os.getenv("XML_RETRY_MAX_ATTEMPTS", 8)),
+    # Delay after the first failure, doubled on each further failure
+    "base_delay_seconds": int(os.getenv("XML_RETRY_BASE_DELAY_SECONDS", 60)),
+    "max_delay_seconds": int(os.getenv("XML_RETRY_MAX_DELAY_SECONDS", 3600)),
+    # Events retried per batch at the start of a run
+    "batch_size": int(os.getenv("XML_RETRY_BATCH_SIZE", 20))
 }
@@ -6,6 +6,7 @@ from PortmanNotificator.slack_notificator import blob_trigger
 from CargoGenerator.cargo_generator import cargo_generator
 from VesselDetails.vessel_details import vessel_details
 from PortmanTrigger.noa_generator import noa_generator
+from PortmanTrigger.xml_link import xml_link, xml_documents
 
 app = func.FunctionApp()
 
@@ -29,3 +30,9 @@ app.route(route="vessel-details", auth_level=func.AuthLevel.FUNCTION, methods=["
 
 # Register NOA Generator
 app.route(route="noa-generator", auth_level=func.AuthLevel.FUNCTION, methods=["GET", "POST"])(noa_generator)
+
+# Register XML Link (short-lived download links of stored XML documents)
+app.route(route="emswe-xml-link", auth_level=func.AuthLevel.FUNCTION, methods=["GET"])(xml_link)
+
+# Register XML Documents (catalog queries of generated XML documents)
+app.route(route="emswe-xml-documents", auth_level=func.AuthLevel.FUNCTION, methods=["GET"])(xml_documents)
@@ -179,7 +179,7 @@ export const mockArrivals = [
     portareaname: "Matkustajasatama",
     berthname: "viking1",
     created: "2024-03-13T10:20:00.000Z",
-    ata_xml_url: "https://storageaccount.blob.core.windows.net/xmlfiles/ata_3190880.xml"
+    ata_xml_url: "emswe-xml-messages/2024/03/13/FIHEL/ATA_3190880_20240313102000.xml"
   },
   {
     id: 2,
@@ -191,7 +191,7 @@ export const mockArrivals = [
     portareaname: "Länsisatama",
     berthname: "LJ7",
     created: "2024-03-14T09:00:00.000Z",
-    ata_xml_url: "https://storageaccount.blob.core.windows.net/xmlfiles/ata_3190881.xml"
+    ata_xml_url: "emswe-xml-messages/2024/03/14/FIHEL/ATA_3190881_20240314090000.xml"
   },
   {
     id: 3,
@@ -203,7 +203,7 @@ export const mockArrivals = [
     portareaname: "Vuosaaren satama",
     berthname: "VC3",
     created: "2024-03-15T15:30:00.000Z",
-    ata_xml_url: "https://storageaccount.blob.core.windows.net/xmlfiles/ata_3190882.xml"
+    ata_xml_url: "emswe-xml-messages/2024/03/15/FIHEL/ATA_3190882_20240315153000.xml"
   },
   {
     id: 4,
@@ -215,7 +215,7 @@ export const mockArrivals = [
     portareaname: "Matkustajasatama",
     berthname: "LJ8",
     created: "2024-03-16T16:25:00.000Z",
-    ata_xml_url: "https://storageaccount.blob.core.windows.net/xmlfiles/ata_3190883.xml"
+    ata_xml_url: "emswe-xml-messages/2024/03/16/FIHEL/ATA_3190883_20240316162500.xml"
   },
   {
     id: 5,
@@ -227,7 +227,7 @@ export const mockArrivals = [
     portareaname: "Länsisatama",
     berthname: "LJ5",
     created: "2024-03-17T12:20:00.000Z",
-    ata_xml_url: "https://storageaccount.blob.core.windows.net/xmlfiles/ata_3190884.xml"
+    ata_xml_url: "emswe-xml-messages/2024/03/17/FIHEL/ATA_3190884_20240317122000.xml"
   }
 ];
 
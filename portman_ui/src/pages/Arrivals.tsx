@@ -129,8 +129,22 @@ const Arrivals: React.FC = () => {
     return new Date(dateString).toLocaleString();
   };
 
-  const handleViewXML = (url: string) => {
-    window.open(url, '_blank');
+  // ata_xml_url holds a blob path; the download link is signed when the XML is opened
+  const handleViewXML = async (blobPath: string) => {
+    // Open the window before the request so it is not blocked as a popup
+    const xmlWindow = window.open('', '_blank');
+    try {
+      const link = await api.getXmlLink(blobPath);
+      if (xmlWindow) {
+        xmlWindow.location.href = link.url;
+      } else {
+        window.open(link.url, '_blank');
+      }
+    } catch (err) {
+      console.error('Error opening XML:', err);
+      xmlWindow?.close();
+      setError('Failed to open the XML document. Please try again later.');
+    }
   };
 
   if (loading && arrivals.length === 0) {
@@ -1,11 +1,14 @@
-import axios from 'axios';
-import { AISResponse, ArrivalUpdate, PortCall } from '../types';
+import axios, { InternalAxiosRequestConfig } from 'axios';
+import { AISResponse, ArrivalUpdate, PortCall, XmlLink } from '../types';
 import { mockArrivalUpdates, mockPortCalls, mockTrackedVessels } from '../data/mockData';
 
 // @ts-ignore
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL;
 // @ts-ignore
 const AIS_API_BASE_URL = import.meta.env.VITE_AIS_API_BASE_URL;
+// Function app serving the on-demand XML download links (emswe-xml-link)
+// @ts-ignore
+const FUNCTION_APP_URL = import.meta.env.VITE_FUNCTION_APP_URL;
 
 // Flag to use mock data instead of real API calls
 const USE_MOCK_DATA = false;
@@ -18,28 +21,33 @@ const apiClient = axios.create({
   },
 });
 
-// Add request interceptor to include function key and auth token
-apiClient.interceptors.request.use(
-    (config) => {
-      // Add function key if available
-      const functionKey = localStorage.getItem('portmanFunctionKey');
-      if (functionKey) {
-        config.params = {
-          ...config.params,
-          code: functionKey,
-        };
-      }
+// Client of the function app endpoints; they use function-level auth, so requests carry the function key
+const functionClient = axios.create({
+  baseURL: FUNCTION_APP_URL + '/api',
+});
 
-      // Add auth token if available
-      const token = localStorage.getItem('portmanAuthToken');
-      if (token) {
-        config.headers.Authorization = `Bearer ${token}`;
-      }
+// Request interceptor including the function key and auth token
+const addCredentials = (config: InternalAxiosRequestConfig) => {
+  // Add function key if available
+  const functionKey = localStorage.getItem('portmanFunctionKey');
+  if (functionKey) {
+    config.params = {
+      ...config.params,
+      code: functionKey,
+    };
+  }
+
+  // Add auth token if available
+  const token = localStorage.getItem('portmanAuthToken');
+  if (token) {
+    config.headers.Authorization = `Bearer ${token}`;
+  }
+
+  return config;
+};
 
-      return config;
-    },
-    (error) => Promise.reject(error)
-);
+apiClient.interceptors.request.use(addCredentials, (error) => Promise.reject(error));
+functionClient.interceptors.request.use(addCredentials, (error) => Promise.reject(error));
 
 // API functions
 export const api = {
@@ -231,6 +239,21 @@ export const api = {
     }
   },
 
+  // Short-lived download link of a stored XML document; the *_xml_url columns hold blob paths
+  getXmlLink: async (blobPath: string): Promise<XmlLink> => {
+    if (USE_MOCK_DATA) {
+      return { blobPath, url: `https://storageaccount.blob.core.windows.net/${blobPath}`, expires: null };
+    }
+
+    try {
+      const response = await functionClient.get('/emswe-xml-link', { params: { path: blobPath, redirect: 'false' } });
+      return response.data;
+    } catch (error) {
+      console.error(`Error signing a link for ${blobPath}:`, error);
+      throw error;
+    }
+  },
+
   // Vessels
   getTrackedVessels: async () => {
     if (USE_MOCK_DATA) {
@@ -77,7 +77,14 @@ export interface Arrival {
   portareaname: string;
   berthname: string;
   created: string;
-  ata_xml_url?: string;
+  ata_xml_url?: string; // Blob path "emswe-xml-messages/...", not a URL; see XmlLink
+}
+
+// Short-lived download link of a stored XML document, signed on request by emswe-xml-link
+export interface XmlLink {
+  blobPath: string;
+  url: string;
+  expires: string | null;
 }
 
 export interface User {